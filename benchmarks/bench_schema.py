@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Sxema asosidagi parser benchmark i
+
+Kompilyatsiya qilingan sxemalarni (src/schema.py) asl qo'lda yozilgan parser metodlari
+bilan solishtiradi: natijalar bir xilligini tekshiradi, vaqtni o'lchaydi va har bir metod
+uchun tezlashishni maqsad bilan solishtiradi. Maqsadga yetmagan metod bo'lsa chiqish kodi 1.
+
+Maqsad (standart 3x) ro'yxat metodlariga qo'yiladi. Bitta yozuvli parse_device_info va
+parse_ptz_info uchun talab - sekinlashmaslik (1x): ularda sxema ishining o'zi asl metod
+vaqtining uchdan biridan ko'p, farqni faqat vaqt belgisi keshi beradi.
+
+    python benchmarks/bench_schema.py [qatorlar_soni] [maqsad_tezlashish]
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+from typing import Dict, List, Any
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser import HikVisionParser
+
+
+class LegacyParser:
+    """Qo'lda yozilgan asl parser metodlari (har bir qatorda datetime.now() bilan)"""
+    
+    def parse_device_info(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Qurilma ma'lumotlarini parsing qilish
+        
+        Args:
+            device_info: Qurilma ma'lumotlari
+            
+        Returns:
+            Parsing qilingan ma'lumotlar
+        """
+        parsed = {
+            'timestamp': datetime.now().isoformat(),
+            'device_name': '',
+            'device_id': '',
+            'model': '',
+            'serial_number': '',
+            'firmware_version': '',
+            'mac_address': '',
+            'ip_address': '',
+            'manufacturer': '',
+            'device_type': ''
+        }
+        
+        if 'DeviceInfo' in device_info:
+            info = device_info['DeviceInfo']
+            parsed.update({
+                'device_name': info.get('deviceName', ''),
+                'device_id': info.get('deviceID', ''),
+                'model': info.get('model', ''),
+                'serial_number': info.get('serialNumber', ''),
+                'firmware_version': info.get('firmwareVersion', ''),
+                'mac_address': info.get('macAddress', ''),
+                'ip_address': info.get('ipAddress', ''),
+                'manufacturer': info.get('manufacturer', 'HikVision'),
+                'device_type': info.get('deviceType', '')
+            })
+        
+        return parsed
+    
+    def parse_channels(self, channels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Kanallarni parsing qilish
+        
+        Args:
+            channels: Kanallar ro'yxati
+            
+        Returns:
+            Parsing qilingan kanallar
+        """
+        parsed_channels = []
+        
+        for channel in channels:
+            parsed_channel = {
+                'timestamp': datetime.now().isoformat(),
+                'channel_id': '',
+                'channel_name': '',
+                'enabled': False,
+                'resolution_height': 0,
+                'resolution_width': 0,
+                'video_format': '',
+                'input_port': '',
+                'video_quality': ''
+            }
+            
+            if isinstance(channel, dict):
+                parsed_channel.update({
+                    'channel_id': channel.get('id', ''),
+                    'channel_name': channel.get('channelName', ''),
+                    'enabled': channel.get('enabled', 'false').lower() == 'true',
+                    'input_port': channel.get('inputPort', ''),
+                })
+                
+                # Video formatini parsing qilish
+                if 'videoFormat' in channel:
+                    video_format = channel['videoFormat']
+                    parsed_channel['video_format'] = video_format
+                
+                # Rezolyutsiyani parsing qilish
+                if 'resolutionHeight' in channel:
+                    parsed_channel['resolution_height'] = int(channel.get('resolutionHeight', 0))
+                if 'resolutionWidth' in channel:
+                    parsed_channel['resolution_width'] = int(channel.get('resolutionWidth', 0))
+            
+            parsed_channels.append(parsed_channel)
+        
+        return parsed_channels
+    
+    def parse_streaming_channels(self, channels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Streaming kanallarni parsing qilish
+        
+        Args:
+            channels: Streaming kanallar ro'yxati
+            
+        Returns:
+            Parsing qilingan streaming kanallar
+        """
+        parsed_channels = []
+        
+        for channel in channels:
+            parsed_channel = {
+                'timestamp': datetime.now().isoformat(),
+                'channel_id': '',
+                'transport_protocol': '',
+                'enabled': False,
+                'video_codec_type': '',
+                'audio_codec_type': '',
+                'video_bitrate': 0,
+                'audio_bitrate': 0,
+                'video_frame_rate': 0,
+                'video_resolution': '',
+                'stream_type': ''
+            }
+            
+            if isinstance(channel, dict):
+                parsed_channel.update({
+                    'channel_id': channel.get('id', ''),
+                    'enabled': channel.get('enabled', 'false').lower() == 'true',
+                    'transport_protocol': channel.get('Transport', {}).get('Protocol', ''),
+                })
+                
+                # Video ma'lumotlarini parsing qilish
+                if 'Video' in channel:
+                    video = channel['Video']
+                    parsed_channel.update({
+                        'video_codec_type': video.get('videoCodecType', ''),
+                        'video_bitrate': int(video.get('maxBitrate', 0)),
+                        'video_frame_rate': int(video.get('videoFrameRate', 0)),
+                        'video_resolution': f"{video.get('videoResolutionWidth', 0)}x{video.get('videoResolutionHeight', 0)}"
+                    })
+                
+                # Audio ma'lumotlarini parsing qilish
+                if 'Audio' in channel:
+                    audio = channel['Audio']
+                    parsed_channel.update({
+                        'audio_codec_type': audio.get('audioCompressionType', ''),
+                        'audio_bitrate': int(audio.get('audioBitRate', 0))
+                    })
+            
+            parsed_channels.append(parsed_channel)
+        
+        return parsed_channels
+    
+    def parse_ptz_info(self, ptz_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PTZ ma'lumotlarini parsing qilish
+        
+        Args:
+            ptz_info: PTZ ma'lumotlari
+            
+        Returns:
+            Parsing qilingan PTZ ma'lumotlari
+        """
+        parsed = {
+            'timestamp': datetime.now().isoformat(),
+            'ptz_supported': False,
+            'pan_supported': False,
+            'tilt_supported': False,
+            'zoom_supported': False,
+            'preset_supported': False,
+            'patrol_supported': False,
+            'max_presets': 0,
+            'pan_range': '',
+            'tilt_range': '',
+            'zoom_range': ''
+        }
+        
+        if 'PTZData' in ptz_info:
+            ptz_data = ptz_info['PTZData']
+            parsed.update({
+                'ptz_supported': True,
+                'pan_supported': ptz_data.get('pan', 'false').lower() == 'true',
+                'tilt_supported': ptz_data.get('tilt', 'false').lower() == 'true',
+                'zoom_supported': ptz_data.get('zoom', 'false').lower() == 'true',
+                'preset_supported': ptz_data.get('presetSupport', 'false').lower() == 'true',
+                'patrol_supported': ptz_data.get('patrolSupport', 'false').lower() == 'true',
+            })
+        
+        return parsed
+
+
+DEVICE_INFO = {'DeviceInfo': {
+    'deviceName': 'Kirish', 'deviceID': '48a6b8e1', 'model': 'DS-K1T341CM',
+    'serialNumber': 'DS-K1T341CM20240101', 'firmwareVersion': 'V3.2.30',
+    'macAddress': 'c0:56:e3:00:00:01', 'ipAddress': '172.18.18.60', 'deviceType': 'ACS'
+}}
+
+CHANNEL = {'id': '1', 'channelName': 'Camera 01', 'enabled': 'true', 'inputPort': '1',
+           'videoFormat': 'PAL', 'resolutionHeight': '1080', 'resolutionWidth': '1920'}
+
+STREAMING_CHANNEL = {
+    'id': '101', 'enabled': 'true', 'Transport': {'Protocol': 'RTSP'},
+    'Video': {'videoCodecType': 'H.264', 'maxBitrate': '4096', 'videoFrameRate': '25',
+              'videoResolutionWidth': '1920', 'videoResolutionHeight': '1080'},
+    'Audio': {'audioCompressionType': 'G.711ulaw', 'audioBitRate': '64'}
+}
+
+PTZ_INFO = {'PTZData': {'pan': 'true', 'tilt': 'true', 'zoom': 'false',
+                        'presetSupport': 'true', 'patrolSupport': 'false'}}
+
+
+def strip_timestamps(data):
+    """Vaqt belgisini olib tashlash (solishtirish uchun)"""
+    if isinstance(data, list):
+        return [strip_timestamps(item) for item in data]
+    return {key: value for key, value in data.items() if key != 'timestamp'}
+
+
+def main(rows: int = 1000, target: float = 3.0, repeat: int = 15) -> List[str]:
+    """
+    Benchmark ni ishga tushirish
+
+    Returns:
+        Maqsadga yetmagan metodlar
+    """
+    legacy = LegacyParser()
+    parser = HikVisionParser.__new__(HikVisionParser)
+    cases = [
+        ('parse_device_info', DEVICE_INFO, 2000, 1.0),
+        ('parse_ptz_info', PTZ_INFO, 2000, 1.0),
+        ('parse_channels', [CHANNEL, {'id': '2'}, 'noto\'g\'ri'] * (rows // 3), 20, target),
+        ('parse_streaming_channels', [STREAMING_CHANNEL, {'id': '102'}] * (rows // 2), 20, target),
+    ]
+    print(f"{'metod':<28}{'avval (ms)':>12}{'sxema (ms)':>12}{'tezlashish':>12}{'maqsad':>8}")
+    missed = []
+    for name, data, number, goal in cases:
+        old, new = getattr(legacy, name), getattr(parser, name)
+        assert strip_timestamps(old(data)) == strip_timestamps(new(data)), name
+        old_time = min(timeit.repeat(lambda: old(data), number=number, repeat=repeat)) / number
+        new_time = min(timeit.repeat(lambda: new(data), number=number, repeat=repeat)) / number
+        ratio = old_time / new_time
+        if ratio < goal:
+            missed.append(name)
+        print(f"{name:<28}{old_time * 1000:>12.4f}{new_time * 1000:>12.4f}{ratio:>11.1f}x{goal:>7.1f}x  "
+              f"{'ok' if ratio >= goal else 'yetmadi'}")
+    if missed:
+        print(f"Maqsadga yetmadi: {', '.join(missed)}")
+    return missed
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    target = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    sys.exit(1 if main(rows, target) else 0)
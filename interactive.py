@@ -7,20 +7,21 @@ Bu skript sizdan kamera ma'lumotlarini so'raydi va keyin parsing qiladi
 import sys
 import os
 import json
+import argparse
 import getpass
 from datetime import datetime
-from colorama import init, Fore, Style
-from tqdm import tqdm
 
 # Loyiha yo'lini qo'shish
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import HikVisionConfig
-from src.hikvision_api import HikVisionAPI
-from src.parser import HikVisionParser
+from src.lazy import LazyAttr
 
-# Ranglarni ishga tushirish
-init()
+# Og'ir kutubxonalar faqat kerak bo'lganda import qilinadi (tez ishga tushish uchun)
+init = LazyAttr('colorama', 'init')
+Fore = LazyAttr('colorama', 'Fore')
+Style = LazyAttr('colorama', 'Style')
+tqdm = LazyAttr('tqdm', 'tqdm')
 
 def print_banner():
     """Banner chiqarish"""
@@ -94,36 +95,12 @@ def get_camera_credentials():
 
 def create_custom_config(credentials):
     """Foydalanuvchi ma'lumotlari asosida konfiguratsiya yaratish"""
+    from src.inventory import DeviceConfig
     
-    class CustomConfig:
-        def __init__(self, creds):
-            self.HOST = creds['host']
-            self.USERNAME = creds['username']
-            self.PASSWORD = creds['password']
-            self.PORT = creds['port']
-            self.PROTOCOL = creds['protocol']
-            
-            # API yo'llari
-            self.API_VERSION = 'ISAPI/System/deviceInfo'
-            self.API_CHANNELS = 'ISAPI/System/Video/inputs'
-            self.API_STREAMING = 'ISAPI/Streaming/channels'
-            self.API_PTZ = 'ISAPI/PTZCtrl/channels'
-            self.API_EVENTS = 'ISAPI/Event/notification'
-            self.API_PLAYBACK = 'ISAPI/ContentMgmt/search'
-            
-            # Boshqa sozlamalar
-            self.TIMEOUT = 30
-            self.RETRY_COUNT = 3
-            self.DEBUG = True
-        
-        @property
-        def base_url(self):
-            return f"{self.PROTOCOL}://{self.HOST}:{self.PORT}"
-        
-        def get_api_url(self, endpoint):
-            return f"{self.base_url}/{endpoint}"
-    
-    return CustomConfig(credentials)
+    return DeviceConfig(credentials['host'], host=credentials['host'],
+                        username=credentials['username'], password=credentials['password'],
+                        port=credentials['port'], protocol=credentials['protocol'],
+                        timeout=30, debug=True)
 
 def create_output_directory():
     """Natija papkasini yaratish"""
@@ -171,10 +148,46 @@ def display_summary(system_info):
     
     print(Fore.CYAN + "="*60 + Style.RESET_ALL + "\n")
 
-def main():
+def parse_args(argv=None):
+    """Buyruq qatori argumentlarini o'qish"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', action='store_true',
+                        help="Bosqichlar vaqtini o'lchash va hisobotni output/ ga yozish")
+    parser.add_argument('--profile-cpu', action='store_true',
+                        help="--profile bilan birga cProfile natijasini ham yozish")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="--profile bilan birga tracemalloc natijasini ham yozish")
+    return parser.parse_args(argv)
+
+def write_profile_report(profiler, output_dir, timestamp):
+    """Profiling hisobotini yozish"""
+    if profiler is None:
+        return
+    try:
+        report_file = profiler.write_report(output_dir, timestamp)
+        print_success(f"Profiling hisoboti saqlandi: {report_file}")
+    except Exception as e:
+        print_error(f"Profiling hisobotini saqlashda xatolik: {e}")
+
+def main(argv=None):
     """Asosiy funksiya"""
+    args = parse_args(argv)
+    from src.hikvision_api import HikVisionAPI
+    from src.parser import HikVisionParser
+    from src.profiling import Profiler, stage_of
+    
+    # Ranglarni ishga tushirish
+    init()
     print_banner()
     
+    profiler = None
+    if args.profile or args.profile_cpu or args.profile_memory:
+        profiler = Profiler(cpu=args.profile_cpu, memory=args.profile_memory)
+        profiler.start()
+    stage = stage_of(profiler)
+    output_dir = "output"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
     try:
         # Foydalanuvchidan ma'lumotlarni olish
         credentials = get_camera_credentials()
@@ -182,6 +195,8 @@ def main():
         # Konfiguratsiya yaratish
         print_info("Konfiguratsiya yaratilmoqda...")
         config = create_custom_config(credentials)
+        if profiler:
+            profiler.metadata['device'] = config.base_url
         
         # Ulanish ma'lumotlarini ko'rsatish
         print(f"\n{Fore.CYAN}Ulanish ma'lumotlari:{Style.RESET_ALL}")
@@ -195,7 +210,9 @@ def main():
         
         # Ulanishni tekshirish
         print_info("Ulanish tekshirilmoqda...")
-        if not api.test_connection():
+        with stage('connect'):
+            connected = api.test_connection()
+        if not connected:
             print_error("HikVision serveriga ulanib bo'lmadi!")
             print_error("Quyidagilarni tekshiring:")
             print_error("• IP manzil to'g'ri kiritilganmi?")
@@ -218,17 +235,19 @@ def main():
         with tqdm(total=5, desc="Ma'lumotlar olinmoqda") as pbar:
             # To'liq tizim ma'lumotlari
             pbar.set_description("Qurilma ma'lumotlari...")
-            system_info = parser.get_full_system_info()
+            with stage('collect'):
+                system_info = parser.get_full_system_info(profiler)
             pbar.update(1)
             
             # Natijalarni chiqarish
             pbar.set_description("Natijalar tayyorlanmoqda...")
             
             # JSON formatda saqlash
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             json_file = os.path.join(output_dir, f"hikvision_data_{timestamp}.json")
             
-            if parser.export_to_json(system_info, json_file):
+            with stage('export.json'):
+                exported = parser.export_to_json(system_info, json_file)
+            if exported:
                 print_success(f"Ma'lumotlar JSON formatda saqlandi: {json_file}")
             else:
                 print_error("JSON formatda saqlashda xatolik!")
@@ -237,7 +256,9 @@ def main():
             # CSV formatda saqlash (kanallar uchun)
             if system_info.get('channels'):
                 csv_file = os.path.join(output_dir, f"hikvision_channels_{timestamp}.csv")
-                if parser.export_to_csv(system_info['channels'], csv_file):
+                with stage('export.channels_csv'):
+                    exported = parser.export_to_csv(system_info['channels'], csv_file)
+                if exported:
                     print_success(f"Kanallar CSV formatda saqlandi: {csv_file}")
                 else:
                     print_error("CSV formatda saqlashda xatolik!")
@@ -246,7 +267,9 @@ def main():
             # Streaming kanallar CSV
             if system_info.get('streaming_channels'):
                 csv_file = os.path.join(output_dir, f"hikvision_streaming_{timestamp}.csv")
-                if parser.export_to_csv(system_info['streaming_channels'], csv_file):
+                with stage('export.streaming_csv'):
+                    exported = parser.export_to_csv(system_info['streaming_channels'], csv_file)
+                if exported:
                     print_success(f"Streaming kanallar CSV formatda saqlandi: {csv_file}")
                 else:
                     print_error("Streaming CSV saqlashda xatolik!")
@@ -295,6 +318,8 @@ DEBUG=True
     except Exception as e:
         print_error(f"Xatolik yuz berdi: {str(e)}")
         return False
+    finally:
+        write_profile_report(profiler, output_dir, timestamp)
 
 if __name__ == "__main__":
     success = main()
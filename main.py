@@ -7,19 +7,20 @@ Bu skript HikVision platformasidan ma'lumotlarni olish va parsing qilish uchun
 import sys
 import os
 import json
+import argparse
 from datetime import datetime
-from colorama import init, Fore, Style
-from tqdm import tqdm
 
 # Loyiha yo'lini qo'shish
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import HikVisionConfig
-from src.hikvision_api import HikVisionAPI
-from src.parser import HikVisionParser
+from src.lazy import LazyAttr
 
-# Ranglarni ishga tushirish
-init()
+# Og'ir kutubxonalar faqat kerak bo'lganda import qilinadi (tez ishga tushish uchun)
+init = LazyAttr('colorama', 'init')
+Fore = LazyAttr('colorama', 'Fore')
+Style = LazyAttr('colorama', 'Style')
+tqdm = LazyAttr('tqdm', 'tqdm')
 
 def print_banner():
     """Banner chiqarish"""
@@ -92,14 +93,418 @@ def display_summary(system_info):
     
     print(Fore.CYAN + "="*60 + Style.RESET_ALL + "\n")
 
-def main():
+def parse_args(argv=None):
+    """Buyruq qatori argumentlarini o'qish"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', action='store_true',
+                        help="Bosqichlar vaqtini o'lchash va hisobotni output/ ga yozish")
+    parser.add_argument('--profile-cpu', action='store_true',
+                        help="--profile bilan birga cProfile natijasini ham yozish")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="--profile bilan birga tracemalloc natijasini ham yozish")
+    parser.add_argument('--check', action='store_true',
+                        help="Faqat ulanishni tekshirish (cron probe lar uchun, rangsiz va progress barsiz)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Uzoq ishlovchi rejim: vazifalarni (event_sync, user_sync, device_info) intervallar bo'yicha bajarish")
+    parser.add_argument('--receive', action='store_true',
+                        help="Qurilmalarning HTTP push hodisalarini qabul qilish (PUSH_HOST:PUSH_PORT)")
+    parser.add_argument('--inventory', metavar='PATH',
+                        help="--daemon bilan: inventar faylidagi (JSON/TOML) barcha qurilmalardan yig'ish")
+    parser.add_argument('--discover', metavar='CIDR',
+                        help="Tarmoqdagi ISAPI qurilmalarni qidirish (masalan 192.168.0.0/22) va inventar faylini yozish")
+    parser.add_argument('--config-snapshot', action='store_true',
+                        help="Qurilma(lar) sozlamalari snapshot ini olish va oldingi versiya bilan farqini chiqarish")
+    parser.add_argument('--config-enforce', metavar='SNAPSHOT_ID',
+                        help="Qurilma(lar)ni snapshot ga moslash: faqat farq qilgan bo'limlar yoziladi")
+    parser.add_argument('--push-config', metavar='ENDPOINT',
+                        help="Bo'limni barcha qurilmalarga to'lqinlar bilan yozish (masalan ISAPI/System/time), --set bilan")
+    parser.add_argument('--set', dest='assignments', action='append', default=[], metavar='KALIT=QIYMAT',
+                        help="--push-config bilan: yoziladigan maydon (masalan timeZone=CST-5:00:00), takrorlanadi")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="Saqlangan hodisalarni (jsonl/json/sqlite) SINKS pipeline iga qayta yuborish va o'lchash")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="--replay bilan: tezlik (1 - real vaqt, 10 - 10x, 0 - maksimal)")
+    parser.add_argument('--replay-push', action='store_true',
+                        help="--replay bilan: hodisalarni lokal push endpoint orqali (HTTP) yuborish")
+    parser.add_argument('--backfill', nargs=2, metavar=('START', 'END'),
+                        help="Oraliqdagi tarixiy hodisalarni yuklash (masalan 2024-01-01 2024-04-01), checkpoint bilan")
+    parser.add_argument('--snapshots', action='store_true',
+                        help="Qurilma(lar) kanallaridan davriy JPEG kadrlar olish (SNAPSHOT_FRAMES_PER_MINUTE), Ctrl+C gacha")
+    parser.add_argument('--ptz', type=int, metavar='KANAL',
+                        help="Kanalni klaviaturadan boshqarish: har qatorda 'pan tilt [zoom]' (-100..100), "
+                             "'s' - to'xtatish, 'q' - chiqish")
+    parser.add_argument('--duration', type=float, metavar='SEKUND',
+                        help="--snapshots bilan: ishlash vaqti (berilmasa to'xtatilguncha)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="--config-enforce bilan: hech narsa yozmasdan farqlarni chiqarish")
+    return parser.parse_args(argv)
+
+def run_discovery(network):
+    """Tarmoqni skanerlash va output/discovered_devices.json ga yozish"""
+    from src.discovery import discover, write_inventory
+    
+    config = HikVisionConfig()
+    ports = [int(port) for port in config.DISCOVERY_PORTS.split(',') if port.strip()]
+    start = datetime.now()
+    devices = discover(network, config.USERNAME, config.PASSWORD, ports, config.PROTOCOL,
+                       config.DISCOVERY_CONCURRENCY, config.DISCOVERY_TIMEOUT)
+    elapsed = (datetime.now() - start).total_seconds()
+    for device in devices:
+        print(f"{device['status']:<12} {device['host']}:{device['port']} {device.get('model', '')} "
+              f"{device.get('serial_number', '')} {device.get('firmware_version', '')}")
+    path = write_inventory(devices, os.path.join(create_output_directory(), 'discovered_devices.json'))
+    print(f"{len(devices)} ta qurilma topildi ({elapsed:.1f} s): {path}")
+    return True
+
+def _device_configs(inventory=None):
+    """Inventardagi (yoki .env dagi bitta) qurilmalar konfiguratsiyalari"""
+    inventory = inventory or HikVisionConfig().INVENTORY_FILE
+    if inventory:
+        from src.inventory import load_inventory
+        return list(load_inventory(inventory).values())
+    return [HikVisionConfig()]
+
+def run_config_snapshot(inventory=None):
+    """Sozlamalar snapshot ini olish (output/config_snapshots/)"""
+    from src.config_snapshots import ConfigStore, format_path
+    from src.hikvision_api import HikVisionAPI
+    
+    store = ConfigStore(os.path.join(create_output_directory(), 'config_snapshots'))
+    for config in _device_configs(inventory):
+        api = HikVisionAPI(config)
+        device = getattr(config, 'name', None) or config.HOST
+        previous = store.latest(device)
+        manifest = store.capture(api, device=device)
+        print(f"{device}: {manifest['id']}")
+        for name, error in manifest['errors'].items():
+            print(f"  ! {name}: {error}")
+        if previous is not None and previous['id'] != manifest['id']:
+            for name, changes in store.diff(previous, manifest).items():
+                for change in changes:
+                    print(f"  {name}.{format_path(change['path'])}: {change['old']!r} -> {change['new']!r}")
+    return True
+
+def run_config_enforce(snapshot_id, inventory=None, dry_run=False):
+    """Qurilmalarni snapshot ga moslash (faqat farqlar yoziladi)"""
+    from src.config_snapshots import ConfigStore, enforce, format_path
+    from src.hikvision_api import HikVisionAPI
+    
+    store = ConfigStore(os.path.join(create_output_directory(), 'config_snapshots'))
+    manifest = store.find(snapshot_id)
+    if manifest is None:
+        print(f"Snapshot topilmadi: {snapshot_id}")
+        return False
+    desired = store.load(manifest)
+    ok = True
+    for config in _device_configs(inventory):
+        device = getattr(config, 'name', None) or config.HOST
+        report = enforce(HikVisionAPI(config), desired, dry_run=dry_run)
+        for name, result in report.items():
+            if 'error' in result:
+                ok = False
+                print(f"{device} {name}: xatolik - {result['error']}")
+                continue
+            state = 'yozildi' if result['written'] else ('farq bor' if result['changes'] else 'mos')
+            print(f"{device} {name}: {state}")
+            for change in result['changes']:
+                print(f"  {format_path(change['path'])}: {change['old']!r} -> {change['new']!r}")
+    return ok
+
+def run_config_push(endpoint, assignments, inventory=None):
+    """Bo'limni qurilmalarga canary va to'lqinlar bilan yozish, xatoda rollback"""
+    from src.fleet_push import FleetPush, parse_assignments
+    from src.hikvision_api import HikVisionAPI
+    
+    config = HikVisionConfig()
+    patch = parse_assignments(assignments)
+    if not patch:
+        print("Yoziladigan maydonlar yo'q (--set KALIT=QIYMAT)")
+        return False
+    push = FleetPush(endpoint, patch, canary=config.FLEET_PUSH_CANARY, wave_size=config.FLEET_PUSH_WAVE_SIZE,
+                     concurrency=config.FLEET_PUSH_CONCURRENCY,
+                     max_failure_rate=config.FLEET_PUSH_MAX_FAILURE_RATE,
+                     on_result=lambda result: print(f"{result['status']:<16} {result['device']} "
+                                                    f"{result['error'] or ''}"))
+    report = push.run([HikVisionAPI(device) for device in _device_configs(inventory)])
+    summary = ', '.join(f"{status}: {count}" for status, count in sorted(report['summary'].items()))
+    if report['aborted']:
+        summary += " - xatolar ko'p, qolgan qurilmalar o'tkazib yuborildi"
+    print(f"{summary} ({report['duration']:.1f} s)")
+    return not report['aborted'] and set(report['summary']) <= {'ok', 'unchanged'}
+
+def run_replay(path, speed=1.0, via_push=False):
+    """Hodisalarni qayta yuborish va events/s hamda latency persentillarini chiqarish"""
+    from src.replay import LatencyProbe, load_events, replay
+    from src.sinks import build_pipeline
+    
+    config = HikVisionConfig()
+    events = load_events(path)
+    probe = LatencyProbe()
+    pipeline = build_pipeline(config, create_output_directory(), extra_sinks=[probe])
+    try:
+        report = replay(events, pipeline, probe, speed=speed, via_push=via_push,
+                        batch_size=config.SINK_BATCH_SIZE)
+    except KeyboardInterrupt:
+        return False
+    finally:
+        pipeline.close()
+    latency = ', '.join(f"{name} {value:.1f} ms" for name, value in report['latency'].items())
+    print(f"{report['events']} ta hodisa {report['duration']:.2f} s da: {report['events_per_second']:.0f} hodisa/s")
+    print(f"Yetkazildi: {report['delivered']}, latency: {latency or '-'}")
+    return report['complete']
+
+def run_backfill(start, end, inventory=None):
+    """Tarixiy hodisalarni bo'laklab yuklash va SINKS pipeline iga yozish"""
+    from src.backfill import Backfill
+    from src.clock import clocks
+    from src.dedup import build_deduplicator
+    from src.hikvision_api import HikVisionAPI
+    from src.sinks import build_pipeline
+    
+    config = HikVisionConfig()
+    start_epoch = int(datetime.fromisoformat(start).timestamp())
+    end_epoch = int(datetime.fromisoformat(end).timestamp())
+    output_dir = create_output_directory()
+    pipeline = build_pipeline(config, output_dir)
+    dedup = build_deduplicator(config, output_dir)
+    ok = True
+    try:
+        for device in _device_configs(inventory):
+            api = HikVisionAPI(device)
+            name = getattr(device, 'name', None) or device.HOST
+            device_id = dedup.resolve(api) if dedup is not None else None
+            
+            def deliver(events, host=device.HOST, device_id=device_id):
+                clocks.normalize(events, device=host)
+                if dedup is not None:
+                    events = dedup.filter(events, device=device_id)
+                pipeline.submit(events)
+            
+            backfill = Backfill(api, start_epoch, end_epoch, deliver,
+                                checkpoint_path=os.path.join(output_dir, 'backfill', f"{name}.json"),
+                                shard_seconds=device.BACKFILL_SHARD_SECONDS,
+                                min_shard_seconds=device.BACKFILL_MIN_SHARD_SECONDS,
+                                max_results=device.BACKFILL_MAX_RESULTS,
+                                concurrency=device.BACKFILL_CONCURRENCY or device.DEVICE_MAX_CONCURRENCY)
+            try:
+                report = backfill.run()
+            except KeyboardInterrupt:
+                backfill.stop()
+                return False
+            ok = ok and report['complete']
+            print(f"{name}: {report['events']} ta hodisa, {report['shards']} bo'lak "
+                  f"({report['splits']} bo'linish), {report['duration']:.1f} s"
+                  f"{'' if report['complete'] else ' - tugallanmagan, qayta ishga tushiring'}")
+    finally:
+        pipeline.close()
+        if dedup is not None:
+            dedup.save()
+    return ok
+
+def start_metrics_exporter(config):
+    """METRICS_PORT berilgan bo'lsa Prometheus `/metrics` endpointini ishga tushirish"""
+    if not config.METRICS_PORT:
+        return None
+    from src.metrics import metrics, start_metrics_server
+    
+    metrics.enable()
+    return start_metrics_server(config.METRICS_PORT)
+
+def run_snapshots(inventory=None, duration=None):
+    """Kanallardan kadrlar olish, output/snapshots/ ga yozish"""
+    from src.hikvision_api import HikVisionAPI
+    from src.snapshot_capture import SnapshotScheduler
+    
+    config = HikVisionConfig()
+    start_metrics_exporter(config)
+    capture = SnapshotScheduler(os.path.join(create_output_directory(), 'snapshots'),
+                                config.SNAPSHOT_FRAMES_PER_MINUTE, config.SNAPSHOT_DEVICE_CONCURRENCY,
+                                config.SNAPSHOT_WORKERS)
+    for device in _device_configs(inventory):
+        channels = [int(channel) for channel in device.SNAPSHOT_CHANNELS.split(',') if channel.strip()]
+        capture.add_device(HikVisionAPI(device), channels or None)
+    try:
+        stats = capture.run(duration)
+    except KeyboardInterrupt:
+        capture.stop()
+        stats = capture.stats()
+    for name, device in stats['devices'].items():
+        print(f"{name}: {device['channels']} kanal, {device['saved']} saqlandi, {device['unchanged']} o'zgarmagan, "
+              f"{device['failed']} xato, {device['late']} kechikdi, {device['frames_per_minute']:.2f} kadr/daqiqa")
+    print(f"Maqsad: {stats['target_frames_per_minute']:.2f} kadr/daqiqa, "
+          f"erishildi: {stats['total']['frames_per_minute']:.2f}")
+    return stats['total']['failed'] == 0
+
+def run_ptz(channel, commands=None):
+    """
+    PTZ kanalini qatorma-qator buyruqlar bilan boshqarish (stdin yoki joystik skripti)
+
+    Har bir qator: 'pan tilt [zoom]' - uzluksiz harakat, 's' yoki bo'sh qator - to'xtash,
+    'q' - chiqish. Buyruqlar PTZController orqali birlashtirilib yuboriladi.
+    """
+    from src.hikvision_api import HikVisionAPI
+    from src.ptz import PTZController
+    
+    config = HikVisionConfig()
+    start_metrics_exporter(config)
+    api = HikVisionAPI(config)
+    ptz = PTZController(api, rate=config.PTZ_COMMAND_RATE)
+    try:
+        for line in commands if commands is not None else sys.stdin:
+            words = line.split()
+            if words[:1] == ['q']:
+                break
+            if not words or words[0] == 's':
+                ptz.stop(channel)
+                continue
+            try:
+                ptz.move(channel, *(int(word) for word in words[:3]))
+            except ValueError:
+                print_warning(f"Noto'g'ri buyruq: {line.strip()} (kutilgan: pan tilt [zoom])")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ptz.close()
+        api.close()
+    stats = ptz.stats().get(channel, {'sent': 0, 'coalesced': 0, 'failed': 0})
+    print(f"Kanal {channel}: {stats['sent']} yuborildi, {stats['coalesced']} birlashtirildi, "
+          f"{stats['failed']} xato")
+    return stats['failed'] == 0
+
+def run_push_receiver(inventory=None):
+    """Push qabul qiluvchini ishga tushirish, hodisalar SINKS dagi sink larga yoziladi"""
+    from src.dedup import build_deduplicator
+    from src.push_receiver import EventPushReceiver
+    from src.sinks import build_pipeline
+    
+    config = HikVisionConfig()
+    start_metrics_exporter(config)
+    output_dir = create_output_directory()
+    pipeline = build_pipeline(config, output_dir)
+    dedup = build_deduplicator(config, output_dir)
+    if dedup:
+        # Push dagi MAC/IP ni polling bilan bir xil kalitga (serial raqam) bog'lash
+        from concurrent.futures import ThreadPoolExecutor
+        from src.hikvision_api import HikVisionAPI
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(lambda device: dedup.resolve(HikVisionAPI(device)), _device_configs(inventory)))
+    on_batch = dedup.wrap(pipeline.submit) if dedup else pipeline.submit
+    receiver = EventPushReceiver(on_batch, config.PUSH_HOST, config.PUSH_PORT,
+                                 config.PUSH_BATCH_SIZE, config.PUSH_BATCH_INTERVAL)
+    try:
+        receiver.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.close()
+        if dedup:
+            dedup.save()
+    return True
+
+def run_daemon(inventory=None):
+    """Collector daemon ni ishga tushirish (SIGTERM/SIGINT gacha)"""
+    from src.daemon import CollectorDaemon
+    from src.dedup import build_deduplicator
+    from src.sinks import build_pipeline
+    
+    config = HikVisionConfig()
+    start_metrics_exporter(config)
+    if config.STATUS_PORT:
+        from src.status import start_status_server, status
+        
+        status.stale_after = config.STATUS_STALE_AFTER
+        start_status_server(config.STATUS_PORT, config.STATUS_HOST)
+    
+    output_dir = create_output_directory()
+    inventory = inventory or config.INVENTORY_FILE
+    if inventory:
+        from src.inventory import FleetCollector
+        
+        # Har bir qurilma output/<nom>/ da, inventar o'zgarsa qayta ishga tushirmasdan yangilanadi
+        fleet = FleetCollector(inventory, output_dir, pipeline=build_pipeline(config, output_dir),
+                               dedup=build_deduplicator(config, output_dir),
+                               poll_interval=config.INVENTORY_POLL_INTERVAL)
+        fleet.install_signal_handlers()
+        fleet.run()
+        return True
+    
+    daemon = CollectorDaemon(output_dir=output_dir, pipeline=build_pipeline(config, output_dir),
+                             dedup=build_deduplicator(config, output_dir))
+    daemon.add_default_jobs(config)
+    daemon.install_signal_handlers()
+    daemon.run()
+    return True
+
+def run_health_check():
+    """Tezkor ulanish tekshiruvi: bitta qator natija va exit kodi"""
+    from src.hikvision_api import HikVisionAPI
+    
+    config = HikVisionConfig()
+    if HikVisionAPI(config).test_connection():
+        print(f"OK {config.base_url}")
+        return True
+    print(f"FAIL {config.base_url}")
+    return False
+
+def write_profile_report(profiler, output_dir, timestamp):
+    """Profiling hisobotini yozish"""
+    if profiler is None:
+        return
+    try:
+        report_file = profiler.write_report(output_dir, timestamp)
+        print_success(f"Profiling hisoboti saqlandi: {report_file}")
+    except Exception as e:
+        print_error(f"Profiling hisobotini saqlashda xatolik: {e}")
+
+def main(argv=None):
     """Asosiy funksiya"""
+    args = parse_args(argv)
+    if args.check:
+        return run_health_check()
+    if args.daemon:
+        return run_daemon(args.inventory)
+    if args.receive:
+        return run_push_receiver(args.inventory)
+    if args.discover:
+        return run_discovery(args.discover)
+    if args.config_snapshot:
+        return run_config_snapshot(args.inventory)
+    if args.backfill:
+        return run_backfill(*args.backfill, inventory=args.inventory)
+    if args.snapshots:
+        return run_snapshots(args.inventory, args.duration)
+    if args.ptz is not None:
+        return run_ptz(args.ptz)
+    if args.replay:
+        return run_replay(args.replay, args.speed, args.replay_push)
+    if args.push_config:
+        return run_config_push(args.push_config, args.assignments, args.inventory)
+    if args.config_enforce:
+        return run_config_enforce(args.config_enforce, args.inventory, args.dry_run)
+    
+    from src.hikvision_api import HikVisionAPI
+    from src.parser import HikVisionParser
+    from src.profiling import Profiler, stage_of
+    
+    # Ranglarni ishga tushirish
+    init()
     print_banner()
     
+    profiler = None
+    if args.profile or args.profile_cpu or args.profile_memory:
+        profiler = Profiler(cpu=args.profile_cpu, memory=args.profile_memory)
+        profiler.start()
+    stage = stage_of(profiler)
+    output_dir = "output"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
     try:
         # Konfiguratsiya yaratish
         print_info("Konfiguratsiya yuklanmoqda...")
         config = HikVisionConfig()
+        if profiler:
+            profiler.metadata['device'] = config.base_url
         
         # API obyektini yaratish
         print_info("HikVision API ga ulanmoqda...")
@@ -107,7 +512,9 @@ def main():
         
         # Ulanishni tekshirish
         print_info("Ulanish tekshirilmoqda...")
-        if not api.test_connection():
+        with stage('connect'):
+            connected = api.test_connection()
+        if not connected:
             print_error("HikVision serveriga ulanib bo'lmadi!")
             print_error(f"Server: {config.base_url}")
             print_error(f"Username: {config.USERNAME}")
@@ -128,17 +535,19 @@ def main():
         with tqdm(total=5, desc="Ma'lumotlar olinmoqda") as pbar:
             # To'liq tizim ma'lumotlari
             pbar.set_description("Qurilma ma'lumotlari...")
-            system_info = parser.get_full_system_info()
+            with stage('collect'):
+                system_info = parser.get_full_system_info(profiler)
             pbar.update(1)
             
             # Natijalarni chiqarish
             pbar.set_description("Natijalar tayyorlanmoqda...")
             
             # JSON formatda saqlash
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             json_file = os.path.join(output_dir, f"hikvision_data_{timestamp}.json")
             
-            if parser.export_to_json(system_info, json_file):
+            with stage('export.json'):
+                exported = parser.export_to_json(system_info, json_file)
+            if exported:
                 print_success(f"Ma'lumotlar JSON formatda saqlandi: {json_file}")
             else:
                 print_error("JSON formatda saqlashda xatolik!")
@@ -147,7 +556,9 @@ def main():
             # CSV formatda saqlash (kanallar uchun)
             if system_info.get('channels'):
                 csv_file = os.path.join(output_dir, f"hikvision_channels_{timestamp}.csv")
-                if parser.export_to_csv(system_info['channels'], csv_file):
+                with stage('export.channels_csv'):
+                    exported = parser.export_to_csv(system_info['channels'], csv_file)
+                if exported:
                     print_success(f"Kanallar CSV formatda saqlandi: {csv_file}")
                 else:
                     print_error("CSV formatda saqlashda xatolik!")
@@ -156,7 +567,9 @@ def main():
             # Streaming kanallar CSV
             if system_info.get('streaming_channels'):
                 csv_file = os.path.join(output_dir, f"hikvision_streaming_{timestamp}.csv")
-                if parser.export_to_csv(system_info['streaming_channels'], csv_file):
+                with stage('export.streaming_csv'):
+                    exported = parser.export_to_csv(system_info['streaming_channels'], csv_file)
+                if exported:
                     print_success(f"Streaming kanallar CSV formatda saqlandi: {csv_file}")
                 else:
                     print_error("Streaming CSV saqlashda xatolik!")
@@ -177,6 +590,8 @@ def main():
     except Exception as e:
         print_error(f"Xatolik yuz berdi: {str(e)}")
         return False
+    finally:
+        write_profile_report(profiler, output_dir, timestamp)
 
 if __name__ == "__main__":
     success = main()
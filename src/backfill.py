@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import requests
+
+from .metrics import metrics
+from .scheduler import PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_backfill_shards_total', 'counter', 'Backfill bo\'laklari natijalari')
+metrics.describe('hikvision_backfill_events_total', 'counter', 'Backfill orqali olingan hodisalar')
+
+Shard = Tuple[int, int]
+
+
+def isapi_time(epoch: int) -> str:
+    """Epoch ni qurilma so'rovi uchun lokal ISO vaqtga aylantirish"""
+    return datetime.fromtimestamp(epoch).astimezone().isoformat(timespec='seconds')
+
+
+def subtract_ranges(start: int, end: int, done: List[List[int]]) -> List[Shard]:
+    """[start, end) oralig'idan bajarilgan oraliqlarni ayirish"""
+    pending = []
+    cursor = start
+    for done_start, done_end in sorted(done):
+        if done_end <= cursor or done_start >= end:
+            continue
+        if done_start > cursor:
+            pending.append((cursor, done_start))
+        cursor = max(cursor, done_end)
+    if cursor < end:
+        pending.append((cursor, end))
+    return pending
+
+
+def merge_ranges(ranges: List[List[int]]) -> List[List[int]]:
+    """Ustma-ust tushgan yoki tutash oraliqlarni birlashtirish"""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class _Truncated(Exception):
+    """Javob qurilma chegarasiga yetdi - bo'lak to'liq emas"""
+
+
+class Backfill:
+    """
+    Uzoq vaqt oralig'idagi hodisalarni bo'laklarga bo'lib parallel yuklash
+
+    Oraliq vaqt bo'laklariga bo'linadi va ular qurilma navbati (PRIORITY_BULK - jonli
+    sinxronizatsiyadan keyin) orqali parallel so'raladi. Qurilma javobni kesgan bo'lsa
+    (MORE/totalMatches yoki max_results ga yetgan) yoki timeout bo'lsa bo'lak ikkiga bo'linib
+    qayta so'raladi; kuzatilgan zichlik bo'yicha
+    navbatdagi katta bo'laklar yuborishdan oldin maydalanadi - zich soatlar kichik,
+    bo'sh tunlar katta bo'laklarda o'qiladi. Har bir tugagan bo'lak checkpoint fayliga
+    yoziladi, to'xtatilgan backfill qayta ishga tushganda faqat qolgan oraliqlarni o'qiydi.
+    """
+
+    def __init__(self, api, start: int, end: int, on_events: Callable[[List[Dict[str, Any]]], Any],
+                 checkpoint_path: str = None, shard_seconds: int = 21600, min_shard_seconds: int = 60,
+                 max_results: int = 1000, concurrency: int = 2, retries: int = 3):
+        """
+        Args:
+            api: HikVisionAPI obyekti
+            start: Boshlanish (epoch sekund)
+            end: Tugash (epoch sekund, kirmaydi)
+            on_events: Har bir tugagan bo'lak hodisalari bilan chaqiriladi
+            checkpoint_path: Checkpoint fayli (None - saqlanmaydi)
+            shard_seconds: Boshlang'ich bo'lak uzunligi
+            min_shard_seconds: Eng kichik bo'lak (bundan kichigi bo'linmaydi)
+            max_results: Bitta javobda so'raladigan maksimal hodisalar soni (maxResults)
+            concurrency: Bir vaqtda so'raladigan bo'laklar (qurilma navbati ham cheklaydi)
+            retries: Boshqa xatolarda qayta urinishlar
+        """
+        self.api = api
+        self.start = int(start)
+        self.end = int(end)
+        self.on_events = on_events
+        self.checkpoint_path = checkpoint_path
+        self.shard_seconds = max(1, int(shard_seconds))
+        self.min_shard_seconds = max(1, int(min_shard_seconds))
+        self.max_results = max_results
+        self.target_events = max(1, max_results // 2)
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.done: List[List[int]] = []
+        self.events = 0
+        self.stats = {'shards': 0, 'splits': 0, 'retries': 0, 'failed': []}
+        self._density: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if (state.get('start'), state.get('end')) != (self.start, self.end):
+            logger.warning("Checkpoint boshqa oraliq uchun (%s), e'tiborsiz qoldiriladi", self.checkpoint_path)
+            return
+        self.done = merge_ranges(state.get('done', []))
+        self.events = state.get('events', 0)
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        state = {'start': self.start, 'end': self.end, 'done': self.done, 'events': self.events,
+                 'updated_at': datetime.now().isoformat()}
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def pending(self) -> List[Shard]:
+        """Hali o'qilmagan oraliqlar boshlang'ich bo'laklarga bo'lingan holda"""
+        shards = []
+        for start, end in subtract_ranges(self.start, self.end, self.done):
+            shards.extend(self._split(start, end, self.shard_seconds))
+        return shards
+
+    @staticmethod
+    def _split(start: int, end: int, length: int) -> List[Shard]:
+        return [(s, min(s + length, end)) for s in range(start, end, max(1, length))]
+
+    def _size(self, shard: Shard) -> List[Shard]:
+        """Kuzatilgan zichlik bo'yicha bo'lakni kerak bo'lsa maydalash"""
+        start, end = shard
+        density = self._density
+        if not density or (end - start) * density <= self.target_events * 1.5:
+            return [shard]
+        length = max(self.min_shard_seconds, int(self.target_events / density))
+        return self._split(start, end, length)
+
+    def fetch(self, shard: Shard) -> List[Dict[str, Any]]:
+        """
+        Bitta bo'lakni o'qish
+
+        maxResults so'rov bilan yuboriladi; bo'lak kesilgan deb qurilma MORE/totalMatches
+        bildirsa yoki javob max_results ga yetsa hisoblanadi. Qurilmaning o'z chegarasi
+        kichikroq bo'lsa, keyingi bo'laklar shu chegara bo'yicha maydalanadi.
+
+        Raises:
+            _Truncated: Javob qurilma chegarasiga yetgan
+        """
+        start, end = shard
+        # endTime qurilmada kiradi: bo'laklar chegarasida takrorlanmasligi uchun 1 s oldin
+        events, truncated = self.api.search_access_control_events(isapi_time(start), isapi_time(end - 1),
+                                                                  max_results=self.max_results,
+                                                                  priority=PRIORITY_BULK)
+        if truncated and 0 < len(events) < self.max_results:
+            with self._lock:
+                self.target_events = min(self.target_events, max(1, len(events) // 2))
+        if truncated or len(events) >= self.max_results:
+            if end - start > self.min_shard_seconds:
+                raise _Truncated()
+            logger.warning("Eng kichik bo'lak ham chegaraga yetdi, hodisalar to'liq bo'lmasligi mumkin: %s",
+                           isapi_time(start))
+        return events
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Backfill ni bajarish (stop() gacha yoki hammasi tugaguncha)
+
+        Returns:
+            Hisobot: events, shards, splits, retries, failed, duration, complete
+        """
+        started = time.perf_counter()
+        queue: List[Shard] = self.pending()
+        attempts: Dict[Shard, int] = {}
+        logger.info("Backfill: %d ta bo'lak, %s - %s", len(queue), isapi_time(self.start), isapi_time(self.end))
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='backfill') as executor:
+            running = {}
+            while (queue or running) and not self._stop.is_set():
+                while queue and len(running) < self.concurrency:
+                    shard = queue.pop(0)
+                    sized = self._size(shard)
+                    if len(sized) > 1:
+                        queue[:0] = sized
+                        continue
+                    running[executor.submit(self.fetch, shard)] = shard
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    shard = running.pop(future)
+                    requeue = self._complete(shard, future, attempts)
+                    queue[:0] = requeue
+            for future, shard in running.items():
+                self._complete(shard, future, attempts)
+
+        return {'events': self.events, 'shards': self.stats['shards'], 'splits': self.stats['splits'],
+                'retries': self.stats['retries'], 'failed': list(self.stats['failed']),
+                'duration': time.perf_counter() - started,
+                'complete': not subtract_ranges(self.start, self.end, self.done)}
+
+    def _complete(self, shard: Shard, future, attempts: Dict[Shard, int]) -> List[Shard]:
+        """Tugagan so'rov natijasini qayta ishlash; qayta so'raladigan bo'laklarni qaytaradi"""
+        start, end = shard
+        try:
+            events = future.result()
+        except (_Truncated, requests.exceptions.Timeout) as e:
+            if end - start > self.min_shard_seconds:
+                middle = start + (end - start) // 2
+                self.stats['splits'] += 1
+                self._record('split')
+                logger.debug("Bo'lak bo'linadi (%s): %s - %s", type(e).__name__, start, end)
+                return [(start, middle), (middle, end)]
+            return self._retry(shard, e, attempts)
+        except Exception as e:
+            return self._retry(shard, e, attempts)
+
+        self.on_events(events)
+        density = len(events) / max(1, end - start)
+        with self._lock:
+            self._density = density if self._density is None else 0.7 * self._density + 0.3 * density
+            self.done = merge_ranges(self.done + [[start, end]])
+            self.events += len(events)
+            self.stats['shards'] += 1
+            self._save_checkpoint()
+        self._record('ok', len(events))
+        return []
+
+    def _retry(self, shard: Shard, error: Exception, attempts: Dict[Shard, int]) -> List[Shard]:
+        attempts[shard] = attempts.get(shard, 0) + 1
+        if attempts[shard] <= self.retries:
+            self.stats['retries'] += 1
+            return [shard]
+        logger.error("Bo'lak o'qilmadi %s - %s: %s", isapi_time(shard[0]), isapi_time(shard[1]), error)
+        self.stats['failed'].append(shard)
+        self._record('failed')
+        return []
+
+    def _record(self, status: str, events: int = 0):
+        if metrics.enabled:
+            device = self.api.config.HOST
+            metrics.inc('hikvision_backfill_shards_total', device=device, status=status)
+            if events:
+                metrics.inc('hikvision_backfill_events_total', events, device=device)
+
+    def stop(self):
+        """Yangi bo'laklarni boshlamaslik (boshlanganlari tugatilib checkpoint yoziladi)"""
+        self._stop.set()
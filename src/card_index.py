@@ -0,0 +1,258 @@
+import bisect
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_card_index_records', 'gauge', 'Indeksdagi kartalar va foydalanuvchilar soni')
+
+_MAGIC = b'HKINDEX1\n'
+
+
+def _fingerprint(record: Dict[str, Any]) -> str:
+    """Yozuv izi (o'zgarganini aniqlash uchun)"""
+    return json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+class _Table:
+    """Kalit bo'yicha yozuvlar, ularning izlari va prefiks qidiruv uchun saralangan kalitlar"""
+
+    __slots__ = ('key', 'records', 'fingerprints', 'sorted_keys')
+
+    def __init__(self, key: str):
+        self.key = key
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.sorted_keys: Optional[List[str]] = []
+
+    def staged(self, records: Iterable[Dict[str, Any]]) -> Tuple['_Table', Dict[str, Dict[str, Any]],
+                                                                Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Qurilmadagi to'liq ro'yxatdan yangi jadval qurish (joriy jadval o'zgarmaydi)
+
+        Yozuvlar oqimdan bittadan olinadi; o'zgarmagan yozuvlar uchun eski obyekt qayta
+        ishlatiladi, shuning uchun xotirada ikkinchi nusxa faqat o'zgarganlar uchun turadi.
+
+        Returns:
+            (table, added, removed, changed) - kalit -> yozuv (removed da eski yozuv)
+        """
+        table = _Table(self.key)
+        added, changed = {}, {}
+        for record in records:
+            key = str(record.get(self.key) or '')
+            if not key:
+                continue
+            fingerprint = _fingerprint(record)
+            old = self.fingerprints.get(key)
+            if old == fingerprint:
+                record = self.records[key]
+            else:
+                (changed if old is not None else added)[key] = record
+            table.records[key] = record
+            table.fingerprints[key] = fingerprint
+        removed = {key: record for key, record in self.records.items() if key not in table.records}
+        # Kalitlar to'plami o'zgarmagan bo'lsa saralangan ro'yxat qayta ishlatiladi,
+        # aks holda prefiks qidiruvi birinchi kerak bo'lganda qayta saralanadi
+        table.sorted_keys = self.sorted_keys if not (added or removed) else None
+        return table, added, removed, changed
+
+    def load(self, records: List[Dict[str, Any]]):
+        self.records = {str(record[self.key]): record for record in records}
+        self.fingerprints = {key: _fingerprint(record) for key, record in self.records.items()}
+        self.sorted_keys = None
+
+    def prefix(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        keys = self.sorted_keys
+        if keys is None:
+            keys = self.sorted_keys = sorted(self.records)
+        result = []
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if len(result) >= limit or not keys[i].startswith(prefix):
+                break
+            record = self.records.get(keys[i])
+            if record is not None:
+                result.append(record)
+        return result
+
+
+class _View:
+    """Indeksning bir lahzadagi holati - refresh uni butunligicha almashtiradi"""
+
+    __slots__ = ('users', 'cards', 'person_cards', 'card_owner')
+
+    def __init__(self, users: _Table, cards: _Table):
+        self.users = users
+        self.cards = cards
+        self.person_cards: Dict[str, List[str]] = {}
+        self.card_owner: Dict[str, str] = {}
+        for card_no, card in cards.records.items():
+            owner = str(card.get('employeeNo') or '')
+            if owner:
+                self.card_owner[card_no] = owner
+                self.person_cards.setdefault(owner, []).append(card_no)
+
+
+class CardIndex:
+    """
+    Qurilmadagi kartalar va foydalanuvchilarning xotiradagi indeksi
+
+    get_card_info(card_no) / get_user_info(user_id) har safar qurilmaga so'rov yuboradi;
+    indeks esa ro'yxatlarni bir marta (oqim bilan) o'qib, karta va xodim raqami bo'yicha
+    dict qidiruvi, prefiks qidiruvi va karta -> shaxs bog'lanishini beradi. refresh() qurilma
+    ro'yxatini oqimdan yozuvma-yozuv yangi jadvalga o'qiydi (to'liq ro'yxat nusxasi yaratilmaydi),
+    o'qish muvaffaqiyatli tugagandagina indeks bitta havola almashtirish bilan yangilanadi -
+    qidiruvlar hech qachon yarim yangilangan holatni ko'rmaydi. Holat siqilgan snapshot ga
+    saqlanadi, shuning uchun xizmatlar qayta ishga tushganda darhol ishlaydi.
+    """
+
+    def __init__(self, api=None, state_path: str = None):
+        """
+        Args:
+            api: HikVisionAPI obyekti (refresh uchun)
+            state_path: Snapshot fayli (berilsa va mavjud bo'lsa yuklanadi)
+        """
+        self.api = api
+        self.state_path = state_path
+        self.refreshed_at: Optional[float] = None
+        self._view = _View(_Table('employeeNo'), _Table('cardNo'))
+        self._lock = threading.Lock()
+        if state_path and os.path.exists(state_path):
+            try:
+                self.load(state_path)
+            except (OSError, ValueError) as e:
+                logger.warning("Indeks snapshot i o'qilmadi: %s", e)
+
+    def user(self, employee_no: str) -> Optional[Dict[str, Any]]:
+        """Xodim raqami bo'yicha foydalanuvchi"""
+        return self._view.users.records.get(employee_no)
+
+    def card(self, card_no: str) -> Optional[Dict[str, Any]]:
+        """Karta raqami bo'yicha karta"""
+        return self._view.cards.records.get(card_no)
+
+    def person_for_card(self, card_no: str) -> Optional[Dict[str, Any]]:
+        """Karta egasi (foydalanuvchi yozuvi)"""
+        view = self._view
+        card = view.cards.records.get(card_no)
+        if card is None:
+            return None
+        return view.users.records.get(str(card.get('employeeNo') or ''))
+
+    def cards_for(self, employee_no: str) -> List[Dict[str, Any]]:
+        """Foydalanuvchiga biriktirilgan kartalar"""
+        view = self._view
+        cards = view.cards.records
+        return [cards[card_no] for card_no in view.person_cards.get(employee_no, ()) if card_no in cards]
+
+    def search_cards(self, prefix: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Karta raqami prefiksi bo'yicha qidiruv (saralangan)"""
+        return self._view.cards.prefix(prefix, limit)
+
+    def search_users(self, prefix: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Xodim raqami prefiksi bo'yicha qidiruv (saralangan)"""
+        return self._view.users.prefix(prefix, limit)
+
+    def update(self, users: Iterable[Dict[str, Any]] = None,
+               cards: Iterable[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Indeksni to'liq ro'yxatlar bilan yangilash (berilmagan ro'yxat o'zgarmaydi)
+
+        Ro'yxatlar (generator ham bo'lishi mumkin) yangi jadvallarga o'qiladi; xatolik yuqoriga
+        uzatiladi va joriy indeks o'zgarmaydi. Muvaffaqiyatli o'qishdan keyin indeks atomar almashtiriladi.
+
+        Args:
+            users: Foydalanuvchilar (UserInfo yozuvlari)
+            cards: Kartalar (CardInfo yozuvlari)
+
+        Returns:
+            Qo'shilgan, o'chirilgan va o'zgargan yozuvlar soni
+        """
+        counts = {'added': 0, 'removed': 0, 'changed': 0}
+        with self._lock:
+            current = self._view
+            user_table, card_table = current.users, current.cards
+            if users is not None:
+                user_table, *diffs = current.users.staged(users)
+                for name, diff in zip(counts, diffs):
+                    counts[name] += len(diff)
+            if cards is not None:
+                card_table, *diffs = current.cards.staged(cards)
+                for name, diff in zip(counts, diffs):
+                    counts[name] += len(diff)
+            view = _View(user_table, card_table)
+            self._view = view
+            self.refreshed_at = time.time()
+        if metrics.enabled:
+            metrics.set('hikvision_card_index_records', len(view.users.records), kind='users')
+            metrics.set('hikvision_card_index_records', len(view.cards.records), kind='cards')
+        return counts
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Qurilmadan foydalanuvchi va kartalarni oqim bilan qayta o'qish va indeksni almashtirish
+
+        Returns:
+            Qo'shilgan, o'chirilgan va o'zgargan yozuvlar soni
+        """
+        if self.api is None:
+            raise ValueError("Indeks API siz yaratilgan")
+        # Xatolik yuqoriga uzatiladi: yarim o'qilgan ro'yxat mavjud yozuvlarni o'chirmasligi kerak
+        return self.update(self.api.iter_user_info(), self.api.iter_card_info())
+
+    def stats(self) -> Dict[str, Any]:
+        """Indeks hajmi"""
+        view = self._view
+        return {'users': len(view.users.records), 'cards': len(view.cards.records),
+                'refreshed_at': self.refreshed_at}
+
+    def save(self, path: str = None):
+        """
+        Indeksni siqilgan snapshot ga saqlash (atomar)
+
+        Args:
+            path: Fayl yo'li (standart - state_path)
+        """
+        path = path or self.state_path
+        view = self._view
+        payload = {'refreshed_at': self.refreshed_at,
+                   'users': list(view.users.records.values()),
+                   'cards': list(view.cards.records.values())}
+        data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(gzip.compress(data, compresslevel=6))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Indeksni snapshot dan yuklash"""
+        with open(path, 'rb') as f:
+            if f.readline() != _MAGIC:
+                raise ValueError(f"Indeks snapshot i emas: {path}")
+            payload = json.loads(gzip.decompress(f.read()))
+        users, cards = _Table('employeeNo'), _Table('cardNo')
+        users.load(payload['users'])
+        cards.load(payload['cards'])
+        with self._lock:
+            self._view = _View(users, cards)
+            self.refreshed_at = payload.get('refreshed_at')
+
+
+def build_card_index(api, output_dir: str = 'output') -> CardIndex:
+    """
+    API uchun snapshot li indeks yaratish (output_dir/card_index.snapshot)
+
+    Returns:
+        CardIndex
+    """
+    return CardIndex(api, state_path=os.path.join(output_dir, 'card_index.snapshot'))
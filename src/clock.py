@@ -0,0 +1,260 @@
+import threading
+import time
+from datetime import date, datetime
+from email.utils import parsedate_tz, mktime_tz
+from typing import Dict, List, Any, Optional
+
+from .metrics import metrics
+
+metrics.describe('hikvision_device_clock_skew_seconds', 'gauge',
+                 'Qurilma soati va collector soati orasidagi farq')
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_day_cache: Dict[str, int] = {}
+
+
+def _day_seconds(day: str) -> int:
+    """'YYYY-MM-DD' kunining boshi (UTC epoch soniya), kesh bilan"""
+    seconds = _day_cache.get(day)
+    if seconds is None:
+        seconds = (date(int(day[:4]), int(day[5:7]), int(day[8:10])).toordinal()
+                   - _EPOCH_ORDINAL) * 86400
+        if len(_day_cache) > 4096:
+            _day_cache.clear()
+        _day_cache[day] = seconds
+    return seconds
+
+
+def _parse_offset(tail: str) -> Optional[int]:
+    """'Z', '+05:00', '+0500' qo'shimchasini soniyalarga aylantirish (yo'q bo'lsa None)"""
+    if not tail:
+        return None
+    if tail == 'Z':
+        return 0
+    sign = -1 if tail[0] == '-' else 1
+    digits = tail[1:].replace(':', '')
+    return sign * (int(digits[:2]) * 3600 + int(digits[2:4] or 0) * 60)
+
+
+def parse_iso_epoch(value: str, default_offset: int = 0) -> Optional[int]:
+    """
+    ISAPI vaqtini ('2024-01-01T08:00:00+05:00') UTC epoch soniyaga aylantirish
+
+    Qat'iy formatdagi satrlar datetime obyektisiz kesmalar orqali o'qiladi; boshqa
+    ko'rinishlar datetime.fromisoformat ga beriladi.
+
+    Args:
+        value: Vaqt satri
+        default_offset: Zonasiz vaqtlar uchun UTC farqi (soniya)
+
+    Returns:
+        Epoch soniya yoki None (parsing qilib bo'lmasa)
+    """
+    try:
+        if len(value) >= 19 and value[4] == '-' and value[10] in 'T ' and value[13] == ':':
+            tail = value[19:]
+            if tail[:1] == '.':
+                i = 1
+                while i < len(tail) and tail[i].isdigit():
+                    i += 1
+                tail = tail[i:]
+            offset = _parse_offset(tail)
+            return (_day_seconds(value[:10]) + int(value[11:13]) * 3600 + int(value[14:16]) * 60
+                    + int(value[17:19]) - (default_offset if offset is None else offset))
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    offset = parsed.utcoffset()
+    naive = parsed.replace(tzinfo=None)
+    seconds = int((naive - datetime(1970, 1, 1)).total_seconds())
+    return seconds - (default_offset if offset is None else int(offset.total_seconds()))
+
+
+class DeviceClock:
+    """Qurilma soati holati: farq (skew) va vaqt zonasi"""
+
+    __slots__ = ('skew', 'utc_offset', 'measured_at')
+
+    def __init__(self, skew: float, utc_offset: Optional[int], measured_at: float):
+        """
+        Args:
+            skew: Qurilma soati minus collector soati (soniya)
+            utc_offset: Qurilmaning UTC farqi (soniya, noma'lum bo'lsa None)
+            measured_at: O'lchangan vaqt (monotonic)
+        """
+        self.skew = skew
+        self.utc_offset = utc_offset
+        self.measured_at = measured_at
+
+
+def normalize_timestamps(events: List[Dict[str, Any]], clock: DeviceClock = None,
+                         field: str = 'time', target: str = 'timestamp') -> int:
+    """
+    Hodisa vaqtlarini bitta o'tishda UTC epoch butun soniyaga aylantirish
+
+    Qurilma soati ma'lum bo'lsa uning farqi ayiriladi, zonasiz vaqtlar qurilma zonasida
+    (noma'lum bo'lsa collector zonasida) deb hisoblanadi. Asl `time` maydoni o'zgarmaydi.
+
+    Args:
+        events: Hodisalar ro'yxati (joyida o'zgartiriladi)
+        clock: Qurilma soati holati
+        field: Manba maydon
+        target: Natija maydoni
+
+    Returns:
+        Normallashtirilgan hodisalar soni
+    """
+    if clock is not None:
+        skew = round(clock.skew)
+        default_offset = clock.utc_offset
+    else:
+        skew = 0
+        default_offset = None
+    if default_offset is None:
+        default_offset = time.localtime().tm_gmtoff
+    # To'plamdagi hodisalar odatda bir necha daqiqaga tushadi: daqiqa boshi (zona va
+    # farq bilan) bir marta hisoblanadi, har bir qatorda faqat soniya o'qiladi
+    minutes: Dict[str, tuple] = {}
+    count = 0
+    for event in events:
+        value = event.get(field)
+        if value.__class__ is not str:
+            continue
+        minute = value[:16]
+        tail = value[19:]
+        entry = minutes.get(minute)
+        if entry is None or entry[1] != tail:
+            entry = minutes[minute] = (_minute_epoch(value, default_offset, skew), tail)
+        try:
+            epoch = entry[0] + int(value[17:19])
+        except (TypeError, ValueError):
+            # Qat'iy formatga mos kelmaydigan vaqt
+            epoch = parse_iso_epoch(value, default_offset)
+            if epoch is None:
+                continue
+            epoch -= skew
+        event[target] = epoch
+        count += 1
+    return count
+
+
+def _minute_epoch(value: str, default_offset: int, skew: int) -> Optional[int]:
+    """Vaqt daqiqasining boshi (UTC epoch, farq ayirilgan), format mos kelmasa None"""
+    if len(value) < 19 or value[16] != ':':
+        return None
+    epoch = parse_iso_epoch(value[:17] + '00' + value[19:], default_offset)
+    return None if epoch is None else epoch - skew
+
+
+class ClockSkewTracker:
+    """
+    Qurilmalar soati farqini kuzatuvchi (TTL bilan keshlanadi)
+
+    Farq vaqt sozlamalari (localTime) javobidan, u bo'lmasa javobning Date sarlavhasidan
+    o'lchanadi. Ikkalasi ham soniya aniqligida, shuning uchun 1 soniyadan kichik farqlar
+    e'tiborsiz qoldiriladi.
+    """
+
+    def __init__(self, ttl: float = 3600, min_skew: float = 1.0):
+        """
+        Args:
+            ttl: O'lchov amal qilish muddati (sekund)
+            min_skew: Bundan kichik farqlar 0 deb olinadi
+        """
+        self.ttl = ttl
+        self.min_skew = min_skew
+        self._clocks: Dict[str, DeviceClock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device: str) -> Optional[DeviceClock]:
+        """
+        Keshdagi soat holati (muddati o'tgan bo'lsa None)
+
+        Args:
+            device: Qurilma identifikatori (HOST yoki push manzili)
+        """
+        clock = self._clocks.get(device)
+        if clock is None or time.monotonic() - clock.measured_at > self.ttl:
+            return None
+        return clock
+
+    def record(self, device: str, device_epoch: float, sent: float, received: float,
+               utc_offset: Optional[int] = None) -> DeviceClock:
+        """
+        O'lchovni qayd qilish
+
+        Args:
+            device: Qurilma identifikatori
+            device_epoch: Qurilma javobidagi vaqt (epoch, soniya aniqligida)
+            sent: So'rov yuborilgan vaqt (collector, time.time)
+            received: Javob olingan vaqt (collector, time.time)
+            utc_offset: Qurilmaning UTC farqi
+        """
+        # Qurilma soniyani kesib yuboradi: o'rtacha 0.5 soniya qo'shiladi
+        skew = device_epoch + 0.5 - (sent + received) / 2
+        if abs(skew) < self.min_skew:
+            skew = 0.0
+        clock = DeviceClock(skew, utc_offset, time.monotonic())
+        with self._lock:
+            self._clocks[device] = clock
+        if metrics.enabled:
+            metrics.set('hikvision_device_clock_skew_seconds', skew, device=device)
+        return clock
+
+    def refresh(self, api) -> Optional[DeviceClock]:
+        """
+        Qurilma soatini vaqt sozlamalari so'rovi orqali o'lchash
+
+        Args:
+            api: HikVisionAPI obyekti
+
+        Returns:
+            DeviceClock yoki None (javobda vaqt bo'lmasa)
+        """
+        sent = time.time()
+        response = api._make_request('GET', api.config.API_TIME_CONFIG)
+        received = time.time()
+
+        utc_offset = None
+        data = api._parse_xml_response(response)
+        local_time = data.get('Time', data).get('localTime')
+        if isinstance(local_time, str):
+            try:
+                utc_offset = _parse_offset(local_time[19:].lstrip('.0123456789'))
+            except ValueError:
+                utc_offset = None
+            device_epoch = parse_iso_epoch(local_time)
+            if utc_offset is not None and device_epoch is not None:
+                return self.record(api.config.HOST, device_epoch, sent, received, utc_offset)
+        # localTime zonasiz bo'lsa farq Date sarlavhasidan (GMT) olinadi
+        date_header = response.headers.get('Date')
+        parsed = parsedate_tz(date_header) if date_header else None
+        if parsed is None:
+            return None
+        return self.record(api.config.HOST, mktime_tz(parsed), sent, received)
+
+    def clock_for(self, api) -> Optional[DeviceClock]:
+        """Keshdagi holat, muddati o'tgan bo'lsa qayta o'lchash"""
+        return self.get(api.config.HOST) or self.refresh(api)
+
+    def normalize(self, events: List[Dict[str, Any]], device: str = None) -> int:
+        """
+        Hodisalarni keshdagi qurilma soati bilan normallashtirish (tarmoq so'rovisiz)
+
+        Args:
+            events: Hodisalar ro'yxati
+            device: Qurilma identifikatori (berilmasa har bir hodisaning ipAddress i)
+
+        Returns:
+            Normallashtirilgan hodisalar soni
+        """
+        if device is not None:
+            return normalize_timestamps(events, self.get(device))
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            groups.setdefault(event.get('ipAddress', ''), []).append(event)
+        return sum(normalize_timestamps(group, self.get(ip)) for ip, group in groups.items())
+
+
+# Jarayon bo'yicha umumiy kuzatuvchi
+clocks = ClockSkewTracker()
@@ -1,41 +1,214 @@
 import os
-from dotenv import load_dotenv
+import threading
 
-# .env faylini yuklash
-load_dotenv('config/settings.env')
+ENV_FILE = 'config/settings.env'
+
+_env_loaded = False
+_env_lock = threading.Lock()
+_UNSET = object()
+
+
+def load_env(path: str = None):
+    """
+    .env faylini bir marta yuklash
+
+    Import vaqtida emas, birinchi sozlama o'qilganda chaqiriladi. python-dotenv ham
+    faqat shu paytda import qilinadi.
+
+    Args:
+        path: .env fayl yo'li (standart - config/settings.env)
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if _env_loaded:
+            return
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            pass
+        else:
+            load_dotenv(path or ENV_FILE)
+        _env_loaded = True
+
+
+def _to_bool(value) -> bool:
+    """'True'/'true' satrini bool ga aylantirish"""
+    return str(value).lower() == 'true'
+
+
+class EnvSetting:
+    """Muhit o'zgaruvchisidan birinchi murojaatda o'qiladigan va keshlanadigan sozlama"""
+
+    _instances = []
+
+    def __init__(self, env: str, default, cast=str):
+        """
+        Args:
+            env: Muhit o'zgaruvchisi nomi
+            default: Standart qiymat (cast dan o'tkaziladi)
+            cast: Qiymatni aylantiruvchi funksiya (str, int, float, _to_bool)
+        """
+        self.env = env
+        self.default = default
+        self.cast = cast
+        self._value = _UNSET
+        EnvSetting._instances.append(self)
+
+    def __get__(self, instance, owner):
+        value = self._value
+        if value is _UNSET:
+            load_env()
+            value = self._value = self.cast(os.getenv(self.env, self.default))
+        return value
+
+    @classmethod
+    def reset_all(cls):
+        """Keshlangan qiymatlarni tozalash (keyingi murojaatda qayta o'qiladi)"""
+        for setting in cls._instances:
+            setting._value = _UNSET
+
+
+def reload_config():
+    """
+    Muhit o'zgaruvchilarini qayta o'qish
+
+    .env fayli qayta yuklanadi va barcha sozlamalar keyingi murojaatda yangidan hisoblanadi.
+    """
+    global _env_loaded
+    _env_loaded = False
+    EnvSetting.reset_all()
 
 class HikVisionConfig:
-    """HikVision konfiguratsiya sinfi - Access Control uchun moslashtirilgan"""
+    """HikVision konfiguratsiya sinfi - Access Control uchun moslashtirilgan
+    
+    Sozlamalar import vaqtida emas, birinchi murojaatda o'qiladi (EnvSetting).
+    """
     
     # Server ma'lumotlari
-    HOST = os.getenv('HIKVISION_HOST', '172.18.18.60')
-    USERNAME = os.getenv('HIKVISION_USERNAME', 'admin')
-    PASSWORD = os.getenv('HIKVISION_PASSWORD', 'qwerty@321')
-    PORT = int(os.getenv('HIKVISION_PORT', 80))
-    PROTOCOL = os.getenv('HIKVISION_PROTOCOL', 'http')
+    HOST = EnvSetting('HIKVISION_HOST', '172.18.18.60')
+    USERNAME = EnvSetting('HIKVISION_USERNAME', 'admin')
+    PASSWORD = EnvSetting('HIKVISION_PASSWORD', 'qwerty@321')
+    PORT = EnvSetting('HIKVISION_PORT', 80, int)
+    PROTOCOL = EnvSetting('HIKVISION_PROTOCOL', 'http')
     
     # Access Control API yo'llari
-    API_DEVICE_INFO = os.getenv('API_DEVICE_INFO', 'ISAPI/System/deviceInfo')
-    API_ACCESS_CONTROL = os.getenv('API_ACCESS_CONTROL', 'ISAPI/AccessControl/AcsEvent')
-    API_CARD_INFO = os.getenv('API_CARD_INFO', 'ISAPI/AccessControl/CardInfo')
-    API_USER_INFO = os.getenv('API_USER_INFO', 'ISAPI/AccessControl/UserInfo')
-    API_DOOR_STATUS = os.getenv('API_DOOR_STATUS', 'ISAPI/AccessControl/Door')
-    API_DOOR_CONTROL = os.getenv('API_DOOR_CONTROL', 'ISAPI/AccessControl/RemoteControl/door')
-    API_EVENT_NOTIFICATION = os.getenv('API_EVENT_NOTIFICATION', 'ISAPI/Event/notification/alertStream')
-    API_TIME_CONFIG = os.getenv('API_TIME_CONFIG', 'ISAPI/System/time')
-    API_NETWORK_CONFIG = os.getenv('API_NETWORK_CONFIG', 'ISAPI/System/Network/interfaces')
-    API_CAPABILITIES = os.getenv('API_CAPABILITIES', 'ISAPI/System/capabilities')
+    API_DEVICE_INFO = EnvSetting('API_DEVICE_INFO', 'ISAPI/System/deviceInfo')
+    API_ACCESS_CONTROL = EnvSetting('API_ACCESS_CONTROL', 'ISAPI/AccessControl/AcsEvent')
+    API_CARD_INFO = EnvSetting('API_CARD_INFO', 'ISAPI/AccessControl/CardInfo')
+    API_USER_INFO = EnvSetting('API_USER_INFO', 'ISAPI/AccessControl/UserInfo')
+    API_DOOR_STATUS = EnvSetting('API_DOOR_STATUS', 'ISAPI/AccessControl/Door')
+    API_DOOR_CONTROL = EnvSetting('API_DOOR_CONTROL', 'ISAPI/AccessControl/RemoteControl/door')
+    API_EVENT_NOTIFICATION = EnvSetting('API_EVENT_NOTIFICATION', 'ISAPI/Event/notification/alertStream')
+    API_TIME_CONFIG = EnvSetting('API_TIME_CONFIG', 'ISAPI/System/time')
+    API_NETWORK_CONFIG = EnvSetting('API_NETWORK_CONFIG', 'ISAPI/System/Network/interfaces')
+    API_CAPABILITIES = EnvSetting('API_CAPABILITIES', 'ISAPI/System/capabilities')
     
     # Eski kamera API lari (agar kerak bo'lsa)
-    API_CHANNELS = os.getenv('API_CHANNELS', 'ISAPI/System/Video/inputs')
-    API_STREAMING = os.getenv('API_STREAMING', 'ISAPI/Streaming/channels')
-    API_PTZ = os.getenv('API_PTZ', 'ISAPI/PTZCtrl/channels')
-    API_PLAYBACK = os.getenv('API_PLAYBACK', 'ISAPI/ContentMgmt/search')
+    API_CHANNELS = EnvSetting('API_CHANNELS', 'ISAPI/System/Video/inputs')
+    API_STREAMING = EnvSetting('API_STREAMING', 'ISAPI/Streaming/channels')
+    API_PTZ = EnvSetting('API_PTZ', 'ISAPI/PTZCtrl/channels')
+    API_PLAYBACK = EnvSetting('API_PLAYBACK', 'ISAPI/ContentMgmt/search')
     
     # Boshqa sozlamalar
-    TIMEOUT = int(os.getenv('TIMEOUT', 30))
-    RETRY_COUNT = int(os.getenv('RETRY_COUNT', 3))
-    DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+    TIMEOUT = EnvSetting('TIMEOUT', 30, int)
+    RETRY_COUNT = EnvSetting('RETRY_COUNT', 3, int)
+    DEBUG = EnvSetting('DEBUG', 'False', _to_bool)
+    LOG_SAMPLE_RATE = EnvSetting('LOG_SAMPLE_RATE', 1.0, float)
+    
+    # So'rov trace lari (JSON lines)
+    TRACE_ENABLED = EnvSetting('TRACE_ENABLED', 'False', _to_bool)
+    TRACE_SAMPLE_RATE = EnvSetting('TRACE_SAMPLE_RATE', 0.01, float)
+    TRACE_FILE = EnvSetting('TRACE_FILE', 'output/traces.jsonl')
+    
+    # Metrikalar (Prometheus)
+    METRICS_ENABLED = EnvSetting('METRICS_ENABLED', 'False', _to_bool)
+    METRICS_PORT = EnvSetting('METRICS_PORT', 0, int)
+    
+    # Holat endpointi (/status, /health): qurilma shuncha sekund javob bermasa sog'lom emas
+    STATUS_PORT = EnvSetting('STATUS_PORT', 0, int)
+    STATUS_HOST = EnvSetting('STATUS_HOST', '0.0.0.0')
+    STATUS_STALE_AFTER = EnvSetting('STATUS_STALE_AFTER', 300, float)
+    
+    # Qurilma bo'yicha so'rovlar navbati
+    SCHEDULER_ENABLED = EnvSetting('SCHEDULER_ENABLED', 'True', _to_bool)
+    DEVICE_MAX_CONCURRENCY = EnvSetting('DEVICE_MAX_CONCURRENCY', 2, int)
+    DEVICE_RATE_LIMIT = EnvSetting('DEVICE_RATE_LIMIT', 0, float)
+    
+    # HTTP push qabul qiluvchi (qurilma httpHosts)
+    PUSH_HOST = EnvSetting('PUSH_HOST', '0.0.0.0')
+    PUSH_PORT = EnvSetting('PUSH_PORT', 8099, int)
+    PUSH_BATCH_SIZE = EnvSetting('PUSH_BATCH_SIZE', 500, int)
+    PUSH_BATCH_INTERVAL = EnvSetting('PUSH_BATCH_INTERVAL', 1.0, float)
+    
+    # Hodisalar pipeline i (sink lar)
+    SINKS = EnvSetting('SINKS', 'jsonl')
+    SINK_BATCH_SIZE = EnvSetting('SINK_BATCH_SIZE', 500, int)
+    SINK_BATCH_INTERVAL = EnvSetting('SINK_BATCH_INTERVAL', 1.0, float)
+    SINK_MAX_QUEUE = EnvSetting('SINK_MAX_QUEUE', 10000, int)
+    SINK_MAX_RETRIES = EnvSetting('SINK_MAX_RETRIES', 8, int)
+    SINK_CLOSE_TIMEOUT = EnvSetting('SINK_CLOSE_TIMEOUT', 30, float)
+    SINK_SQLITE_PATH = EnvSetting('SINK_SQLITE_PATH', 'output/events.db')
+    SINK_WEBHOOK_URL = EnvSetting('SINK_WEBHOOK_URL', '')
+    
+    # Takroriy hodisalarni olib tashlash (qurilma, serialNo)
+    DEDUP_ENABLED = EnvSetting('DEDUP_ENABLED', 'True', _to_bool)
+    DEDUP_LRU_SIZE = EnvSetting('DEDUP_LRU_SIZE', 100000, int)
+    DEDUP_WINDOW = EnvSetting('DEDUP_WINDOW', 86400, float)
+    DEDUP_CAPACITY = EnvSetting('DEDUP_CAPACITY', 250000, int)
+    
+    # Daemon vazifalari intervallari (sekund, 0 - o'chirilgan)
+    DAEMON_EVENT_SYNC_INTERVAL = EnvSetting('DAEMON_EVENT_SYNC_INTERVAL', 60, float)
+    DAEMON_USER_SYNC_INTERVAL = EnvSetting('DAEMON_USER_SYNC_INTERVAL', 3600, float)
+    DAEMON_DEVICE_INFO_INTERVAL = EnvSetting('DAEMON_DEVICE_INFO_INTERVAL', 900, float)
+    DAEMON_JITTER = EnvSetting('DAEMON_JITTER', 0.1, float)
+    DAEMON_CLOCK_SYNC_INTERVAL = EnvSetting('DAEMON_CLOCK_SYNC_INTERVAL', 900, float)
+    DAEMON_CARD_INDEX_INTERVAL = EnvSetting('DAEMON_CARD_INDEX_INTERVAL', 0, float)
+    
+    # Qurilma soati farqi o'lchovining amal qilish muddati (sekund)
+    CLOCK_SKEW_TTL = EnvSetting('CLOCK_SKEW_TTL', 3600, float)
+    
+    # Ulanishlar pool i: qurilmaga ochiq ulanishlar, keep-alive va ishlatilmagan sessiyalar.
+    # Keep-alive eng uzun polling oralig'idan (event_sync, 60 s) uzoq: har bir poll iliq ulanishda
+    POOL_MAXSIZE = EnvSetting('POOL_MAXSIZE', 4, int)
+    POOL_KEEPALIVE_TIMEOUT = EnvSetting('POOL_KEEPALIVE_TIMEOUT', 90, float)
+    POOL_IDLE_TIMEOUT = EnvSetting('POOL_IDLE_TIMEOUT', 300, float)
+    POOL_RETRIES = EnvSetting('POOL_RETRIES', 1, int)
+    
+    # Katta XML javoblarni alohida jarayonlarda parse qilish (0 - o'chirilgan), chegara baytda
+    PARSE_PROCESSES = EnvSetting('PARSE_PROCESSES', 0, int)
+    PARSE_PROCESS_THRESHOLD = EnvSetting('PARSE_PROCESS_THRESHOLD', 262144, int)
+    
+    # Ko'p qurilmali inventar (JSON/TOML), o'zgarganda qayta yuklanadi
+    INVENTORY_FILE = EnvSetting('INVENTORY_FILE', '')
+    INVENTORY_POLL_INTERVAL = EnvSetting('INVENTORY_POLL_INTERVAL', 2.0, float)
+    
+    # Tarmoqdagi qurilmalarni qidirish (--discover)
+    DISCOVERY_PORTS = EnvSetting('DISCOVERY_PORTS', '80')
+    DISCOVERY_CONCURRENCY = EnvSetting('DISCOVERY_CONCURRENCY', 256, int)
+    DISCOVERY_TIMEOUT = EnvSetting('DISCOVERY_TIMEOUT', 1.0, float)
+    
+    # Tarixiy hodisalarni yuklash (--backfill): bo'lak uzunligi, qurilma javobi chegarasi
+    BACKFILL_SHARD_SECONDS = EnvSetting('BACKFILL_SHARD_SECONDS', 21600, int)
+    BACKFILL_MIN_SHARD_SECONDS = EnvSetting('BACKFILL_MIN_SHARD_SECONDS', 60, int)
+    BACKFILL_MAX_RESULTS = EnvSetting('BACKFILL_MAX_RESULTS', 1000, int)
+    BACKFILL_CONCURRENCY = EnvSetting('BACKFILL_CONCURRENCY', 0, int)
+    
+    # Sozlamalarni ko'p qurilmaga yozish (--push-config): canary, to'lqin hajmi va to'xtatish chegarasi
+    FLEET_PUSH_CANARY = EnvSetting('FLEET_PUSH_CANARY', 1, int)
+    FLEET_PUSH_WAVE_SIZE = EnvSetting('FLEET_PUSH_WAVE_SIZE', 0, int)
+    FLEET_PUSH_CONCURRENCY = EnvSetting('FLEET_PUSH_CONCURRENCY', 32, int)
+    FLEET_PUSH_MAX_FAILURE_RATE = EnvSetting('FLEET_PUSH_MAX_FAILURE_RATE', 0.1, float)
+    
+    # PTZ joystik buyruqlari: kanal boshiga sekundiga maksimal buyruqlar
+    PTZ_COMMAND_RATE = EnvSetting('PTZ_COMMAND_RATE', 10, float)
+    
+    # Kanallardan davriy kadrlar (--snapshots): kanal boshiga kadr/daqiqa, qurilmaga parallel so'rovlar
+    SNAPSHOT_FRAMES_PER_MINUTE = EnvSetting('SNAPSHOT_FRAMES_PER_MINUTE', 6, float)
+    SNAPSHOT_DEVICE_CONCURRENCY = EnvSetting('SNAPSHOT_DEVICE_CONCURRENCY', 1, int)
+    SNAPSHOT_WORKERS = EnvSetting('SNAPSHOT_WORKERS', 16, int)
+    SNAPSHOT_CHANNELS = EnvSetting('SNAPSHOT_CHANNELS', '')
     
     @property
     def base_url(self):
@@ -0,0 +1,325 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bo'lim nomi -> endpoint sozlamasi
+SECTIONS = {
+    'time': 'API_TIME_CONFIG',
+    'network': 'API_NETWORK_CONFIG',
+    'capabilities': 'API_CAPABILITIES',
+}
+
+# Faqat o'qiladigan bo'limlar (enforce da yozilmaydi)
+READ_ONLY = {'capabilities'}
+
+# Har o'qishda o'zgaradigan maydonlar: snapshot ga yozilmaydi, solishtirilmaydi va qurilmaga
+# qaytarib yozilmaydi (eski localTime manual rejimdagi soatni orqaga suradi)
+VOLATILE = {'time': {('localTime',)}}
+
+# Ildiz element -> bo'lim nomi (bo'lim nomi berilmagan yozishlar uchun, masalan fleet push)
+SECTION_ROOTS = {'Time': 'time'}
+
+
+def _canonical(blob: Any) -> bytes:
+    return json.dumps(blob, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def format_path(path: List[Any]) -> str:
+    """['NTPServer', 0, 'hostName'] -> 'NTPServer[0].hostName'"""
+    text = ''
+    for key in path:
+        text += f"[{key}]" if isinstance(key, int) else (f".{key}" if text else str(key))
+    return text
+
+
+def diff_config(old: Any, new: Any, path: List[Any] = None) -> List[Dict[str, Any]]:
+    """
+    Ikki sozlama tuzilmasining farqi
+
+    Dict lar kalit bo'yicha, ro'yxatlar indeks bo'yicha solishtiriladi.
+
+    Args:
+        old: Eski (yoki qurilmadagi) qiymat
+        new: Yangi (yoki kerakli) qiymat
+        path: Ichki chaqiruvlar uchun joriy yo'l
+
+    Returns:
+        [{'op': 'added'|'removed'|'changed', 'path': [...], 'old': ..., 'new': ...}, ...]
+    """
+    path = path or []
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key, value in old.items():
+            if key in new:
+                changes.extend(diff_config(value, new[key], path + [key]))
+            else:
+                changes.append({'op': 'removed', 'path': path + [key], 'old': value, 'new': None})
+        for key, value in new.items():
+            if key not in old:
+                changes.append({'op': 'added', 'path': path + [key], 'old': None, 'new': value})
+        return changes
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            changes.extend(diff_config(a, b, path + [i]))
+        for i in range(len(new), len(old)):
+            changes.append({'op': 'removed', 'path': path + [i], 'old': old[i], 'new': None})
+        for i in range(len(old), len(new)):
+            changes.append({'op': 'added', 'path': path + [i], 'old': None, 'new': new[i]})
+        return changes
+    if old != new:
+        return [{'op': 'changed', 'path': path, 'old': old, 'new': new}]
+    return []
+
+
+def apply_changes(data: Any, changes: List[Dict[str, Any]]) -> Any:
+    """
+    diff_config natijasini nusxaga qo'llash ('removed' - o'chirish, qolganlari - yozish)
+
+    Returns:
+        O'zgartirilgan nusxa
+    """
+    data = copy.deepcopy(data)
+    # O'chirishlar oxirida va teskari tartibda: ro'yxat indekslari siljimasligi uchun
+    removed = [change for change in changes if change['op'] == 'removed']
+    for change in [change for change in changes if change['op'] != 'removed'] + removed[::-1]:
+        path = change['path']
+        if not path:
+            data = copy.deepcopy(change['new'])
+            continue
+        parent = data
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        if change['op'] == 'removed':
+            del parent[key]
+        elif isinstance(parent, list) and key == len(parent):
+            parent.append(copy.deepcopy(change['new']))
+        else:
+            parent[key] = copy.deepcopy(change['new'])
+    return data
+
+
+def _strip_volatile(name: str, data: Any) -> Any:
+    volatile = VOLATILE.get(name)
+    if not volatile or not isinstance(data, dict):
+        return data
+    data = copy.deepcopy(data)
+    for path in volatile:
+        parent = data
+        for key in path[:-1]:
+            parent = parent.get(key) if isinstance(parent, dict) else None
+        if isinstance(parent, dict):
+            parent.pop(path[-1], None)
+    return data
+
+
+def writable_section(section: Dict[str, Any], name: str = None) -> Dict[str, Any]:
+    """
+    Bo'limni PUT uchun tayyorlash: VOLATILE maydonlar olib tashlanadi
+
+    Args:
+        section: get_config_section ko'rinishidagi bo'lim
+        name: Bo'lim nomi (berilmasa ildiz element bo'yicha aniqlanadi)
+
+    Returns:
+        Bo'lim nusxasi
+    """
+    name = name or SECTION_ROOTS.get(section.get('root'))
+    return dict(section, data=_strip_volatile(name, section['data']))
+
+
+def diff_snapshots(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Ikki snapshot (bo'lim -> bo'lim ma'lumoti) farqi
+
+    Returns:
+        Faqat farqi bor bo'limlar: bo'lim nomi -> o'zgarishlar
+    """
+    result = {}
+    for name in sorted(set(old) | set(new)):
+        changes = diff_config(old[name]['data'] if name in old else {},
+                              new[name]['data'] if name in new else {})
+        if changes:
+            result[name] = changes
+    return result
+
+
+class ConfigStore:
+    """
+    Qurilma sozlamalari snapshot lari ombori (content-addressed)
+
+    Har bir bo'lim kanonik JSON ning sha256 i bo'yicha objects/ ga bir marta yoziladi, shuning
+    uchun bir xil sozlamali qurilmalar va o'zgarmagan versiyalar joyni bo'lishadi. Qurilma
+    versiyalari devices/<qurilma>.jsonl da manifest (bo'lim -> hash) sifatida saqlanadi;
+    yangi versiya faqat sozlamalar o'zgarganda qo'shiladi.
+    """
+
+    def __init__(self, root: str = 'output/config_snapshots'):
+        """
+        Args:
+            root: Ombor papkasi
+        """
+        self.root = root
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'devices'), exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.json")
+
+    def _device_path(self, device: str) -> str:
+        return os.path.join(self.root, 'devices', re.sub(r'[^\w.-]', '_', device) + '.jsonl')
+
+    def put(self, blob: Any) -> str:
+        """
+        Obyektni saqlash (mavjud bo'lsa qayta yozilmaydi)
+
+        Returns:
+            sha256 hash
+        """
+        data = _canonical(blob)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> Any:
+        """Obyektni hash bo'yicha o'qish"""
+        with open(self._object_path(digest), 'rb') as f:
+            return json.loads(f.read())
+
+    def capture(self, api, sections: Dict[str, str] = None, device: str = None) -> Dict[str, Any]:
+        """
+        Qurilma sozlamalarini o'qib snapshot olish
+
+        O'qib bo'lmagan bo'limlar (masalan qurilma qo'llamaydigan endpoint) manifest dagi
+        `errors` ga yoziladi, qolganlari saqlanadi.
+
+        Args:
+            api: HikVisionAPI obyekti
+            sections: Bo'lim nomi -> endpoint (standart - SECTIONS dagi sozlamalar)
+            device: Qurilma nomi (standart - config.name yoki HOST)
+
+        Returns:
+            Manifest: id, device, taken_at, sections (nom -> hash), errors
+        """
+        config = api.config
+        device = device or getattr(config, 'name', None) or config.HOST
+        if sections is None:
+            sections = {name: getattr(config, attr) for name, attr in SECTIONS.items()}
+
+        hashes, errors = {}, {}
+        for name, endpoint in sections.items():
+            try:
+                section = api.get_config_section(endpoint)
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+            section['endpoint'] = endpoint
+            section['data'] = _strip_volatile(name, section['data'])
+            hashes[name] = self.put(section)
+
+        manifest = {'id': hashlib.sha256(_canonical(hashes)).hexdigest()[:16], 'device': device,
+                    'taken_at': datetime.now().isoformat(), 'sections': hashes, 'errors': errors}
+        latest = self.latest(device)
+        if latest is None or latest['id'] != manifest['id']:
+            with open(self._device_path(device), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(manifest, ensure_ascii=False) + '\n')
+            logger.info("Sozlamalar snapshot i: %s %s", device, manifest['id'])
+        return manifest
+
+    def history(self, device: str) -> List[Dict[str, Any]]:
+        """Qurilma versiyalari (eskidan yangiga)"""
+        try:
+            with open(self._device_path(device), 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def latest(self, device: str) -> Optional[Dict[str, Any]]:
+        """Qurilmaning oxirgi versiyasi"""
+        history = self.history(device)
+        return history[-1] if history else None
+
+    def find(self, snapshot_id: str, device: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Manifest ni id (yoki uning boshi) bo'yicha topish
+
+        Args:
+            snapshot_id: Manifest id si yoki prefiksi
+            device: Qurilma (berilmasa barcha qurilmalar ichidan)
+        """
+        if device is not None:
+            devices = [self._device_path(device)]
+        else:
+            directory = os.path.join(self.root, 'devices')
+            devices = [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+        for path in devices:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    manifest = json.loads(line)
+                    if manifest['id'].startswith(snapshot_id):
+                        return manifest
+        return None
+
+    def load(self, manifest: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Manifest bo'limlarini o'qish (bo'lim nomi -> bo'lim)"""
+        return {name: self.get(digest) for name, digest in manifest['sections'].items()}
+
+    def diff(self, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Ikki manifest farqi (hash lari teng bo'limlar o'qilmaydi)"""
+        names = [name for name in set(old['sections']) | set(new['sections'])
+                 if old['sections'].get(name) != new['sections'].get(name)]
+        return diff_snapshots({name: self.get(old['sections'][name]) for name in names if name in old['sections']},
+                              {name: self.get(new['sections'][name]) for name in names if name in new['sections']})
+
+
+def enforce(api, desired: Dict[str, Dict[str, Any]], dry_run: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Qurilmani kerakli snapshot ga moslash: faqat farq qilgan bo'limlar yoziladi
+
+    Har bir bo'lim qurilmadan o'qiladi va kerakli qiymat bilan solishtiriladi. Farq bo'lmasa
+    hech narsa yozilmaydi (drift bo'lmagan qurilma uchun faqat GET lar). Farq bo'lsa qurilmadagi
+    bo'lim faqat farq qilgan maydonlari almashtirilib PUT qilinadi; qurilmada bor, snapshot da
+    yo'q maydonlar (masalan yangi proshivka maydonlari) tegilmaydi.
+
+    Args:
+        api: HikVisionAPI obyekti
+        desired: ConfigStore.load natijasi (bo'lim nomi -> bo'lim)
+        dry_run: True bo'lsa faqat farqlar hisoblanadi
+
+    Returns:
+        Bo'lim nomi -> {'changes': [...], 'written': bool, 'error': xato (bo'lsa)}
+    """
+    report = {}
+    for name, section in desired.items():
+        if name in READ_ONLY:
+            continue
+        endpoint = section['endpoint']
+        try:
+            current = writable_section(api.get_config_section(endpoint), name)
+            changes = [change for change in diff_config(current['data'], section['data'])
+                       if change['op'] != 'removed']
+            written = False
+            if changes and not dry_run:
+                api.put_config_section(endpoint, dict(current, data=apply_changes(current['data'], changes)))
+                written = True
+            report[name] = {'changes': changes, 'written': written}
+        except Exception as e:
+            logger.error("%s bo'limini moslashda xatolik: %s", name, e)
+            report[name] = {'changes': [], 'written': False, 'error': str(e)}
+    return report
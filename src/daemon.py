@@ -0,0 +1,367 @@
+import json
+import logging
+import os
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional
+
+from .card_index import build_card_index
+from .clock import clocks
+from .config import HikVisionConfig
+from .hikvision_api import HikVisionAPI
+from .parser import HikVisionParser
+from .status import status
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """Daemon ichida o'z intervali bilan ishlaydigan vazifa"""
+
+    def __init__(self, name: str, interval: float, func: Callable[['CollectorDaemon'], Any],
+                 jitter: float = 0.1):
+        """
+        Args:
+            name: Vazifa nomi
+            interval: Ishga tushirishlar orasidagi interval (sekund)
+            func: Vazifa funksiyasi, daemon obyektini qabul qiladi
+            jitter: Intervalga qo'shiladigan tasodifiy og'ish ulushi (0.1 = ±10%)
+        """
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.jitter = jitter
+        self.next_run = 0.0
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_run: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def schedule_next(self, now: float, first: bool = False):
+        """
+        Keyingi ishga tushish vaqtini hisoblash
+
+        Birinchi ishga tushirish jitter oralig'ida tarqatiladi, shunda bir nechta daemon
+        (yoki vazifa) qurilmaga bir vaqtda urilmaydi.
+
+        Args:
+            now: Joriy monotonic vaqt
+            first: Birinchi rejalashtirishmi
+        """
+        spread = self.interval * self.jitter
+        if first:
+            self.next_run = now + random.uniform(0, spread)
+        else:
+            self.next_run = now + self.interval + random.uniform(-spread, spread)
+
+    def status(self) -> Dict[str, Any]:
+        """Vazifa holati"""
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_run': self.last_run,
+            'last_duration': self.last_duration,
+            'last_error': self.last_error
+        }
+
+
+class CollectorDaemon:
+    """HikVisionAPI sessiyasini iliq saqlab, vazifalarni rejalashtiruvchi uzoq ishlovchi jarayon"""
+
+    STATE_FILE = 'daemon_state.json'
+
+    def __init__(self, api: HikVisionAPI = None, output_dir: str = 'output', pipeline=None,
+                 dedup=None, shared: bool = False):
+        """
+        Daemon ni ishga tushirish
+
+        Args:
+            api: HikVisionAPI obyekti (sessiya butun ish davomida qayta ishlatiladi)
+            output_dir: Natija papkasi
+            pipeline: Hodisalar uchun EventPipeline (berilmasa kunlik JSON lines fayl)
+            dedup: EventDeduplicator (bir-birini qoplagan oynalardagi takrorlarni olib tashlaydi)
+            shared: pipeline va dedup boshqa daemon lar bilan umumiy (shutdown da yopilmaydi)
+        """
+        self.api = api or HikVisionAPI()
+        self.pipeline = pipeline
+        self.dedup = dedup
+        self.shared = shared
+        self.parser = HikVisionParser(self.api)
+        self.index = None
+        self.output_dir = output_dir
+        self.jobs: List[Job] = []
+        self.state: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._files: Dict[str, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._load_state()
+
+    def add_job(self, job: Job) -> Job:
+        """
+        Vazifa qo'shish (interval 0 yoki manfiy bo'lsa vazifa o'chirilgan)
+
+        Returns:
+            Qo'shilgan Job
+        """
+        if job.interval > 0:
+            self.jobs.append(job)
+        return job
+
+    def add_default_jobs(self, config: HikVisionConfig = None):
+        """
+        Standart vazifalarni konfiguratsiyadan qo'shish: event_sync, user_sync, device_info,
+        clock_sync, card_index
+
+        Args:
+            config: HikVisionConfig obyekti (standart - API konfiguratsiyasi)
+        """
+        config = config or self.api.config
+        jitter = config.DAEMON_JITTER
+        self.add_job(Job('event_sync', config.DAEMON_EVENT_SYNC_INTERVAL, sync_events, jitter))
+        self.add_job(Job('user_sync', config.DAEMON_USER_SYNC_INTERVAL, sync_users, jitter))
+        self.add_job(Job('device_info', config.DAEMON_DEVICE_INFO_INTERVAL, refresh_device_info, jitter))
+        clocks.ttl = config.CLOCK_SKEW_TTL
+        self.add_job(Job('clock_sync', config.DAEMON_CLOCK_SYNC_INTERVAL, sync_clock, jitter))
+        self.add_job(Job('card_index', config.DAEMON_CARD_INDEX_INTERVAL, refresh_card_index, jitter))
+
+    def install_signal_handlers(self):
+        """SIGTERM va SIGINT kelganda daemon ni silliq to'xtatish"""
+        def handler(signum, frame):
+            logger.info("Signal %s olindi, daemon to'xtatilmoqda", signum)
+            self.stop()
+
+        signal.signal(signal.SIGTERM, handler)
+        signal.signal(signal.SIGINT, handler)
+
+    def run(self):
+        """
+        Asosiy tsikl: stop() chaqirilguncha vazifalarni rejalashtirish
+
+        Har bir vazifa alohida thread da ishlaydi. Oldingi ishga tushirish tugamagan bo'lsa
+        yangisi o'tkazib yuboriladi (overlap bo'lmaydi).
+        """
+        if not self.jobs:
+            logger.warning("Daemon da vazifalar yo'q")
+            return
+        self._executor = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix='job')
+        now = time.monotonic()
+        for job in self.jobs:
+            job.schedule_next(now, first=True)
+        logger.info("Daemon ishga tushdi: %s", ', '.join(job.name for job in self.jobs))
+
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                for job in self.jobs:
+                    if job.next_run <= now:
+                        self._dispatch(job)
+                        job.schedule_next(now)
+                wait = min(job.next_run for job in self.jobs) - time.monotonic()
+                self._stop.wait(max(wait, 0.05))
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        """Daemon ga to'xtash signalini berish"""
+        self._stop.set()
+
+    def shutdown(self):
+        """Ishlayotgan vazifalarni kutib, natija fayllarini flush qilish va yopish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self.pipeline is not None and not self.shared:
+            self.pipeline.close()
+        if self.dedup is not None and self.dedup.state_path and not self.shared:
+            self.dedup.save()
+        self.flush()
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files.clear()
+        logger.info("Daemon to'xtatildi")
+
+    def _dispatch(self, job: Job):
+        """Vazifani thread pool ga yuborish (agar oldingisi tugagan bo'lsa)"""
+        if job.running:
+            job.skipped += 1
+            logger.warning("'%s' vazifasi hali tugamagan, navbatdagi ishga tushirish o'tkazib yuborildi",
+                           job.name)
+            return
+        job.running = True
+        self._executor.submit(self._run_job, job)
+
+    def _run_job(self, job: Job):
+        """Vazifani bajarish va natijasini yozish"""
+        start = time.perf_counter()
+        job.last_run = datetime.now().isoformat()
+        try:
+            job.func(self)
+            job.last_error = None
+            status.record_job(self.api.device_name, job.name)
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error("'%s' vazifasida xatolik: %s", job.name, e)
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - start
+            job.running = False
+            self._save_state()
+
+    def append_jsonl(self, name: str, records: List[Dict[str, Any]]):
+        """
+        Yozuvlarni ochiq JSON lines faylga qo'shish (fayl daemon davomida ochiq turadi)
+
+        Args:
+            name: output_dir ichidagi fayl nomi
+            records: Yozuvlar ro'yxati
+        """
+        if not records:
+            return
+        lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        with self._lock:
+            handle = self._files.get(name)
+            if handle is None:
+                handle = self._files[name] = open(os.path.join(self.output_dir, name), 'a',
+                                                  encoding='utf-8')
+            handle.write(lines)
+
+    def write_json(self, name: str, data: Any):
+        """
+        JSON faylni atomar yozish (avval vaqtinchalik fayl, keyin almashtirish)
+
+        Args:
+            name: output_dir ichidagi fayl nomi
+            data: Yoziladigan ma'lumotlar
+        """
+        path = os.path.join(self.output_dir, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def flush(self):
+        """Ochiq natija fayllarini diskka yozish"""
+        with self._lock:
+            for handle in self._files.values():
+                handle.flush()
+
+    def status(self) -> Dict[str, Any]:
+        """Daemon va vazifalar holati"""
+        return {'jobs': [job.status() for job in self.jobs], 'state': dict(self.state)}
+
+    def _load_state(self):
+        path = os.path.join(self.output_dir, self.STATE_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _save_state(self):
+        with self._lock:
+            state = dict(self.state)
+        self.write_json(self.STATE_FILE, state)
+
+
+def _isapi_time(dt: datetime) -> str:
+    """datetime ni ISAPI vaqt formatiga o'tkazish (masalan 2024-01-01T10:00:00+05:00)"""
+    return dt.astimezone().isoformat(timespec='seconds')
+
+
+# Bitta event_sync da so'raladigan maksimal sahifalar (qolgani keyingi ishga tushirishda)
+_MAX_SYNC_PAGES = 50
+
+
+def sync_events(daemon: CollectorDaemon):
+    """
+    Oxirgi sinxronizatsiyadan beri bo'lgan hodisalarni olish va kunlik JSON lines faylga yozish
+
+    Qurilma javobni kesgan bo'lsa (MORE / totalMatches) kursor faqat oxirgi olingan hodisa
+    vaqtigacha suriladi va qolgan oraliq darhol (yoki keyingi ishga tushirishda) so'raladi.
+    Chegaradagi soniya qayta so'raladi - takrorlarni dedup olib tashlaydi.
+    """
+    now = datetime.now()
+    end_time = _isapi_time(now)
+    device = daemon.dedup.resolve(daemon.api) if daemon.dedup is not None else None
+    total = 0
+    for _ in range(_MAX_SYNC_PAGES):
+        start_time = daemon.state.get('event_sync_cursor')
+        events, truncated = daemon.api.search_access_control_events(start_time, end_time)
+        # Kursor qurilma vaqtida: normallashtirishdan oldin olinadi
+        last_time = max((str(event['time']) for event in events if event.get('time')), default=None)
+        # Qurilma soati farqi clock_sync vazifasi o'lchagan keshdan olinadi
+        clocks.normalize(events, device=daemon.api.config.HOST)
+        if daemon.dedup is not None:
+            # Kalit qurilma serial raqami: push orqali kelgan xuddi shu hodisa ham takror topiladi
+            events = daemon.dedup.filter(events, device=device)
+        if daemon.pipeline is not None:
+            # Navbat to'la bo'lsa shu yerda kutiladi (backpressure), kursor keyin suriladi
+            daemon.pipeline.submit(events)
+        else:
+            daemon.append_jsonl(f"events_{now.strftime('%Y%m%d')}.jsonl", events)
+        total += len(events)
+        if not truncated:
+            daemon.state['event_sync_cursor'] = end_time
+            break
+        if last_time is None or last_time == start_time:
+            # Bir soniyadagi hodisalar ham chegaradan ko'p: oldinga siljishning boshqa yo'li yo'q
+            logger.warning("event_sync: %s dagi hodisalar qurilma chegarasidan ko'p, qolgani o'tkazib yuborildi",
+                           start_time)
+            daemon.state['event_sync_cursor'] = end_time
+            break
+        daemon.state['event_sync_cursor'] = last_time
+    cursor = daemon.state['event_sync_cursor']
+    status.record_sync(daemon.api.device_name,
+                       now.timestamp() if cursor == end_time else datetime.fromisoformat(cursor).timestamp())
+    logger.info("event_sync: %d ta hodisa", total)
+
+
+def sync_users(daemon: CollectorDaemon):
+    """Foydalanuvchilar ro'yxatini yangilash (xatolikda oldingi fayl saqlanib qoladi)"""
+    users = list(daemon.api.iter_user_info())
+    daemon.write_json('users.json', users)
+    daemon.state['user_sync_at'] = datetime.now().isoformat()
+    logger.info("user_sync: %d ta foydalanuvchi", len(users))
+
+
+def refresh_device_info(daemon: CollectorDaemon):
+    """Qurilma ma'lumotlarini yangilash"""
+    device_info = daemon.api.get_device_info()
+    if not device_info:
+        raise RuntimeError("Qurilma ma'lumotlari olinmadi")
+    daemon.write_json('device_info.json', daemon.parser.parse_device_info(device_info))
+    daemon.state['device_info_at'] = datetime.now().isoformat()
+
+
+def sync_clock(daemon: CollectorDaemon):
+    """Qurilma soati farqini o'lchash (hodisa vaqtlarini tuzatish uchun)"""
+    clock = clocks.refresh(daemon.api)
+    if clock is None:
+        raise RuntimeError("Qurilma vaqti olinmadi")
+    daemon.state['clock_skew'] = clock.skew
+    logger.info("clock_sync: farq %.1f s", clock.skew)
+
+
+def refresh_card_index(daemon: CollectorDaemon):
+    """Karta/foydalanuvchi indeksini yangilash va snapshot ga saqlash"""
+    if daemon.index is None:
+        daemon.index = build_card_index(daemon.api, daemon.output_dir)
+    counts = daemon.index.refresh()
+    daemon.index.save()
+    daemon.state['card_index_at'] = datetime.now().isoformat()
+    logger.info("card_index: +%d -%d ~%d", counts['added'], counts['removed'], counts['changed'])
@@ -0,0 +1,347 @@
+import hashlib
+import json
+import math
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_dedup_events_total', 'counter', 'Deduplikatsiyadan o\'tgan hodisalar')
+metrics.describe('hikvision_dedup_duplicates_total', 'counter', 'Takroriy deb topilgan hodisalar')
+
+_MAGIC = b'HKDEDUP1\n'
+
+
+def _alias(value: Any) -> str:
+    """Qurilma identifikatorini solishtirish uchun normallashtirish (MAC: kichik harf, ':' bilan)"""
+    return str(value).strip().lower().replace('-', ':')
+
+
+class BloomFilter:
+    """Oddiy bit massivli Bloom filter (double hashing, blake2b)"""
+
+    __slots__ = ('size', 'hashes', 'bits', 'count')
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Kutilayotgan elementlar soni
+            error_rate: Yolg'on-musbat ehtimoli
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, digest: bytes):
+        """Element (16 baytli digest) qo'shish"""
+        bits = self.bits
+        for pos in self._positions(digest):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self.bits
+        for pos in self._positions(digest):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def clear(self):
+        """Filterni tozalash"""
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+
+class EventDeduplicator:
+    """
+    (qurilma, serialNo) bo'yicha takroriy hodisalarni aniqlovchi bosqich
+
+    Qurilma kaliti - qurilmaning serialNumber i. Polling (HOST) va push (macAddress,
+    ipAddress) bir qurilmani turlicha nomlaydi, shuning uchun bu nomlar resolve() da bir
+    marta o'lchanib serial raqamga bog'lanadi va bir hodisa qaysi yo'ldan kelmasin bitta
+    kalitga tushadi. Ikki daraja: yaqinda ko'rilgan kalitlar uchun aniq LRU, eskiroqlari uchun vaqt oynasi
+    bo'yicha aylanadigan Bloom filterlar. Xotira o'zgarmas: LRU hajmi va Bloom
+    generatsiyalari soni cheklangan, eng eski generatsiya oyna o'tgach yoki joriy generatsiya
+    capacity kalitga to'lganda tozalanadi (to'lgan filter yangi hodisalarni takror deb tashlaydi).
+    """
+
+    def __init__(self, lru_size: int = 100000, window_seconds: float = 86400,
+                 generations: int = 4, capacity: int = 1000000, error_rate: float = 1e-6,
+                 state_path: str = None):
+        """
+        Args:
+            lru_size: Aniq LRU keshidagi kalitlar soni
+            window_seconds: Takrorlar qidiriladigan vaqt oynasi
+            generations: Oyna nechta Bloom generatsiyasiga bo'linadi
+            capacity: Bitta generatsiyaga kutilayotgan kalitlar soni
+            error_rate: Bloom yolg'on-musbat ehtimoli (haqiqiy hodisa takror deb topilishi)
+            state_path: Holat saqlanadigan fayl (mavjud bo'lsa yuklanadi)
+        """
+        self.lru_size = lru_size
+        self.window_seconds = window_seconds
+        self.generation_seconds = window_seconds / generations
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.state_path = state_path
+        self._lru: 'OrderedDict[bytes, None]' = OrderedDict()
+        self._blooms = [BloomFilter(capacity, error_rate) for _ in range(generations)]
+        self._generation_started = time.time()
+        # HOST/IP/MAC -> qurilma serial raqami
+        self._aliases: Dict[str, str] = {}
+        self._resolved: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'seen': 0, 'duplicates': 0, 'lru_hits': 0, 'bloom_hits': 0, 'saturated': 0}
+        if state_path and os.path.exists(state_path):
+            self.load(state_path)
+
+    def register_device(self, device_id: str, *aliases: Any):
+        """
+        Qurilma nomlarini (HOST, IP, MAC) serial raqamga bog'lash
+
+        Args:
+            device_id: Qurilmaning serialNumber i
+            *aliases: Shu qurilmaning boshqa identifikatorlari (bo'shlari e'tiborsiz)
+        """
+        with self._lock:
+            for alias in (device_id,) + aliases:
+                if alias:
+                    self._aliases[_alias(alias)] = device_id
+
+    def resolve(self, api) -> str:
+        """
+        Qurilmaning kanonik identifikatori (serialNumber), qurilma uchun bir marta so'raladi
+
+        deviceInfo olinmasa HOST qaytariladi va keyingi chaqiruvda qayta uriniladi.
+
+        Args:
+            api: HikVisionAPI obyekti
+
+        Returns:
+            serialNumber yoki HOST
+        """
+        config = api.config
+        cache_key = f"{config.HOST}:{config.PORT}"
+        device_id = self._resolved.get(cache_key)
+        if device_id is not None:
+            return device_id
+        info = api.get_device_info() or {}
+        info = info.get('DeviceInfo', info)
+        serial = info.get('serialNumber')
+        if not serial:
+            logger.warning("%s serial raqami olinmadi, dedup kaliti HOST bo'yicha", config.HOST)
+            return self.canonical(config.HOST)
+        self.register_device(serial, config.HOST, info.get('macAddress'), info.get('ipAddress'))
+        self._resolved[cache_key] = serial
+        return serial
+
+    def canonical(self, device: Any) -> str:
+        """Identifikator (HOST, IP, MAC yoki serial) ga mos serial raqam, noma'lum bo'lsa o'zi"""
+        if not device:
+            return ''
+        return self._aliases.get(_alias(device), str(device))
+
+    def event_key(self, event: Dict[str, Any], device: str = None) -> str:
+        """
+        Hodisa kaliti: kanonik qurilma identifikatori va serialNo
+
+        Args:
+            event: Hodisa
+            device: Qurilma identifikatori (berilmasa hodisa maydonlaridan olinadi)
+
+        Returns:
+            Kalit satr
+        """
+        if device is None:
+            candidates = [event.get(field) for field in ('deviceSerial', 'macAddress', 'ipAddress')]
+            candidates = [value for value in candidates if value]
+            # Ma'lum (resolve qilingan) nom birinchi o'rinda: push dagi MAC ham serialga aylanadi
+            device = next((value for value in candidates if _alias(value) in self._aliases),
+                          candidates[0] if candidates else '')
+        return f"{self.canonical(device)}|{event.get('serialNo', '')}"
+
+    def _shift(self, steps: int):
+        """Eng eski generatsiyalarni tozalab boshiga qo'yish"""
+        for _ in range(min(steps, len(self._blooms))):
+            oldest = self._blooms.pop()
+            oldest.clear()
+            self._blooms.insert(0, oldest)
+
+    def _rotate(self, now: float):
+        """Oyna o'tgan yoki sig'imi to'lgan generatsiyalarni almashtirish"""
+        elapsed = now - self._generation_started
+        if elapsed >= self.generation_seconds:
+            self._shift(int(elapsed // self.generation_seconds))
+            self._generation_started += (elapsed // self.generation_seconds) * self.generation_seconds
+        if self._blooms[0].count >= self.capacity:
+            # To'lgan filterning yolg'on-musbat ulushi keskin oshadi (yangi hodisalar takror
+            # deb tashlanadi), shuning uchun generatsiya muddatidan oldin almashtiriladi -
+            # oyna qisqaradi, lekin hodisalar yo'qolmaydi
+            logger.warning("Dedup generatsiyasi %.0f s da to'ldi (%d kalit), oyna qisqarmoqda: "
+                           "DEDUP_CAPACITY ni oshiring", now - self._generation_started, self.capacity)
+            self._shift(1)
+            self._generation_started = now
+            self.stats['saturated'] += 1
+
+    def seen(self, key: str) -> bool:
+        """
+        Kalit avval ko'rilganmi (ko'rilmagan bo'lsa qayd qilinadi)
+
+        Args:
+            key: Hodisa kaliti
+
+        Returns:
+            True agar takror bo'lsa
+        """
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        with self._lock:
+            self.stats['seen'] += 1
+            lru = self._lru
+            if digest in lru:
+                lru.move_to_end(digest)
+                self.stats['lru_hits'] += 1
+                self.stats['duplicates'] += 1
+                return True
+            self._rotate(time.time())
+            for bloom in self._blooms:
+                if digest in bloom:
+                    self.stats['bloom_hits'] += 1
+                    self.stats['duplicates'] += 1
+                    return True
+            lru[digest] = None
+            if len(lru) > self.lru_size:
+                lru.popitem(last=False)
+            self._blooms[0].add(digest)
+            return False
+
+    def filter(self, events: List[Dict[str, Any]], device: str = None) -> List[Dict[str, Any]]:
+        """
+        Takroriy hodisalarni olib tashlash
+
+        Args:
+            events: Hodisalar ro'yxati
+            device: Qurilma identifikatori (barcha hodisalar uchun bir xil bo'lsa)
+
+        Returns:
+            Yangi hodisalar
+        """
+        unique = [event for event in events if not self.seen(self.event_key(event, device))]
+        if metrics.enabled and events:
+            metrics.inc('hikvision_dedup_events_total', len(events))
+            metrics.inc('hikvision_dedup_duplicates_total', len(events) - len(unique))
+        return unique
+
+    def wrap(self, submit: Callable[[List[Dict[str, Any]]], Any]) -> Callable[[List[Dict[str, Any]]], Any]:
+        """
+        Pipeline kirishini deduplikatsiya bilan o'rash
+
+        Args:
+            submit: Hodisalar ro'yxatini qabul qiluvchi funksiya (masalan pipeline.submit)
+
+        Returns:
+            Faqat yangi hodisalarni uzatuvchi funksiya
+        """
+        def submit_unique(events, *args, **kwargs):
+            unique = self.filter(events)
+            if unique:
+                return submit(unique, *args, **kwargs)
+            return True
+        return submit_unique
+
+    def report(self) -> Dict[str, Any]:
+        """Takrorlar ulushi va xotira hajmi"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['lru_size'] = len(self._lru)
+        stats['duplicate_rate'] = stats['duplicates'] / stats['seen'] if stats['seen'] else 0.0
+        stats['memory_bytes'] = sum(len(bloom.bits) for bloom in self._blooms) + len(self._lru) * 16
+        return stats
+
+    def save(self, path: str = None):
+        """
+        Holatni faylga saqlash (atomar)
+
+        Args:
+            path: Fayl yo'li (standart - state_path)
+        """
+        path = path or self.state_path
+        with self._lock:
+            meta = {
+                'window_seconds': self.window_seconds,
+                'capacity': self.capacity,
+                'error_rate': self.error_rate,
+                'generation_started': self._generation_started,
+                'counts': [bloom.count for bloom in self._blooms],
+                'lru_count': len(self._lru),
+                'aliases': dict(self._aliases)
+            }
+            blobs = [bytes(bloom.bits) for bloom in self._blooms]
+            lru = b''.join(self._lru.keys())
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(meta).encode('utf-8') + b'\n')
+            f.write(lru)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """
+        Holatni fayldan yuklash
+
+        Parametrlar (oyna, sig'im, xato ulushi) mos kelmasa holat e'tiborsiz qoldiriladi.
+        """
+        with open(path, 'rb') as f:
+            if f.readline() != _MAGIC:
+                return
+            meta = json.loads(f.readline())
+            if (meta['capacity'] != self.capacity or meta['error_rate'] != self.error_rate
+                    or meta.get('window_seconds') != self.window_seconds
+                    or len(meta['counts']) != len(self._blooms)):
+                logger.warning("Dedup holati boshqa parametrlar bilan saqlangan, e'tiborsiz qoldirildi: %s", path)
+                return
+            lru = f.read(meta['lru_count'] * 16)
+            blooms = []
+            for count in meta['counts']:
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                bloom.bits = bytearray(f.read(len(bloom.bits)))
+                bloom.count = count
+                blooms.append(bloom)
+        with self._lock:
+            self._blooms = blooms
+            # Boshqa jarayon (masalan daemon) aniqlagan qurilma nomlari ham tiklanadi
+            self._aliases.update(meta.get('aliases', {}))
+            self._generation_started = meta['generation_started']
+            self._lru = OrderedDict((lru[i:i + 16], None) for i in range(0, len(lru), 16))
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+
+def build_deduplicator(config, output_dir: str = 'output') -> Optional[EventDeduplicator]:
+    """
+    Konfiguratsiyadan deduplikator yaratish
+
+    Returns:
+        EventDeduplicator yoki None (DEDUP_ENABLED=False bo'lsa)
+    """
+    if not config.DEDUP_ENABLED:
+        return None
+    return EventDeduplicator(lru_size=config.DEDUP_LRU_SIZE, window_seconds=config.DEDUP_WINDOW,
+                             capacity=config.DEDUP_CAPACITY,
+                             state_path=os.path.join(output_dir, 'dedup.state'))
@@ -0,0 +1,166 @@
+import ipaddress
+import json
+import logging
+import os
+import socket
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Any, Optional
+
+from .xml_utils import xml_to_dict
+
+logger = logging.getLogger(__name__)
+
+# deviceInfo maydonlari -> inventar maydonlari
+_INFO_FIELDS = {
+    'deviceName': 'device_name',
+    'model': 'model',
+    'serialNumber': 'serial_number',
+    'firmwareVersion': 'firmware_version',
+    'macAddress': 'mac_address',
+    'deviceType': 'device_type',
+}
+
+
+def iter_targets(network: str, ports: Iterable[int]) -> List[tuple]:
+    """
+    Tarmoq (CIDR, bitta IP yoki 'a-b' oralig'i) va portlardan (host, port) juftliklari
+
+    Args:
+        network: Masalan '192.168.0.0/22', '10.0.0.5' yoki '10.0.0.10-10.0.0.50'
+        ports: Tekshiriladigan portlar
+
+    Returns:
+        (host, port) ro'yxati
+    """
+    if '-' in network:
+        first, last = (ipaddress.ip_address(part.strip()) for part in network.split('-', 1))
+        hosts = [ipaddress.ip_address(value) for value in range(int(first), int(last) + 1)]
+    else:
+        parsed = ipaddress.ip_network(network, strict=False)
+        hosts = list(parsed.hosts()) or [parsed.network_address]
+    return [(str(host), port) for host in hosts for port in ports]
+
+
+def probe_port(host: str, port: int, timeout: float) -> bool:
+    """TCP ulanish ochiladimi"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_device(host: str, port: int, username: str, password: str, protocol: str = 'http',
+                 timeout: float = 1.0, endpoint: str = 'ISAPI/System/deviceInfo') -> Optional[Dict[str, Any]]:
+    """
+    Portni tekshirib, ochiq bo'lsa deviceInfo ni digest auth bilan so'rash
+
+    Args:
+        host: IP manzil
+        port: Port
+        username: Foydalanuvchi nomi
+        password: Parol
+        protocol: http yoki https
+        timeout: Ulanish va javob kutish vaqti (sekund)
+        endpoint: deviceInfo endpoint i
+
+    Returns:
+        Qurilma yozuvi yoki None (ISAPI qurilma emas)
+    """
+    if not probe_port(host, port, timeout):
+        return None
+
+    import requests
+    from requests.auth import HTTPDigestAuth
+
+    record = {'host': host, 'port': port, 'protocol': protocol}
+    start = time.perf_counter()
+    try:
+        response = requests.get(f"{protocol}://{host}:{port}/{endpoint}",
+                                auth=HTTPDigestAuth(username, password), timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.debug("%s:%s deviceInfo so'rovi xatosi: %s", host, port, e)
+        return None
+    record['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    if response.status_code == 401:
+        # ISAPI qurilma, lekin login/parol mos kelmadi
+        record['status'] = 'auth_failed'
+        return record
+    if response.status_code != 200:
+        return None
+    try:
+        info = xml_to_dict(ET.fromstring(response.content))
+    except ET.ParseError:
+        return None
+    info = info.get('DeviceInfo', info)
+    if not isinstance(info, dict) or 'model' not in info and 'serialNumber' not in info:
+        return None
+    record['status'] = 'ok'
+    for source, target in _INFO_FIELDS.items():
+        record[target] = info.get(source, '')
+    return record
+
+
+def discover(network: str, username: str, password: str, ports: Iterable[int] = (80,),
+             protocol: str = 'http', concurrency: int = 256, timeout: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Manzillar oralig'idagi ISAPI qurilmalarni parallel qidirish
+
+    Har bir manzil alohida ishchida tekshiriladi (TCP, keyin deviceInfo), shuning uchun
+    /22 tarmoq taxminan (1022 / concurrency) * timeout sekundda tugaydi.
+
+    Args:
+        network: CIDR, IP yoki oraliq
+        username: Foydalanuvchi nomi
+        password: Parol
+        ports: Tekshiriladigan portlar
+        protocol: http yoki https
+        concurrency: Bir vaqtdagi tekshiruvlar soni
+        timeout: Har bir ulanish uchun kutish vaqti (sekund)
+
+    Returns:
+        Topilgan qurilmalar (host va port bo'yicha tartiblangan)
+    """
+    targets = iter_targets(network, ports)
+    if not targets:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(targets))),
+                            thread_name_prefix='hik-discover') as executor:
+        results = executor.map(
+            lambda target: probe_device(target[0], target[1], username, password, protocol, timeout),
+            targets)
+        devices = [record for record in results if record]
+    devices.sort(key=lambda record: (ipaddress.ip_address(record['host']), record['port']))
+    return devices
+
+
+def write_inventory(devices: List[Dict[str, Any]], path: str) -> str:
+    """
+    Topilgan qurilmalarni inventar fayliga yozish (atomar, parolsiz)
+
+    `devices` ga faqat login qilingan qurilmalar yoziladi; login/parol mos kelmaganlari
+    alohida `auth_failed` ro'yxatida qoladi (inventar uni o'qimaydi, daemon ularni
+    so'ramaydi), hisob ma'lumotlari tuzatilgach `devices` ga ko'chiriladi.
+
+    Args:
+        devices: discover() natijasi
+        path: Fayl yo'li
+
+    Returns:
+        Fayl yo'li
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = {
+        'devices': [device for device in devices if device.get('status') != 'auth_failed'],
+        'auth_failed': [device for device in devices if device.get('status') == 'auth_failed'],
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
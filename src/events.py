@@ -0,0 +1,198 @@
+import json
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Any, Optional
+
+from .xml_utils import xml_to_dict
+
+# Push (EventNotificationAlert) maydonlarini AcsEvent nomlariga moslashtirish
+_PUSH_FIELD_MAP = {
+    'majorEventType': 'major',
+    'subEventType': 'minor',
+}
+
+# EventNotificationAlert ning yuqori darajadagi maydonlari, hodisaga ko'chiriladi
+_ALERT_FIELDS = ('ipAddress', 'macAddress', 'channelID', 'eventType', 'eventState')
+
+
+def _as_list(value) -> List[Any]:
+    """Bitta element yoki ro'yxatni ro'yxatga aylantirish"""
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _from_alert(alert: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    EventNotificationAlert (push) ni AcsEvent ko'rinishidagi hodisaga aylantirish
+
+    Args:
+        alert: EventNotificationAlert ma'lumotlari (ildiz tegisiz)
+
+    Returns:
+        Hodisa yoki None (access control hodisasi bo'lmasa, masalan heartBeat)
+    """
+    acs = alert.get('AccessControllerEvent')
+    if not isinstance(acs, dict):
+        return None
+    event = {_PUSH_FIELD_MAP.get(key, key): value for key, value in acs.items()}
+    if 'dateTime' in alert and 'time' not in event:
+        event['time'] = alert['dateTime']
+    for field in _ALERT_FIELDS:
+        if field in alert and field not in event:
+            event[field] = alert[field]
+    return event
+
+
+def extract_events(data: Any) -> List[Dict[str, Any]]:
+    """
+    Parsing qilingan javob yoki push dan hodisalar ro'yxatini ajratib olish
+
+    get_access_control_events va push qabul qiluvchi bir xil normallashtirishdan
+    foydalanadi. Quyidagi ko'rinishlar qo'llab-quvvatlanadi:
+
+    - {"AcsEventList": {"AcsEvent": ...}}
+    - {"AcsEvent": ...} (XML ildiz tegi olib tashlangan)
+    - {"AcsEvent": {"InfoList": [...]}} (ISAPI JSON qidiruv javobi)
+    - EventNotificationAlert (HTTP push, XML yoki JSON)
+
+    Args:
+        data: xml_to_dict yoki json.loads natijasi
+
+    Returns:
+        Hodisalar ro'yxati
+    """
+    if not isinstance(data, dict):
+        return []
+
+    if 'AcsEventList' in data:
+        data = data['AcsEventList']
+        if not isinstance(data, dict):
+            return []
+
+    if 'AcsEvent' in data:
+        acs = data['AcsEvent']
+        if isinstance(acs, dict) and 'InfoList' in acs:
+            return _as_list(acs['InfoList'])
+        return _as_list(acs)
+
+    if 'InfoList' in data:
+        info = data['InfoList']
+        if isinstance(info, dict) and 'info' in info:
+            info = info['info']
+        return _as_list(info)
+
+    if 'EventNotificationAlert' in data and isinstance(data['EventNotificationAlert'], dict):
+        data = data['EventNotificationAlert']
+
+    event = _from_alert(data)
+    return [event] if event is not None else []
+
+
+def is_truncated(data: Any, received: int) -> bool:
+    """
+    Qidiruv javobi qurilma tomonidan kesilganmi
+
+    Qurilma bitta javobda o'z chegarasidan ko'p hodisa qaytarmaydi va buni
+    responseStatusStrg = MORE yoki totalMatches > qaytarilganlar soni bilan bildiradi.
+
+    Args:
+        data: xml_to_dict yoki json.loads natijasi
+        received: Javobdan olingan hodisalar soni
+
+    Returns:
+        True agar oraliqda yana hodisalar qolgan bo'lsa
+    """
+    if not isinstance(data, dict):
+        return False
+    for scope in (data, data.get('AcsEventList'), data.get('AcsEvent')):
+        if not isinstance(scope, dict):
+            continue
+        if str(scope.get('responseStatusStrg', '')).upper() == 'MORE':
+            return True
+        total = str(scope.get('totalMatches', ''))
+        if total.isdigit() and int(total) > received:
+            return True
+    return False
+
+
+def parse_payload(body: bytes, content_type: str = '') -> List[Dict[str, Any]]:
+    """
+    XML yoki JSON tanadan hodisalarni ajratib olish
+
+    Args:
+        body: So'rov/javob tanasi
+        content_type: Content-Type sarlavhasi
+
+    Returns:
+        Hodisalar ro'yxati
+    """
+    body = body.strip()
+    if not body:
+        return []
+    if 'json' in content_type or body[:1] in (b'{', b'['):
+        data = json.loads(body)
+        if isinstance(data, list):
+            return [event for item in data for event in extract_events(item)]
+        return extract_events(data)
+    return extract_events(xml_to_dict(ET.fromstring(body)))
+
+
+def parse_multipart(body: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """
+    multipart/form-data push ni parsing qilish
+
+    Qurilmalar hodisani (XML/JSON) va rasmni (JPEG) alohida qismlarda yuboradi. Rasm
+    qismlari o'tkazib yuboriladi.
+
+    Args:
+        body: So'rov tanasi
+        content_type: Content-Type sarlavhasi (boundary bilan)
+
+    Returns:
+        Hodisalar ro'yxati
+    """
+    boundary = None
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary':
+            boundary = value.strip('"')
+    if not boundary:
+        return parse_payload(body, '')
+
+    events = []
+    delimiter = b'--' + boundary.encode('latin-1')
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b'--'):
+            break
+        head, sep, payload = part.partition(b'\r\n\r\n')
+        if not sep:
+            continue
+        part_type = ''
+        for line in head.split(b'\r\n'):
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-type':
+                part_type = value.strip().decode('latin-1').lower()
+        if part_type.startswith('image/') or part_type == 'application/octet-stream':
+            continue
+        if payload.endswith(b'\r\n'):
+            payload = payload[:-2]
+        events.extend(parse_payload(payload, part_type))
+    return events
+
+
+def parse_push(body: bytes, content_type: str = '') -> List[Dict[str, Any]]:
+    """
+    Qurilma HTTP push tanasini Content-Type bo'yicha parsing qilish
+
+    Args:
+        body: So'rov tanasi
+        content_type: Content-Type sarlavhasi
+
+    Returns:
+        Hodisalar ro'yxati
+    """
+    if content_type.lower().startswith('multipart/'):
+        return parse_multipart(body, content_type)
+    return parse_payload(body, content_type.lower())
@@ -0,0 +1,209 @@
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
+
+from .config_snapshots import writable_section
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_config_push_total', 'counter', 'Sozlamalarni yozish natijalari (qurilmalar bo\'yicha)')
+
+# Qurilma natijalari
+OK = 'ok'
+UNCHANGED = 'unchanged'
+ROLLED_BACK = 'rolled_back'
+ROLLBACK_FAILED = 'rollback_failed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+def parse_assignments(assignments: List[str]) -> Dict[str, Any]:
+    """
+    ['NTPServer.hostName=pool.ntp.org', 'timeMode=NTP'] -> ichma-ich patch dict
+
+    Raises:
+        ValueError: '=' siz yozuv
+    """
+    patch: Dict[str, Any] = {}
+    for assignment in assignments:
+        if '=' not in assignment:
+            raise ValueError(f"Noto'g'ri qiymat (kalit=qiymat kerak): {assignment}")
+        path, value = assignment.split('=', 1)
+        keys = path.strip().split('.')
+        node = patch
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = value.strip()
+    return patch
+
+
+def merge_patch(data: Any, patch: Dict[str, Any]) -> Any:
+    """Patch ni bo'lim nusxasiga qo'llash (dict lar ichma-ich, qolganlari almashtiriladi)"""
+    result = copy.deepcopy(data) if isinstance(data, dict) else {}
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = merge_patch(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def patch_applied(data: Any, patch: Dict[str, Any]) -> bool:
+    """Patch dagi barcha qiymatlar bo'limda borligini tekshirish"""
+    if not isinstance(data, dict):
+        return False
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            if not patch_applied(data.get(key), value):
+                return False
+        elif data.get(key) != value:
+            return False
+    return True
+
+
+def patch_restored(data: Any, original: Any, patch: Dict[str, Any]) -> bool:
+    """Patch tegadigan maydonlar asl qiymatiga qaytganini tekshirish"""
+    data = data if isinstance(data, dict) else {}
+    original = original if isinstance(original, dict) else {}
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(original.get(key), dict):
+            if not patch_restored(data.get(key), original[key], value):
+                return False
+        elif data.get(key) != original.get(key):
+            return False
+    return True
+
+
+class FleetPush:
+    """
+    Bitta ISAPI bo'limini ko'p qurilmaga to'lqinlar bilan yozish
+
+    Avval canary to'lqini (bir nechta qurilma), keyin qolganlari wave_size lik to'lqinlarda
+    parallel yoziladi; to'lqin vaqti eng sekin qurilmasi vaqtiga teng. Har bir qurilmada:
+    bo'lim o'qiladi (zaxira), patch qo'llanadi, farq bo'lmasa yozilmaydi, yozilgandan keyin
+    qayta o'qib tekshiriladi. Yozish yoki tekshirish muvaffaqiyatsiz bo'lsa zaxira qaytarib
+    yoziladi (rollback), agar qurilmadagi qiymat o'zgargan bo'lsa. Tugagan to'lqinlarda xatolar ulushi max_failure_rate dan oshsa
+    qolgan qurilmalarga tegilmaydi.
+    """
+
+    def __init__(self, endpoint: str, patch: Dict[str, Any], canary: int = 1, wave_size: int = 0,
+                 concurrency: int = 32, max_failure_rate: float = 0.1,
+                 on_result: Callable[[Dict[str, Any]], Any] = None):
+        """
+        Args:
+            endpoint: Bo'lim endpoint i (masalan config.API_TIME_CONFIG)
+            patch: Yoziladigan maydonlar (ichma-ich dict)
+            canary: Canary to'lqinidagi qurilmalar soni
+            wave_size: Keyingi to'lqinlar hajmi (0 - qolganlarning hammasi bitta to'lqinda)
+            concurrency: Bir vaqtda ishlanadigan qurilmalar
+            max_failure_rate: To'xtatish chegarasi (0..1)
+            on_result: Har bir qurilma natijasi bilan chaqiriladi (progress uchun)
+        """
+        self.endpoint = endpoint
+        self.patch = patch
+        self.canary = max(0, canary)
+        self.wave_size = wave_size
+        self.concurrency = max(1, concurrency)
+        self.max_failure_rate = max_failure_rate
+        self.on_result = on_result
+
+    def waves(self, apis: List[Any]) -> List[List[Any]]:
+        """Qurilmalarni to'lqinlarga bo'lish"""
+        waves = []
+        if self.canary:
+            waves.append(apis[:self.canary])
+        rest = apis[self.canary:]
+        size = self.wave_size if self.wave_size > 0 else len(rest)
+        for i in range(0, len(rest), max(1, size)):
+            waves.append(rest[i:i + size])
+        return [wave for wave in waves if wave]
+
+    def run(self, apis: List[Any]) -> Dict[str, Any]:
+        """
+        Barcha qurilmalarga yozish
+
+        Args:
+            apis: HikVisionAPI obyektlari (yoki get/put_config_section li obyektlar)
+
+        Returns:
+            {'results': [...], 'summary': holat -> soni, 'aborted': bool, 'duration': sekund}
+        """
+        start = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+        aborted = False
+        waves = self.waves(list(apis))
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='fleet-push') as executor:
+            for number, wave in enumerate(waves):
+                if aborted:
+                    results.extend(self._result(api, SKIPPED) for api in wave)
+                    continue
+                wave_start = time.perf_counter()
+                wave_results = list(executor.map(self.push_device, wave))
+                results.extend(wave_results)
+                failed = sum(1 for result in results if result['status'] not in (OK, UNCHANGED))
+                logger.info("To'lqin %d/%d: %d qurilma, %.2f s, jami xato %d", number + 1, len(waves),
+                            len(wave), time.perf_counter() - wave_start, failed)
+                if failed > self.max_failure_rate * len(results):
+                    logger.error("Xatolar ulushi chegaradan oshdi, qolgan qurilmalar o'tkazib yuboriladi")
+                    aborted = True
+
+        summary: Dict[str, int] = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        return {'results': results, 'summary': summary, 'aborted': aborted,
+                'duration': time.perf_counter() - start}
+
+    def push_device(self, api) -> Dict[str, Any]:
+        """
+        Bitta qurilmaga yozish, tekshirish va kerak bo'lsa rollback
+
+        Returns:
+            {'device', 'status', 'error', 'duration'}
+        """
+        start = time.perf_counter()
+        backup: Optional[Dict[str, Any]] = None
+        try:
+            backup = api.get_config_section(self.endpoint)
+            if patch_applied(backup['data'], self.patch):
+                return self._result(api, UNCHANGED, duration=time.perf_counter() - start)
+            # O'zgaruvchan maydonlar (localTime) yozilmaydi, patch da berilgan bo'lsa qoladi
+            base = writable_section(backup)
+            api.put_config_section(self.endpoint, dict(base, data=merge_patch(base['data'], self.patch)))
+            if not patch_applied(api.get_config_section(self.endpoint)['data'], self.patch):
+                raise RuntimeError("Qayta o'qilgan qiymatlar yozilganiga mos emas")
+            return self._result(api, OK, duration=time.perf_counter() - start)
+        except Exception as e:
+            if backup is None:
+                return self._result(api, FAILED, str(e), time.perf_counter() - start)
+            status = self._rollback(api, backup, e)
+            return self._result(api, status, str(e), time.perf_counter() - start)
+
+    def _rollback(self, api, backup: Dict[str, Any], error: Exception) -> str:
+        """Zaxirani tiklash (qurilma o'zgarmagan bo'lsa - faqat FAILED)"""
+        try:
+            if patch_restored(api.get_config_section(self.endpoint)['data'], backup['data'], self.patch):
+                logger.warning("%s: yozish muvaffaqiyatsiz, qurilma o'zgarmagan: %s", self._device(api), error)
+                return FAILED
+            logger.warning("%s: yozish muvaffaqiyatsiz (%s), rollback", self._device(api), error)
+            # Zaxiradagi eski localTime qaytarilmaydi - manual rejimdagi soat orqaga ketmasin
+            api.put_config_section(self.endpoint, writable_section(backup))
+            if patch_restored(api.get_config_section(self.endpoint)['data'], backup['data'], self.patch):
+                return ROLLED_BACK
+        except Exception as rollback_error:
+            logger.error("%s: rollback muvaffaqiyatsiz: %s", self._device(api), rollback_error)
+        return ROLLBACK_FAILED
+
+    @staticmethod
+    def _device(api) -> str:
+        return getattr(api.config, 'name', None) or api.config.HOST
+
+    def _result(self, api, status: str, error: str = None, duration: float = 0.0) -> Dict[str, Any]:
+        result = {'device': self._device(api), 'status': status, 'error': error, 'duration': duration}
+        if metrics.enabled:
+            metrics.inc('hikvision_config_push_total', status=status)
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
@@ -2,10 +2,22 @@ import requests
 import xml.etree.ElementTree as ET
 import json
 import logging
+import time
+import uuid
+import weakref
 from datetime import datetime
+from urllib.parse import urlsplit
 from requests.auth import HTTPDigestAuth
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple
 from .config import HikVisionConfig
+from .metrics import metrics, endpoint_label
+from .parse_pool import parse_pool
+from .pool import pool, device_key
+from .tracing import configure_logging, new_span_id, tracer, sampled
+from .scheduler import scheduler, default_priority
+from .status import status as fleet_status
+from .xml_utils import dict_to_xml, iter_records, local_name, xml_to_dict
+from .events import extract_events, is_truncated
 
 class HikVisionAPI:
     """HikVision API bilan ishlash uchun asosiy sinf - Access Control uchun moslashtirilgan"""
@@ -18,42 +30,201 @@ class HikVisionAPI:
             config: HikVisionConfig obyekti
         """
         self.config = config or HikVisionConfig()
-        self.session = requests.Session()
-        self.session.auth = HTTPDigestAuth(self.config.USERNAME, self.config.PASSWORD)
+        # Qurilma sessiyasi jarayon bo'yicha umumiy pool dan olinadi (keep-alive ulanishlar
+        # bir qurilmaga ulangan barcha API obyektlari orasida bo'lishiladi)
+        pool.idle_timeout = getattr(self.config, 'POOL_IDLE_TIMEOUT', pool.idle_timeout)
+        self.session_key = device_key(self.config)
+        # Holat registridagi nom (inventardagi nom, bo'lmasa HOST)
+        self.device_name = getattr(self.config, 'name', None) or self.config.HOST
+        self.session = pool.session(
+            self.session_key,
+            getattr(self.config, 'POOL_MAXSIZE', 4),
+            getattr(self.config, 'POOL_KEEPALIVE_TIMEOUT', 90.0),
+            getattr(self.config, 'POOL_RETRIES', 1)
+        )
+        # Sessiya obyekt yopilganda yoki yo'q qilinganda bo'shatiladi
+        self._release = weakref.finalize(self, pool.release, self.session_key, self.session)
+        if self.session.auth is None:
+            # Kalitda parol bor: bir sessiyadagi obyektlar bir xil digest auth holatini bo'lishadi
+            self.session.auth = HTTPDigestAuth(self.config.USERNAME, self.config.PASSWORD)
         self.session.timeout = self.config.TIMEOUT
+        parse_pool.configure(getattr(self.config, 'PARSE_PROCESSES', parse_pool.processes),
+                             getattr(self.config, 'PARSE_PROCESS_THRESHOLD', parse_pool.threshold))
         
-        # Logging sozlash
-        logging.basicConfig(
-            level=logging.DEBUG if self.config.DEBUG else logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        # Logging sozlash (jarayon uchun bir marta)
+        configure_logging(self.config.DEBUG)
         self.logger = logging.getLogger(__name__)
+        self._log_sample_rate = getattr(self.config, 'LOG_SAMPLE_RATE', 1.0)
+        
+        if getattr(self.config, 'METRICS_ENABLED', False):
+            metrics.enable()
+        if getattr(self.config, 'TRACE_ENABLED', False):
+            tracer.configure(True, self.config.TRACE_SAMPLE_RATE, self.config.TRACE_FILE)
+        
+        # Qurilma bo'yicha umumiy so'rovlar navbati (concurrency, rate limit, ustuvorlik)
+        self.scheduler = None
+        if getattr(self.config, 'SCHEDULER_ENABLED', True):
+            self.scheduler = scheduler.for_device(
+                f"{self.config.HOST}:{self.config.PORT}",
+                getattr(self.config, 'DEVICE_MAX_CONCURRENCY', 2),
+                getattr(self.config, 'DEVICE_RATE_LIMIT', 0.0)
+            )
+        
+    def close(self, drop: bool = False):
+        """
+        Qurilma sessiyasini bo'shatish (obyekt endi ishlatilmaydi)
         
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        Args:
+            drop: Sessiyani boshqa obyektlar ushlamasa darhol yopish (qurilma olib tashlanganda)
+        """
+        if self._release.detach() is not None:
+            pool.release(self.session_key, self.session, close=drop)
+        
+    def _make_request(self, method: str, endpoint: str, priority: int = None, **kwargs) -> requests.Response:
         """
         API ga so'rov yuborish
         
+        So'rov qurilma navbatidan o'tadi: eshik boshqaruvi hodisalardan, hodisalar esa
+        ommaviy karta/foydalanuvchi o'qishlaridan oldin bajariladi.
+        
+        stream=True bo'lsa navbatdagi joy javob tanasi o'qib bo'linguncha band turadi va
+        response.close() da bo'shatiladi.
+        
         Args:
             method: HTTP metodi (GET, POST, PUT, DELETE)
             endpoint: API endpoint
+            priority: Ustuvorlik sinfi (standart - endpoint bo'yicha, src.scheduler ga qarang)
             **kwargs: Qo'shimcha parametrlar
             
+        Returns:
+            requests.Response obyekti
+        """
+        if self.scheduler is None:
+            return self._send(method, endpoint, **kwargs)
+        if priority is None:
+            priority = default_priority(method, endpoint, self.config)
+        if not kwargs.get('stream'):
+            with self.scheduler.slot(priority, timeout=self.config.TIMEOUT):
+                return self._send(method, endpoint, **kwargs)
+        
+        self.scheduler.acquire(priority, timeout=self.config.TIMEOUT)
+        try:
+            response = self._send(method, endpoint, **kwargs)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        _release_on_close(response, self.scheduler.release)
+        return response
+    
+    def _send(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        So'rovni navbatsiz yuborish (metrikalar, trace va log bilan)
+        
+        Args:
+            method: HTTP metodi
+            endpoint: API endpoint
+            **kwargs: requests parametrlari
+            
         Returns:
             requests.Response obyekti
         """
         url = self.config.get_api_url(endpoint)
+        log_request = self.logger.isEnabledFor(logging.DEBUG) and sampled(self._log_sample_rate)
+        trace_id = tracer.start_trace() if tracer.enabled else None
+        wall_start = time.time() if trace_id else 0.0
+        start = time.perf_counter()
+        response = None
+        error = None
+        phases = {}
+        
+        if trace_id:
+            def mark_headers(r, **hook_kwargs):
+                # Request hook lari auth hook idan keyin ishlaydi: digest takrorlangan bo'lsa
+                # ham bu yakuniy javob sarlavhalari kelgan vaqt
+                phases['headers'] = time.perf_counter() - start
+            
+            hooks = dict(kwargs.get('hooks') or {})
+            previous = hooks.get('response') or []
+            hooks['response'] = [previous] if callable(previous) else list(previous)
+            hooks['response'].append(mark_headers)
+            kwargs['hooks'] = hooks
         
         try:
-            self.logger.debug(f"So'rov yuborilmoqda: {method} {url}")
+            if log_request:
+                self.logger.debug("So'rov yuborilmoqda: %s %s", method, url)
+            kwargs.setdefault('timeout', self.config.TIMEOUT)
             response = self.session.request(method, url, **kwargs)
             response.raise_for_status()
             
-            self.logger.debug(f"Javob olindi: {response.status_code}")
+            if log_request:
+                self.logger.debug("Javob olindi: %s", response.status_code)
             return response
             
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"So'rov yuborishda xatolik: {e}")
+            self.logger.error("So'rov yuborishda xatolik: %s", e)
+            error = str(e)
             raise
+        finally:
+            duration = time.perf_counter() - start
+            fleet_status.record_request(self.device_name,
+                                        response.status_code if response is not None else None, error)
+            if metrics.enabled:
+                self._record_request_metrics(method, endpoint, kwargs, response, duration)
+            if trace_id:
+                status = response.status_code if response is not None else 'error'
+                attrs = {'device': self.config.HOST, 'method': method,
+                         'endpoint': endpoint_label(endpoint), 'status': status}
+                span_id = new_span_id()
+                if response is not None and error is None and kwargs.get('stream'):
+                    # Tana keyin o'qiladi: span lar javob yopilganda (transfer bilan) yoziladi
+                    _release_on_close(response, lambda: tracer.record_request(
+                        trace_id, wall_start, time.perf_counter() - start, response,
+                        phases.get('headers'), span_id, **attrs))
+                else:
+                    tracer.record_request(trace_id, wall_start, duration, response,
+                                          phases.get('headers'), span_id, **attrs)
+                if response is not None:
+                    # parse span shu trace ga bog'lanadi
+                    response.hik_trace = (trace_id, span_id)
+    
+    def _record_request_metrics(self, method: str, endpoint: str, kwargs: Dict[str, Any],
+                                response: Optional[requests.Response], duration: float):
+        """
+        So'rov metrikalarini yozish (latency, status, baytlar, retry va auth challenge lar)
+        
+        Args:
+            method: HTTP metodi
+            endpoint: API endpoint
+            kwargs: So'rov parametrlari
+            response: Javob obyekti (ulanish xatosida None)
+            duration: So'rov davomiyligi (sekund)
+        """
+        labels = {'device': self.config.HOST, 'endpoint': endpoint_label(endpoint)}
+        status = str(response.status_code) if response is not None else 'error'
+        
+        metrics.observe('hikvision_request_duration_seconds', duration, method=method, **labels)
+        metrics.inc('hikvision_requests_total', method=method, status=status, **labels)
+        
+        body = kwargs.get('data')
+        if body:
+            # str tana simlarda UTF-8 bo'lib ketadi: belgilar emas, baytlar sanaladi
+            size = len(body.encode('utf-8')) if isinstance(body, str) else len(body)
+            metrics.inc('hikvision_request_bytes_sent_total', size, **labels)
+        
+        if response is None:
+            return
+        
+        if not kwargs.get('stream'):
+            metrics.inc('hikvision_response_bytes_received_total', len(response.content), **labels)
+        
+        # Digest auth: birinchi 401 javobi history da qoladi
+        challenges = sum(1 for r in response.history if r.status_code == 401)
+        if challenges:
+            metrics.inc('hikvision_auth_challenges_total', challenges, **labels)
+        
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        if retries is not None and retries.history:
+            metrics.inc('hikvision_request_retries_total', len(retries.history), **labels)
     
     def _parse_xml_response(self, response: requests.Response) -> Dict[str, Any]:
         """
@@ -65,12 +236,70 @@ class HikVisionAPI:
         Returns:
             Dictionary
         """
+        trace = getattr(response, 'hik_trace', None)
+        wall_start = time.time() if trace else 0.0
+        start = time.perf_counter()
         try:
+            # Katta javoblar (pool yoqilgan bo'lsa) worker jarayonda parse qilinadi
+            if parse_pool.should_offload(len(response.content)):
+                return parse_pool.parse_document(response.content)
             root = ET.fromstring(response.content)
             return self._xml_to_dict(root)
         except ET.ParseError as e:
-            self.logger.error(f"XML parsing xatolik: {e}")
+            self.logger.error("XML parsing xatolik: %s", e)
             return {}
+        finally:
+            if metrics.enabled or trace:
+                duration = time.perf_counter() - start
+                endpoint = endpoint_label(urlsplit(getattr(response, 'url', None) or '').path)
+                metrics.observe('hikvision_parse_duration_seconds', duration,
+                                device=self.config.HOST, endpoint=endpoint)
+                if trace:
+                    tracer.record(trace[0], 'parse', wall_start, duration, trace[1],
+                                  endpoint=endpoint, bytes=len(response.content))
+    
+    def iter_xml_records(self, method: str, endpoint: str, tags: Sequence[str],
+                         chunk_size: int = 65536, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Katta ro'yxat javobini to'liq yuklamasdan yozuvlarga ajratish
+        
+        Javob tanasi soketdan bo'laklab o'qilib inkremental parser ga beriladi, yozuvlar
+        bittadan qaytariladi - 100 MB lik foydalanuvchilar ro'yxati ham bir necha MB xotirada
+        qayta ishlanadi. Generator yopilganda (yoki tugaganda) ulanish va navbat joyi bo'shatiladi.
+        Parse pool yoqilgan bo'lsa bitta yozuv turidagi katta javoblar worker jarayonlarda
+        bo'laklab parse qilinadi.
+        
+        Args:
+            method: HTTP metodi
+            endpoint: API endpoint
+            tags: Yozuv elementlari nomlari (masalan ('UserInfo',))
+            chunk_size: O'qish bo'lagi hajmi (bayt)
+            **kwargs: requests parametrlari
+            
+        Returns:
+            Yozuvlar iteratori
+        """
+        response = self._make_request(method, endpoint, stream=True, **kwargs)
+        received = 0
+        start = time.perf_counter()
+        
+        def chunks():
+            nonlocal received
+            for chunk in response.iter_content(chunk_size):
+                received += len(chunk)
+                yield chunk
+        
+        try:
+            if len(tags) == 1 and parse_pool.enabled and parse_pool.should_offload(_content_length(response)):
+                yield from parse_pool.iter_records(chunks(), tags[0])
+            else:
+                yield from iter_records(chunks(), tags)
+        finally:
+            response.close()
+            if metrics.enabled:
+                labels = {'device': self.config.HOST, 'endpoint': endpoint_label(endpoint)}
+                metrics.inc('hikvision_response_bytes_received_total', received, **labels)
+                metrics.observe('hikvision_parse_duration_seconds', time.perf_counter() - start, **labels)
     
     def _xml_to_dict(self, element: ET.Element) -> Dict[str, Any]:
         """
@@ -82,29 +311,7 @@ class HikVisionAPI:
         Returns:
             Dictionary
         """
-        result = {}
-        
-        # Atributlarni qo'shish
-        if element.attrib:
-            result.update(element.attrib)
-        
-        # Matnni qo'shish
-        if element.text and element.text.strip():
-            if len(element) == 0:
-                return element.text.strip()
-            result['text'] = element.text.strip()
-        
-        # Bolalarni qo'shish
-        for child in element:
-            child_data = self._xml_to_dict(child)
-            if child.tag in result:
-                if not isinstance(result[child.tag], list):
-                    result[child.tag] = [result[child.tag]]
-                result[child.tag].append(child_data)
-            else:
-                result[child.tag] = child_data
-        
-        return result
+        return xml_to_dict(element)
     
     def get_device_info(self) -> Dict[str, Any]:
         """
@@ -117,7 +324,7 @@ class HikVisionAPI:
             response = self._make_request('GET', self.config.API_DEVICE_INFO)
             return self._parse_xml_response(response)
         except Exception as e:
-            self.logger.error(f"Qurilma ma'lumotlarini olishda xatolik: {e}")
+            self.logger.error("Qurilma ma'lumotlarini olishda xatolik: %s", e)
             return {}
     
     def get_access_control_events(self, start_time: str = None, end_time: str = None) -> List[Dict[str, Any]]:
@@ -132,27 +339,92 @@ class HikVisionAPI:
             Hodisalar ro'yxati
         """
         try:
-            params = {}
-            if start_time:
-                params['startTime'] = start_time
-            if end_time:
-                params['endTime'] = end_time
+            return self.fetch_access_control_events(start_time, end_time)
+        except Exception as e:
+            self.logger.error("Access Control hodisalarini olishda xatolik: %s", e)
+            return []
+    
+    def fetch_access_control_events(self, start_time: str = None, end_time: str = None,
+                                    priority: int = None) -> List[Dict[str, Any]]:
+        """
+        Access Control hodisalarini olish (xatolik yuqoriga uzatiladi)
+        
+        get_access_control_events dan farqi - xatolikda bo'sh ro'yxat qaytarmaydi, shuning uchun
+        sinxronizatsiya kursorlari muvaffaqiyatsiz so'rovdan keyin oldinga surilmaydi. Javob
+        kesilganini bilish kerak bo'lsa search_access_control_events ishlating.
+        
+        Args:
+            start_time: Boshlanish vaqti (ISO format)
+            end_time: Tugash vaqti (ISO format)
+            priority: Navbat ustuvorligi (masalan backfill uchun PRIORITY_BULK)
             
-            response = self._make_request('GET', self.config.API_ACCESS_CONTROL, params=params)
-            data = self._parse_xml_response(response)
+        Returns:
+            Hodisalar ro'yxati
+        """
+        return self.search_access_control_events(start_time, end_time, priority=priority)[0]
+    
+    def search_access_control_events(self, start_time: str = None, end_time: str = None,
+                                     max_results: int = None,
+                                     priority: int = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Access Control hodisalarini olish va javob kesilganini aniqlash (xatolik yuqoriga uzatiladi)
+        
+        Args:
+            start_time: Boshlanish vaqti (ISO format)
+            end_time: Tugash vaqti (ISO format)
+            max_results: Bitta javobdagi maksimal hodisalar (maxResults, berilmasa qurilma chegarasi)
+            priority: Navbat ustuvorligi
             
-            events = []
-            if 'AcsEventList' in data and 'AcsEvent' in data['AcsEventList']:
-                event_data = data['AcsEventList']['AcsEvent']
-                if isinstance(event_data, list):
-                    events = event_data
-                else:
-                    events = [event_data]
+        Returns:
+            (hodisalar, kesilgan) - kesilgan bo'lsa oraliqda yana hodisalar bor
+        """
+        params = {}
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+        if max_results:
+            params['maxResults'] = max_results
+        
+        response = self._make_request('GET', self.config.API_ACCESS_CONTROL, priority=priority, params=params)
+        data = self._parse_xml_response(response)
+        events = extract_events(data)
+        return events, is_truncated(data, len(events))
+    
+    def iter_access_control_events(self, start_time: str = None,
+                                   end_time: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Access Control hodisalarini oqim bilan bittadan olish (xatolik yuqoriga uzatiladi)
+        
+        Args:
+            start_time: Boshlanish vaqti (ISO format)
+            end_time: Tugash vaqti (ISO format)
             
-            return events
-        except Exception as e:
-            self.logger.error(f"Access Control hodisalarini olishda xatolik: {e}")
-            return []
+        Returns:
+            Hodisalar iteratori
+        """
+        params = {}
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+        return self.iter_xml_records('GET', self.config.API_ACCESS_CONTROL, ('AcsEvent', 'InfoList'),
+                                     params=params)
+    
+    def iter_card_info(self, card_no: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Kartalarni oqim bilan bittadan olish (xatolik yuqoriga uzatiladi)
+        
+        Args:
+            card_no: Karta raqami (agar berilmasa, barcha kartalar)
+            
+        Returns:
+            Karta ma'lumotlari iteratori
+        """
+        endpoint = self.config.API_CARD_INFO
+        if card_no:
+            endpoint = f"{endpoint}/{card_no}"
+        return self.iter_xml_records('GET', endpoint, ('CardInfo',))
     
     def get_card_info(self, card_no: str = None) -> List[Dict[str, Any]]:
         """
@@ -165,26 +437,26 @@ class HikVisionAPI:
             Karta ma'lumotlari ro'yxati
         """
         try:
-            endpoint = self.config.API_CARD_INFO
-            if card_no:
-                endpoint = f"{endpoint}/{card_no}"
-            
-            response = self._make_request('GET', endpoint)
-            data = self._parse_xml_response(response)
-            
-            cards = []
-            if 'CardInfoList' in data and 'CardInfo' in data['CardInfoList']:
-                card_data = data['CardInfoList']['CardInfo']
-                if isinstance(card_data, list):
-                    cards = card_data
-                else:
-                    cards = [card_data]
-            
-            return cards
+            return list(self.iter_card_info(card_no))
         except Exception as e:
-            self.logger.error(f"Karta ma'lumotlarini olishda xatolik: {e}")
+            self.logger.error("Karta ma'lumotlarini olishda xatolik: %s", e)
             return []
     
+    def iter_user_info(self, user_id: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Foydalanuvchilarni oqim bilan bittadan olish (xatolik yuqoriga uzatiladi)
+        
+        Args:
+            user_id: Foydalanuvchi ID si (agar berilmasa, barcha foydalanuvchilar)
+            
+        Returns:
+            Foydalanuvchi ma'lumotlari iteratori
+        """
+        endpoint = self.config.API_USER_INFO
+        if user_id:
+            endpoint = f"{endpoint}/{user_id}"
+        return self.iter_xml_records('GET', endpoint, ('UserInfo',))
+    
     def get_user_info(self, user_id: str = None) -> List[Dict[str, Any]]:
         """
         Foydalanuvchi ma'lumotlarini olish
@@ -196,24 +468,9 @@ class HikVisionAPI:
             Foydalanuvchi ma'lumotlari ro'yxati
         """
         try:
-            endpoint = self.config.API_USER_INFO
-            if user_id:
-                endpoint = f"{endpoint}/{user_id}"
-            
-            response = self._make_request('GET', endpoint)
-            data = self._parse_xml_response(response)
-            
-            users = []
-            if 'UserInfoList' in data and 'UserInfo' in data['UserInfoList']:
-                user_data = data['UserInfoList']['UserInfo']
-                if isinstance(user_data, list):
-                    users = user_data
-                else:
-                    users = [user_data]
-            
-            return users
+            return list(self.iter_user_info(user_id))
         except Exception as e:
-            self.logger.error(f"Foydalanuvchi ma'lumotlarini olishda xatolik: {e}")
+            self.logger.error("Foydalanuvchi ma'lumotlarini olishda xatolik: %s", e)
             return []
     
     def get_door_status(self, door_id: int = 1) -> Dict[str, Any]:
@@ -231,7 +488,7 @@ class HikVisionAPI:
             response = self._make_request('GET', endpoint)
             return self._parse_xml_response(response)
         except Exception as e:
-            self.logger.error(f"Eshik holatini olishda xatolik: {e}")
+            self.logger.error("Eshik holatini olishda xatolik: %s", e)
             return {}
     
     def control_door(self, door_id: int = 1, command: str = "open") -> bool:
@@ -257,9 +514,60 @@ class HikVisionAPI:
             
             return response.status_code == 200
         except Exception as e:
-            self.logger.error(f"Eshikni boshqarishda xatolik: {e}")
+            self.logger.error("Eshikni boshqarishda xatolik: %s", e)
             return False
     
+    def get_ptz_info(self, channel: int = 1) -> Dict[str, Any]:
+        """
+        Kanal PTZ imkoniyatlarini olish (PTZ bo'lmasa bo'sh dict)
+        
+        Args:
+            channel: Kanal raqami
+            
+        Returns:
+            {'PTZData': {'pan', 'tilt', 'zoom', 'presetSupport', 'patrolSupport', 'capabilities'}}
+        """
+        try:
+            response = self._make_request('GET', f"{self.config.API_PTZ}/{channel}/capabilities")
+            caps = self._parse_xml_response(response)
+        except Exception as e:
+            self.logger.error("PTZ ma'lumotlarini olishda xatolik: %s", e)
+            return {}
+        if not isinstance(caps, dict) or not caps:
+            return {}
+        # XML dagi kabi 'true'/'false' satrlar (PTZ_SCHEMA shuni kutadi)
+        flag = lambda *keys: 'true' if any(key in caps for key in keys) else 'false'
+        pan_tilt = flag('ContinuousPanTiltSpace', 'AbsolutePanTiltPositionSpace')
+        return {'PTZData': {
+            'pan': pan_tilt,
+            'tilt': pan_tilt,
+            'zoom': flag('ContinuousZoomSpace', 'AbsoluteZoomPositionSpace'),
+            'presetSupport': flag('maxPresetNum', 'PresetCap'),
+            'patrolSupport': flag('maxPatrolNum', 'PatrolCap'),
+            'capabilities': caps,
+        }}
+    
+    def ptz_continuous(self, channel: int, pan: int = 0, tilt: int = 0, zoom: int = 0) -> requests.Response:
+        """
+        Uzluksiz PTZ harakati (tezliklar -100..100, hammasi 0 - to'xtash; xatolik yuqoriga uzatiladi)
+        
+        Kamera keyingi buyruqqacha shu tezlikda harakatlanadi. Joystik uchun PTZController
+        ishlating - u eskirgan buyruqlarni birlashtiradi va tezlikni cheklaydi.
+        
+        Args:
+            channel: Kanal raqami
+            pan: Gorizontal tezlik
+            tilt: Vertikal tezlik
+            zoom: Zoom tezligi
+            
+        Returns:
+            requests.Response obyekti
+        """
+        body = dict_to_xml('PTZData', {'pan': int(pan), 'tilt': int(tilt), 'zoom': int(zoom)})
+        headers = {'Content-Type': 'application/xml'}
+        return self._make_request('PUT', f"{self.config.API_PTZ}/{channel}/continuous",
+                                  data=body, headers=headers)
+    
     def get_capabilities(self) -> Dict[str, Any]:
         """
         Qurilma imkoniyatlarini olish
@@ -271,7 +579,7 @@ class HikVisionAPI:
             response = self._make_request('GET', self.config.API_CAPABILITIES)
             return self._parse_xml_response(response)
         except Exception as e:
-            self.logger.error(f"Imkoniyatlarni olishda xatolik: {e}")
+            self.logger.error("Imkoniyatlarni olishda xatolik: %s", e)
             return {}
     
     def get_time_config(self) -> Dict[str, Any]:
@@ -285,7 +593,7 @@ class HikVisionAPI:
             response = self._make_request('GET', self.config.API_TIME_CONFIG)
             return self._parse_xml_response(response)
         except Exception as e:
-            self.logger.error(f"Vaqt sozlamalarini olishda xatolik: {e}")
+            self.logger.error("Vaqt sozlamalarini olishda xatolik: %s", e)
             return {}
     
     def get_network_config(self) -> Dict[str, Any]:
@@ -299,9 +607,45 @@ class HikVisionAPI:
             response = self._make_request('GET', self.config.API_NETWORK_CONFIG)
             return self._parse_xml_response(response)
         except Exception as e:
-            self.logger.error(f"Tarmoq sozlamalarini olishda xatolik: {e}")
+            self.logger.error("Tarmoq sozlamalarini olishda xatolik: %s", e)
             return {}
     
+    def get_config_section(self, endpoint: str) -> Dict[str, Any]:
+        """
+        Sozlamalar bo'limini ildiz elementi bilan birga o'qish (xatolik yuqoriga uzatiladi)
+        
+        _parse_xml_response dan farqi - ildiz nomi va atributlari saqlanadi, shuning uchun
+        natijani put_config_section bilan qurilmaga qaytarib yozish mumkin.
+        
+        Args:
+            endpoint: Bo'lim endpoint i (masalan config.API_TIME_CONFIG)
+            
+        Returns:
+            {'root': ildiz nomi, 'attrib': ildiz atributlari, 'data': mazmun}
+        """
+        response = self._make_request('GET', endpoint)
+        root = ET.fromstring(response.content)
+        data = xml_to_dict(root)
+        if isinstance(data, dict):
+            for key in root.attrib:
+                data.pop(key, None)
+        return {'root': local_name(root.tag), 'attrib': dict(root.attrib), 'data': data}
+    
+    def put_config_section(self, endpoint: str, section: Dict[str, Any]) -> requests.Response:
+        """
+        Sozlamalar bo'limini qurilmaga yozish (xatolik yuqoriga uzatiladi)
+        
+        Args:
+            endpoint: Bo'lim endpoint i
+            section: get_config_section ko'rinishidagi bo'lim
+            
+        Returns:
+            requests.Response obyekti
+        """
+        body = dict_to_xml(section['root'], section['data'], section.get('attrib'))
+        headers = {'Content-Type': 'application/xml'}
+        return self._make_request('PUT', endpoint, data=body, headers=headers)
+    
     # Kameralar uchun eski metodlar (agar access control qurilmasida kamera bo'lsa)
     def get_channels(self) -> List[Dict[str, Any]]:
         """
@@ -314,21 +658,92 @@ class HikVisionAPI:
             response = self._make_request('GET', self.config.API_CHANNELS)
             data = self._parse_xml_response(response)
             
-            channels = []
-            if 'VideoInputChannelList' in data:
-                channel_list = data['VideoInputChannelList']
-                if 'VideoInputChannel' in channel_list:
-                    channel_data = channel_list['VideoInputChannel']
-                    if isinstance(channel_data, list):
-                        channels = channel_data
-                    else:
-                        channels = [channel_data]
-            
-            return channels
+            # Ildiz (VideoInputChannelList) xml_to_dict da olib tashlangan
+            channels = data.get('VideoInputChannel', []) if isinstance(data, dict) else []
+            return channels if isinstance(channels, list) else [channels]
         except Exception as e:
-            self.logger.error(f"Kanallarni olishda xatolik: {e}")
+            self.logger.error("Kanallarni olishda xatolik: %s", e)
             return []
     
+    def get_streaming_channels(self) -> List[Dict[str, Any]]:
+        """
+        Streaming kanallarini olish (agar mavjud bo'lsa)
+        
+        Returns:
+            Streaming kanallar ro'yxati
+        """
+        try:
+            response = self._make_request('GET', self.config.API_STREAMING)
+            data = self._parse_xml_response(response)
+            channels = data.get('StreamingChannel', []) if isinstance(data, dict) else []
+            return channels if isinstance(channels, list) else [channels]
+        except Exception as e:
+            self.logger.error("Streaming kanallarini olishda xatolik: %s", e)
+            return []
+    
+    def open_snapshot(self, channel: int, stream: int = 1) -> requests.Response:
+        """
+        Kanal kadrini (JPEG) oqim bilan ochish (xatolik yuqoriga uzatiladi)
+        
+        Javob tanasi o'qilmagan holda qaytadi: chaqiruvchi uni iter_content bilan diskka
+        yozadi va response.close() qiladi (navbatdagi joy shunda bo'shatiladi).
+        
+        Args:
+            channel: Kanal raqami (1 dan)
+            stream: Oqim (1 - asosiy, 2 - qo'shimcha)
+            
+        Returns:
+            requests.Response obyekti (stream=True)
+        """
+        endpoint = f"{self.config.API_STREAMING}/{int(channel) * 100 + stream}/picture"
+        return self._make_request('GET', endpoint, stream=True)
+    
+    def search_recordings(self, track_ids, start_time: str, end_time: str, page_size: int = 40,
+                          priority: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yozuvlarni (NVR/kamera video fayllari) sahifalab qidirish (xatolik yuqoriga uzatiladi)
+        
+        Qurilma bitta javobda page_size tadan ko'p natija qaytarmaydi: responseStatusStrg
+        'MORE' bo'lsa keyingi sahifa searchResultPostion ni surib shu searchID bilan so'raladi.
+        Generator keyingi sahifani faqat oldingi sahifa o'qib bo'lingach so'raydi.
+        
+        Args:
+            track_ids: Trek ID (yoki ro'yxati), masalan 101 - 1-kanal asosiy oqimi
+            start_time: Boshlanish vaqti (ISO format)
+            end_time: Tugash vaqti (ISO format)
+            page_size: Bir sahifadagi natijalar (maxResults)
+            priority: Navbat ustuvorligi
+            
+        Returns:
+            searchMatchItem lar iteratori (trackID, timeSpan, mediaSegmentDescriptor)
+        """
+        if isinstance(track_ids, (int, str)):
+            track_ids = [track_ids]
+        search_id = str(uuid.uuid4()).upper()
+        headers = {'Content-Type': 'application/xml'}
+        position = 0
+        while True:
+            body = dict_to_xml('CMSearchDescription', {
+                'searchID': search_id,
+                'trackList': {'trackID': [str(track) for track in track_ids]},
+                'timeSpanList': {'timeSpan': {'startTime': start_time, 'endTime': end_time}},
+                'maxResults': page_size,
+                # Qurilma sxemasidagi yozilishi shunday (Position emas)
+                'searchResultPostion': position,
+                'metadataList': {'metadataDescriptor': '//recordType.meta.std-cgi.com'},
+            }, {'version': '2.0'})
+            response = self._make_request('POST', self.config.API_PLAYBACK, priority=priority,
+                                          data=body, headers=headers)
+            data = self._parse_xml_response(response)
+            matches = data.get('matchList')
+            items = matches.get('searchMatchItem', []) if isinstance(matches, dict) else []
+            if isinstance(items, dict):
+                items = [items]
+            yield from items
+            position += len(items)
+            if data.get('responseStatusStrg') != 'MORE' or not items:
+                return
+    
     def test_connection(self) -> bool:
         """
         Ulanishni tekshirish
@@ -345,5 +760,28 @@ class HikVisionAPI:
                 self.logger.error("HikVision access control qurilmasiga ulanish muvaffaqiyatsiz")
                 return False
         except Exception as e:
-            self.logger.error(f"Ulanishni tekshirishda xatolik: {e}")
+            self.logger.error("Ulanishni tekshirishda xatolik: %s", e)
             return False
+
+
+def _content_length(response) -> Optional[int]:
+    """Javob hajmi Content-Length sarlavhasidan (noma'lum bo'lsa None)"""
+    length = response.headers.get('Content-Length')
+    return int(length) if isinstance(length, str) and length.isdigit() else None
+
+
+def _release_on_close(response: requests.Response, release):
+    """response.close() chaqirilganda release() ni bir marta chaqiradigan qilish"""
+    close = response.close
+    released = False
+
+    def close_and_release():
+        nonlocal released
+        try:
+            close()
+        finally:
+            if not released:
+                released = True
+                release()
+
+    response.close = close_and_release
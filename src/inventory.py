@@ -0,0 +1,323 @@
+import json
+import logging
+import os
+import signal
+import threading
+from typing import Callable, Dict, Any, Optional
+
+from .config import EnvSetting, HikVisionConfig, load_env
+
+logger = logging.getLogger(__name__)
+
+# Inventardagi `jobs` kalitlari -> daemon interval sozlamalari
+_JOB_SETTINGS = {
+    'event_sync': 'DAEMON_EVENT_SYNC_INTERVAL',
+    'user_sync': 'DAEMON_USER_SYNC_INTERVAL',
+    'device_info': 'DAEMON_DEVICE_INFO_INTERVAL',
+    'clock_sync': 'DAEMON_CLOCK_SYNC_INTERVAL',
+    'card_index': 'DAEMON_CARD_INDEX_INTERVAL',
+}
+
+
+class DeviceConfig(HikVisionConfig):
+    """
+    Bitta qurilma konfiguratsiyasi
+
+    Berilgan sozlamalar obyekt atributi sifatida yoziladi va HikVisionConfig dagi muhit
+    o'zgaruvchilari qiymatlarini yopadi; berilmaganlari odatdagidek muhitdan o'qiladi.
+    """
+
+    def __init__(self, name: str = None, meta: Dict[str, Any] = None, **settings):
+        """
+        Args:
+            name: Qurilma nomi (standart - host)
+            meta: Sozlama bo'lmagan qo'shimcha maydonlar (model, seriya raqami va h.k.)
+            **settings: Sozlamalar, kichik harflarda ham bo'lishi mumkin (host, timeout, ...)
+        """
+        self.settings: Dict[str, Any] = {}
+        for key, value in settings.items():
+            attr = key.upper()
+            descriptor = HikVisionConfig.__dict__.get(attr)
+            if isinstance(descriptor, EnvSetting):
+                value = descriptor.cast(value)
+            setattr(self, attr, value)
+            self.settings[attr] = value
+        self.name = name or self.HOST
+        self.meta = meta or {}
+
+    def fingerprint(self) -> tuple:
+        """Sozlamalar izi (qayta yuklashda o'zgargan qurilmalarni aniqlash uchun)"""
+        return tuple(sorted((key, repr(value)) for key, value in self.settings.items()))
+
+    def __repr__(self):
+        return f"DeviceConfig({self.name!r}, {self.base_url!r})"
+
+
+def _device_settings(entry: Dict[str, Any], defaults: Dict[str, Any]) -> DeviceConfig:
+    """Inventar yozuvini (standart qiymatlar bilan) DeviceConfig ga aylantirish"""
+    merged = dict(defaults)
+    merged.update(entry)
+    jobs = dict(defaults.get('jobs') or {})
+    jobs.update(entry.get('jobs') or {})
+    merged.pop('jobs', None)
+
+    name = merged.pop('name', None)
+    password_env = merged.pop('password_env', None)
+    if password_env:
+        load_env()
+        merged['password'] = os.environ.get(password_env, '')
+
+    settings, meta = {}, {}
+    for key, value in merged.items():
+        if hasattr(HikVisionConfig, key.upper()):
+            settings[key] = value
+        else:
+            meta[key] = value
+    for job, interval in jobs.items():
+        if job not in _JOB_SETTINGS:
+            raise ValueError(f"Noma'lum vazifa: {job}")
+        settings[_JOB_SETTINGS[job]] = interval
+    if 'host' not in settings and 'HOST' not in settings:
+        raise ValueError(f"Qurilmada host ko'rsatilmagan: {entry}")
+    return DeviceConfig(name, meta, **settings)
+
+
+def load_inventory(path: str) -> Dict[str, DeviceConfig]:
+    """
+    Inventar faylini o'qish (JSON yoki TOML)
+
+    Fayl tuzilishi: ixtiyoriy `defaults` bo'limi va `devices` ro'yxati. --discover natijasi
+    (output/discovered_devices.json) ham to'g'ridan-to'g'ri inventar sifatida ishlatiladi.
+
+    Args:
+        path: Fayl yo'li (.toml - TOML, qolganlari JSON)
+
+    Returns:
+        Nom -> DeviceConfig lug'ati
+    """
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    defaults = data.get('defaults') or {}
+    entries = data.get('devices') or []
+    if isinstance(entries, dict):
+        entries = [dict(entry, name=name) for name, entry in entries.items()]
+
+    devices: Dict[str, DeviceConfig] = {}
+    for entry in entries:
+        if entry.get('status') == 'auth_failed':
+            # Eski --discover natijasi: login qilib bo'lmaydigan qurilma so'ralmaydi
+            logger.warning("Inventardagi %s o'tkazib yuborildi: auth_failed", entry.get('name') or entry.get('host'))
+            continue
+        device = _device_settings(entry, defaults)
+        if device.name in devices:
+            raise ValueError(f"Qurilma nomi takrorlangan: {device.name}")
+        devices[device.name] = device
+    return devices
+
+
+class InventoryWatcher:
+    """
+    Inventar faylini kuzatib, o'zgarganda qayta yuklovchi
+
+    Fayl o'zgarganda (mtime yoki hajm) qayta o'qiladi va oldingi holat bilan solishtiriladi:
+    on_change(added, removed, changed) faqat qo'shilgan, o'chirilgan va sozlamalari o'zgargan
+    qurilmalar bilan chaqiriladi. Xato fayl e'tiborsiz qoldiriladi, oldingi holat saqlanadi.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[Dict[str, DeviceConfig], Dict[str, DeviceConfig],
+                                                       Dict[str, DeviceConfig]], Any],
+                 poll_interval: float = 2.0):
+        """
+        Args:
+            path: Inventar fayli
+            on_change: O'zgarishlar bilan chaqiriladigan funksiya
+            poll_interval: Faylni tekshirish oralig'i (sekund)
+        """
+        self.path = path
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.devices: Dict[str, DeviceConfig] = {}
+        self._signature = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """
+        Fayl o'zgarganini tekshirish va kerak bo'lsa qayta yuklash
+
+        Returns:
+            True agar qurilmalar ro'yxatida o'zgarish bo'lsa
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            logger.warning("Inventar fayli o'qilmadi: %s", e)
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        try:
+            devices = load_inventory(self.path)
+        except (OSError, ValueError) as e:
+            logger.error("Inventar faylida xatolik, oldingi holat saqlanadi: %s", e)
+            return False
+        self._signature = signature
+
+        added = {name: device for name, device in devices.items() if name not in self.devices}
+        removed = {name: device for name, device in self.devices.items() if name not in devices}
+        changed = {name: device for name, device in devices.items()
+                   if name in self.devices and device.fingerprint() != self.devices[name].fingerprint()}
+        # O'zgarmagan qurilmalar uchun eski obyekt qoladi (unga bog'langan API va keshlar ham)
+        self.devices = {name: device if name in added or name in changed else self.devices[name]
+                        for name, device in devices.items()}
+        if not (added or removed or changed):
+            return False
+        logger.info("Inventar yangilandi: +%d -%d ~%d", len(added), len(removed), len(changed))
+        self.on_change(added, removed, changed)
+        return True
+
+    def start(self) -> 'InventoryWatcher':
+        """Faylni fon thread da kuzatishni boshlash"""
+        self.check()
+        self._thread = threading.Thread(target=self._loop, name='inventory-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("Inventarni qayta yuklashda xatolik: %s", e)
+
+    def stop(self):
+        """Kuzatishni to'xtatish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class FleetCollector:
+    """
+    Inventardagi har bir qurilma uchun CollectorDaemon ishlatuvchi collector
+
+    Har bir qurilma o'z thread ida va output_dir/<nom>/ papkasida ishlaydi, pipeline va
+    deduplikator umumiy. Inventar o'zgarganda faqat qo'shilgan, o'chirilgan va o'zgargan
+    qurilmalar qayta ishga tushiriladi; o'chirilganlarning sessiyasi va navbati yopiladi.
+    """
+
+    def __init__(self, inventory_path: str, output_dir: str = 'output', pipeline=None, dedup=None,
+                 poll_interval: float = 2.0):
+        """
+        Args:
+            inventory_path: Inventar fayli
+            output_dir: Natija papkasi
+            pipeline: Umumiy EventPipeline
+            dedup: Umumiy EventDeduplicator
+            poll_interval: Inventar faylini tekshirish oralig'i (sekund)
+        """
+        self.output_dir = output_dir
+        self.pipeline = pipeline
+        self.dedup = dedup
+        self.daemons: Dict[str, Any] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.watcher = InventoryWatcher(inventory_path, self.apply, poll_interval)
+
+    def apply(self, added: Dict[str, DeviceConfig], removed: Dict[str, DeviceConfig],
+              changed: Dict[str, DeviceConfig]):
+        """Inventar o'zgarishlarini qo'llash"""
+        from .pool import device_key
+
+        with self._lock:
+            for name in removed:
+                self._stop_device(name, teardown=True)
+            for name, config in changed.items():
+                old = self.daemons.get(name)
+                # Ulanish ma'lumotlari o'zgarmagan bo'lsa sessiya pool da qoladi
+                teardown = old is not None and old.api.session_key != device_key(config)
+                self._stop_device(name, teardown=teardown)
+                self._start_device(config)
+            for config in added.values():
+                self._start_device(config)
+
+    def _start_device(self, config: DeviceConfig):
+        from .daemon import CollectorDaemon
+        from .hikvision_api import HikVisionAPI
+
+        daemon = CollectorDaemon(HikVisionAPI(config), os.path.join(self.output_dir, config.name),
+                                 pipeline=self.pipeline, dedup=self.dedup, shared=True)
+        daemon.add_default_jobs(config)
+        thread = threading.Thread(target=daemon.run, name=f"collector-{config.name}", daemon=True)
+        self.daemons[config.name] = daemon
+        self._threads[config.name] = thread
+        thread.start()
+        logger.info("Qurilma ishga tushirildi: %s (%s)", config.name, config.base_url)
+
+    def _stop_device(self, name: str, teardown: bool):
+        from .scheduler import scheduler
+        from .status import status
+
+        daemon = self.daemons.pop(name, None)
+        thread = self._threads.pop(name, None)
+        if daemon is None:
+            return
+        daemon.stop()
+        if thread is not None:
+            thread.join()
+        if teardown:
+            daemon.api.close(drop=True)
+            scheduler.remove(f"{daemon.api.config.HOST}:{daemon.api.config.PORT}")
+            status.remove(daemon.api.device_name)
+        logger.info("Qurilma to'xtatildi: %s", name)
+
+    def install_signal_handlers(self):
+        """SIGTERM va SIGINT kelganda barcha qurilmalarni silliq to'xtatish"""
+        def handler(signum, frame):
+            logger.info("Signal %s olindi, collector to'xtatilmoqda", signum)
+            self.stop()
+
+        signal.signal(signal.SIGTERM, handler)
+        signal.signal(signal.SIGINT, handler)
+
+    def run(self):
+        """stop() chaqirilguncha inventarni kuzatish va qurilmalarni boshqarish"""
+        self.watcher.check()
+        try:
+            while not self._stop.wait(self.watcher.poll_interval):
+                try:
+                    self.watcher.check()
+                except Exception as e:
+                    logger.error("Inventarni qayta yuklashda xatolik: %s", e)
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        """Collector ga to'xtash signalini berish"""
+        self._stop.set()
+
+    def shutdown(self):
+        """Barcha qurilmalarni to'xtatish, keyin umumiy pipeline va deduplikatorni yopish"""
+        with self._lock:
+            for name in list(self.daemons):
+                self._stop_device(name, teardown=False)
+        if self.pipeline is not None:
+            self.pipeline.close()
+        if self.dedup is not None and self.dedup.state_path:
+            self.dedup.save()
+
+    def status(self) -> Dict[str, Any]:
+        """Qurilmalar bo'yicha daemon holati"""
+        return {name: daemon.status() for name, daemon in list(self.daemons.items())}
+
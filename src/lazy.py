@@ -0,0 +1,47 @@
+import importlib
+import threading
+
+
+class LazyAttr:
+    """
+    Modul atributiga kechiktirilgan murojaat
+
+    Modul faqat atributga birinchi marta murojaat qilinganda (yoki chaqirilganda) import
+    qilinadi. CLI ishga tushish vaqtini qisqartirish uchun ishlatiladi:
+
+        Fore = LazyAttr('colorama', 'Fore')
+        tqdm = LazyAttr('tqdm', 'tqdm')
+    """
+
+    __slots__ = ('_module', '_attr', '_target', '_lock')
+
+    def __init__(self, module: str, attr: str):
+        """
+        Args:
+            module: Modul nomi
+            attr: Modul ichidagi atribut nomi
+        """
+        self._module = module
+        self._attr = attr
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        target = self._target
+        if target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self._module)
+                    self._target = getattr(module, self._attr)
+                target = self._target
+        return target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = 'loaded' if self._target is not None else 'not loaded'
+        return f"<LazyAttr {self._module}.{self._attr} ({state})>"
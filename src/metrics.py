@@ -0,0 +1,261 @@
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Tuple
+
+# Prometheus uchun standart latency chegaralari (sekundlarda)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ID_SEGMENT = re.compile(r'[^/]*\d[^/]*')
+
+
+@lru_cache(maxsize=1024)
+def endpoint_label(endpoint: str) -> str:
+    """
+    Endpoint ni metrika labeli uchun normallashtirish
+
+    Raqam qatnashgan segmentlar (eshik, karta, foydalanuvchi ID lari) `{id}` bilan
+    almashtiriladi, shunda labellar soni cheklangan bo'ladi.
+
+    Args:
+        endpoint: API endpoint (masalan "ISAPI/AccessControl/Door/1/status")
+
+    Returns:
+        Normallashtirilgan endpoint
+    """
+    return _ID_SEGMENT.sub('{id}', endpoint.split('?', 1)[0].strip('/'))
+
+
+class _Histogram:
+    """Bitta label to'plami uchun histogram"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Counter, gauge va histogram metrikalarini saqlovchi thread-safe registry"""
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Registry ni ishga tushirish
+
+        Args:
+            enabled: Metrikalar yig'ilsinmi (o'chirilgan bo'lsa yozish no-op)
+            buckets: Histogram chegaralari
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._gauges: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, _Histogram]] = {}
+
+    def enable(self):
+        """Metrikalarni yoqish"""
+        self.enabled = True
+
+    def disable(self):
+        """Metrikalarni o'chirish"""
+        self.enabled = False
+
+    def reset(self):
+        """Barcha yig'ilgan qiymatlarni tozalash"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """
+        Metrika turini va tavsifini ro'yxatdan o'tkazish
+
+        Args:
+            name: Metrika nomi
+            kind: "counter", "gauge" yoki "histogram"
+            help_text: Prometheus HELP matni
+        """
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Counter ni oshirish"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Gauge qiymatini o'rnatish"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Histogram ga qiymat qo'shish"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(len(self.buckets) + 1)
+            hist.counts[index] += 1
+            hist.sum += value
+            hist.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Joriy metrikalarning Python ko'rinishidagi nusxasi
+
+        Returns:
+            {"counters": {...}, "gauges": {...}, "histograms": {...}} ko'rinishidagi dictionary
+        """
+        with self._lock:
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            gauges = {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self._gauges.items()
+            }
+            histograms = {}
+            for name, series in self._histograms.items():
+                rows = []
+                for key, hist in series.items():
+                    cumulative, buckets = 0, {}
+                    for bound, count in zip(self.buckets + (float('inf'),), hist.counts):
+                        cumulative += count
+                        buckets[bound] = cumulative
+                    rows.append({
+                        'labels': dict(key),
+                        'count': hist.count,
+                        'sum': hist.sum,
+                        'buckets': buckets
+                    })
+                histograms[name] = rows
+        return {'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def render_prometheus(self) -> str:
+        """
+        Metrikalarni Prometheus text exposition formatida qaytarish
+
+        Returns:
+            Prometheus text formatidagi satr
+        """
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        def header(name, default_kind):
+            kind, help_text = self._help.get(name, (default_kind, name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, rows in sorted(snap['counters'].items()):
+            header(name, 'counter')
+            for row in rows:
+                lines.append(f"{name}{_format_labels(row['labels'])} {_format_value(row['value'])}")
+
+        for name, rows in sorted(snap['gauges'].items()):
+            header(name, 'gauge')
+            for row in rows:
+                lines.append(f"{name}{_format_labels(row['labels'])} {_format_value(row['value'])}")
+
+        for name, rows in sorted(snap['histograms'].items()):
+            header(name, 'histogram')
+            for row in rows:
+                for bound, count in row['buckets'].items():
+                    le = '+Inf' if bound == float('inf') else _format_value(bound)
+                    labels = _format_labels({**row['labels'], 'le': le})
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _format_labels(row['labels'])
+                lines.append(f"{name}_sum{labels} {_format_value(row['sum'])}")
+                lines.append(f"{name}_count{labels} {row['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    """Labellarni Prometheus formatiga o'tkazish"""
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Sonni Prometheus formatiga o'tkazish"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# Jarayon bo'yicha umumiy registry (standart holatda o'chirilgan)
+metrics = MetricsRegistry()
+
+metrics.describe('hikvision_request_duration_seconds', 'histogram',
+                 'ISAPI so\'rovining to\'liq davomiyligi (auth va transfer bilan)')
+metrics.describe('hikvision_requests_total', 'counter', 'Status kodi bo\'yicha ISAPI so\'rovlar soni')
+metrics.describe('hikvision_request_bytes_sent_total', 'counter', 'Yuborilgan baytlar')
+metrics.describe('hikvision_response_bytes_received_total', 'counter', 'Qabul qilingan baytlar')
+metrics.describe('hikvision_request_retries_total', 'counter', 'Transport darajasidagi qayta urinishlar')
+metrics.describe('hikvision_auth_challenges_total', 'counter', 'Digest auth 401 challenge lari')
+metrics.describe('hikvision_parse_duration_seconds', 'histogram', 'XML javobni parsing qilish davomiyligi')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """`/metrics` endpointi uchun HTTP handler"""
+
+    registry: MetricsRegistry = metrics
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Har bir scrape ni log qilmaymiz
+        pass
+
+
+def start_metrics_server(port: int, host: str = '0.0.0.0',
+                         registry: MetricsRegistry = None) -> ThreadingHTTPServer:
+    """
+    Prometheus `/metrics` endpointini fon thread ida ishga tushirish
+
+    Args:
+        port: Tinglanadigan port (0 - ixtiyoriy bo'sh port)
+        host: Tinglanadigan manzil
+        registry: MetricsRegistry obyekti (standart - umumiy registry)
+
+    Returns:
+        Ishlayotgan server (to'xtatish uchun `server.shutdown()`)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry or metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,202 @@
+import json
+import logging
+import multiprocessing
+import threading
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from .metrics import metrics
+from .xml_utils import iter_records, xml_to_dict
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_parse_offloaded_total', 'counter', 'Jarayonlar pool ida parse qilingan javoblar')
+
+
+def _document_worker(body: bytes) -> bytes:
+    """Worker: butun XML hujjatni dict ga aylantirib JSON bayt sifatida qaytarish"""
+    return json.dumps(xml_to_dict(ET.fromstring(body)), ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def _records_worker(segment: bytes, tag: str) -> Tuple[Tuple[str, ...], List[tuple]]:
+    """
+    Worker: yozuvlar bo'lagini ustunlar va qatorlarga aylantirish
+
+    Nested dict lar ro'yxatini pickle qilish o'rniga kalitlar bir marta, qiymatlar esa
+    tuple qatorlarda qaytariladi (yo'q kalit - None).
+    """
+    records = list(iter_records([b'<r>', segment, b'</r>'], (tag,)))
+    columns: Dict[str, int] = {}
+    for record in records:
+        for key in record:
+            if key not in columns:
+                columns[key] = len(columns)
+    names = tuple(columns)
+    rows = [tuple(record.get(name) for name in names) for record in records]
+    return names, rows
+
+
+def _rows_to_records(names: Tuple[str, ...], rows: List[tuple]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        yield {name: value for name, value in zip(names, row) if value is not None}
+
+
+class ParsePool:
+    """
+    Katta XML javoblarni alohida jarayonlarda parse qiluvchi pool
+
+    ET va xml_to_dict GIL ni ushlab turadi: ko'p qurilmadan bir vaqtda katta ro'yxatlar
+    kelganda bitta yadro band bo'ladi. Pool yoqilganda threshold dan katta javoblar worker
+    jarayonlarga xom bayt sifatida beriladi va ixcham ko'rinishda (JSON bayt yoki
+    ustun/qatorlar) qaytadi. Kichik javoblar, o'chirilgan yoki buzilgan pool holatida
+    parsing joyida bajariladi.
+    """
+
+    def __init__(self, processes: int = 0, threshold: int = 262144, segment_size: int = 1048576):
+        """
+        Args:
+            processes: Worker jarayonlar soni (0 - o'chirilgan)
+            threshold: Shundan kichik javoblar joyida parse qilinadi (bayt)
+            segment_size: Oqimli ro'yxatlarda worker ga beriladigan bo'lak hajmi (bayt)
+        """
+        self.processes = processes
+        self.threshold = threshold
+        self.segment_size = segment_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def configure(self, processes: int, threshold: int):
+        """Sozlamalarni yangilash (jarayonlar soni o'zgarsa pool qayta yaratiladi)"""
+        if processes != self.processes:
+            self.close()
+        self.processes = processes
+        self.threshold = threshold
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: ko'p thread li jarayonni fork qilish qulflar holatini meros qoldiradi
+                self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _broken(self, executor: ProcessPoolExecutor, error: Exception):
+        """Buzilgan pool ni tashlash - keyingi chaqiruv yangi pool yaratadi"""
+        logger.error("Parse pool ishlamayapti, joyida parse qilinadi: %s", error)
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def should_offload(self, size: Optional[int]) -> bool:
+        """Shu hajmdagi javob pool ga berilishi kerakmi (None - noma'lum hajm)"""
+        return self.enabled and (size is None or size >= self.threshold)
+
+    def parse_document(self, body: bytes) -> Any:
+        """
+        XML hujjatni dict ga aylantirish (katta bo'lsa worker da)
+
+        Raises:
+            ET.ParseError: Noto'g'ri XML
+        """
+        if self.should_offload(len(body)):
+            executor = self._pool()
+            try:
+                data = executor.submit(_document_worker, body).result()
+            except BrokenProcessPool as e:
+                self._broken(executor, e)
+            else:
+                if metrics.enabled:
+                    metrics.inc('hikvision_parse_offloaded_total', mode='document')
+                return json.loads(data)
+        return xml_to_dict(ET.fromstring(body))
+
+    def iter_records(self, chunks: Iterable[bytes], tag: str) -> Iterator[Dict[str, Any]]:
+        """
+        Oqimdagi yozuvlarni worker larda parse qilish (tartib saqlanadi)
+
+        Bayt oqimi `</tag>` chegaralarida segment_size lik bo'laklarga bo'linadi; bir vaqtda
+        processes * 2 tadan ko'p bo'lak kutilmaydi, shuning uchun xotira cheklangan qoladi.
+        Ildiz elementi va yozuvlardan oldingi maydonlar (numOfMatches va h.k.) tashlanadi.
+        Worker jarayon o'lsa (BrokenProcessPool) kutilayotgan bo'laklar va oqimning qolgani
+        joyida parse qilinadi - oqimni qayta o'qib bo'lmaydi, shuning uchun bo'laklar natijasi
+        olinguncha saqlanadi; pool keyingi chaqiruvda qayta yaratiladi.
+        """
+        close = b'</' + tag.encode() + b'>'
+        opens = (b'<' + tag.encode() + b'>', b'<' + tag.encode() + b' ')
+        executor = self._pool()
+        pending = deque()
+        buffer = b''
+        started = False
+
+        def submit(segment):
+            nonlocal executor
+            future = None
+            if executor is not None:
+                try:
+                    future = executor.submit(_records_worker, segment, tag)
+                except BrokenProcessPool as e:
+                    self._broken(executor, e)
+                    executor = None
+                else:
+                    if metrics.enabled:
+                        metrics.inc('hikvision_parse_offloaded_total', mode='records')
+            pending.append((segment, future))
+
+        def drain(limit):
+            nonlocal executor
+            while len(pending) > limit:
+                segment, future = pending.popleft()
+                names = rows = None
+                if future is not None:
+                    try:
+                        names, rows = future.result()
+                    except BrokenProcessPool as e:
+                        if executor is not None:
+                            self._broken(executor, e)
+                            executor = None
+                if names is None:
+                    names, rows = _records_worker(segment, tag)
+                yield from _rows_to_records(names, rows)
+
+        for chunk in chunks:
+            buffer += chunk
+            if not started:
+                positions = [p for p in (buffer.find(token) for token in opens) if p >= 0]
+                if not positions:
+                    continue
+                buffer = buffer[min(positions):]
+                started = True
+            if len(buffer) < self.segment_size:
+                continue
+            cut = buffer.rfind(close)
+            if cut < 0:
+                continue
+            cut += len(close)
+            submit(buffer[:cut])
+            buffer = buffer[cut:]
+            yield from drain(self.processes * 2)
+        if started:
+            cut = buffer.rfind(close)
+            if cut >= 0:
+                submit(buffer[:cut + len(close)])
+        yield from drain(0)
+
+    def close(self):
+        """Worker jarayonlarni to'xtatish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Jarayon bo'yicha umumiy pool (HikVisionAPI konfiguratsiyadan sozlaydi)
+parse_pool = ParsePool()
@@ -4,6 +4,9 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from .hikvision_api import HikVisionAPI
 from .config import HikVisionConfig
+from .profiling import Profiler, stage_of
+from .schema import (CHANNEL_SCHEMA, DEVICE_INFO_SCHEMA, EVENT_SCHEMA, PTZ_SCHEMA,
+                     STREAMING_CHANNEL_SCHEMA)
 
 class HikVisionParser:
     """HikVision ma'lumotlarini parsing qilish uchun sinf"""
@@ -27,34 +30,7 @@ class HikVisionParser:
         Returns:
             Parsing qilingan ma'lumotlar
         """
-        parsed = {
-            'timestamp': datetime.now().isoformat(),
-            'device_name': '',
-            'device_id': '',
-            'model': '',
-            'serial_number': '',
-            'firmware_version': '',
-            'mac_address': '',
-            'ip_address': '',
-            'manufacturer': '',
-            'device_type': ''
-        }
-        
-        if 'DeviceInfo' in device_info:
-            info = device_info['DeviceInfo']
-            parsed.update({
-                'device_name': info.get('deviceName', ''),
-                'device_id': info.get('deviceID', ''),
-                'model': info.get('model', ''),
-                'serial_number': info.get('serialNumber', ''),
-                'firmware_version': info.get('firmwareVersion', ''),
-                'mac_address': info.get('macAddress', ''),
-                'ip_address': info.get('ipAddress', ''),
-                'manufacturer': info.get('manufacturer', 'HikVision'),
-                'device_type': info.get('deviceType', '')
-            })
-        
-        return parsed
+        return DEVICE_INFO_SCHEMA.parse(device_info)
     
     def parse_channels(self, channels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -66,43 +42,7 @@ class HikVisionParser:
         Returns:
             Parsing qilingan kanallar
         """
-        parsed_channels = []
-        
-        for channel in channels:
-            parsed_channel = {
-                'timestamp': datetime.now().isoformat(),
-                'channel_id': '',
-                'channel_name': '',
-                'enabled': False,
-                'resolution_height': 0,
-                'resolution_width': 0,
-                'video_format': '',
-                'input_port': '',
-                'video_quality': ''
-            }
-            
-            if isinstance(channel, dict):
-                parsed_channel.update({
-                    'channel_id': channel.get('id', ''),
-                    'channel_name': channel.get('channelName', ''),
-                    'enabled': channel.get('enabled', 'false').lower() == 'true',
-                    'input_port': channel.get('inputPort', ''),
-                })
-                
-                # Video formatini parsing qilish
-                if 'videoFormat' in channel:
-                    video_format = channel['videoFormat']
-                    parsed_channel['video_format'] = video_format
-                
-                # Rezolyutsiyani parsing qilish
-                if 'resolutionHeight' in channel:
-                    parsed_channel['resolution_height'] = int(channel.get('resolutionHeight', 0))
-                if 'resolutionWidth' in channel:
-                    parsed_channel['resolution_width'] = int(channel.get('resolutionWidth', 0))
-            
-            parsed_channels.append(parsed_channel)
-        
-        return parsed_channels
+        return CHANNEL_SCHEMA.parse_many(channels)
     
     def parse_streaming_channels(self, channels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -114,51 +54,7 @@ class HikVisionParser:
         Returns:
             Parsing qilingan streaming kanallar
         """
-        parsed_channels = []
-        
-        for channel in channels:
-            parsed_channel = {
-                'timestamp': datetime.now().isoformat(),
-                'channel_id': '',
-                'transport_protocol': '',
-                'enabled': False,
-                'video_codec_type': '',
-                'audio_codec_type': '',
-                'video_bitrate': 0,
-                'audio_bitrate': 0,
-                'video_frame_rate': 0,
-                'video_resolution': '',
-                'stream_type': ''
-            }
-            
-            if isinstance(channel, dict):
-                parsed_channel.update({
-                    'channel_id': channel.get('id', ''),
-                    'enabled': channel.get('enabled', 'false').lower() == 'true',
-                    'transport_protocol': channel.get('Transport', {}).get('Protocol', ''),
-                })
-                
-                # Video ma'lumotlarini parsing qilish
-                if 'Video' in channel:
-                    video = channel['Video']
-                    parsed_channel.update({
-                        'video_codec_type': video.get('videoCodecType', ''),
-                        'video_bitrate': int(video.get('maxBitrate', 0)),
-                        'video_frame_rate': int(video.get('videoFrameRate', 0)),
-                        'video_resolution': f"{video.get('videoResolutionWidth', 0)}x{video.get('videoResolutionHeight', 0)}"
-                    })
-                
-                # Audio ma'lumotlarini parsing qilish
-                if 'Audio' in channel:
-                    audio = channel['Audio']
-                    parsed_channel.update({
-                        'audio_codec_type': audio.get('audioCompressionType', ''),
-                        'audio_bitrate': int(audio.get('audioBitRate', 0))
-                    })
-            
-            parsed_channels.append(parsed_channel)
-        
-        return parsed_channels
+        return STREAMING_CHANNEL_SCHEMA.parse_many(channels)
     
     def parse_ptz_info(self, ptz_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -170,32 +66,19 @@ class HikVisionParser:
         Returns:
             Parsing qilingan PTZ ma'lumotlari
         """
-        parsed = {
-            'timestamp': datetime.now().isoformat(),
-            'ptz_supported': False,
-            'pan_supported': False,
-            'tilt_supported': False,
-            'zoom_supported': False,
-            'preset_supported': False,
-            'patrol_supported': False,
-            'max_presets': 0,
-            'pan_range': '',
-            'tilt_range': '',
-            'zoom_range': ''
-        }
-        
-        if 'PTZData' in ptz_info:
-            ptz_data = ptz_info['PTZData']
-            parsed.update({
-                'ptz_supported': True,
-                'pan_supported': ptz_data.get('pan', 'false').lower() == 'true',
-                'tilt_supported': ptz_data.get('tilt', 'false').lower() == 'true',
-                'zoom_supported': ptz_data.get('zoom', 'false').lower() == 'true',
-                'preset_supported': ptz_data.get('presetSupport', 'false').lower() == 'true',
-                'patrol_supported': ptz_data.get('patrolSupport', 'false').lower() == 'true',
-            })
+        return PTZ_SCHEMA.parse(ptz_info)
+    
+    def parse_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Access control hodisalarini parsing qilish
         
-        return parsed
+        Args:
+            events: Hodisalar ro'yxati (extract_events natijasi)
+            
+        Returns:
+            Parsing qilingan hodisalar
+        """
+        return EVENT_SCHEMA.parse_many(events)
     
     def export_to_json(self, data: Any, filename: str) -> bool:
         """
@@ -242,13 +125,17 @@ class HikVisionParser:
             print(f"CSV ga eksport qilishda xatolik: {e}")
             return False
     
-    def get_full_system_info(self) -> Dict[str, Any]:
+    def get_full_system_info(self, profiler: Optional[Profiler] = None) -> Dict[str, Any]:
         """
         To'liq tizim ma'lumotlarini olish va parsing qilish
         
+        Args:
+            profiler: Profiler obyekti (har bir bo'lim uchun fetch/parse vaqtini yozadi)
+        
         Returns:
             Barcha ma'lumotlar
         """
+        stage = stage_of(profiler)
         system_info = {
             'timestamp': datetime.now().isoformat(),
             'device_info': {},
@@ -257,28 +144,24 @@ class HikVisionParser:
             'ptz_info': {}
         }
         
-        try:
-            # Qurilma ma'lumotlari
-            device_info = self.api.get_device_info()
-            if device_info:
-                system_info['device_info'] = self.parse_device_info(device_info)
-            
-            # Kanallar
-            channels = self.api.get_channels()
-            if channels:
-                system_info['channels'] = self.parse_channels(channels)
-            
-            # Streaming kanallar
-            streaming_channels = self.api.get_streaming_channels()
-            if streaming_channels:
-                system_info['streaming_channels'] = self.parse_streaming_channels(streaming_channels)
-            
-            # PTZ ma'lumotlari
-            ptz_info = self.api.get_ptz_info()
-            if ptz_info:
-                system_info['ptz_info'] = self.parse_ptz_info(ptz_info)
-        
-        except Exception as e:
-            print(f"Tizim ma'lumotlarini olishda xatolik: {e}")
+        # Har bir bo'lim alohida: bittasi (masalan PTZ siz qurilma) xato bersa qolganlari olinadi
+        sections = (
+            ('device_info', 'get_device_info', self.parse_device_info),
+            ('channels', 'get_channels', self.parse_channels),
+            ('streaming_channels', 'get_streaming_channels', self.parse_streaming_channels),
+            ('ptz_info', 'get_ptz_info', self.parse_ptz_info),
+        )
+        for name, method, parse in sections:
+            fetch = getattr(self.api, method, None)
+            if fetch is None:
+                continue
+            try:
+                with stage(f'{name}.fetch'):
+                    data = fetch()
+                if data:
+                    with stage(f'{name}.parse'):
+                        system_info[name] = parse(data)
+            except Exception as e:
+                print(f"Tizim ma'lumotlarini olishda xatolik ({name}): {e}")
         
         return system_info
@@ -0,0 +1,224 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import metrics
+
+metrics.describe('hikvision_pool_stale_resets_total', 'counter',
+                 'Uzoq turib qolgan keep-alive ulanishlar oldindan yopilgan holatlar')
+metrics.describe('hikvision_pool_sessions', 'gauge', 'Pool dagi qurilma sessiyalari soni')
+
+
+# Kalitdagi parol izi faqat shu jarayon ichida solishtiriladi (fayl/metrikalarga chiqmaydi)
+_KEY_SALT = os.urandom(16)
+
+
+def device_key(config) -> str:
+    """
+    Qurilma sessiyasi kaliti: protocol://user@host:port#<parol izi>
+
+    Parol kalitga kiradi: bir qurilmaga boshqa hisob ma'lumotlari bilan ulangan obyektlar
+    sessiyani (va uning digest auth holatini) bo'lishmaydi.
+    """
+    secret = hashlib.blake2b(str(config.PASSWORD).encode('utf-8'), key=_KEY_SALT, digest_size=6).hexdigest()
+    return f"{config.PROTOCOL}://{config.USERNAME}@{config.HOST}:{config.PORT}#{secret}"
+
+
+def session_label(key: str) -> str:
+    """Metrikalar va holat uchun kalit (parol izisiz)"""
+    return key.split('#', 1)[0]
+
+
+class PooledSession(requests.Session):
+    """
+    Bitta qurilma uchun keep-alive sessiya
+
+    Terminallar bo'sh turgan keep-alive ulanishni ogohlantirmasdan (FIN/RST siz) tashlab
+    yuboradi, bunday soketni o'qish orqali aniqlab bo'lmaydi. Shuning uchun sessiya
+    keepalive_timeout dan uzoq ishlatilmagan bo'lsa, keyingi so'rovdan oldin pool dagi
+    ulanishlar yopiladi va so'rov yangi ulanishda ketadi. Qayta ishlatilgan ulanish baribir
+    uzilsa, idempotent so'rovlar bir marta qayta yuboriladi (retries metrikasida ko'rinadi).
+    """
+
+    def __init__(self, name: str, pool_maxsize: int = 4, keepalive_timeout: float = 90.0,
+                 retries: int = 1):
+        """
+        Args:
+            name: Qurilma nomi (metrikalar labeli)
+            pool_maxsize: Qurilmaga ochiq turadigan ulanishlar soni
+            keepalive_timeout: Shundan uzoq bo'sh turgan ulanishlar eskirgan hisoblanadi (sekund)
+            retries: Ulanish uzilganda qayta urinishlar soni
+        """
+        super().__init__()
+        self.name = name
+        self.keepalive_timeout = keepalive_timeout
+        self.last_used = time.monotonic()
+        self.stale_resets = 0
+        # Sessiyani ushlab turgan (release qilmagan) API obyektlari soni
+        self.refs = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self.pool_maxsize = None
+        self.retries = None
+        self.configure(pool_maxsize, keepalive_timeout, retries)
+
+    def configure(self, pool_maxsize: int, keepalive_timeout: float, retries: int):
+        """
+        Ulanishlar pool i sozlamalarini yangilash (inventar qayta yuklanganda)
+
+        Hajm yoki qayta urinishlar o'zgarsa yangi adapter o'rnatiladi; eski adapterdagi
+        ishlayotgan so'rovlar tugaydi, ularning ulanishlari qayta ishlatilmaydi.
+        """
+        self.keepalive_timeout = keepalive_timeout
+        if (pool_maxsize, retries) == (self.pool_maxsize, self.retries):
+            return
+        old = set(self.adapters.values()) if self.pool_maxsize is not None else set()
+        self.pool_maxsize, self.retries = pool_maxsize, retries
+        retry = Retry(total=retries, connect=retries, read=retries, status=0, redirect=0,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        for adapter in old:
+            adapter.close()
+
+    def request(self, *args, **kwargs):
+        with self._lock:
+            idle = time.monotonic() - self.last_used
+            if idle > self.keepalive_timeout and self._active == 0:
+                self.drop_connections()
+                self.stale_resets += 1
+                if metrics.enabled:
+                    metrics.inc('hikvision_pool_stale_resets_total', device=self.name)
+            self._active += 1
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.last_used = time.monotonic()
+
+    def drop_connections(self):
+        """Pool dagi bo'sh ulanishlarni yopish (sessiya ishlatishda qoladi)"""
+        for adapter in set(self.adapters.values()):
+            adapter.poolmanager.clear()
+
+    @property
+    def idle_seconds(self) -> float:
+        """Oxirgi so'rovdan beri o'tgan vaqt"""
+        return time.monotonic() - self.last_used if self._active == 0 else 0.0
+
+
+class PoolManager:
+    """
+    Jarayon bo'yicha qurilma sessiyalari reyestri
+
+    Bir qurilmaga bir xil hisob ma'lumotlari bilan ulangan barcha HikVisionAPI obyektlari
+    (parser, daemon, discovery va h.k.) bitta sessiya va ulanishlar pool ini bo'lishadi.
+    session() sessiyani band qiladi, release() bo'shatadi; faqat hech kim ushlamagan va
+    idle_timeout dan uzoq ishlatilmagan sessiyalar navbatdagi murojaatda yopiladi.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0):
+        """
+        Args:
+            idle_timeout: Ishlatilmagan sessiya yopiladigan vaqt (sekund)
+        """
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, PooledSession] = {}
+        self._next_eviction = 0.0
+        self._lock = threading.Lock()
+
+    def session(self, key: str, pool_maxsize: int = 4, keepalive_timeout: float = 90.0,
+                retries: int = 1) -> PooledSession:
+        """
+        Qurilma sessiyasini olish va band qilish (birinchi murojaatda yaratiladi)
+
+        Har bir chaqiruvga bitta release() mos kelishi kerak.
+
+        Args:
+            key: Qurilma kaliti (device_key)
+            pool_maxsize: Qurilmaga ochiq turadigan ulanishlar soni (mavjud sessiyada ham yangilanadi)
+            keepalive_timeout: Bo'sh ulanish eskirgan hisoblanadigan vaqt (sekund)
+            retries: Ulanish uzilganda qayta urinishlar soni
+
+        Returns:
+            PooledSession obyekti
+        """
+        with self._lock:
+            self._evict_idle(exclude=key)
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = PooledSession(session_label(key), pool_maxsize,
+                                                              keepalive_timeout, retries)
+                if metrics.enabled:
+                    metrics.set('hikvision_pool_sessions', len(self._sessions))
+            else:
+                # Oxirgi berilgan sozlamalar qo'llanadi (inventardagi POOL_* o'zgarishi)
+                session.configure(pool_maxsize, keepalive_timeout, retries)
+            session.refs += 1
+        return session
+
+    def release(self, key: str, session: PooledSession, close: bool = False):
+        """
+        Sessiyani bo'shatish (API obyekti endi uni ishlatmaydi)
+
+        Args:
+            key: Qurilma kaliti
+            session: session() qaytargan obyekt
+            close: Boshqa hech kim ushlamasa sessiyani darhol yopish (qurilma olib tashlanganda)
+        """
+        with self._lock:
+            session.refs = max(0, session.refs - 1)
+            if close and session.refs == 0 and self._sessions.get(key) is session:
+                del self._sessions[key]
+                session.close()
+
+    def _evict_idle(self, exclude: str = None):
+        """Uzoq ishlatilmagan sessiyalarni yopish (lock ostida chaqiriladi)"""
+        now = time.monotonic()
+        if not self.idle_timeout or now < self._next_eviction:
+            return
+        self._next_eviction = now + self.idle_timeout / 4
+        for key, session in list(self._sessions.items()):
+            # Tirik API obyekti ushlab turgan sessiya yopilmaydi
+            if key != exclude and session.refs == 0 and session.idle_seconds > self.idle_timeout:
+                del self._sessions[key]
+                session.close()
+
+    def evict_idle(self):
+        """Uzoq ishlatilmagan sessiyalarni yopish"""
+        with self._lock:
+            self._next_eviction = 0.0
+            self._evict_idle()
+
+    def close(self, key: str = None):
+        """
+        Sessiyani yoki barcha sessiyalarni yopish
+
+        Args:
+            key: Qurilma kaliti (None - hammasi)
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._sessions)
+            for item in keys:
+                session = self._sessions.pop(item, None)
+                if session is not None:
+                    session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Sessiyalar holati"""
+        return {key: {'idle_seconds': round(session.idle_seconds, 1),
+                      'stale_resets': session.stale_resets,
+                      'refs': session.refs}
+                for key, session in list(self._sessions.items())}
+
+
+# Jarayon bo'yicha umumiy pool
+pool = PoolManager()
@@ -0,0 +1,182 @@
+import io
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+
+class Profiler:
+    """Bosqichlar bo'yicha wall-clock vaqtini va ixtiyoriy cProfile/tracemalloc ni yig'uvchi sinf"""
+
+    def __init__(self, cpu: bool = False, memory: bool = False, top: int = 25):
+        """
+        Profiler ni ishga tushirish
+
+        Args:
+            cpu: cProfile yoqilsinmi
+            memory: tracemalloc yoqilsinmi
+            top: Hisobotdagi eng og'ir funksiyalar/allokatsiyalar soni
+        """
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.stages: List[Dict[str, Any]] = []
+        self.metadata: Dict[str, Any] = {}
+        self._stack: List[str] = []
+        self._profile = None
+        self._started_at = None
+        self._start = None
+        self._total = None
+
+    def start(self):
+        """Profiling ni boshlash"""
+        self._started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start()
+        if self.cpu:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        """Profiling ni to'xtatish"""
+        if self._profile is not None:
+            self._profile.disable()
+        if self._start is not None and self._total is None:
+            self._total = time.perf_counter() - self._start
+
+    @contextmanager
+    def stage(self, name: str, **attrs):
+        """
+        Bosqich vaqtini o'lchash
+
+        Ichma-ich bosqichlar "ota.bola" ko'rinishida nomlanadi.
+
+        Args:
+            name: Bosqich nomi (masalan "connect", "device_info.fetch")
+            **attrs: Hisobotga qo'shiladigan qo'shimcha ma'lumotlar
+        """
+        full_name = '.'.join(self._stack + [name])
+        self._stack.append(name)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._stack.pop()
+            entry = {
+                'stage': full_name,
+                'seconds': round(time.perf_counter() - start, 6),
+                'offset': round(start - self._start, 6) if self._start is not None else None
+            }
+            if error:
+                entry['error'] = error
+            if attrs:
+                entry.update(attrs)
+            self.stages.append(entry)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Mashina o'qiy oladigan hisobot
+
+        Returns:
+            Hisobot dictionary
+        """
+        self.stop()
+        report = {
+            'started_at': self._started_at,
+            'total_seconds': round(self._total, 6) if self._total is not None else None,
+            'python': platform.python_version(),
+            'metadata': self.metadata,
+            'stages': self.stages
+        }
+        if self._profile is not None:
+            report['cpu_top'] = self._cpu_top()
+        if self.memory:
+            report['memory'] = self._memory_summary()
+        return report
+
+    def write_report(self, output_dir: str, timestamp: str = None) -> str:
+        """
+        Hisobotni `output_dir` ga yozish
+
+        cProfile yoqilgan bo'lsa `pstats`/`snakeviz` uchun `.prof` fayl ham yoziladi.
+
+        Args:
+            output_dir: Natija papkasi
+            timestamp: Fayl nomi uchun vaqt belgisi
+
+        Returns:
+            JSON hisobot fayli yo'li
+        """
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(output_dir, exist_ok=True)
+        report = self.report()
+        if self._profile is not None:
+            prof_file = os.path.join(output_dir, f"hikvision_profile_{timestamp}.prof")
+            self._profile.dump_stats(prof_file)
+            report['cpu_profile_file'] = prof_file
+        report_file = os.path.join(output_dir, f"hikvision_profile_{timestamp}.json")
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return report_file
+
+    def _cpu_top(self) -> List[Dict[str, Any]]:
+        """cProfile natijasidan eng og'ir funksiyalar (cumulative bo'yicha)"""
+        import pstats
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                'function': f"{os.path.basename(filename)}:{line}({func})",
+                'calls': nc,
+                'self_seconds': round(tt, 6),
+                'cumulative_seconds': round(ct, 6)
+            })
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:self.top]
+
+    def _memory_summary(self) -> Dict[str, Any]:
+        """tracemalloc natijalari: joriy/eng yuqori xotira va eng katta allokatsiyalar"""
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return {}
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        top = [
+            {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:self.top]
+        ]
+        return {'current_bytes': current, 'peak_bytes': peak, 'top_allocations': top}
+
+
+class _NullProfiler:
+    """Profiling o'chirilganda ishlatiladigan no-op profiler"""
+
+    def stage(self, name: str, **attrs):
+        return nullcontext()
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def stage_of(profiler: Optional[Profiler]):
+    """
+    Profiler yoki no-op profiler ning `stage` metodini qaytarish
+
+    Args:
+        profiler: Profiler obyekti yoki None
+
+    Returns:
+        `stage(name)` context manager funksiyasi
+    """
+    return (profiler or NULL_PROFILER).stage
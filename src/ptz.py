@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_ptz_commands_total', 'counter', 'PTZ buyruqlari (sent/coalesced/failed)')
+metrics.describe('hikvision_ptz_command_latency_seconds', 'histogram',
+                 'PTZ buyrug\'i navbatga qo\'yilgandan qurilma javobigacha')
+
+Velocity = Tuple[int, int, int]
+
+STOP: Velocity = (0, 0, 0)
+
+# Yuborilmagan buyruqni qayta yuborish kutishi (har xatoda ikki baravar, yuqori chegara bilan)
+_RETRY_DELAY = 0.1
+_RETRY_MAX_DELAY = 2.0
+
+
+class _ChannelQueue:
+    """Bitta kanal uchun oxirgi buyruq qutisi va uni yuboruvchi thread"""
+
+    def __init__(self, controller: 'PTZController', channel: int):
+        self.controller = controller
+        self.channel = channel
+        self.pending: Optional[Velocity] = None
+        self.queued_at = 0.0
+        self.last_sent: Optional[Velocity] = None
+        self.next_allowed = 0.0
+        self.retry_at = 0.0
+        self.attempts = 0
+        self.closed = False
+        self.close_deadline = 0.0
+        self.counts = {'sent': 0, 'coalesced': 0, 'failed': 0}
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._loop, name=f"ptz-{channel}", daemon=True)
+        self.thread.start()
+
+    def put(self, velocity: Velocity):
+        with self.cond:
+            if self.pending is not None:
+                # Hali yuborilmagan buyruq eskirdi: faqat oxirgi tezlik qoladi
+                self.counts['coalesced'] += 1
+                self.controller._record('coalesced')
+            else:
+                self.queued_at = time.monotonic()
+            self.pending = velocity
+            self.cond.notify()
+
+    def _ready_at(self) -> float:
+        # Yopilayotgan navbat tezlik chegarasini kutmaydi, lekin xatodan keyingi kutishni saqlaydi
+        return self.retry_at if self.closed else max(self.next_allowed, self.retry_at)
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.pending is None:
+                        if self.closed:
+                            return
+                        self.cond.wait()
+                        continue
+                    delay = self._ready_at() - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.cond.wait(delay)
+                velocity, queued_at = self.pending, self.queued_at
+                self.pending = None
+                if velocity == self.last_sent:
+                    # Kamera allaqachon shu tezlikda harakatlanmoqda
+                    self.counts['coalesced'] += 1
+                    self.controller._record('coalesced')
+                    continue
+                self.next_allowed = time.monotonic() + self.controller.min_interval
+            self._send(velocity, queued_at)
+
+    def _send(self, velocity: Velocity, queued_at: float):
+        try:
+            self.controller.api.ptz_continuous(self.channel, *velocity)
+        except Exception as e:
+            with self.cond:
+                self.counts['failed'] += 1
+                # Kamera qaysi tezlikda ekani noma'lum: keyingi buyruq takror deb tashlanmaydi
+                self.last_sent = None
+                self.attempts += 1
+                # Yangi buyruq kelmagan bo'lsa shu tezlik qayta yuboriladi (to'xtamagan kamera
+                # harakatda qolmasligi uchun); yopilgandan keyin faqat STOP close muddatigacha
+                retry = self.pending is None and (
+                    not self.closed or (velocity == STOP and time.monotonic() < self.close_deadline))
+                if retry:
+                    self.pending, self.queued_at = velocity, queued_at
+                    self.retry_at = time.monotonic() + min(_RETRY_MAX_DELAY,
+                                                           _RETRY_DELAY * 2 ** (self.attempts - 1))
+            self.controller._record('failed')
+            logger.warning("PTZ buyrug'i yuborilmadi (kanal %s)%s: %s", self.channel,
+                           ', qayta yuboriladi' if retry else '', e)
+            return
+        with self.cond:
+            self.last_sent = velocity
+            self.attempts = 0
+            self.retry_at = 0.0
+            self.counts['sent'] += 1
+        self.controller._record('sent', time.monotonic() - queued_at)
+
+    def close(self, timeout: float = None):
+        with self.cond:
+            self.closed = True
+            self.close_deadline = time.monotonic() + (timeout or 0.0)
+            if self.attempts and self.pending != STOP:
+                # Qayta yuborilayotgan harakat buyrug'i yopilgandan keyin kerak emas
+                self.pending = None
+            self.cond.notify()
+        self.thread.join(timeout)
+
+
+class PTZController:
+    """
+    Joystik uchun PTZ buyruqlari navbati (kanal bo'yicha, oxirgi buyruq yutadi)
+
+    Har bir kanalda bitta kutilayotgan buyruq joyi bor: yangi tezlik yuborilmagan eski
+    tezlikni almashtiradi, shuning uchun qurilma sekin javob bersa ham navbat o'smaydi va
+    kamera doim operatorning eng oxirgi harakatini bajaradi. Kanalga buyruqlar min_interval
+    dan tez yuborilmaydi; bo'sh turgan kanalga birinchi buyruq kutmasdan ketadi. Oxirgi
+    yuborilgan tezlik qayta yuborilmaydi. Buyruqlar API ning umumiy keep-alive sessiyasi
+    orqali PRIORITY_CONTROL ustuvorligida (navbatdagi boshqa so'rovlardan oldin) yuboriladi.
+    """
+
+    def __init__(self, api, rate: float = 10.0):
+        """
+        Args:
+            api: HikVisionAPI obyekti
+            rate: Kanal boshiga sekundiga maksimal buyruqlar
+        """
+        self.api = api
+        self.min_interval = 1.0 / rate if rate > 0 else 0.0
+        self._channels: Dict[int, _ChannelQueue] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, channel: int) -> _ChannelQueue:
+        with self._lock:
+            queue = self._channels.get(channel)
+            if queue is None:
+                queue = self._channels[channel] = _ChannelQueue(self, channel)
+            return queue
+
+    def move(self, channel: int, pan: int = 0, tilt: int = 0, zoom: int = 0):
+        """
+        Uzluksiz harakat buyrug'ini navbatga qo'yish (darhol qaytadi)
+
+        Args:
+            channel: Kanal raqami
+            pan: Gorizontal tezlik (-100..100)
+            tilt: Vertikal tezlik (-100..100)
+            zoom: Zoom tezligi (-100..100)
+        """
+        clamp = lambda value: max(-100, min(100, int(value)))
+        self._queue(channel).put((clamp(pan), clamp(tilt), clamp(zoom)))
+
+    def stop(self, channel: int):
+        """Kanal harakatini to'xtatish"""
+        self.move(channel, *STOP)
+
+    def _record(self, status: str, latency: float = None):
+        if metrics.enabled:
+            device = self.api.config.HOST
+            metrics.inc('hikvision_ptz_commands_total', device=device, status=status)
+            if latency is not None:
+                metrics.observe('hikvision_ptz_command_latency_seconds', latency, device=device)
+
+    def stats(self) -> Dict[int, Dict[str, Any]]:
+        """Kanallar bo'yicha yuborilgan, birlashtirilgan va xato buyruqlar"""
+        with self._lock:
+            queues = list(self._channels.values())
+        return {queue.channel: dict(queue.counts, velocity=queue.last_sent) for queue in queues}
+
+    def close(self, stop: bool = True, timeout: float = 5.0):
+        """
+        Navbatlarni yopish (kutilayotgan buyruqlar yuboriladi)
+
+        Args:
+            stop: Harakatdagi kanallarga to'xtash buyrug'ini yuborish
+            timeout: Har bir kanal thread ini kutish (sekund)
+        """
+        with self._lock:
+            queues = list(self._channels.values())
+            self._channels.clear()
+        for queue in queues:
+            if stop and (queue.pending or queue.last_sent) not in (None, STOP):
+                queue.put(STOP)
+            queue.close(timeout)
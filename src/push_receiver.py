@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional
+
+from .clock import clocks
+from .events import parse_push
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_ACK = (b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n'
+        b'Connection: keep-alive\r\n\r\nOK')
+_BAD_REQUEST = (b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+_TOO_LARGE = (b'HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+
+metrics.describe('hikvision_push_requests_total', 'counter', 'Qabul qilingan push so\'rovlar')
+metrics.describe('hikvision_push_events_total', 'counter', 'Push orqali kelgan hodisalar')
+
+
+class EventPushReceiver:
+    """
+    Qurilmalarning HTTP push (httpHosts) hodisalarini qabul qiluvchi asyncio server
+
+    Har bir so'rovga tana o'qilishi bilan darhol 200 javobi qaytariladi, keyin tana
+    get_access_control_events bilan bir xil normallashtirishdan o'tadi va hodisalar
+    `on_batch` ga to'plam (batch) holida uzatiladi. `on_batch` alohida thread da
+    chaqiriladi; u band bo'lsa, bufer to'lganda ulanishlardan o'qish to'xtaydi (TCP
+    backpressure).
+    """
+
+    def __init__(self, on_batch: Callable[[List[Dict[str, Any]]], Any], host: str = '0.0.0.0',
+                 port: int = 8099, batch_size: int = 500, batch_interval: float = 1.0,
+                 max_body: int = 4 * 1024 * 1024):
+        """
+        Args:
+            on_batch: Hodisalar to'plamini qabul qiluvchi funksiya
+            host: Tinglanadigan manzil
+            port: Tinglanadigan port (0 - ixtiyoriy bo'sh port)
+            batch_size: To'plamdagi maksimal hodisalar soni
+            batch_interval: To'plam to'lmasa ham uzatish intervali (sekund)
+            max_body: Maksimal tana hajmi (bayt)
+        """
+        self.on_batch = on_batch
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_body = max_body
+        self.stats = {'connections': 0, 'requests': 0, 'events': 0, 'errors': 0, 'batches': 0}
+        self._buffer: List[Dict[str, Any]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def serve(self):
+        """Serverni ishga tushirish va stop() chaqirilguncha ishlash"""
+        self._loop = asyncio.get_running_loop()
+        self._flush_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  reuse_address=True, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Push qabul qiluvchi ishga tushdi: %s:%s", self.host, self.port)
+        ticker = asyncio.ensure_future(self._ticker())
+        self._ready.set()
+        try:
+            await self._stopped.wait()
+        finally:
+            ticker.cancel()
+            self._server.close()
+            await self._server.wait_closed()
+            await self._flush()
+            logger.info("Push qabul qiluvchi to'xtatildi")
+
+    def run(self):
+        """Serverni joriy thread da ishga tushirish (bloklaydi)"""
+        asyncio.run(self.serve())
+
+    def start(self) -> 'EventPushReceiver':
+        """Serverni fon thread ida ishga tushirish va tayyor bo'lishini kutish"""
+        self._thread = threading.Thread(target=self.run, name='push-receiver', daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def stop(self):
+        """Serverni to'xtatish (buferdagi hodisalar uzatiladi)"""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(10)
+
+    async def _ticker(self):
+        """batch_interval da buferni uzatish"""
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            if self._buffer:
+                await self._flush()
+
+    async def _flush(self):
+        """Buferdagi hodisalarni on_batch ga uzatish (bir vaqtda bitta to'plam)"""
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            self.stats['batches'] += 1
+            try:
+                await self._loop.run_in_executor(None, self.on_batch, batch)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error("Hodisalar to'plamini uzatishda xatolik: %s", e)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Bitta ulanish: keep-alive bilan ketma-ket so'rovlar"""
+        self.stats['connections'] += 1
+        peer = writer.get_extra_info('peername')
+        peer_ip = peer[0] if peer else ''
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                request_line, _, header_block = head.partition(b'\r\n')
+                headers = {}
+                for line in header_block.split(b'\r\n'):
+                    name, sep, value = line.partition(b':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                body = await self._read_body(reader, writer, headers)
+                if body is None:
+                    break
+
+                # Qurilmaga darhol javob, parsing keyin
+                writer.write(_ACK)
+                self.stats['requests'] += 1
+
+                if request_line.startswith((b'POST', b'PUT')) and body:
+                    self._accept(body, headers.get(b'content-type', b'').decode('latin-1'), peer_ip)
+                    if len(self._buffer) >= self.batch_size:
+                        await self._flush()
+
+                await writer.drain()
+                if headers.get(b'connection', b'').lower() == b'close':
+                    break
+        finally:
+            writer.close()
+
+    async def _read_body(self, reader, writer, headers) -> Optional[bytes]:
+        """So'rov tanasini o'qish (Content-Length yoki chunked)"""
+        try:
+            if headers.get(b'transfer-encoding', b'').lower() == b'chunked':
+                chunks, total = [], 0
+                while True:
+                    size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                    if size == 0:
+                        await reader.readuntil(b'\r\n')
+                        break
+                    total += size
+                    if total > self.max_body:
+                        writer.write(_TOO_LARGE)
+                        return None
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readexactly(2)
+                return b''.join(chunks)
+
+            length = int(headers.get(b'content-length', b'0') or 0)
+            if length > self.max_body:
+                writer.write(_TOO_LARGE)
+                return None
+            return await reader.readexactly(length) if length else b''
+        except (ValueError, asyncio.LimitOverrunError):
+            self.stats['errors'] += 1
+            writer.write(_BAD_REQUEST)
+            return None
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+
+    def _accept(self, body: bytes, content_type: str, peer_ip: str):
+        """Tanani parsing qilib hodisalarni buferga qo'shish"""
+        try:
+            events = parse_push(body, content_type)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning("Push tanasini parsing qilib bo'lmadi (%s): %s", peer_ip, e)
+            return
+        received_at = time.time()
+        for event in events:
+            event.setdefault('ipAddress', peer_ip)
+            event['receivedAt'] = received_at
+        clocks.normalize(events)
+        self._buffer.extend(events)
+        self.stats['events'] += len(events)
+        if metrics.enabled:
+            metrics.inc('hikvision_push_requests_total', device=peer_ip)
+            if events:
+                metrics.inc('hikvision_push_events_total', len(events), device=peer_ip)
@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
+
+from .clock import parse_iso_epoch
+from .metrics import metrics
+from .replay import event_epoch
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_recording_searches_total', 'counter', 'Yozuvlar qidiruvi so\'rovlari')
+metrics.describe('hikvision_recording_cache_total', 'counter', 'Yozuvlar keshi murojaatlari (hit/miss)')
+
+Segment = Dict[str, Any]
+
+
+def track_id(channel: int, stream: int = 1) -> int:
+    """Kanal raqamidan trek ID (1-kanal asosiy oqimi - 101)"""
+    return int(channel) * 100 + stream
+
+
+def isapi_utc(epoch: float) -> str:
+    """Epoch ni qidiruv so'rovi uchun UTC vaqtga aylantirish"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(epoch))
+
+
+def parse_segment(item: Dict[str, Any]) -> Optional[Segment]:
+    """searchMatchItem ni ixcham ko'rinishga keltirish (vaqtsiz natijalar - None)"""
+    span = item.get('timeSpan') or {}
+    start = parse_iso_epoch(span.get('startTime', ''))
+    end = parse_iso_epoch(span.get('endTime', ''))
+    if start is None or end is None:
+        return None
+    media = item.get('mediaSegmentDescriptor') or {}
+    return {'trackID': str(item.get('trackID', '')), 'start': start, 'end': end,
+            'startTime': span['startTime'], 'endTime': span['endTime'],
+            'playbackURI': media.get('playbackURI'), 'contentType': media.get('contentType')}
+
+
+class RecordingIndex:
+    """
+    Yozuvlar qidiruvi natijalari keshi (trek, soat) bo'laklari bo'yicha
+
+    Hodisani video bilan bog'lash uchun hodisa vaqti tushgan soat bo'lagi qidiriladi va
+    natija keshlanadi: shu soatdagi boshqa hodisalar uchun qayta so'rov yuborilmaydi.
+    Bir nechta bo'lak kerak bo'lsa ketma-ket kelgan kesh-siz bo'laklar bitta qidiruvga
+    birlashtiriladi - minglab hodisalar bir necha so'rov bilan bog'lanadi. Hali tugamagan
+    (joriy) soat keshlanmaydi, chunki unga yangi yozuvlar qo'shilishi mumkin.
+    """
+
+    def __init__(self, api, bucket_seconds: int = 3600, page_size: int = 40, max_buckets: int = 4096):
+        """
+        Args:
+            api: HikVisionAPI obyekti
+            bucket_seconds: Kesh bo'lagi uzunligi (sekund)
+            page_size: Qidiruv sahifasi hajmi
+            max_buckets: Keshdagi bo'laklar soni chegarasi (LRU)
+        """
+        self.api = api
+        self.bucket_seconds = bucket_seconds
+        self.page_size = page_size
+        self.max_buckets = max_buckets
+        self.searches = 0
+        self._cache: 'OrderedDict[Tuple[str, int], List[Segment]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, epoch: float) -> int:
+        return int(epoch // self.bucket_seconds) * self.bucket_seconds
+
+    def _cached(self, key: Tuple[str, int]) -> Optional[List[Segment]]:
+        with self._lock:
+            segments = self._cache.get(key)
+            if segments is not None:
+                self._cache.move_to_end(key)
+            return segments
+
+    def _store(self, key: Tuple[str, int], segments: List[Segment]):
+        with self._lock:
+            self._cache[key] = segments
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_buckets:
+                self._cache.popitem(last=False)
+
+    def _search(self, track: str, start: int, end: int) -> List[Segment]:
+        self.searches += 1
+        if metrics.enabled:
+            metrics.inc('hikvision_recording_searches_total', device=self.api.config.HOST)
+        segments = []
+        for item in self.api.search_recordings(track, isapi_utc(start), isapi_utc(end), self.page_size):
+            segment = parse_segment(item)
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def load(self, track, buckets: List[int]) -> Dict[int, List[Segment]]:
+        """
+        Bo'laklar natijalarini olish (keshda bo'lmaganlari ketma-ket guruhlab qidiriladi)
+
+        Args:
+            track: Trek ID
+            buckets: Bo'lak boshlari (epoch, bucket_seconds ga karrali)
+
+        Returns:
+            Bo'lak boshi -> shu bo'lak bilan kesishgan segmentlar
+        """
+        track = str(track)
+        result: Dict[int, List[Segment]] = {}
+        missing = []
+        for bucket in sorted(set(buckets)):
+            segments = self._cached((track, bucket))
+            if segments is None:
+                missing.append(bucket)
+            else:
+                result[bucket] = segments
+        if metrics.enabled:
+            metrics.inc('hikvision_recording_cache_total', len(result), result='hit')
+            metrics.inc('hikvision_recording_cache_total', len(missing), result='miss')
+
+        runs: List[List[int]] = []
+        for bucket in missing:
+            if runs and bucket == runs[-1][-1] + self.bucket_seconds:
+                runs[-1].append(bucket)
+            else:
+                runs.append([bucket])
+        now = time.time()
+        for run in runs:
+            segments = self._search(track, run[0], run[-1] + self.bucket_seconds)
+            for bucket in run:
+                bucket_end = bucket + self.bucket_seconds
+                result[bucket] = [segment for segment in segments
+                                  if segment['start'] < bucket_end and segment['end'] > bucket]
+                if bucket_end <= now:
+                    self._store((track, bucket), result[bucket])
+        return result
+
+    def find(self, track, epoch: float) -> List[Segment]:
+        """Berilgan vaqtni o'z ichiga olgan segmentlar"""
+        bucket = self._bucket(epoch)
+        return [segment for segment in self.load(track, [bucket])[bucket]
+                if segment['start'] <= epoch < segment['end']]
+
+    def correlate(self, events: List[Dict[str, Any]],
+                  track: Union[int, str, Callable[[Dict[str, Any]], Any]] = 101) -> List[Optional[Segment]]:
+        """
+        Hodisalarni video segmentlari bilan bog'lash
+
+        Args:
+            events: Hodisalar (timestamp yoki time maydoni bilan)
+            track: Trek ID yoki hodisa -> trek ID funksiyasi (None - bog'lanmaydi)
+
+        Returns:
+            Har bir hodisa uchun segment (topilmasa yoki vaqti bo'lmasa None), events tartibida
+        """
+        track_for = track if callable(track) else (lambda event: track)
+        targets = []
+        needed: Dict[str, List[int]] = {}
+        for event in events:
+            epoch = event_epoch(event)
+            event_track = track_for(event)
+            if epoch is None or event_track is None:
+                targets.append(None)
+                continue
+            event_track = str(event_track)
+            targets.append((event_track, epoch))
+            needed.setdefault(event_track, []).append(self._bucket(epoch))
+
+        loaded = {event_track: self.load(event_track, buckets) for event_track, buckets in needed.items()}
+        result = []
+        for target in targets:
+            if target is None:
+                result.append(None)
+                continue
+            event_track, epoch = target
+            segments = loaded[event_track][self._bucket(epoch)]
+            result.append(next((segment for segment in segments
+                                if segment['start'] <= epoch < segment['end']), None))
+        return result
+
+    def clear(self):
+        """Keshni tozalash"""
+        with self._lock:
+            self._cache.clear()
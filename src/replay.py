@@ -0,0 +1,240 @@
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
+
+import requests
+
+from .clock import parse_iso_epoch
+from .events import extract_events
+from .sinks import Sink
+
+logger = logging.getLogger(__name__)
+
+# Replay hodisalariga qo'yiladigan yuborilish vaqti (end-to-end latency uchun)
+EMITTED_FIELD = 'replayEmittedAt'
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """
+    Saqlangan hodisalarni o'qish
+
+    Qo'llanadigan formatlar: JSON lines (.jsonl, .jsonl.gz - daemon va jsonl sink fayllari),
+    JSON (hodisalar ro'yxati yoki AcsEvent javobi) va SQLite (sqlite sink jadvali).
+
+    Args:
+        path: Fayl yo'li
+
+    Returns:
+        Hodisalar ro'yxati (fayldagi tartibda)
+    """
+    if path.endswith(('.db', '.sqlite', '.sqlite3')):
+        conn = sqlite3.connect(path)
+        try:
+            return [json.loads(payload) for (payload,) in conn.execute('SELECT payload FROM events ORDER BY id')]
+        finally:
+            conn.close()
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        if '.jsonl' in os.path.basename(path):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, list):
+        return data
+    return extract_events(data)
+
+
+def event_epoch(event: Dict[str, Any]) -> Optional[float]:
+    """Hodisa vaqti (normallashtirilgan timestamp, bo'lmasa time maydoni)"""
+    timestamp = event.get('timestamp')
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    value = event.get('time')
+    if isinstance(value, str):
+        epoch = parse_iso_epoch(value)
+        if epoch is not None:
+            return float(epoch)
+    return None
+
+
+def percentiles(values: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Qiymatlar persentillari (millisekund, eng yaqin rang usuli)"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{point}": ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))] * 1000
+              for point in points}
+    result['max'] = ordered[-1] * 1000
+    return result
+
+
+class LatencyProbe(Sink):
+    """Pipeline ga ulanadigan sink: replay hodisalarining yuborilishdan yozilishgacha vaqti"""
+
+    name = 'replay_probe'
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.events = 0
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def write(self, batch):
+        now = time.time()
+        latencies = [now - event[EMITTED_FIELD] for event in batch if EMITTED_FIELD in event]
+        with self._lock:
+            self.latencies.extend(latencies)
+            self.events += len(latencies)
+            self._done.notify_all()
+
+    def wait(self, count: int, timeout: float = None) -> bool:
+        """count ta hodisa yetib kelguncha kutish"""
+        with self._lock:
+            return self._done.wait_for(lambda: self.events >= count, timeout)
+
+
+class PushEmitter:
+    """Hodisalarni push endpoint ga (qurilma kabi HTTP POST bilan) yuboruvchi"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        """
+        Args:
+            url: Push qabul qiluvchi manzili (masalan http://127.0.0.1:8099/)
+            timeout: So'rov timeout i (sekund)
+        """
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def __call__(self, batch: List[Dict[str, Any]]):
+        body = json.dumps({'AcsEvent': {'InfoList': batch}}, ensure_ascii=False).encode('utf-8')
+        response = self.session.post(self.url, data=body, timeout=self.timeout,
+                                     headers={'Content-Type': 'application/json'})
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class EventReplayer:
+    """
+    Saqlangan hodisalarni asl vaqt oraliqlari bilan qayta yuborish
+
+    speed=1 - real vaqt, speed=N - N baravar tez, speed=0 - maksimal tezlik. Bir tick
+    (standart 10 ms) ichida yuborilishi kerak bo'lgan hodisalar bitta to'plamga yig'iladi.
+    Har bir hodisa nusxasiga yuborilish vaqti (replayEmittedAt) yoziladi - LatencyProbe
+    shu bo'yicha end-to-end latency ni o'lchaydi.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], speed: float = 1.0, batch_size: int = 500,
+                 tick: float = 0.01):
+        """
+        Args:
+            events: Hodisalar
+            speed: Tezlik koeffitsienti (0 - maksimal)
+            batch_size: To'plamdagi maksimal hodisalar
+            tick: Bir to'plamga yig'iladigan vaqt oralig'i (sekund)
+        """
+        timed = [(event_epoch(event), index, event) for index, event in enumerate(events)]
+        # Vaqtsiz hodisalar oldingi hodisa vaqtini oladi
+        last = next((epoch for epoch, _, _ in timed if epoch is not None), 0.0)
+        ordered = []
+        for epoch, index, event in timed:
+            last = epoch if epoch is not None else last
+            ordered.append((last, index, event))
+        ordered.sort(key=lambda item: (item[0], item[1]))
+        self.events = [(epoch, event) for epoch, _, event in ordered]
+        self.speed = speed
+        self.batch_size = max(1, batch_size)
+        self.tick = tick
+        self._stop = threading.Event()
+
+    def batches(self) -> Iterator[Tuple[float, List[Dict[str, Any]]]]:
+        """(boshlanishdan keyingi yuborish vaqti, to'plam) juftliklari"""
+        if not self.events:
+            return
+        base = self.events[0][0]
+        speed = self.speed
+        batch: List[Dict[str, Any]] = []
+        batch_due = 0.0
+        for epoch, event in self.events:
+            due = (epoch - base) / speed if speed > 0 else 0.0
+            if batch and (len(batch) >= self.batch_size or due - batch_due > self.tick):
+                yield batch_due, batch
+                batch = []
+            if not batch:
+                batch_due = due
+            batch.append(event)
+        if batch:
+            yield batch_due, batch
+
+    def run(self, emit: Callable[[List[Dict[str, Any]]], Any]) -> Dict[str, Any]:
+        """
+        Hodisalarni emit ga yuborish
+
+        Returns:
+            events, duration, events_per_second va lag (rejadan kechikish persentillari)
+        """
+        start = time.monotonic()
+        sent = 0
+        lags = []
+        for due, batch in self.batches():
+            if self._stop.is_set():
+                break
+            wait = start + due - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            lags.append(max(0.0, time.monotonic() - start - due))
+            emitted_at = time.time()
+            emit([dict(event, **{EMITTED_FIELD: emitted_at}) for event in batch])
+            sent += len(batch)
+        duration = time.monotonic() - start
+        return {'events': sent, 'duration': duration,
+                'events_per_second': sent / duration if duration > 0 else 0.0,
+                'lag': percentiles(lags)}
+
+    def stop(self):
+        """Replay ni to'xtatish"""
+        self._stop.set()
+
+
+def replay(events: List[Dict[str, Any]], pipeline, probe: LatencyProbe, speed: float = 1.0,
+           via_push: bool = False, batch_size: int = 500, drain_timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Hodisalarni pipeline ga (to'g'ridan-to'g'ri yoki lokal push endpoint orqali) qayta yuborish
+
+    Args:
+        events: Hodisalar
+        pipeline: EventPipeline (probe uning sink lari orasida bo'lishi kerak)
+        probe: LatencyProbe
+        speed: Tezlik koeffitsienti (0 - maksimal)
+        via_push: True bo'lsa lokal EventPushReceiver ishga tushiriladi va hodisalar unga
+            HTTP orqali yuboriladi (qurilma push ini emulyatsiya qilish)
+        batch_size: To'plam hajmi
+        drain_timeout: Oxirgi hodisalar sink larga yetishini kutish (sekund)
+
+    Returns:
+        Hisobot: events, duration, events_per_second, delivered, latency va lag persentillari
+    """
+    replayer = EventReplayer(events, speed=speed, batch_size=batch_size)
+    receiver = emitter = None
+    if via_push:
+        from .push_receiver import EventPushReceiver
+
+        receiver = EventPushReceiver(pipeline.submit, host='127.0.0.1', port=0, batch_size=batch_size,
+                                     batch_interval=0.05).start()
+        emitter = PushEmitter(f"http://127.0.0.1:{receiver.port}/")
+    try:
+        report = replayer.run(emitter or pipeline.submit)
+    finally:
+        if emitter is not None:
+            emitter.close()
+        if receiver is not None:
+            receiver.stop()
+    delivered = probe.wait(report['events'], drain_timeout)
+    report.update(delivered=probe.events, complete=delivered, latency=percentiles(probe.latencies))
+    return report
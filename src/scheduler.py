@@ -0,0 +1,277 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Ustuvorlik sinflari (kichik qiymat - yuqori ustuvorlik)
+PRIORITY_CONTROL = 0   # eshik boshqaruvi, PTZ
+PRIORITY_EVENTS = 1    # hodisalar sinxronizatsiyasi
+PRIORITY_NORMAL = 2    # qurilma ma'lumotlari, sozlamalar
+PRIORITY_BULK = 3      # karta/foydalanuvchi ro'yxatlari, kadrlar
+
+PRIORITY_NAMES = {
+    PRIORITY_CONTROL: 'control',
+    PRIORITY_EVENTS: 'events',
+    PRIORITY_NORMAL: 'normal',
+    PRIORITY_BULK: 'bulk'
+}
+
+metrics.describe('hikvision_scheduler_wait_seconds', 'histogram', 'So\'rovning navbatda kutish vaqti')
+metrics.describe('hikvision_scheduler_queue_depth', 'gauge', 'Navbatda kutayotgan so\'rovlar soni')
+
+
+class DeviceScheduler:
+    """
+    Bitta qurilma uchun so'rovlar rejalashtiruvchisi
+
+    Bir vaqtda bajariladigan so'rovlar sonini (concurrency) va sekundiga so'rovlar sonini
+    (token bucket) cheklaydi. Bo'sh joy ochilganda eng yuqori ustuvorlikdagi kutayotgan
+    so'rov o'tadi, bir xil ustuvorlikda - navbat tartibida.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 2, rate_limit: float = 0.0,
+                 burst: int = None):
+        """
+        Args:
+            name: Qurilma nomi (metrikalar labeli)
+            max_concurrency: Bir vaqtdagi so'rovlar soni
+            rate_limit: Sekundiga so'rovlar (0 - cheklanmagan)
+            burst: Token bucket sig'imi (standart - max(1, rate_limit))
+        """
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(rate_limit))
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._active = 0
+        self._waiting = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {label: {'requests': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+                       for label in PRIORITY_NAMES.values()}
+
+    def configure(self, max_concurrency: int, rate_limit: float, burst: int = None):
+        """
+        Cheklovlarni joyida yangilash (inventar qayta yuklanganda), kutayotganlar yangi cheklov bilan davom etadi
+
+        Args:
+            max_concurrency: Bir vaqtdagi so'rovlar soni
+            rate_limit: Sekundiga so'rovlar (0 - cheklanmagan)
+            burst: Token bucket sig'imi (standart - max(1, rate_limit))
+        """
+        with self._cond:
+            self.max_concurrency = max(1, max_concurrency)
+            self.rate_limit = rate_limit
+            self.burst = burst or max(1, int(rate_limit))
+            self._tokens = min(self._tokens, float(self.burst))
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_NORMAL, timeout: float = None):
+        """
+        So'rov uchun joy olish
+
+        Args:
+            priority: Ustuvorlik sinfi
+            timeout: Kutish uchun maksimal vaqt (None - cheksiz)
+
+        Raises:
+            TimeoutError: Joy timeout ichida bo'shamasa
+        """
+        waited = self.acquire(priority, timeout)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, timeout: float = None) -> float:
+        """
+        Joy olish (bloklaydi)
+
+        Returns:
+            Navbatda kutilgan vaqt (sekund)
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        entry = (priority, next(self._counter))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            self._publish_depth()
+            try:
+                while True:
+                    if self._waiting[0] == entry and self._active < self.max_concurrency:
+                        delay = self._take_token()
+                        if delay <= 0:
+                            break
+                    else:
+                        delay = None
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"{self.name}: so'rov navbatida kutish vaqti tugadi")
+                    if delay is not None and remaining is not None:
+                        delay = min(delay, remaining)
+                    self._cond.wait(delay if delay is not None else remaining)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._publish_depth()
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self._active += 1
+            self._publish_depth()
+            # Keyingi kutayotgan so'rov ham o'ta olishi mumkin
+            self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stats = self._stats[PRIORITY_NAMES.get(priority, 'normal')]
+            stats['requests'] += 1
+            stats['wait_total'] += waited
+            stats['wait_max'] = max(stats['wait_max'], waited)
+
+        if metrics.enabled:
+            metrics.observe('hikvision_scheduler_wait_seconds', waited, device=self.name,
+                            priority=PRIORITY_NAMES.get(priority, str(priority)))
+        return waited
+
+    def release(self):
+        """Joyni bo'shatish"""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _take_token(self) -> float:
+        """
+        Token bucket dan token olish
+
+        Returns:
+            0 agar token olingan bo'lsa, aks holda keyingi token gacha kutish vaqti
+        """
+        if self.rate_limit <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate_limit
+
+    def _publish_depth(self):
+        if metrics.enabled:
+            metrics.set('hikvision_scheduler_queue_depth', len(self._waiting), device=self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Navbat holati va kutish vaqtlari
+
+        Returns:
+            queue_depth, active va ustuvorlik sinflari bo'yicha kutish statistikasi
+        """
+        with self._cond:
+            depth = len(self._waiting)
+            active = self._active
+            priorities = {}
+            for label, stats in self._stats.items():
+                requests = stats['requests']
+                priorities[label] = {
+                    'requests': requests,
+                    'wait_avg': stats['wait_total'] / requests if requests else 0.0,
+                    'wait_max': stats['wait_max']
+                }
+        return {
+            'device': self.name,
+            'queue_depth': depth,
+            'active': active,
+            'max_concurrency': self.max_concurrency,
+            'rate_limit': self.rate_limit,
+            'priorities': priorities
+        }
+
+
+class RequestScheduler:
+    """Jarayon bo'yicha qurilmalar rejalashtiruvchilari reyestri"""
+
+    def __init__(self):
+        self._devices: Dict[str, DeviceScheduler] = {}
+        self._lock = threading.Lock()
+
+    def for_device(self, key: str, max_concurrency: int = 2, rate_limit: float = 0.0) -> DeviceScheduler:
+        """
+        Qurilma rejalashtiruvchisini olish (birinchi murojaatda yaratiladi)
+
+        Bir qurilmaga ulangan barcha HikVisionAPI obyektlari bitta rejalashtiruvchini
+        bo'lishadi, shuning uchun bir jarayondagi turli vositalar bir-birini hisobga oladi.
+        Mavjud rejalashtiruvchining cheklovlari boshqacha bo'lsa, oxirgi berilgan qiymatlar
+        qo'llanadi (inventardagi o'zgarish qayta ishga tushirmasdan kuchga kiradi).
+
+        Args:
+            key: Qurilma kaliti (host:port)
+            max_concurrency: Bir vaqtdagi so'rovlar soni
+            rate_limit: Sekundiga so'rovlar (0 - cheklanmagan)
+
+        Returns:
+            DeviceScheduler obyekti
+        """
+        scheduler = self._devices.get(key)
+        if scheduler is None:
+            with self._lock:
+                scheduler = self._devices.get(key)
+                if scheduler is None:
+                    scheduler = self._devices[key] = DeviceScheduler(key, max_concurrency, rate_limit)
+                    return scheduler
+        if (scheduler.max_concurrency, scheduler.rate_limit) != (max(1, max_concurrency), rate_limit):
+            logger.info("%s navbat cheklovlari yangilandi: concurrency %d, rate %s", key, max_concurrency, rate_limit)
+            scheduler.configure(max_concurrency, rate_limit)
+        return scheduler
+
+    def remove(self, key: str):
+        """
+        Qurilma rejalashtiruvchisini reyestrdan olib tashlash (qurilma inventardan o'chirilganda)
+
+        Args:
+            key: Qurilma kaliti (host:port)
+        """
+        with self._lock:
+            self._devices.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Barcha qurilmalar navbat statistikasi"""
+        return {key: scheduler.stats() for key, scheduler in list(self._devices.items())}
+
+
+# Jarayon bo'yicha umumiy reyestr
+scheduler = RequestScheduler()
+
+
+def default_priority(method: str, endpoint: str, config) -> int:
+    """
+    Endpoint bo'yicha standart ustuvorlik sinfini aniqlash
+
+    Args:
+        method: HTTP metodi
+        endpoint: API endpoint
+        config: HikVisionConfig obyekti
+
+    Returns:
+        Ustuvorlik sinfi
+    """
+    if endpoint.startswith(getattr(config, 'API_DOOR_CONTROL', 'ISAPI/AccessControl/RemoteControl/door')):
+        return PRIORITY_CONTROL
+    if endpoint.startswith(getattr(config, 'API_PTZ', 'ISAPI/PTZCtrl/channels')) and method != 'GET':
+        return PRIORITY_CONTROL
+    if endpoint.startswith(getattr(config, 'API_ACCESS_CONTROL', 'ISAPI/AccessControl/AcsEvent')):
+        return PRIORITY_EVENTS
+    if endpoint.startswith((getattr(config, 'API_CARD_INFO', 'ISAPI/AccessControl/CardInfo'),
+                            getattr(config, 'API_USER_INFO', 'ISAPI/AccessControl/UserInfo'),
+                            getattr(config, 'API_STREAMING', 'ISAPI/Streaming/channels'))):
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
@@ -0,0 +1,320 @@
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Any, Optional, Sequence
+
+# Koddagi o'zgarmas sifatida yoziladigan standart qiymat turlari
+_LITERAL_TYPES = (str, int, float, bool, type(None))
+
+# format turidagi shablonlar: faqat {0}, {1} ko'rinishidagi joylar f-string ga aylantiriladi
+_PLACEHOLDER = re.compile(r'\{(\d+)\}')
+_PLAIN_TEMPLATE = re.compile(r'(?:[^{}]|\{\d+\})*')
+
+# Barcha sxemalar uchun umumiy int() natijalari keshi
+_INT_CACHE_SIZE = 10000
+_INTS: Dict[Any, int] = {}
+
+# Vaqt belgisining soniyagacha bo'lgan qismi keshi: (soniya, 'YYYY-MM-DDTHH:MM:SS')
+_SECOND = (None, '')
+
+
+def now_iso() -> str:
+    """
+    datetime.now().isoformat() bilan bir xil satr, soniya qismi keshlangan holda
+
+    Bitta yozuvli parse da asosiy vaqtni datetime obyektini yaratish egallaydi; bir soniya
+    ichida faqat mikrosekundlar qo'shiladi.
+    """
+    now = time.time()
+    second = int(now)
+    micro = round((now - second) * 1e6)
+    if micro >= 1000000:
+        second, micro = second + 1, 0
+    global _SECOND
+    cached, prefix = _SECOND
+    if cached != second:
+        # Juftlik bitta tayinlash bilan almashtiriladi - boshqa oqim aralash qiymat ko'rmaydi
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _SECOND = (second, prefix)
+    return f"{prefix}.{micro:06d}" if micro else prefix
+
+
+class Field:
+    """
+    Chiqish maydoni ta'rifi
+
+    Manba yo'li nuqta bilan yoziladi ('Video.maxBitrate'), har bir qadam dict.get orqali
+    olinadi. Turlar:
+        str    - qiymat o'zgarishsiz
+        int    - int(qiymat)
+        bool   - qiymat.lower() == 'true' (ISAPI mantiqiy qiymatlari satr ko'rinishida)
+        const  - manba qatorda bo'lsa `value`
+        format - `template.format(*paths)`, masalan '{0}x{1}'
+    """
+
+    __slots__ = ('name', 'path', 'kind', 'default', 'missing', 'require', 'value', 'template', 'paths')
+
+    def __init__(self, name: str, path: str = None, kind: str = 'str', default: Any = '',
+                 missing: Any = None, require: str = None, value: Any = True,
+                 template: str = None, paths: Sequence[str] = ()):
+        """
+        Args:
+            name: Chiqish kaliti
+            path: Manba yo'li (nuqta bilan)
+            kind: str, int, bool, const yoki format
+            default: Qator (yoki require kaliti) bo'lmaganda chiqish qiymati
+            missing: Manbada kalit bo'lmaganda olinadigan qiymat (standart - kind ga mos)
+            require: Maydon faqat qatorda shu kalit bo'lsa to'ldiriladi
+            value: const turi uchun qiymat
+            template: format turi uchun shablon
+            paths: format turi uchun manba yo'llari
+        """
+        self.name = name
+        self.path = path
+        self.kind = kind
+        self.default = default
+        if missing is None:
+            missing = {'int': 0, 'bool': 'false'}.get(kind, '')
+        self.missing = missing
+        self.require = require
+        self.value = value
+        self.template = template
+        self.paths = tuple(paths)
+
+
+class Schema:
+    """
+    Deklarativ maydonlar sxemasi, bir marta Python funksiyasiga kompilyatsiya qilinadi
+
+    Sxema har bir maydon uchun .get zanjirlarini yig'ib, bitta dict literal qaytaradigan
+    funksiya manbasini yaratadi va exec qiladi. Natijada har bir qatorda sxemani talqin
+    qilish emas, to'g'ridan-to'g'ri yozilgan kod ishlaydi.
+    """
+
+    def __init__(self, fields: Sequence[Field], root: str = None, timestamp: Optional[str] = 'timestamp',
+                 name: str = 'record'):
+        """
+        Args:
+            fields: Maydonlar (chiqish tartibida)
+            root: Kirishdagi ildiz kalit (masalan 'DeviceInfo'); kirishda bo'lmasa qator ildizsiz deb
+                olinadi, bo'sh qatorda faqat standart qiymatlar
+            timestamp: Vaqt belgisi maydoni nomi (None - qo'shilmaydi)
+            name: Kompilyatsiya qilingan funksiya nomi (debug uchun)
+        """
+        self.fields = list(fields)
+        self.root = root
+        self.timestamp = timestamp
+        self.name = name
+        self.source = ''
+        self._extract, self._extract_many = self._compile()
+
+    def _compile(self):
+        """Sxemadan bitta yozuv va ro'yxat uchun funksiyalar yaratish"""
+        namespace: Dict[str, Any] = {'_EMPTY': {}, '_INTS': _INTS, 'ints': _INTS}
+
+        def literal(value: Any) -> str:
+            if isinstance(value, _LITERAL_TYPES):
+                return repr(value)
+            key = f"_C{len(namespace)}"
+            namespace[key] = value
+            return key
+
+        def getter(path: str, missing: Any, scope: str = None) -> str:
+            steps = path.split('.')
+            expr = 'get'
+            if scope and len(steps) > 1 and steps[0] == scope:
+                # require bloki ichida ichki dict bir marta olingan (gget)
+                expr, steps = 'gget', steps[1:]
+            for step in steps[:-1]:
+                expr = f"{expr}({step!r}, _EMPTY).get"
+            return f"{expr}({steps[-1]!r}, {literal(missing)})"
+
+        def expression(field: Field, var: str, scope: str = None) -> List[str]:
+            if field.kind == 'const':
+                return [f"{var} = {literal(field.value)}"]
+            if field.kind == 'format':
+                args = [getter(path, 0, scope) for path in field.paths]
+                if not _PLAIN_TEMPLATE.fullmatch(field.template):
+                    return [f"{var} = {literal(field.template)}.format({', '.join(args)})"]
+                # Oddiy {0}, {1} joylari f-string ga aylantiriladi (str.format dan tezroq)
+                lines = [f"{var}a{index} = {arg}" for index, arg in enumerate(args)]
+                text = _PLACEHOLDER.sub(lambda match: f"{{{var}a{match.group(1)}}}", field.template)
+                return lines + [f"{var} = f{text!r}"]
+            value = getter(field.path, field.missing, scope)
+            if field.kind == 'int':
+                # Takrorlanuvchi qiymatlar (bitrate, kadr tezligi) uchun int() keshlanadi
+                # (3.11+ da try bloki bepul, to'g'ridan-to'g'ri indekslash .get chaqiruvidan tezroq)
+                return [f"{var} = {value}",
+                        "try:",
+                        f"    {var} = ints[{var}]",
+                        "except KeyError:",
+                        f"    {var}i = int({var})",
+                        f"    if len(ints) < {_INT_CACHE_SIZE}:",
+                        f"        ints[{var}] = {var}i",
+                        f"    {var} = {var}i"]
+            if field.kind == 'bool':
+                # Ko'p uchraydigan 'true'/'false' uchun .lower() chaqirilmaydi
+                return [f"{var} = {value}",
+                        f"{var} = {var} == 'true' or ({var} != 'false' and {var}.lower() == 'true')"]
+            if field.kind == 'str':
+                return [f"{var} = {value}"]
+            raise ValueError(f"Noma'lum maydon turi: {field.kind}")
+
+        def output(values: Dict[str, str]) -> str:
+            items = []
+            if self.timestamp:
+                items.append(f"{self.timestamp!r}: ts")
+            items.extend(f"{field.name!r}: {values[field.name]}" for field in self.fields)
+            return '{' + ', '.join(items) + '}'
+
+        defaults = {field.name: literal(field.default) for field in self.fields}
+        values = {field.name: f"v{index}" for index, field in enumerate(self.fields)}
+        body = ["get = row.get"]
+        guarded: Dict[str, List[Field]] = {}
+        for field in self.fields:
+            if field.require:
+                guarded.setdefault(field.require, []).append(field)
+            else:
+                body.extend(expression(field, values[field.name]))
+        for require, fields in guarded.items():
+            nested = any(len(path.split('.')) > 1 and path.split('.')[0] == require
+                         for field in fields for path in (field.path or '',) + field.paths)
+            if nested:
+                # Ichki dict bitta get bilan olinadi ('in' + indekslash o'rniga)
+                body.append(f"sub = get({require!r})")
+                body.append("if sub is not None:")
+                body.append("    gget = sub.get")
+            else:
+                body.append(f"if {require!r} in row:")
+            scope = require if nested else None
+            body.extend(f"    {line}" for field in fields
+                        for line in expression(field, values[field.name], scope))
+            body.append("else:")
+            body.extend(f"    {values[field.name]} = {defaults[field.name]}" for field in fields)
+
+        # Ildiz kalit bo'lmasa qator allaqachon ildizsiz (xml_to_dict natijasi) deb olinadi
+        root = [f"row = row.get({self.root!r}, row or None) if isinstance(row, dict) else None"] if self.root else []
+        lines = [f"def {self.name}(row, ts):"]
+        lines.extend(f"    {line}" for line in root)
+        lines.append("    if not isinstance(row, dict):")
+        lines.append(f"        return {output(defaults)}")
+        lines.extend(f"    {line}" for line in body)
+        lines.append(f"    return {output(values)}")
+        # Ro'yxat uchun tsikl funksiya ichida: har bir qator uchun chaqiruv xarajati yo'q
+        lines.append(f"def {self.name}_many(rows, ts):")
+        lines.append("    result = []")
+        lines.append("    append = result.append")
+        lines.append("    ints = _INTS")
+        lines.append("    for row in rows:")
+        lines.extend(f"        {line}" for line in root)
+        lines.append("        if not isinstance(row, dict):")
+        lines.append(f"            append({output(defaults)})")
+        lines.append("            continue")
+        lines.extend(f"        {line}" for line in body)
+        lines.append(f"        append({output(values)})")
+        lines.append("    return result")
+
+        self.source = '\n'.join(lines) + '\n'
+        exec(compile(self.source, f"<schema {self.name}>", 'exec'), namespace)
+        return namespace[self.name], namespace[f"{self.name}_many"]
+
+    def parse(self, row: Any, timestamp: str = None) -> Dict[str, Any]:
+        """
+        Bitta yozuvni parsing qilish
+
+        Args:
+            row: Manba dict (root berilgan bo'lsa - uni o'z ichiga olgan yoki ildizsiz javob)
+            timestamp: Vaqt belgisi (standart - hozirgi vaqt)
+
+        Returns:
+            Chiqish dict
+        """
+        if timestamp is None and self.timestamp:
+            timestamp = now_iso()
+        return self._extract(row, timestamp)
+
+    def parse_many(self, rows: Iterable[Any], timestamp: str = None) -> List[Dict[str, Any]]:
+        """
+        Yozuvlar ro'yxatini parsing qilish (vaqt belgisi butun to'plam uchun bir marta olinadi)
+
+        Args:
+            rows: Manba dict lar
+            timestamp: Vaqt belgisi (standart - hozirgi vaqt)
+
+        Returns:
+            Chiqish dict lar ro'yxati
+        """
+        if timestamp is None and self.timestamp:
+            timestamp = now_iso()
+        return self._extract_many(rows, timestamp)
+
+
+DEVICE_INFO_SCHEMA = Schema([
+    Field('device_name', 'deviceName'),
+    Field('device_id', 'deviceID'),
+    Field('model', 'model'),
+    Field('serial_number', 'serialNumber'),
+    Field('firmware_version', 'firmwareVersion'),
+    Field('mac_address', 'macAddress'),
+    Field('ip_address', 'ipAddress'),
+    Field('manufacturer', 'manufacturer', missing='HikVision'),
+    Field('device_type', 'deviceType'),
+], root='DeviceInfo', name='device_info')
+
+CHANNEL_SCHEMA = Schema([
+    Field('channel_id', 'id'),
+    Field('channel_name', 'channelName'),
+    Field('enabled', 'enabled', 'bool', default=False),
+    Field('resolution_height', 'resolutionHeight', 'int', default=0, require='resolutionHeight'),
+    Field('resolution_width', 'resolutionWidth', 'int', default=0, require='resolutionWidth'),
+    Field('video_format', 'videoFormat', require='videoFormat'),
+    Field('input_port', 'inputPort'),
+    Field('video_quality', kind='const', value=''),
+], name='channel')
+
+STREAMING_CHANNEL_SCHEMA = Schema([
+    Field('channel_id', 'id'),
+    Field('transport_protocol', 'Transport.Protocol'),
+    Field('enabled', 'enabled', 'bool', default=False),
+    Field('video_codec_type', 'Video.videoCodecType', require='Video'),
+    Field('audio_codec_type', 'Audio.audioCompressionType', require='Audio'),
+    Field('video_bitrate', 'Video.maxBitrate', 'int', default=0, require='Video'),
+    Field('audio_bitrate', 'Audio.audioBitRate', 'int', default=0, require='Audio'),
+    Field('video_frame_rate', 'Video.videoFrameRate', 'int', default=0, require='Video'),
+    Field('video_resolution', kind='format', template='{0}x{1}', require='Video',
+          paths=('Video.videoResolutionWidth', 'Video.videoResolutionHeight')),
+    Field('stream_type', kind='const', value=''),
+], name='streaming_channel')
+
+PTZ_SCHEMA = Schema([
+    Field('ptz_supported', kind='const', value=True, default=False),
+    Field('pan_supported', 'pan', 'bool', default=False),
+    Field('tilt_supported', 'tilt', 'bool', default=False),
+    Field('zoom_supported', 'zoom', 'bool', default=False),
+    Field('preset_supported', 'presetSupport', 'bool', default=False),
+    Field('patrol_supported', 'patrolSupport', 'bool', default=False),
+    Field('max_presets', kind='const', value=0, default=0),
+    Field('pan_range', kind='const', value=''),
+    Field('tilt_range', kind='const', value=''),
+    Field('zoom_range', kind='const', value=''),
+], root='PTZData', name='ptz')
+
+# Access control hodisasi (AcsEvent.InfoList elementi yoki normallashtirilgan push hodisasi)
+EVENT_SCHEMA = Schema([
+    Field('serial_no', 'serialNo'),
+    Field('time', 'time'),
+    Field('major', 'major'),
+    Field('minor', 'minor'),
+    Field('employee_no', 'employeeNoString'),
+    Field('name', 'name'),
+    Field('card_no', 'cardNo'),
+    Field('card_type', 'cardType'),
+    Field('door_no', 'doorNo'),
+    Field('card_reader_no', 'cardReaderNo'),
+    Field('verify_mode', 'currentVerifyMode'),
+    Field('user_type', 'userType'),
+    Field('attendance_status', 'attendanceStatus'),
+    Field('mask', 'mask'),
+    Field('picture_url', 'pictureURL'),
+    Field('ip_address', 'ipAddress'),
+], name='event')
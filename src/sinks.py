@@ -0,0 +1,607 @@
+import csv
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_sink_events_total', 'counter', 'Sink ga yozilgan hodisalar')
+metrics.describe('hikvision_sink_retries_total', 'counter', 'Sink yozuvini qayta urinishlar')
+metrics.describe('hikvision_sink_queue_events', 'gauge', 'Sink navbatidagi hodisalar')
+
+
+class Sink:
+    """Hodisalar to'plamini qabul qiluvchi manzil uchun asosiy sinf"""
+
+    name = 'sink'
+
+    def write(self, batch: List[Dict[str, Any]]):
+        """
+        To'plamni yozish (xatolikda exception ko'tariladi, pipeline qayta urinadi)
+
+        Args:
+            batch: Hodisalar ro'yxati
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Buferlarni yozish"""
+
+    def close(self):
+        """Resurslarni yopish"""
+        self.flush()
+
+
+def _expand_path(pattern: str) -> str:
+    """Fayl yo'lidagi {date} ni joriy sana bilan almashtirish"""
+    return pattern.replace('{date}', datetime.now().strftime('%Y%m%d'))
+
+
+class JsonLinesSink(Sink):
+    """Hodisalarni JSON lines faylga yozuvchi sink (`{date}` - kunlik aylanish)"""
+
+    name = 'jsonl'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._current = None
+        self._handle = None
+        # Dead-letter sifatida bir nechta thread dan yozilishi mumkin
+        self._lock = threading.Lock()
+
+    def write(self, batch):
+        data = ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in batch)
+        path = _expand_path(self.path)
+        with self._lock:
+            if path != self._current:
+                self._close_locked()
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._handle = open(path, 'a', encoding='utf-8')
+                self._current = path
+            self._handle.write(data)
+
+    def flush(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._current = None
+
+
+class CsvSink(Sink):
+    """
+    Hodisalarni CSV faylga yozuvchi sink
+
+    Ustunlar birinchi to'plamdan olinadi. Keyingi to'plamda yangi maydon paydo bo'lsa sarlavha
+    kengaytiriladi: fayl yangi ustunlar oxirga qo'shilgan holda qayta yoziladi (eski qatorlarda
+    ular bo'sh), shuning uchun hech bir maydon tashlab yuborilmaydi.
+    """
+
+    name = 'csv'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._current = None
+        self._fieldnames: Optional[List[str]] = None
+
+    def write(self, batch):
+        path = _expand_path(self.path)
+        if not os.path.exists(path):
+            self._fieldnames = None
+        elif path != self._current or self._fieldnames is None:
+            with open(path, 'r', newline='', encoding='utf-8') as f:
+                self._fieldnames = next(csv.reader(f), None)
+        self._current = path
+        fieldnames = self._fieldnames or []
+        known = set(fieldnames)
+        added = [key for key in dict.fromkeys(key for event in batch for key in event) if key not in known]
+        exists = self._fieldnames is not None
+        if exists and added:
+            self._extend_header(path, fieldnames, added)
+        self._fieldnames = fieldnames = fieldnames + added
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            if not exists:
+                writer.writeheader()
+            writer.writerows(batch)
+
+    @staticmethod
+    def _extend_header(path: str, fieldnames: List[str], added: List[str]):
+        """Faylni yangi ustunlar bilan qayta yozish (vaqtinchalik fayl orqali, atomik)"""
+        logger.info("%s: yangi ustunlar qo'shildi: %s", path, ', '.join(added))
+        padding = [''] * len(added)
+        temp = path + '.tmp'
+        with open(path, 'r', newline='', encoding='utf-8') as src, \
+                open(temp, 'w', newline='', encoding='utf-8') as dst:
+            reader = csv.reader(src)
+            next(reader, None)
+            writer = csv.writer(dst)
+            writer.writerow(fieldnames + added)
+            writer.writerows(row + padding for row in reader)
+        os.replace(temp, path)
+
+
+class SQLiteSink(Sink):
+    """Hodisalarni SQLite jadvaliga yozuvchi sink"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, table: str = 'events'):
+        self.path = path
+        self.table = table
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                'id INTEGER PRIMARY KEY, device TEXT, serial_no TEXT, time TEXT, payload TEXT)'
+            )
+        return self._conn
+
+    def write(self, batch):
+        conn = self._connect()
+        rows = [(str(event.get('ipAddress', '')), str(event.get('serialNo', '')),
+                 str(event.get('time', '')), json.dumps(event, ensure_ascii=False))
+                for event in batch]
+        with conn:
+            conn.executemany(
+                f'INSERT INTO {self.table} (device, serial_no, time, payload) VALUES (?, ?, ?, ?)', rows)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class StdoutSink(Sink):
+    """Hodisalarni stdout ga JSON lines sifatida chiqaruvchi sink"""
+
+    name = 'stdout'
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, batch):
+        self.stream.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in batch))
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class WebhookSink(Sink):
+    """Hodisalar to'plamini HTTP POST (JSON massiv) bilan yuboruvchi sink"""
+
+    name = 'webhook'
+
+    def __init__(self, url: str, timeout: float = 10, headers: Dict[str, str] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._session = None
+
+    def write(self, batch):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        response = self._session.post(self.url, json=batch, headers=self.headers, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class QueueSink(Sink):
+    """To'plamlarni jarayon ichidagi navbatga (queue.Queue) qo'yuvchi sink"""
+
+    name = 'queue'
+
+    def __init__(self, target: 'queue.Queue' = None, timeout: float = 1.0):
+        """
+        Args:
+            target: Navbat (standart - cheklanmagan queue.Queue)
+            timeout: Navbat to'la bo'lganda kutish (keyin qayta urinish)
+        """
+        self.queue = target if target is not None else queue.Queue()
+        self.timeout = timeout
+
+    def write(self, batch):
+        self.queue.put(batch, timeout=self.timeout)
+
+
+class _SinkWorker:
+    """Bitta sink uchun cheklangan navbat va yozuvchi thread"""
+
+    def __init__(self, sink: Sink, batch_size: int, batch_interval: float, max_queue: int,
+                 max_retries: Optional[int], retry_backoff: float, dead_letter: Optional[Sink]):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter = dead_letter
+        self.stats = {'written': 0, 'batches': 0, 'retries': 0, 'failed': 0, 'blocked_seconds': 0.0}
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        # close() muddati tugaganda: qayta urinishlar to'xtaydi, qolganlar dead-letter ga
+        self._abort = threading.Event()
+        self._first_at = None
+        self._in_flight = 0
+        self._thread = threading.Thread(target=self._run, name=f"sink-{sink.name}", daemon=True)
+        self._thread.start()
+
+    def wait_room(self, count: int, deadline: float = None) -> bool:
+        """
+        Navbatda `count` ta hodisaga joy bo'shaguncha kutish (hech narsa qo'yilmaydi)
+
+        Args:
+            count: Hodisalar soni
+            deadline: time.monotonic() bo'yicha oxirgi muddat (None - cheksiz)
+
+        Returns:
+            True agar joy bo'lsa, False agar muddat tugagan bo'lsa
+        """
+        start = time.monotonic()
+        try:
+            with self._cond:
+                # Navbatdan katta to'plam bo'sh navbatga har doim sig'adi (deadlock bo'lmasligi uchun)
+                while self._events and len(self._events) + count > self.max_queue:
+                    if self._closing:
+                        raise RuntimeError("Pipeline yopilgan")
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+        finally:
+            self.stats['blocked_seconds'] += time.monotonic() - start
+
+    def put(self, events: List[Dict[str, Any]], timeout: float = None) -> bool:
+        """
+        Hodisalarni navbatga qo'yish; navbat to'la bo'lsa joy bo'shaguncha bloklaydi
+
+        Returns:
+            True agar qo'yilgan bo'lsa, False agar timeout tugagan bo'lsa
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        if not self.wait_room(len(events), deadline):
+            return False
+        self.append(events)
+        return True
+
+    def append(self, events: List[Dict[str, Any]]):
+        """Hodisalarni kutmasdan navbatga qo'shish (joy wait_room bilan tekshirilgan)"""
+        with self._cond:
+            if not self._events:
+                self._first_at = time.monotonic()
+            self._events.extend(events)
+            self._cond.notify_all()
+            depth = len(self._events)
+        if metrics.enabled:
+            metrics.set('hikvision_sink_queue_events', depth, sink=self.sink.name)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        """Navbatdan to'plam olish (hajm yoki vaqt bo'yicha); yopilganda va bo'sh bo'lsa []"""
+        with self._cond:
+            while True:
+                if len(self._events) >= self.batch_size:
+                    break
+                if self._events:
+                    remaining = self._first_at + self.batch_interval - time.monotonic()
+                    if remaining <= 0 or self._closing:
+                        break
+                    self._cond.wait(remaining)
+                elif self._closing:
+                    return []
+                else:
+                    self._cond.wait()
+            count = min(self.batch_size, len(self._events))
+            batch = [self._events.popleft() for _ in range(count)]
+            self._first_at = time.monotonic() if self._events else None
+            self._in_flight = len(batch)
+            # Bo'shagan joyni kutayotgan ishlab chiqaruvchilarga xabar
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if not batch:
+                break
+            self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                idle = not self._events
+                depth = len(self._events)
+                self._cond.notify_all()
+            if idle:
+                self._flush_sink()
+            if metrics.enabled:
+                metrics.set('hikvision_sink_queue_events', depth, sink=self.sink.name)
+            if self._abort.is_set():
+                self._abandon_queued("Pipeline yopilish muddati tugadi")
+                break
+        try:
+            self.sink.close()
+        except Exception as e:
+            logger.warning("'%s' sink ni yopishda xatolik: %s", self.sink.name, e)
+
+    def _abandon_queued(self, error: Any):
+        """Navbatda qolgan hodisalarni dead-letter ga o'tkazish"""
+        with self._cond:
+            pending = list(self._events)
+            self._events.clear()
+            self._cond.notify_all()
+        if pending:
+            self._give_up(pending, error)
+
+    def _flush_sink(self):
+        try:
+            self.sink.flush()
+        except Exception as e:
+            logger.warning("'%s' sink ni flush qilishda xatolik: %s", self.sink.name, e)
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Navbatdagi va yozilayotgan hodisalar tugaguncha kutish
+
+        Returns:
+            True agar navbat bo'shagan bo'lsa
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            if self._events:
+                # Vaqt bo'yicha kutmasdan darhol yozish
+                self._first_at = time.monotonic() - self.batch_interval
+                self._cond.notify_all()
+            while self._events or self._in_flight:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """To'plamni qayta urinishlar bilan yozish"""
+        attempt = 0
+        while True:
+            try:
+                self.sink.write(batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+                if metrics.enabled:
+                    metrics.inc('hikvision_sink_events_total', len(batch), sink=self.sink.name)
+                return
+            except Exception as e:
+                attempt += 1
+                self.stats['retries'] += 1
+                if metrics.enabled:
+                    metrics.inc('hikvision_sink_retries_total', sink=self.sink.name)
+                if (self.max_retries is not None and attempt > self.max_retries) or self._abort.is_set():
+                    self._give_up(batch, e)
+                    return
+                delay = min(self.retry_backoff * (2 ** (attempt - 1)), 30.0)
+                logger.warning("'%s' sink ga yozishda xatolik (%d-urinish, %.1fs dan keyin): %s",
+                               self.sink.name, attempt, delay, e)
+                # close() muddati tugasa kutish to'xtatiladi
+                if self._abort.wait(delay):
+                    self._give_up(batch, e)
+                    return
+
+    def _give_up(self, batch, error):
+        """Urinishlar tugaganda to'plamni dead-letter sink ga o'tkazish"""
+        self.stats['failed'] += len(batch)
+        if self.dead_letter is None:
+            logger.error("'%s' sink: %d ta hodisa yozilmadi: %s", self.sink.name, len(batch), error)
+            return
+        try:
+            self.dead_letter.write([{'sink': self.sink.name, 'error': str(error), 'event': event}
+                                    for event in batch])
+            self.dead_letter.flush()
+        except Exception as e:
+            logger.error("Dead-letter ga yozishda xatolik: %s", e)
+
+    def begin_close(self):
+        """Yangi hodisalarni kutmasdan navbatdagilarni yozishni boshlash"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+
+    def close(self, timeout: float = None, grace: float = 1.0) -> bool:
+        """
+        Navbatni yozib, sink ni yopish
+
+        timeout tugasa (masalan sink ishlamayapti) qayta urinishlar to'xtatiladi va navbatda
+        qolgan hodisalar dead-letter ga yoziladi.
+
+        Args:
+            timeout: Yozib tugatish uchun maksimal kutish (None - cheksiz)
+            grace: Muddat tugagandan keyin thread ni kutish (sekund)
+
+        Returns:
+            True agar navbat muddat ichida yozib tugatilgan bo'lsa
+        """
+        self.begin_close()
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            return True
+        self._abort.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(grace)
+        if self._thread.is_alive():
+            # sink.write o'zi osilib qolgan: navbatdagilar shu yerda dead-letter ga o'tkaziladi
+            logger.error("'%s' sink yopilmadi: yozuv %.1fs da tugamadi", self.sink.name, timeout)
+            self._abandon_queued("Pipeline yopilish muddati tugadi")
+        return False
+
+    def depth(self) -> int:
+        return len(self._events)
+
+
+class EventPipeline:
+    """
+    Hodisalarni bir nechta sink ga to'plab yuboruvchi pipeline
+
+    Har bir sink o'z cheklangan navbati va thread iga ega: sekin sink boshqalarini
+    to'xtatmaydi, lekin navbati to'lganda `submit` bloklanadi (ishlab chiqaruvchilarga
+    backpressure). Yozish xatolarida to'plam eksponensial kutish bilan qayta yuboriladi,
+    urinishlar tugaganda yoki yopilish muddati o'tganda dead-letter ga yoziladi.
+    """
+
+    def __init__(self, sinks: List[Sink], batch_size: int = 500, batch_interval: float = 1.0,
+                 max_queue: int = 10000, max_retries: Optional[int] = 8, retry_backoff: float = 0.5,
+                 dead_letter: Optional[Sink] = None, close_timeout: float = 30.0):
+        """
+        Args:
+            sinks: Sink lar ro'yxati
+            batch_size: To'plamdagi maksimal hodisalar
+            batch_interval: To'plam to'lmasa ham yozish intervali (sekund)
+            max_queue: Har bir sink navbatidagi maksimal hodisalar
+            max_retries: Qayta urinishlar soni (None - cheksiz, faqat yopilish muddatigacha)
+            retry_backoff: Birinchi qayta urinishgacha kutish (sekund, har safar ikki baravar)
+            dead_letter: Urinishlar tugaganda to'plam yoziladigan sink
+            close_timeout: close() da navbatlarni yozib tugatish uchun umumiy muddat (sekund)
+        """
+        self.workers = [
+            _SinkWorker(sink, batch_size, batch_interval, max_queue, max_retries, retry_backoff,
+                        dead_letter)
+            for sink in sinks
+        ]
+        self.close_timeout = close_timeout
+        self.submitted = 0
+        self._closed = False
+
+    def submit(self, events: List[Dict[str, Any]], timeout: float = None) -> bool:
+        """
+        Hodisalarni barcha sink larga yuborish
+
+        Args:
+            events: Hodisalar ro'yxati
+            timeout: Navbat to'la bo'lganda maksimal kutish (None - cheksiz)
+
+        Returns:
+            True agar barcha navbatlarga qo'yilgan bo'lsa, False bo'lsa hech biriga qo'yilmagan
+        """
+        if self._closed:
+            raise RuntimeError("Pipeline yopilgan")
+        if not events:
+            return True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        # Avval barcha navbatlarda joy kutiladi: to'plam yo barcha sink larga, yo hech biriga tushadi
+        if not all(worker.wait_room(len(events), deadline) for worker in self.workers):
+            return False
+        for worker in self.workers:
+            worker.append(events)
+        self.submitted += len(events)
+        return True
+
+    __call__ = submit
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Barcha navbatlar yozilguncha kutish (sink lar bo'sh qolganda flush qilinadi)
+
+        Returns:
+            True agar barcha navbatlar bo'shagan bo'lsa
+        """
+        return all([worker.drain(timeout) for worker in self.workers])
+
+    def close(self, timeout: float = None) -> bool:
+        """
+        Qolgan hodisalarni yozib, sink larni yopish
+
+        Muddat barcha sink lar uchun umumiy: ishlamayotgan sink SIGTERM da daemon ni
+        to'xtatib qo'ymaydi, uning navbatidagi hodisalar dead-letter ga yoziladi.
+
+        Args:
+            timeout: Maksimal kutish (standart - close_timeout)
+
+        Returns:
+            True agar barcha navbatlar muddat ichida yozilgan bo'lsa
+        """
+        self._closed = True
+        timeout = self.close_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        # Hamma sink lar bir vaqtda yopila boshlaydi, keyin har biri umumiy muddatgacha kutiladi
+        for worker in self.workers:
+            worker.begin_close()
+        return all([worker.close(max(0.0, deadline - time.monotonic())) for worker in self.workers])
+
+    def stats(self) -> Dict[str, Any]:
+        """Sink lar bo'yicha statistika"""
+        return {
+            'submitted': self.submitted,
+            'sinks': {worker.sink.name: dict(worker.stats, queued=worker.depth())
+                      for worker in self.workers}
+        }
+
+
+def build_pipeline(config, output_dir: str = 'output', extra_sinks: List[Sink] = None) -> EventPipeline:
+    """
+    Konfiguratsiyadan pipeline yaratish
+
+    SINKS - vergul bilan ajratilgan ro'yxat: jsonl, csv, sqlite, stdout, webhook.
+
+    Args:
+        config: HikVisionConfig obyekti
+        output_dir: Fayl sink lari uchun papka
+        extra_sinks: SINKS dan tashqari qo'shiladigan sink lar (masalan replay o'lchovi)
+
+    Returns:
+        EventPipeline obyekti
+    """
+    sinks = []
+    for name in (item.strip().lower() for item in config.SINKS.split(',')):
+        if not name:
+            continue
+        if name == 'jsonl':
+            sinks.append(JsonLinesSink(os.path.join(output_dir, 'events_{date}.jsonl')))
+        elif name == 'csv':
+            sinks.append(CsvSink(os.path.join(output_dir, 'events_{date}.csv')))
+        elif name == 'sqlite':
+            sinks.append(SQLiteSink(config.SINK_SQLITE_PATH))
+        elif name == 'stdout':
+            sinks.append(StdoutSink())
+        elif name == 'webhook':
+            sinks.append(WebhookSink(config.SINK_WEBHOOK_URL, timeout=config.TIMEOUT))
+        else:
+            raise ValueError(f"Noma'lum sink: {name}")
+    sinks.extend(extra_sinks or [])
+    dead_letter = JsonLinesSink(os.path.join(output_dir, 'dead_letter_{date}.jsonl'))
+    max_retries = config.SINK_MAX_RETRIES if config.SINK_MAX_RETRIES >= 0 else None
+    return EventPipeline(sinks, config.SINK_BATCH_SIZE, config.SINK_BATCH_INTERVAL,
+                         config.SINK_MAX_QUEUE, max_retries, dead_letter=dead_letter,
+                         close_timeout=config.SINK_CLOSE_TIMEOUT)
@@ -0,0 +1,255 @@
+import hashlib
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('hikvision_snapshots_total', 'counter', 'Kadr olish natijalari (saved/unchanged/failed/late)')
+metrics.describe('hikvision_snapshot_bytes_total', 'counter', 'Diskka yozilgan kadrlar hajmi')
+
+# Kadr olish natijalari
+SAVED = 'saved'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+LATE = 'late'
+
+# Kanallarni fazalar bo'yicha tarqatish uchun (oltin kesim ulushi)
+_PHASE_STEP = 0.6180339887
+
+
+def streaming_channel_numbers(streams: List[Dict[str, Any]]) -> List[int]:
+    """
+    Streaming kanallar ro'yxatidan kadr olinadigan kanal raqamlari
+
+    Kadr ISAPI/Streaming/channels/<kanal><oqim>/picture dan olinadi, shuning uchun kanallar
+    video kirishlaridan (NVR da IP kameralar ko'rinmaydi) emas, oqim ID laridan (101, 201 ...)
+    olinadi. O'chirilgan oqimlar tashlanadi, tartib saqlanadi.
+    """
+    numbers = []
+    for stream in streams:
+        if not isinstance(stream, dict) or str(stream.get('enabled', 'true')).lower() == 'false':
+            continue
+        stream_id = str(stream.get('id', ''))
+        if stream_id.isdigit() and int(stream_id) >= 100:
+            channel = int(stream_id) // 100
+            if channel not in numbers:
+                numbers.append(channel)
+    return numbers
+
+
+class SnapshotTarget:
+    """Bitta qurilma kanali: jadval va hisoblagichlar"""
+
+    __slots__ = ('device', 'api', 'channel', 'next_due', 'in_flight', 'digest', 'counts')
+
+    def __init__(self, device: str, api, channel: int, next_due: float):
+        """
+        Args:
+            device: Qurilma nomi
+            api: HikVisionAPI obyekti
+            channel: Kanal raqami
+            next_due: Birinchi kadr vaqti (monotonic)
+        """
+        self.device = device
+        self.api = api
+        self.channel = channel
+        self.next_due = next_due
+        self.in_flight = False
+        self.digest: Optional[str] = None
+        self.counts = {SAVED: 0, UNCHANGED: 0, FAILED: 0, LATE: 0}
+
+
+class SnapshotScheduler:
+    """
+    Barcha qurilmalar kanallaridan davriy JPEG kadrlar olish
+
+    Har bir kanal o'z fazasida (kanallar davr ichida teng tarqatilgan) mutlaq jadval
+    bo'yicha so'raladi: keyingi vaqt oldingi rejadan hisoblanadi, shuning uchun sekin javoblar
+    kechikishni to'plamaydi va erishilgan kadr/daqiqa maqsadga yaqin qoladi. Oldingi kadri hali
+    olinayotgan kanalning navbati o'tkazib yuboriladi (late) - so'rovlar to'planib qolmaydi.
+    Qurilmaga bir vaqtda device_concurrency tadan ko'p kadr so'rovi yuborilmaydi (so'rovlar
+    PRIORITY_BULK da, hodisalar sinxronizatsiyasidan keyin). Kadr diskka oqim bilan yoziladi va
+    hash i oldingi kadr bilan bir xil bo'lsa o'chiriladi.
+    """
+
+    def __init__(self, output_dir: str, frames_per_minute: float = 6.0, device_concurrency: int = 1,
+                 workers: int = 16, chunk_size: int = 65536):
+        """
+        Args:
+            output_dir: Kadrlar papkasi (<qurilma>/ch<kanal>/<vaqt>-<hash>.jpg)
+            frames_per_minute: Har bir kanal uchun maqsad kadr/daqiqa
+            device_concurrency: Bitta qurilmaga bir vaqtdagi kadr so'rovlari
+            workers: Umumiy thread lar soni
+            chunk_size: Diskka yozish bo'lagi (bayt)
+        """
+        self.output_dir = output_dir
+        self.period = 60.0 / frames_per_minute
+        self.device_concurrency = max(1, device_concurrency)
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.targets: List[SnapshotTarget] = []
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started: Optional[float] = None
+
+    def add_device(self, api, channels: List[int] = None, name: str = None) -> List[SnapshotTarget]:
+        """
+        Qurilma kanallarini jadvalga qo'shish
+
+        Args:
+            api: HikVisionAPI obyekti
+            channels: Kanal raqamlari (berilmasa get_streaming_channels dan, bo'sh bo'lsa [1])
+            name: Qurilma nomi (standart - config.name yoki HOST)
+
+        Returns:
+            Qo'shilgan kanallar
+        """
+        name = name or getattr(api.config, 'name', None) or api.config.HOST
+        if channels is None:
+            channels = streaming_channel_numbers(api.get_streaming_channels()) or [1]
+        self._limits.setdefault(name, threading.BoundedSemaphore(self.device_concurrency))
+        now = time.monotonic()
+        added = []
+        for channel in channels:
+            phase = (len(self.targets) * _PHASE_STEP) % 1.0
+            target = SnapshotTarget(name, api, channel, now + phase * self.period)
+            self.targets.append(target)
+            added.append(target)
+        logger.info("Kadr olish: %s, kanallar %s", name, channels)
+        return added
+
+    def _directory(self, target: SnapshotTarget) -> str:
+        device = re.sub(r'[^\w.-]', '_', target.device)
+        return os.path.join(self.output_dir, device, f"ch{target.channel}")
+
+    def capture(self, target: SnapshotTarget) -> str:
+        """
+        Bitta kadrni olish va diskka yozish
+
+        Returns:
+            SAVED, UNCHANGED yoki FAILED
+        """
+        directory = self._directory(target)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+        tmp_path = os.path.join(directory, f".{stamp}.tmp")
+        size = 0
+        try:
+            with self._limits[target.device]:
+                response = target.api.open_snapshot(target.channel)
+                try:
+                    content_type = response.headers.get('Content-Type', '')
+                    if not content_type.startswith('image/'):
+                        raise ValueError(f"Kutilmagan javob turi: {content_type}")
+                    os.makedirs(directory, exist_ok=True)
+                    digest = hashlib.blake2b(digest_size=16)
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_content(self.chunk_size):
+                            digest.update(chunk)
+                            f.write(chunk)
+                            size += len(chunk)
+                finally:
+                    response.close()
+            digest = digest.hexdigest()
+            if digest == target.digest:
+                os.remove(tmp_path)
+                return UNCHANGED
+            # Hash qo'shimchasi: bir millisekunddagi ikki xil kadr bir-birini yozib yubormaydi
+            os.replace(tmp_path, os.path.join(directory, f"{stamp}-{digest[:8]}.jpg"))
+            target.digest = digest
+            if metrics.enabled:
+                metrics.inc('hikvision_snapshot_bytes_total', size, device=target.device)
+            return SAVED
+        except Exception as e:
+            logger.warning("%s ch%s kadri olinmadi: %s", target.device, target.channel, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return FAILED
+
+    def _run_target(self, target: SnapshotTarget):
+        try:
+            self._record(target, self.capture(target))
+        finally:
+            target.in_flight = False
+
+    def _record(self, target: SnapshotTarget, status: str):
+        with self._lock:
+            target.counts[status] += 1
+        if metrics.enabled:
+            metrics.inc('hikvision_snapshots_total', device=target.device, status=status)
+
+    def run(self, duration: float = None) -> Dict[str, Any]:
+        """
+        Jadval bo'yicha kadr olish (stop() gacha yoki duration sekund)
+
+        Returns:
+            stats() natijasi
+        """
+        self._started = time.monotonic()
+        deadline = self._started + duration if duration else None
+        heap = [(target.next_due, index) for index, target in enumerate(self.targets)]
+        heapq.heapify(heap)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='snapshot') as executor:
+            while heap and not self._stop.is_set():
+                due, index = heap[0]
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                wait = due - now if deadline is None else min(due, deadline) - now
+                if wait > 0:
+                    self._stop.wait(wait)
+                    continue
+                heapq.heappop(heap)
+                target = self.targets[index]
+                if target.in_flight:
+                    self._record(target, LATE)
+                else:
+                    target.in_flight = True
+                    executor.submit(self._run_target, target)
+                # Keyingi vaqt rejadan: kechikish to'planmaydi, ortda qolgan navbatlar tashlanadi
+                target.next_due = due + self.period
+                if target.next_due <= now:
+                    skipped = int((now - target.next_due) // self.period) + 1
+                    target.next_due += skipped * self.period
+                    for _ in range(skipped):
+                        self._record(target, LATE)
+                heapq.heappush(heap, (target.next_due, index))
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Qurilmalar va umumiy natijalar, erishilgan kadr/daqiqa (kanal boshiga)"""
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        devices: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for target in self.targets:
+                device = devices.setdefault(target.device, {'channels': 0, **{key: 0 for key in target.counts}})
+                device['channels'] += 1
+                for key, value in target.counts.items():
+                    device[key] += value
+        total = {'channels': 0, SAVED: 0, UNCHANGED: 0, FAILED: 0, LATE: 0}
+        for device in devices.values():
+            for key in total:
+                total[key] += device[key]
+            device['frames_per_minute'] = self._fpm(device, elapsed)
+        total['frames_per_minute'] = self._fpm(total, elapsed)
+        return {'elapsed': elapsed, 'target_frames_per_minute': 60.0 / self.period,
+                'total': total, 'devices': devices}
+
+    @staticmethod
+    def _fpm(counts: Dict[str, Any], elapsed: float) -> float:
+        if not counts['channels'] or elapsed <= 0:
+            return 0.0
+        return (counts[SAVED] + counts[UNCHANGED]) * 60.0 / elapsed / counts['channels']
+
+    def stop(self):
+        """Yangi kadrlarni boshlamaslik (boshlanganlari tugatiladi)"""
+        self._stop.set()
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+
+class _DeviceStatus:
+    """Bitta qurilmaning xotiradagi holati (wall-clock epoch vaqtlar)"""
+
+    __slots__ = ('last_response', 'last_success', 'last_error', 'last_error_at', 'failures',
+                 'synced_until', 'last_sync', 'jobs')
+
+    def __init__(self):
+        self.last_response: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+        self.failures = 0
+        self.synced_until: Optional[float] = None
+        self.last_sync: Optional[float] = None
+        self.jobs: Dict[str, float] = {}
+
+
+class StatusRegistry:
+    """
+    Qurilmalar holati registri (so'rovlar, sinxronizatsiya va keshlar yangilanishi)
+
+    Holat so'rovlar va vazifalar bajarilayotganda yoziladi (dict ga bir yozuv), o'qishda esa
+    qurilmaga hech qanday so'rov yuborilmaydi. Render natijasi qisqa muddat keshlanadi,
+    shuning uchun har sekund scrape qiladigan bir nechta load balancer ham arzon.
+    """
+
+    def __init__(self, stale_after: float = 300.0, cache_ttl: float = 0.5):
+        """
+        Args:
+            stale_after: Oxirgi muvaffaqiyatli so'rovdan shuncha vaqt o'tsa qurilma sog'lom emas (sekund)
+            cache_ttl: Render natijasini keshlash vaqti (sekund)
+        """
+        self.stale_after = stale_after
+        self.cache_ttl = cache_ttl
+        self.started = time.time()
+        self._devices: Dict[str, _DeviceStatus] = {}
+        self._lock = threading.Lock()
+        self._cache: Optional[tuple] = None
+
+    def _device(self, device: str) -> _DeviceStatus:
+        state = self._devices.get(device)
+        if state is None:
+            state = self._devices[device] = _DeviceStatus()
+        return state
+
+    def record_request(self, device: str, status_code: Optional[int], error: str = None):
+        """
+        So'rov natijasini yozish
+
+        Args:
+            device: Qurilma nomi
+            status_code: HTTP status (ulanish xatosida None)
+            error: Xato matni
+        """
+        now = time.time()
+        with self._lock:
+            state = self._device(device)
+            if status_code is not None:
+                state.last_response = now
+            if status_code is not None and status_code < 400:
+                state.last_success = now
+                state.failures = 0
+            else:
+                state.failures += 1
+                state.last_error = error or (f"HTTP {status_code}" if status_code is not None else "Ulanish xatosi")
+                state.last_error_at = now
+
+    def record_sync(self, device: str, synced_until: float):
+        """Hodisalar sinxronizatsiyasi shu vaqtgacha (epoch) yetdi"""
+        with self._lock:
+            state = self._device(device)
+            state.synced_until = synced_until
+            state.last_sync = time.time()
+
+    def record_job(self, device: str, job: str):
+        """Vazifa (kesh yangilanishi) muvaffaqiyatli tugadi"""
+        with self._lock:
+            self._device(device).jobs[job] = time.time()
+
+    def remove(self, device: str):
+        """Qurilmani registrdan olib tashlash (inventardan o'chirilganda)"""
+        with self._lock:
+            self._devices.pop(device, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Qurilmalar holati
+
+        Returns:
+            {'time', 'uptime', 'devices': {nom: {...}}, 'summary': {...}}
+        """
+        now = time.time()
+        age = lambda value: None if value is None else round(now - value, 3)
+        devices = {}
+        healthy = 0
+        with self._lock:
+            items = list(self._devices.items())
+            for name, state in items:
+                success_age = age(state.last_success)
+                ok = success_age is not None and success_age <= self.stale_after
+                healthy += ok
+                devices[name] = {
+                    'healthy': ok,
+                    'reachable': state.last_response is not None and (
+                        state.last_error_at is None or state.last_response >= state.last_error_at),
+                    'last_success_age': success_age,
+                    'consecutive_failures': state.failures,
+                    'last_error': state.last_error,
+                    'last_error_age': age(state.last_error_at),
+                    'last_sync_age': age(state.last_sync),
+                    'event_lag': age(state.synced_until),
+                    'cache_age': {job: age(at) for job, at in state.jobs.items()},
+                }
+        return {'time': now, 'uptime': round(now - self.started, 3), 'devices': devices,
+                'summary': {'devices': len(devices), 'healthy': healthy}}
+
+    def render(self) -> bytes:
+        """snapshot() JSON ko'rinishida (cache_ttl davomida keshlangan)"""
+        now = time.monotonic()
+        cache = self._cache
+        if cache is not None and now - cache[0] < self.cache_ttl:
+            return cache[1]
+        body = json.dumps(self.snapshot(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._cache = (now, body)
+        return body
+
+    def healthy(self) -> bool:
+        """Collector sog'lommi: qurilmalar yo'q yoki kamida bittasi sog'lom"""
+        now = time.time()
+        with self._lock:
+            states = list(self._devices.values())
+        return not states or any(state.last_success is not None and now - state.last_success <= self.stale_after
+                                 for state in states)
+
+
+# Jarayon bo'yicha umumiy registr (HikVisionAPI va daemon yangilaydi)
+status = StatusRegistry()
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    """`/status` va `/health` endpointlari uchun HTTP handler"""
+
+    registry: StatusRegistry = status
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/status', '/'):
+            self._send(200, self.registry.render())
+        elif path == '/health':
+            ok = self.registry.healthy()
+            self._send(200 if ok else 503, b'{"status":"ok"}' if ok else b'{"status":"unhealthy"}')
+        else:
+            self.send_error(404)
+
+    def _send(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Har sekunddagi scrape larni log qilmaymiz
+        pass
+
+
+def start_status_server(port: int, host: str = '0.0.0.0', registry: StatusRegistry = None) -> ThreadingHTTPServer:
+    """
+    Holat endpointlarini fon thread ida ishga tushirish
+
+    `/status` - qurilmalar bo'yicha JSON, `/health` - load balancer uchun 200/503.
+
+    Args:
+        port: Tinglanadigan port (0 - ixtiyoriy bo'sh port)
+        host: Tinglanadigan manzil
+        registry: StatusRegistry obyekti (standart - umumiy registr)
+
+    Returns:
+        Ishlayotgan server (to'xtatish uchun `server.shutdown()`)
+    """
+    handler = type('StatusHandler', (_StatusHandler,), {'registry': registry or status})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='status-server', daemon=True)
+    thread.start()
+    return server
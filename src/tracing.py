@@ -0,0 +1,255 @@
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import uuid
+from typing import Dict, List, Any, Optional
+
+_logging_configured = False
+_logging_lock = threading.Lock()
+
+
+def configure_logging(debug: bool = False):
+    """
+    Logging ni jarayon uchun bir marta sozlash
+
+    Avval har bir HikVisionAPI obyekti `logging.basicConfig` ni chaqirar edi. Endi sozlash
+    faqat birinchi chaqiruvda bajariladi, keyingilari arzon no-op.
+
+    Args:
+        debug: True bo'lsa DEBUG darajasi, aks holda INFO
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    with _logging_lock:
+        if _logging_configured:
+            return
+        logging.basicConfig(
+            level=logging.DEBUG if debug else logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        _logging_configured = True
+
+
+def sampled(rate: float) -> bool:
+    """
+    Namunalash qarori
+
+    Args:
+        rate: Ulush (0.0 - 1.0)
+
+    Returns:
+        True agar hodisa namunaga tushsa
+    """
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def new_span_id() -> str:
+    """Yangi span ID si (span yozilishidan oldin bolalarga berish uchun)"""
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    """Bitta trace oralig'i (request, auth, transfer, parse ...)"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start', 'duration', 'attrs')
+
+    def __init__(self, trace_id: str, name: str, start: float, duration: float = 0.0,
+                 parent_id: str = None, attrs: Dict[str, Any] = None, span_id: str = None):
+        self.trace_id = trace_id
+        self.span_id = span_id or new_span_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.attrs = attrs or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Span ni JSON uchun dictionary ga aylantirish"""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attrs': self.attrs
+        }
+
+
+class JsonLinesExporter:
+    """Span larni JSON lines faylga yozuvchi exporter"""
+
+    def __init__(self, path: str, flush_every: int = 100):
+        """
+        Args:
+            path: Fayl yo'li (qo'shib yoziladi)
+            flush_every: Nechta span dan keyin diskka yozish
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        """Span larni buferga qo'shish"""
+        lines = [json.dumps(span.to_dict(), ensure_ascii=False) for span in spans]
+        with self._lock:
+            self._buffer.extend(lines)
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        """Buferdagi span larni faylga yozish"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(self._buffer) + '\n')
+        self._buffer.clear()
+
+
+class MemoryExporter:
+    """Span larni xotirada saqlovchi exporter (testlar va debug uchun)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]):
+        self.spans.extend(spans)
+
+    def flush(self):
+        pass
+
+
+class Tracer:
+    """Namunalangan (sampled) so'rov trace lari"""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 1.0, exporter=None):
+        """
+        Args:
+            enabled: Trace lar yig'ilsinmi
+            sample_rate: Trace qilinadigan so'rovlar ulushi (0.0 - 1.0)
+            exporter: export(spans) va flush() metodlari bor obyekt
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._atexit_registered = False
+
+    def configure(self, enabled: bool = True, sample_rate: float = None, path: str = None,
+                  exporter=None):
+        """
+        Tracer ni qayta sozlash
+
+        Args:
+            enabled: Trace lar yig'ilsinmi
+            sample_rate: Namunalash ulushi
+            path: JSON lines fayl yo'li
+            exporter: Tayyor exporter (path dan ustun)
+        """
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if exporter is not None:
+            self.exporter = exporter
+        elif path:
+            self.exporter = JsonLinesExporter(path)
+        self.enabled = enabled and self.exporter is not None
+        if self.enabled and not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def sample(self) -> bool:
+        """Joriy so'rov namunaga tushadimi"""
+        return sampled(self.sample_rate)
+
+    def start_trace(self) -> Optional[str]:
+        """
+        Yangi trace ochish
+
+        Returns:
+            trace_id yoki None (tracer o'chirilgan yoki namunaga tushmagan bo'lsa)
+        """
+        if not self.enabled or not self.sample():
+            return None
+        return uuid.uuid4().hex
+
+    def record(self, trace_id: str, name: str, start: float, duration: float,
+               parent_id: str = None, **attrs) -> Span:
+        """
+        Tugagan span ni yozish
+
+        Args:
+            trace_id: Trace ID
+            name: Span nomi
+            start: Boshlanish vaqti (epoch sekund)
+            duration: Davomiylik (sekund)
+            parent_id: Ota span ID si
+
+        Returns:
+            Yozilgan Span
+        """
+        span = Span(trace_id, name, start, duration, parent_id, attrs)
+        self.exporter.export([span])
+        return span
+
+    def record_request(self, trace_id: str, start: float, duration: float,
+                       response=None, headers_after: float = None, span_id: str = None,
+                       **attrs) -> Span:
+        """
+        HTTP so'rov span larini yozish: request, auth, wait, transfer
+
+        `auth` - digest 401 challenge javoblari vaqti, `wait` - undan keyin yakuniy javob
+        sarlavhalari kelguncha, `transfer` - qolgan vaqt (tana o'qilishi; stream javobda
+        javob yopilguncha).
+
+        Args:
+            trace_id: Trace ID
+            start: So'rov boshlangan vaqt (epoch sekund)
+            duration: To'liq davomiylik (sekund)
+            response: requests.Response obyekti (ulanish xatosida None)
+            headers_after: Boshlanishdan yakuniy javob sarlavhalarigacha (sekund, response hook
+                o'lchaydi). Berilmasa response.elapsed ishlatiladi - digest auth takrorlagan
+                so'rovda u 0 bo'ladi
+            span_id: Oldindan berilgan `request` span ID si
+
+        Returns:
+            Asosiy `request` span (parse span uchun ota sifatida ishlatiladi)
+        """
+        root = Span(trace_id, 'request', start, duration, None, attrs, span_id)
+        spans = [root]
+        if response is not None:
+            # 401 javobi uchun elapsed ni session.send o'lchaydi (auth hook undan keyin ishlaydi)
+            auth = sum((r.elapsed.total_seconds() for r in response.history if r.status_code == 401), 0.0)
+            if headers_after is not None:
+                wait = max(headers_after - auth, 0.0)
+                transfer = max(duration - headers_after, 0.0)
+            else:
+                wait = response.elapsed.total_seconds() if response.elapsed else 0.0
+                transfer = max(duration - auth - wait, 0.0)
+            offset = start
+            if auth:
+                spans.append(Span(trace_id, 'auth', offset, auth, root.span_id))
+                offset += auth
+            spans.append(Span(trace_id, 'wait', offset, wait, root.span_id))
+            spans.append(Span(trace_id, 'transfer', offset + wait, transfer, root.span_id))
+        self.exporter.export(spans)
+        return root
+
+    def flush(self):
+        """Exporter buferini diskka yozish"""
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+# Jarayon bo'yicha umumiy tracer (standart holatda o'chirilgan)
+tracer = Tracer()
@@ -0,0 +1,154 @@
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List, Any, Sequence, Union
+
+
+# ISAPI XML hujjatlari namespace i
+ISAPI_NAMESPACE = 'http://www.hikvision.com/ver20/XMLSchema'
+
+
+def local_name(tag: str) -> str:
+    """
+    XML teg nomidan namespace ni olib tashlash
+
+    ISAPI javoblari `xmlns="http://www.hikvision.com/ver20/XMLSchema"` bilan keladi,
+    ElementTree esa teglarni "{namespace}nom" ko'rinishida qaytaradi.
+
+    Args:
+        tag: Element tegi
+
+    Returns:
+        Namespace siz nom
+    """
+    if tag[:1] == '{':
+        return tag[tag.index('}') + 1:]
+    return tag
+
+
+def xml_to_dict(element: ET.Element) -> Union[Dict[str, Any], str]:
+    """
+    XML elementni dictionary ga aylantirish
+
+    Faqat matndan iborat element satr sifatida qaytadi, takrorlangan bolalar ro'yxatga
+    yig'iladi, teglar namespace siz yoziladi.
+
+    Args:
+        element: XML elementi
+
+    Returns:
+        Dictionary (yoki bolasiz element uchun satr)
+    """
+    result = {}
+
+    # Atributlarni qo'shish
+    if element.attrib:
+        result.update(element.attrib)
+
+    # Matnni qo'shish
+    text = element.text
+    if text and text.strip():
+        if len(element) == 0:
+            return text.strip()
+        result['text'] = text.strip()
+
+    # Bolalarni qo'shish
+    for child in element:
+        tag = local_name(child.tag)
+        child_data = xml_to_dict(child)
+        if tag in result:
+            existing = result[tag]
+            if not isinstance(existing, list):
+                result[tag] = [existing, child_data]
+            else:
+                existing.append(child_data)
+        else:
+            result[tag] = child_data
+
+    return result
+
+
+def dict_to_xml(tag: str, data: Union[Dict[str, Any], str], attrib: Dict[str, str] = None,
+                namespace: str = ISAPI_NAMESPACE) -> bytes:
+    """
+    xml_to_dict natijasini qaytadan XML ga aylantirish (PUT so'rovlari uchun)
+
+    Ro'yxatlar takrorlangan elementlarga, 'text' kaliti element matniga aylanadi. Ichki
+    elementlarning atributlari xml_to_dict da bolalar bilan aralashgani sababli ular ham
+    bola element sifatida yoziladi; ildiz atributlari `attrib` orqali beriladi.
+
+    Args:
+        tag: Ildiz element nomi
+        data: Ildiz mazmuni
+        attrib: Ildiz atributlari (masalan {'version': '2.0'})
+        namespace: xmlns (bo'sh satr - namespace siz)
+
+    Returns:
+        UTF-8 XML hujjat
+    """
+    root = ET.Element(tag, dict(attrib or {}))
+    if namespace:
+        root.set('xmlns', namespace)
+    _fill_element(root, data)
+    return ET.tostring(root, encoding='UTF-8', xml_declaration=True)
+
+
+def _fill_element(element: ET.Element, data: Any):
+    if not isinstance(data, dict):
+        element.text = _xml_text(data)
+        return
+    for key, value in data.items():
+        if key == 'text':
+            element.text = _xml_text(value)
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            _fill_element(ET.SubElement(element, key), item)
+
+
+def _xml_text(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return '' if value is None else str(value)
+
+
+def iter_records(chunks: Iterable[bytes], tags: Sequence[str]) -> Iterator[Union[Dict[str, Any], str]]:
+    """
+    XML oqimidan yozuvlarni bittadan qaytarish (butun hujjat xotiraga olinmaydi)
+
+    Baytlar kelishi bilan XMLPullParser ga beriladi. Ildizdan pastdagi birinchi tugagan
+    `tags` dagi element yozuv darajasi deb olinadi (bunday element bo'lmasa - ildizning
+    o'zi). Har bir yozuv dict ga aylantirilgach daraxtdan olib tashlanadi, shuning uchun
+    xotira bitta yozuv hajmida qoladi.
+
+    Args:
+        chunks: Bayt bo'laklari (masalan response.iter_content())
+        tags: Yozuv elementlari nomlari (namespace siz), masalan ('UserInfo',)
+
+    Returns:
+        Yozuvlar iteratori
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack: List[ET.Element] = []
+    record_level = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == 'start':
+                stack.append(element)
+                continue
+            stack.pop()
+            tag = local_name(element.tag)
+            if not stack:
+                # Bitta yozuvli javob: ildizning o'zi yozuv
+                if record_level is None and tag in tags:
+                    yield xml_to_dict(element)
+                continue
+            if record_level is None:
+                if tag in tags:
+                    record_level = (tag, len(stack))
+                else:
+                    continue
+            if (tag, len(stack)) != record_level:
+                continue
+            record = xml_to_dict(element)
+            stack[-1].remove(element)
+            yield record
+    parser.close()
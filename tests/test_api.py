@@ -1,6 +1,9 @@
 import unittest
 import sys
 import os
+from unittest import mock
+
+import requests
 
 # Loyiha yo'lini qo'shish
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -67,6 +70,21 @@ class TestHikVisionAPI(unittest.TestCase):
         """Autentifikatsiya sozlashni test qilish"""
         from requests.auth import HTTPDigestAuth
         self.assertIsInstance(self.api.session.auth, HTTPDigestAuth)
+    
+    def test_get_channels_from_video_input_list(self):
+        """VideoInputChannelList ildizi olib tashlangan javobdan kanallar ro'yxati"""
+        response = requests.Response()
+        response.status_code = 200
+        body = (b'<VideoInputChannelList version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+                b'<VideoInputChannel><id>1</id><name>Kirish</name></VideoInputChannel>%s'
+                b'</VideoInputChannelList>')
+        response._content = body % b'<VideoInputChannel><id>2</id><name>Ombor</name></VideoInputChannel>'
+        with mock.patch.object(self.api.session, 'request', return_value=response):
+            self.assertEqual([channel['id'] for channel in self.api.get_channels()], ['1', '2'])
+        # Bitta kanal - dict emas, ro'yxat qaytishi kerak
+        response._content = body % b''
+        with mock.patch.object(self.api.session, 'request', return_value=response):
+            self.assertEqual(self.api.get_channels(), [{'id': '1', 'name': 'Kirish'}])
 
 class TestHikVisionParser(unittest.TestCase):
     """HikVision Parser testlari"""
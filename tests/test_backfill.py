@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import bisect
+import tempfile
+import threading
+from datetime import datetime
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backfill import Backfill, merge_ranges, subtract_ranges
+from src.config import HikVisionConfig
+
+DAY = 86400
+START = 1704067200  # 2024-01-01 00:00 UTC
+
+
+class FakeArchive:
+    """Hodisalar arxivi: 08:00-09:00 zich, qolgan vaqt siyrak; javob maxResults va qurilma chegarasi bilan kesiladi"""
+
+    def __init__(self, days=3, max_results=100, fail_after=None):
+        self.config = HikVisionConfig()
+        self.times = []
+        for day in range(days):
+            base = START + day * DAY
+            self.times.extend(base + second for second in range(0, DAY, 1800))
+            self.times.extend(base + 8 * 3600 + second for second in range(0, 3600, 10))
+        self.times.sort()
+        self.max_results = max_results
+        self.fail_after = fail_after
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def search_access_control_events(self, start_time, end_time, max_results=None, priority=None):
+        start = int(datetime.fromisoformat(start_time).timestamp())
+        end = int(datetime.fromisoformat(end_time).timestamp())
+        with self._lock:
+            self.requests.append((start, end, priority))
+            if self.fail_after is not None and len(self.requests) > self.fail_after:
+                raise ConnectionError('uzildi')
+        lo, hi = bisect.bisect_left(self.times, start), bisect.bisect_right(self.times, end)
+        limit = min(self.max_results, max_results or self.max_results)
+        matches = self.times[lo:hi]
+        return [{'serialNo': t, 'time': t} for t in matches[:limit]], len(matches) > limit
+
+
+class TestBackfill(unittest.TestCase):
+    """Tarixiy hodisalarni bo'laklab yuklash testlari"""
+
+    def setUp(self):
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'backfill.json')
+
+    def test_ranges(self):
+        """Bajarilgan oraliqlarni birlashtirish va ayirish"""
+        self.assertEqual(merge_ranges([[5, 7], [0, 2], [2, 4]]), [[0, 4], [5, 7]])
+        self.assertEqual(subtract_ranges(0, 10, [[0, 4], [5, 7]]), [(4, 5), (7, 10)])
+
+    def test_dense_hours_are_split(self):
+        """Zich soat bo'linib, barcha hodisalar bir martadan olinishi kerak"""
+        archive = FakeArchive()
+        received = []
+        report = Backfill(archive, START, START + 3 * DAY, received.extend, self.checkpoint,
+                          shard_seconds=6 * 3600, max_results=100, concurrency=4).run()
+
+        self.assertTrue(report['complete'])
+        self.assertGreater(report['splits'], 0)
+        self.assertEqual(sorted(event['serialNo'] for event in received), archive.times)
+        self.assertEqual(report['events'], len(archive.times))
+        self.assertTrue(all(priority is not None for _, _, priority in archive.requests))
+
+    def test_device_cap_below_max_results_is_detected(self):
+        """Qurilma chegarasi max_results dan kichik bo'lsa ham kesilgan bo'laklar bo'linishi kerak"""
+        archive = FakeArchive(max_results=20)
+        received = []
+        report = Backfill(archive, START, START + DAY, received.extend, self.checkpoint,
+                          shard_seconds=6 * 3600, max_results=1000, concurrency=2).run()
+
+        self.assertTrue(report['complete'])
+        self.assertGreater(report['splits'], 0)
+        self.assertEqual(sorted(event['serialNo'] for event in received),
+                         [t for t in archive.times if t < START + DAY])
+
+    def test_resume_from_checkpoint(self):
+        """Uzilgan backfill faqat qolgan oraliqlarni o'qishi kerak"""
+        received = []
+        first = Backfill(FakeArchive(fail_after=3), START, START + 3 * DAY, received.extend, self.checkpoint,
+                         shard_seconds=6 * 3600, max_results=100, concurrency=1, retries=0).run()
+        self.assertFalse(first['complete'])
+        done = sum(end - start for start, end in Backfill(FakeArchive(), START, START + 3 * DAY, None,
+                                                           self.checkpoint).done)
+        self.assertGreater(done, 0)
+
+        archive = FakeArchive()
+        second = Backfill(archive, START, START + 3 * DAY, received.extend, self.checkpoint,
+                          shard_seconds=6 * 3600, max_results=100, concurrency=2).run()
+        self.assertTrue(second['complete'])
+        self.assertEqual(sorted(event['serialNo'] for event in received), archive.times)
+        self.assertTrue(all(start >= START + done for start, _, _ in archive.requests[:1]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_index import CardIndex
+
+USERS = [{'employeeNo': '1001', 'name': 'Ali'}, {'employeeNo': '1002', 'name': 'Vali'},
+         {'employeeNo': '2001', 'name': 'Soli'}]
+CARDS = [{'cardNo': '0012345', 'employeeNo': '1001'}, {'cardNo': '0012399', 'employeeNo': '1001'},
+         {'cardNo': '0099000', 'employeeNo': '2001'}]
+
+
+class TestCardIndex(unittest.TestCase):
+    """Karta/foydalanuvchi indeksi testlari"""
+
+    def setUp(self):
+        self.index = CardIndex()
+        self.index.update(USERS, CARDS)
+
+    def test_lookups(self):
+        """Raqam bo'yicha qidiruv va karta -> shaxs bog'lanishi"""
+        self.assertEqual(self.index.user('1002')['name'], 'Vali')
+        self.assertEqual(self.index.person_for_card('0099000')['name'], 'Soli')
+        self.assertEqual([card['cardNo'] for card in self.index.cards_for('1001')], ['0012345', '0012399'])
+        self.assertIsNone(self.index.card('404'))
+        self.assertEqual([card['cardNo'] for card in self.index.search_cards('0012')], ['0012345', '0012399'])
+        self.assertEqual([user['employeeNo'] for user in self.index.search_users('100', limit=1)], ['1001'])
+
+    def test_incremental_update(self):
+        """Faqat farqlar qo'llanishi va bog'lanishlar yangilanishi kerak"""
+        kept = self.index.user('1002')
+        counts = self.index.update(
+            [USERS[0], dict(USERS[1]), {'employeeNo': '3001', 'name': 'Gani'}],
+            [CARDS[0], {'cardNo': '0012399', 'employeeNo': '3001'}])
+
+        self.assertEqual(counts, {'added': 1, 'removed': 2, 'changed': 1})
+        self.assertIs(self.index.user('1002'), kept)
+        self.assertIsNone(self.index.user('2001'))
+        self.assertEqual(self.index.person_for_card('0012399')['name'], 'Gani')
+        self.assertEqual([card['cardNo'] for card in self.index.cards_for('1001')], ['0012345'])
+        self.assertEqual(self.index.cards_for('2001'), [])
+        self.assertEqual(self.index.search_users('3'), [{'employeeNo': '3001', 'name': 'Gani'}])
+
+    def test_snapshot_roundtrip(self):
+        """Snapshot dan yuklangan indeks bir xil javob berishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'card_index.snapshot')
+        self.index.save(path)
+        warm = CardIndex(state_path=path)
+
+        self.assertEqual(warm.stats()['users'], 3)
+        self.assertEqual(warm.person_for_card('0012345')['name'], 'Ali')
+        self.assertEqual(len(warm.cards_for('1001')), 2)
+
+    def test_refresh_failure_keeps_index(self):
+        """Qurilmadan o'qish xatosi mavjud yozuvlarni o'chirmasligi kerak"""
+        api = mock.Mock()
+        api.iter_user_info.return_value = iter(USERS)
+        api.iter_card_info.side_effect = ConnectionError('uzildi')
+        self.index.api = api
+        with self.assertRaises(ConnectionError):
+            self.index.refresh()
+        self.assertEqual(self.index.stats()['cards'], 3)
+
+    def test_refresh_streams_and_swaps_atomically(self):
+        """Refresh oqimni ro'yxatga yig'masligi, o'qish davomida eski indeks ko'rinishi kerak"""
+        seen_during_read = []
+
+        def cards():
+            yield {'cardNo': '0012345', 'employeeNo': '1001'}
+            # O'qish hali tugamagan: qidiruvlar eski to'liq indeksni ko'radi
+            seen_during_read.append((self.index.stats()['cards'], self.index.person_for_card('0099000')['name']))
+            yield {'cardNo': '0077000', 'employeeNo': '1002'}
+
+        api = mock.Mock()
+        api.iter_user_info.return_value = iter(USERS)
+        api.iter_card_info.return_value = cards()
+        self.index.api = api
+        counts = self.index.refresh()
+
+        self.assertEqual(seen_during_read, [(3, 'Soli')])
+        self.assertEqual(counts, {'added': 1, 'removed': 2, 'changed': 0})
+        self.assertEqual(self.index.person_for_card('0077000')['name'], 'Vali')
+        self.assertEqual([card['cardNo'] for card in self.index.cards_for('1001')], ['0012345'])
+        self.assertEqual(self.index.search_cards('00'), [self.index.card('0012345'), self.index.card('0077000')])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import time
+from datetime import datetime
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from src.clock import ClockSkewTracker, DeviceClock, normalize_timestamps, parse_iso_epoch
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+
+
+class TestTimestampParsing(unittest.TestCase):
+    """Tezkor ISO vaqt parsing testlari"""
+
+    def test_matches_datetime(self):
+        """Natija datetime.fromisoformat bilan bir xil bo'lishi kerak"""
+        for value in ('2024-01-01T08:00:00+05:00', '2024-02-29T23:59:59Z',
+                      '2023-12-31T19:30:15.123-03:30', '2024-06-01 00:00:00+0000'):
+            expected = int(datetime.fromisoformat(value.replace('Z', '+00:00')
+                                                  .replace('+0000', '+00:00')).timestamp())
+            self.assertEqual(parse_iso_epoch(value), expected, value)
+
+    def test_naive_and_invalid(self):
+        """Zonasiz vaqt default_offset bilan, noto'g'ri satr None bilan qaytishi kerak"""
+        self.assertEqual(parse_iso_epoch('1970-01-01T05:00:00', default_offset=5 * 3600), 0)
+        self.assertIsNone(parse_iso_epoch('yesterday'))
+        self.assertIsNone(parse_iso_epoch('2024-01-01Txx:00:00'))
+
+    def test_normalize_applies_skew(self):
+        """Qurilma soati farqi ayirilishi, vaqtsiz hodisalar o'tkazib yuborilishi kerak"""
+        events = [{'time': '2024-01-01T08:00:30+05:00'}, {'serialNo': '2'}]
+        count = normalize_timestamps(events, DeviceClock(30.2, 18000, time.monotonic()))
+
+        self.assertEqual(count, 1)
+        self.assertEqual(events[0]['timestamp'], 1704078000)
+        self.assertNotIn('timestamp', events[1])
+
+
+class TestClockSkewTracker(unittest.TestCase):
+    """Qurilma soati farqi testlari"""
+
+    def setUp(self):
+        self.api = HikVisionAPI(HikVisionConfig())
+        self.tracker = ClockSkewTracker(ttl=60)
+
+    def respond(self, content, headers=None):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content
+        response.headers.update(headers or {})
+        return mock.patch.object(self.api.session, 'request', return_value=response)
+
+    def test_skew_from_local_time(self):
+        """localTime dan farq va zona o'lchanishi, keshda saqlanishi kerak"""
+        device_now = datetime.fromtimestamp(time.time() + 120).astimezone()
+        body = f"<Time><localTime>{device_now.isoformat(timespec='seconds')}</localTime></Time>"
+        with self.respond(body.encode()):
+            clock = self.tracker.refresh(self.api)
+
+        self.assertAlmostEqual(clock.skew, 120, delta=1.5)
+        self.assertEqual(clock.utc_offset, device_now.utcoffset().total_seconds())
+        self.assertIs(self.tracker.get(self.api.config.HOST), clock)
+
+    def test_skew_from_date_header(self):
+        """localTime bo'lmasa Date sarlavhasidan foydalanilishi kerak"""
+        date = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() - 300))
+        with self.respond(b"<Time><timeMode>NTP</timeMode></Time>", {'Date': date}):
+            clock = self.tracker.refresh(self.api)
+
+        self.assertAlmostEqual(clock.skew, -300, delta=1.5)
+        self.assertIsNone(clock.utc_offset)
+
+    def test_ttl_expiry(self):
+        """Muddati o'tgan o'lchov qaytarilmasligi kerak"""
+        self.tracker.record('dev', time.time(), time.time(), time.time())
+        self.assertIsNotNone(self.tracker.get('dev'))
+        with mock.patch('src.clock.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(self.tracker.get('dev'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
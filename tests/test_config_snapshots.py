@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import copy
+import tempfile
+from unittest import mock
+
+import requests
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.config_snapshots import ConfigStore, diff_config, enforce, format_path
+from src.hikvision_api import HikVisionAPI
+
+TIME = {'root': 'Time', 'attrib': {'version': '2.0'},
+        'data': {'timeMode': 'NTP', 'localTime': '2024-01-01T10:00:00+05:00', 'timeZone': 'CST-5:00:00'}}
+NETWORK = {'root': 'NetworkInterfaceList', 'attrib': {},
+           'data': {'NetworkInterface': [{'id': '1', 'IPAddress': {'ipAddress': '10.0.0.5'}},
+                                         {'id': '2', 'IPAddress': {'ipAddress': '10.0.1.5'}}]}}
+
+
+class FakeDevice:
+    """Bo'limlarni xotirada saqlaydigan soxta API"""
+
+    def __init__(self, host, time=None):
+        self.config = HikVisionConfig()
+        self.config.HOST = host
+        config = self.config
+        self.sections = {config.API_TIME_CONFIG: copy.deepcopy(time or TIME),
+                         config.API_NETWORK_CONFIG: copy.deepcopy(NETWORK)}
+        self.reads, self.writes = 0, []
+
+    def get_config_section(self, endpoint):
+        self.reads += 1
+        if endpoint not in self.sections:
+            raise requests.HTTPError('404 Client Error')
+        return copy.deepcopy(self.sections[endpoint])
+
+    def put_config_section(self, endpoint, section):
+        self.writes.append(endpoint)
+        self.sections[endpoint] = copy.deepcopy(section)
+
+
+class TestConfigSnapshots(unittest.TestCase):
+    """Sozlamalar snapshot lari testlari"""
+
+    def setUp(self):
+        self.store = ConfigStore(tempfile.mkdtemp())
+
+    def test_identical_configs_share_objects(self):
+        """Bir xil sozlamalar bitta obyektda, o'zgarmagan qayta o'qish yangi versiya emas"""
+        first = self.store.capture(FakeDevice('10.0.0.1'))
+        other = FakeDevice('10.0.0.2')
+        other.sections[other.config.API_TIME_CONFIG]['data']['localTime'] = '2024-02-02T00:00:00+05:00'
+        second = self.store.capture(other)
+        self.store.capture(FakeDevice('10.0.0.1'))
+
+        self.assertEqual(first['sections'], second['sections'])
+        self.assertIn('capabilities', first['errors'])
+        self.assertEqual(len(self.store.history('10.0.0.1')), 1)
+        objects = os.path.join(self.store.root, 'objects')
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(objects)), 2)
+
+    def test_structural_diff(self):
+        """Versiyalar farqi yo'l bo'yicha chiqishi kerak"""
+        device = FakeDevice('10.0.0.1')
+        old = self.store.capture(device)
+        device.sections[device.config.API_NETWORK_CONFIG]['data']['NetworkInterface'][1]['IPAddress'] = \
+            {'ipAddress': '10.0.1.9'}
+        new = self.store.capture(device)
+
+        diff = self.store.diff(old, new)
+        self.assertEqual(list(diff), ['network'])
+        self.assertEqual([(format_path(c['path']), c['old'], c['new']) for c in diff['network']],
+                         [('NetworkInterface[1].IPAddress.ipAddress', '10.0.1.5', '10.0.1.9')])
+        self.assertEqual(diff_config({'a': 1}, {'b': 1})[0]['op'], 'removed')
+
+    def test_enforce_writes_only_drift(self):
+        """Drift bo'lmasa faqat o'qish, bo'lsa faqat farq qilgan bo'lim yozilishi kerak"""
+        desired = self.store.load(self.store.capture(FakeDevice('golden')))
+        clean = FakeDevice('10.0.0.1')
+        report = enforce(clean, desired)
+        self.assertEqual(clean.writes, [])
+        self.assertFalse(any(result['changes'] for result in report.values()))
+
+        drifted = FakeDevice('10.0.0.2', time=dict(TIME, data=dict(TIME['data'], timeZone='CST+0:00:00',
+                                                                    extra='firmware')))
+        self.assertEqual(enforce(drifted, desired, dry_run=True)['time']['written'], False)
+        self.assertEqual(drifted.writes, [])
+        report = enforce(drifted, desired)
+        self.assertEqual(drifted.writes, [drifted.config.API_TIME_CONFIG])
+        written = drifted.sections[drifted.config.API_TIME_CONFIG]
+        self.assertEqual(written['data']['timeZone'], 'CST-5:00:00')
+        self.assertEqual(written['data']['extra'], 'firmware')
+        self.assertEqual(written['attrib'], {'version': '2.0'})
+        # O'qilgan paytdagi localTime qaytarib yozilmaydi (manual rejimda soatni orqaga suradi)
+        self.assertNotIn('localTime', written['data'])
+
+    def test_api_section_roundtrip(self):
+        """get_config_section ildizni saqlashi, put_config_section XML yuborishi kerak"""
+        api = HikVisionAPI(HikVisionConfig())
+        response = requests.Response()
+        response.status_code = 200
+        response._content = (b'<Time version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+                             b'<timeMode>NTP</timeMode></Time>')
+        with mock.patch.object(api.session, 'request', return_value=response) as request:
+            section = api.get_config_section(api.config.API_TIME_CONFIG)
+            self.assertEqual(section, {'root': 'Time', 'attrib': {'version': '2.0'}, 'data': {'timeMode': 'NTP'}})
+            api.put_config_section(api.config.API_TIME_CONFIG, section)
+        method, _ = request.call_args.args
+        self.assertEqual(method, 'PUT')
+        self.assertIn(b'<Time version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema"><timeMode>NTP',
+                      request.call_args.kwargs['data'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
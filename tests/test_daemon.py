@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.daemon import CollectorDaemon, Job, refresh_device_info, sync_events, sync_users
+
+
+class TestCollectorDaemon(unittest.TestCase):
+    """Collector daemon testlari"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.api = HikVisionAPI(HikVisionConfig())
+        self.daemon = CollectorDaemon(self.api, self.output_dir)
+
+    def run_for(self, seconds):
+        """Daemon ni berilgan vaqt davomida ishlatish"""
+        threading.Timer(seconds, self.daemon.stop).start()
+        self.daemon.run()
+
+    def test_overlapping_runs_are_skipped(self):
+        """Oldingi ishga tushirish tugamagan bo'lsa yangisi o'tkazib yuborilishi kerak"""
+        job = self.daemon.add_job(Job('slow', 0.05, lambda daemon: time.sleep(0.3), jitter=0))
+        self.run_for(0.2)
+
+        self.assertEqual(job.runs, 1)
+        self.assertGreater(job.skipped, 0)
+
+    def test_event_sync_writes_and_advances_cursor(self):
+        """event_sync hodisalarni yozishi va kursorni surishi kerak"""
+        events = [{'serialNo': '1', 'time': '2024-01-01T10:00:00+05:00'}]
+        with mock.patch.object(self.api, 'search_access_control_events', return_value=(events, False)):
+            sync_events(self.daemon)
+        self.daemon.shutdown()
+
+        files = [name for name in os.listdir(self.output_dir) if name.startswith('events_')]
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(self.output_dir, files[0]), encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline())['serialNo'], '1')
+        self.assertIn('event_sync_cursor', self.daemon.state)
+
+    def test_device_info_json_has_device_fields(self):
+        """device_info.json qurilma javobidagi haqiqiy qiymatlar bilan yozilishi kerak"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = (b'<DeviceInfo xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+                             b'<deviceName>Kirish</deviceName><model>DS-K1T341CM</model>'
+                             b'<serialNumber>DS-K1T341CM20230101AAWRF12345678</serialNumber>'
+                             b'<firmwareVersion>V3.2.30</firmwareVersion></DeviceInfo>')
+        with mock.patch.object(self.api.session, 'request', return_value=response):
+            refresh_device_info(self.daemon)
+        self.daemon.shutdown()
+
+        with open(os.path.join(self.output_dir, 'device_info.json'), encoding='utf-8') as f:
+            info = json.load(f)
+        self.assertEqual(info['device_name'], 'Kirish')
+        self.assertEqual(info['model'], 'DS-K1T341CM')
+        self.assertEqual(info['serial_number'], 'DS-K1T341CM20230101AAWRF12345678')
+        self.assertEqual(info['firmware_version'], 'V3.2.30')
+        self.assertEqual(info['manufacturer'], 'HikVision')
+
+    def test_failed_event_sync_keeps_cursor(self):
+        """So'rov muvaffaqiyatsiz bo'lsa kursor surilmasligi kerak"""
+        self.daemon.state['event_sync_cursor'] = 'cursor'
+        job = self.daemon.add_job(Job('event_sync', 60, sync_events, jitter=0))
+        with mock.patch.object(self.api, 'search_access_control_events', side_effect=IOError('down')):
+            self.daemon._run_job(job)
+
+        self.assertEqual(self.daemon.state['event_sync_cursor'], 'cursor')
+        self.assertEqual(job.failures, 1)
+
+    def test_truncated_event_sync_advances_to_last_event(self):
+        """Qurilma javobni kesganda kursor oxirgi hodisagacha surilib qolgan oraliq so'ralishi kerak"""
+        self.daemon.state['event_sync_cursor'] = '2024-01-01T09:00:00+05:00'
+        xml = (b'<AcsEvent xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+               b'<responseStatusStrg>%s</responseStatusStrg><numOfMatches>%d</numOfMatches>%s</AcsEvent>')
+        info = b'<InfoList><serialNo>%d</serialNo><time>2024-01-01T10:00:0%d+05:00</time></InfoList>'
+        pages = [xml % (b'MORE', 2, info % (1, 1) + info % (2, 2)), xml % (b'OK', 1, info % (3, 3))]
+        responses = []
+        for body in pages:
+            response = requests.Response()
+            response.status_code = 200
+            response._content = body
+            responses.append(response)
+        with mock.patch.object(self.api.session, 'request', side_effect=responses) as request:
+            sync_events(self.daemon)
+        self.daemon.shutdown()
+
+        starts = [call.kwargs['params']['startTime'] for call in request.call_args_list]
+        self.assertEqual(starts, ['2024-01-01T09:00:00+05:00', '2024-01-01T10:00:02+05:00'])
+        self.assertEqual(request.call_args.kwargs['params']['endTime'], self.daemon.state['event_sync_cursor'])
+        files = [name for name in os.listdir(self.output_dir) if name.startswith('events_')]
+        with open(os.path.join(self.output_dir, files[0]), encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['serialNo'] for line in f], ['1', '2', '3'])
+
+    def test_failed_user_sync_keeps_previous_file(self):
+        """Foydalanuvchilar o'qilmasa users.json bo'sh ro'yxat bilan yozilmasligi kerak"""
+        self.daemon.write_json('users.json', [{'employeeNo': '1'}])
+        job = self.daemon.add_job(Job('user_sync', 60, sync_users, jitter=0))
+        with mock.patch.object(self.api.session, 'request', side_effect=requests.exceptions.ConnectTimeout('timeout')):
+            self.daemon._run_job(job)
+        self.daemon.shutdown()
+
+        self.assertEqual(job.failures, 1)
+        with open(os.path.join(self.output_dir, 'users.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [{'employeeNo': '1'}])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dedup import EventDeduplicator
+
+
+def event(serial, device='172.18.18.60'):
+    return {'serialNo': str(serial), 'ipAddress': device}
+
+
+class TestEventDeduplicator(unittest.TestCase):
+    """Hodisalar deduplikatsiyasi testlari"""
+
+    def setUp(self):
+        self.dedup = EventDeduplicator(lru_size=10, window_seconds=100, generations=4,
+                                       capacity=1000, error_rate=1e-6)
+
+    def test_duplicates_are_removed(self):
+        """Bir qurilmaning bir xil serialNo si takror hisoblanishi kerak"""
+        first = self.dedup.filter([event(1), event(2), event(1)])
+        second = self.dedup.filter([event(2), event(3), event(1, device='172.18.18.61')])
+
+        self.assertEqual([e['serialNo'] for e in first], ['1', '2'])
+        self.assertEqual([(e['serialNo'], e['ipAddress']) for e in second],
+                         [('3', '172.18.18.60'), ('1', '172.18.18.61')])
+        self.assertAlmostEqual(self.dedup.report()['duplicate_rate'], 2 / 6)
+
+    def test_bloom_catches_keys_evicted_from_lru(self):
+        """LRU dan chiqib ketgan kalitlar Bloom filter orqali topilishi kerak"""
+        self.dedup.filter([event(i) for i in range(50)])
+        self.assertEqual(self.dedup.filter([event(0)]), [])
+        self.assertGreater(self.dedup.report()['bloom_hits'], 0)
+
+    def test_window_expiry(self):
+        """Oyna o'tgach eski kalitlar unutilishi kerak"""
+        with mock.patch('src.dedup.time.time', return_value=self.dedup._generation_started):
+            self.dedup.filter([event(i) for i in range(50)])
+        with mock.patch('src.dedup.time.time', return_value=self.dedup._generation_started + 101):
+            self.assertEqual(len(self.dedup.filter([event(0)])), 1)
+
+    def test_saturated_generation_rotates_instead_of_dropping(self):
+        """Sig'imdan ko'p yangi kalit kelganda hech biri takror deb topilmasligi kerak"""
+        with mock.patch('src.dedup.time.time', return_value=self.dedup._generation_started):
+            unique = self.dedup.filter([event(i) for i in range(6000)])
+            self.assertEqual(len(unique), 6000)
+            self.assertGreater(self.dedup.report()['saturated'], 0)
+            # Eng so'nggi generatsiyalardagi kalitlar hali takror sifatida topiladi
+            self.assertEqual(self.dedup.filter([event(5999)]), [])
+
+    def test_poll_then_push_is_deduplicated(self):
+        """Polling va push orqali kelgan bir hodisa serial raqam bo'yicha bitta kalitga tushishi kerak"""
+        api = mock.Mock()
+        api.config.HOST, api.config.PORT = '172.18.18.60', 80
+        api.get_device_info.return_value = {'serialNumber': 'DS-K1T341CM0120230101', 'macAddress': 'AA-BB-CC-DD-EE-FF'}
+        device = self.dedup.resolve(api)
+        self.assertEqual(device, 'DS-K1T341CM0120230101')
+        self.assertEqual(self.dedup.resolve(api), device)
+        api.get_device_info.assert_called_once()
+
+        polled = self.dedup.filter([{'serialNo': '7001'}, {'serialNo': '7002'}], device=device)
+        pushed = self.dedup.filter([
+            {'serialNo': '7001', 'macAddress': 'aa:bb:cc:dd:ee:ff', 'ipAddress': '10.20.0.5'},
+            {'serialNo': '7002', 'ipAddress': '172.18.18.60'},
+            {'serialNo': '7003', 'macAddress': 'aa:bb:cc:dd:ee:ff'},
+        ])
+        self.assertEqual(len(polled), 2)
+        self.assertEqual([e['serialNo'] for e in pushed], ['7003'])
+        # Boshqa qurilmaning shu serialNo si takror emas
+        self.assertEqual(len(self.dedup.filter([{'serialNo': '7001', 'macAddress': '11:22:33:44:55:66'}])), 1)
+
+    def test_unresolved_device_falls_back_to_host(self):
+        """deviceInfo olinmasa HOST ishlatilishi va keyin qayta urinilishi kerak"""
+        api = mock.Mock()
+        api.config.HOST, api.config.PORT = '172.18.18.60', 80
+        api.get_device_info.return_value = {}
+        self.assertEqual(self.dedup.resolve(api), '172.18.18.60')
+        api.get_device_info.return_value = {'serialNumber': 'S1'}
+        self.assertEqual(self.dedup.resolve(api), 'S1')
+
+    def test_state_persistence(self):
+        """Saqlangan holat qayta yuklanganda takrorlar aniqlanishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'dedup.state')
+        dedup = EventDeduplicator(lru_size=10, capacity=1000, state_path=path)
+        dedup.filter([event(i) for i in range(20)])
+        dedup.save()
+
+        restored = EventDeduplicator(lru_size=10, capacity=1000, state_path=path)
+        self.assertEqual(restored.filter([event(5), event(19), event(20)]), [event(20)])
+
+    def test_state_with_other_window_is_ignored(self):
+        """Boshqa oyna bilan saqlangan holat yuklanmasligi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'dedup.state')
+        dedup = EventDeduplicator(lru_size=10, capacity=1000, window_seconds=3600, state_path=path)
+        dedup.filter([event(1)])
+        dedup.save()
+
+        restored = EventDeduplicator(lru_size=10, capacity=1000, window_seconds=7200, state_path=path)
+        self.assertEqual(restored.filter([event(1)]), [event(1)])
+
+    def test_aliases_are_persisted(self):
+        """Boshqa jarayon aniqlagan qurilma nomlari holat bilan tiklanishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'dedup.state')
+        dedup = EventDeduplicator(lru_size=10, capacity=1000, state_path=path)
+        dedup.register_device('S1', '172.18.18.60', 'aa:bb:cc:dd:ee:ff')
+        dedup.filter([{'serialNo': '1'}], device='172.18.18.60')
+        dedup.save()
+
+        restored = EventDeduplicator(lru_size=10, capacity=1000, state_path=path)
+        self.assertEqual(restored.filter([{'serialNo': '1', 'macAddress': 'AA:BB:CC:DD:EE:FF'}]), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import json
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.discovery import discover, iter_targets, write_inventory
+from src.inventory import load_inventory
+
+DEVICE_INFO = b"""<?xml version="1.0" encoding="UTF-8"?>
+<DeviceInfo version="2.0" xmlns="http://www.isapi.org/ver20/XMLSchema">
+    <deviceName>Kirish</deviceName>
+    <model>DS-K1T341CM</model>
+    <serialNumber>DS-K1T341CM20240101</serialNumber>
+    <firmwareVersion>V3.2.30</firmwareVersion>
+</DeviceInfo>"""
+
+
+class FakeDevice(BaseHTTPRequestHandler):
+    """deviceInfo ga javob beruvchi soxta qurilma"""
+
+    authorized = True
+
+    def do_GET(self):
+        if not self.authorized:
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Digest realm="DS", nonce="abc", qop="auth"')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(DEVICE_INFO)))
+        self.end_headers()
+        self.wfile.write(DEVICE_INFO)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_device(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestDiscovery(unittest.TestCase):
+    """Qurilmalarni qidirish testlari"""
+
+    def test_targets(self):
+        """CIDR, bitta IP va oraliq to'g'ri yoyilishi kerak"""
+        self.assertEqual(len(iter_targets('192.168.0.0/22', [80])), 1022)
+        self.assertEqual(iter_targets('10.0.0.5', [80, 8000]), [('10.0.0.5', 80), ('10.0.0.5', 8000)])
+        self.assertEqual(len(iter_targets('10.0.0.250-10.0.1.4', [80])), 11)
+
+    def test_finds_device_and_skips_closed_ports(self):
+        """Ochiq ISAPI qurilma topilishi, yopiq port o'tkazib yuborilishi kerak"""
+        server = start_device(FakeDevice)
+        try:
+            devices = discover('127.0.0.1', 'admin', 'secret',
+                               ports=[server.server_address[1], free_port()], timeout=1.0)
+        finally:
+            server.shutdown()
+
+        self.assertEqual(len(devices), 1)
+        self.assertEqual(devices[0]['status'], 'ok')
+        self.assertEqual(devices[0]['model'], 'DS-K1T341CM')
+        self.assertEqual(devices[0]['serial_number'], 'DS-K1T341CM20240101')
+        self.assertEqual(devices[0]['firmware_version'], 'V3.2.30')
+
+    def test_wrong_credentials_are_reported(self):
+        """Login xato bo'lsa qurilma auth_failed holati bilan qaytishi kerak"""
+        server = start_device(type('Locked', (FakeDevice,), {'authorized': False}))
+        try:
+            devices = discover('127.0.0.1', 'admin', 'wrong', ports=[server.server_address[1]])
+        finally:
+            server.shutdown()
+
+        self.assertEqual([device['status'] for device in devices], ['auth_failed'])
+
+    def test_concurrent_scan_is_bounded_by_timeout(self):
+        """Ko'p manzil parallel tekshirilishi kerak"""
+        start = time.perf_counter()
+        discover('127.0.0.0/24', 'admin', 'secret', ports=[free_port()], concurrency=64, timeout=0.2)
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_inventory_file(self):
+        """Inventar fayli JSON ko'rinishida yozilishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'inventory.json')
+        write_inventory([{'host': '10.0.0.5', 'port': 80, 'status': 'ok', 'model': 'DS-K1T341CM'},
+                         {'host': '10.0.0.6', 'port': 80, 'status': 'auth_failed'}], path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual([device['host'] for device in data['devices']], ['10.0.0.5'])
+        self.assertEqual([device['host'] for device in data['auth_failed']], ['10.0.0.6'])
+        # Daemon faqat login qilingan qurilmalarni so'raydi
+        self.assertEqual(list(load_inventory(path)), ['10.0.0.5'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import json
+import http.client
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.events import extract_events, is_truncated, parse_push
+from src.push_receiver import EventPushReceiver
+
+ALERT_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<EventNotificationAlert version="2.0" xmlns="http://www.isapi.org/ver20/XMLSchema">
+    <ipAddress>172.18.18.60</ipAddress>
+    <dateTime>2024-01-01T08:00:00+05:00</dateTime>
+    <eventType>AccessControllerEvent</eventType>
+    <AccessControllerEvent>
+        <majorEventType>5</majorEventType>
+        <subEventType>75</subEventType>
+        <serialNo>1001</serialNo>
+        <employeeNoString>42</employeeNoString>
+    </AccessControllerEvent>
+</EventNotificationAlert>"""
+
+ALERT_JSON = {
+    'ipAddress': '172.18.18.61',
+    'dateTime': '2024-01-01T08:00:01+05:00',
+    'eventType': 'AccessControllerEvent',
+    'AccessControllerEvent': {'majorEventType': 5, 'subEventType': 75, 'serialNo': 1002}
+}
+
+
+class TestEventNormalization(unittest.TestCase):
+    """Hodisalarni normallashtirish testlari"""
+
+    def test_extract_events_shapes(self):
+        """Pull javoblarining turli ko'rinishlari"""
+        event = {'serialNo': '1'}
+        self.assertEqual(extract_events({'AcsEventList': {'AcsEvent': event}}), [event])
+        self.assertEqual(extract_events({'AcsEvent': [event, event]}), [event, event])
+        self.assertEqual(extract_events({'AcsEvent': {'InfoList': [event]}}), [event])
+        self.assertEqual(extract_events({}), [])
+
+    def test_truncated_search_response(self):
+        """MORE yoki totalMatches bo'yicha kesilgan javobni aniqlash"""
+        self.assertTrue(is_truncated({'AcsEvent': {'responseStatusStrg': 'MORE', 'InfoList': []}}, 0))
+        self.assertTrue(is_truncated({'responseStatusStrg': 'OK', 'totalMatches': '120'}, 30))
+        self.assertFalse(is_truncated({'responseStatusStrg': 'OK', 'totalMatches': '30'}, 30))
+        self.assertFalse(is_truncated({'AcsEvent': []}, 0))
+
+    def test_xml_push(self):
+        """XML push namespace siz va AcsEvent nomlari bilan normallashtirilishi kerak"""
+        events = parse_push(ALERT_XML, 'application/xml')
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['major'], '5')
+        self.assertEqual(events[0]['minor'], '75')
+        self.assertEqual(events[0]['serialNo'], '1001')
+        self.assertEqual(events[0]['time'], '2024-01-01T08:00:00+05:00')
+        self.assertEqual(events[0]['ipAddress'], '172.18.18.60')
+
+    def test_multipart_push_skips_images(self):
+        """multipart push dagi rasm qismlari o'tkazib yuborilishi kerak"""
+        boundary = 'MIME_boundary'
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="event_log"\r\n'
+            f'Content-Type: application/json\r\n\r\n{json.dumps(ALERT_JSON)}\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="Picture"; filename="p.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'
+        ).encode() + b'\xff\xd8\xff\x00binary' + f'\r\n--{boundary}--\r\n'.encode()
+
+        events = parse_push(body, f'multipart/form-data; boundary={boundary}')
+        self.assertEqual([event['serialNo'] for event in events], [1002])
+
+    def test_heartbeat_is_ignored(self):
+        """Access control bo'lmagan push hodisa sifatida qaytmasligi kerak"""
+        self.assertEqual(parse_push(json.dumps({'eventType': 'heartBeat'}).encode(),
+                                    'application/json'), [])
+
+
+class TestEventPushReceiver(unittest.TestCase):
+    """Push qabul qiluvchi testlari"""
+
+    def test_receive_and_batch(self):
+        """Push lar qabul qilinib, to'plam holida uzatilishi kerak"""
+        batches = []
+        receiver = EventPushReceiver(batches.append, '127.0.0.1', 0, batch_size=2,
+                                     batch_interval=0.05).start()
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', receiver.port, timeout=5)
+            for body, content_type in ((ALERT_XML, 'application/xml'),
+                                       (json.dumps(ALERT_JSON).encode(), 'application/json'),
+                                       (ALERT_XML, 'application/xml')):
+                connection.request('POST', '/event', body, {'Content-Type': content_type})
+                response = connection.getresponse()
+                self.assertEqual(response.status, 200)
+                response.read()
+            connection.close()
+        finally:
+            receiver.stop()
+
+        events = [event for batch in batches for event in batch]
+        self.assertEqual(len(events), 3)
+        self.assertEqual(len(batches[0]), 2)
+        self.assertTrue(all('receivedAt' in event for event in events))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import copy
+import time
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.fleet_push import FleetPush, parse_assignments
+
+ENDPOINT = 'ISAPI/System/time'
+
+
+class FakeTerminal:
+    """Vaqt bo'limini xotirada saqlaydigan soxta qurilma"""
+
+    def __init__(self, host, delay=0.0, partial=False, reject=False):
+        self.config = HikVisionConfig()
+        self.config.HOST = host
+        self.section = {'root': 'Time', 'attrib': {'version': '2.0'},
+                        'data': {'timeMode': 'manual', 'localTime': '2024-01-01T10:00:00+05:00',
+                                 'timeZone': 'CST+0:00:00'}}
+        self.delay, self.partial, self.reject = delay, partial, reject
+        self.writes = 0
+        self.bodies = []
+
+    def get_config_section(self, endpoint):
+        # Manual rejimda soat yuradi: har o'qishda localTime boshqa
+        self.section['data']['localTime'] = f"2024-01-01T10:00:{len(self.bodies):02d}+05:00"
+        return copy.deepcopy(self.section)
+
+    def put_config_section(self, endpoint, section):
+        time.sleep(self.delay)
+        self.writes += 1
+        self.bodies.append(copy.deepcopy(section['data']))
+        if self.reject:
+            raise RuntimeError('400 Bad Request')
+        section = copy.deepcopy(section)
+        if self.partial:
+            # Qurilma vaqt zonasini qabul qilmaydi, qolgan maydonlarni yozadi
+            section['data']['timeZone'] = self.section['data']['timeZone']
+        self.section = section
+
+
+class TestFleetPush(unittest.TestCase):
+    """Sozlamalarni ko'p qurilmaga yozish testlari"""
+
+    def setUp(self):
+        self.patch = parse_assignments(['timeZone=CST-5:00:00', 'NTPServer.hostName=ntp.local'])
+
+    def test_parse_assignments(self):
+        """Nuqtali kalitlar ichma-ich dict ga aylanishi kerak"""
+        self.assertEqual(self.patch, {'timeZone': 'CST-5:00:00', 'NTPServer': {'hostName': 'ntp.local'}})
+        with self.assertRaises(ValueError):
+            parse_assignments(['timeZone'])
+
+    def test_waves_run_in_parallel(self):
+        """Canary dan keyin qolganlar bitta parallel to'lqinda yozilishi kerak"""
+        devices = [FakeTerminal(f"10.0.0.{i}", delay=0.1) for i in range(20)]
+        devices[5].section['data'].update(self.patch)
+        push = FleetPush(ENDPOINT, self.patch, canary=1, concurrency=32)
+        self.assertEqual([len(wave) for wave in push.waves(devices)], [1, 19])
+
+        report = push.run(devices)
+        self.assertEqual(report['summary'], {'ok': 19, 'unchanged': 1})
+        self.assertLess(report['duration'], 1.0)
+        self.assertEqual(devices[5].writes, 0)
+        self.assertEqual(devices[0].section['data']['NTPServer'], {'hostName': 'ntp.local'})
+        self.assertEqual(devices[0].section['data']['timeMode'], 'manual')
+
+    def test_failed_verification_rolls_back(self):
+        """Qisman yozilgan qurilma tiklanishi, rad etgan qurilmaga qayta yozilmasligi kerak"""
+        devices = [FakeTerminal('10.0.0.1'), FakeTerminal('10.0.0.2', partial=True),
+                   FakeTerminal('10.0.0.3', reject=True)] + [FakeTerminal(f"10.0.1.{i}") for i in range(17)]
+        report = FleetPush(ENDPOINT, self.patch, canary=1, max_failure_rate=0.2).run(devices)
+
+        statuses = {result['device']: result['status'] for result in report['results']}
+        self.assertEqual(statuses['10.0.0.2'], 'rolled_back')
+        self.assertNotIn('NTPServer', devices[1].section['data'])
+        self.assertEqual((statuses['10.0.0.3'], devices[2].writes), ('failed', 1))
+        self.assertFalse(report['aborted'])
+        # Yozish ham, rollback ham eski localTime ni qurilmaga qaytarmaydi
+        self.assertEqual(len(devices[1].bodies), 2)
+        self.assertFalse(any('localTime' in body for device in devices for body in device.bodies))
+
+    def test_failing_canary_stops_rollout(self):
+        """Canary muvaffaqiyatsiz bo'lsa qolgan qurilmalarga tegilmasligi kerak"""
+        devices = [FakeTerminal('10.0.0.1', reject=True)] + [FakeTerminal(f"10.0.1.{i}") for i in range(5)]
+        report = FleetPush(ENDPOINT, self.patch, canary=1).run(devices)
+
+        self.assertTrue(report['aborted'])
+        self.assertEqual(report['summary'], {'failed': 1, 'skipped': 5})
+        self.assertEqual(sum(device.writes for device in devices[1:]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
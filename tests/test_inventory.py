@@ -0,0 +1,135 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.inventory import DeviceConfig, FleetCollector, InventoryWatcher, load_inventory
+from src.pool import pool
+from src.scheduler import scheduler
+
+# Vazifalar o'chirilgan: daemon lar tarmoqqa chiqmaydi
+NO_JOBS = {'event_sync': 0, 'user_sync': 0, 'device_info': 0, 'clock_sync': 0}
+
+TOML_INVENTORY = """
+[defaults]
+username = "admin"
+password = "secret"
+timeout = 10
+
+[defaults.jobs]
+user_sync = 0
+
+[[devices]]
+name = "gate1"
+host = "10.0.0.5"
+port = 8000
+jobs = { event_sync = 30 }
+
+[[devices]]
+host = "10.0.0.6"
+model = "DS-K1T341CM"
+"""
+
+
+class TestInventory(unittest.TestCase):
+    """Qurilmalar inventari testlari"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'inventory.json')
+
+    def write(self, devices, path=None):
+        with open(path or self.path, 'w', encoding='utf-8') as f:
+            json.dump({'defaults': {'password': 'secret', 'jobs': NO_JOBS}, 'devices': devices}, f)
+        # mtime aniqligidan qat'iy nazar o'zgarish sezilishi uchun
+        os.utime(path or self.path, ns=(0, os.stat(path or self.path).st_mtime_ns + 1000000))
+
+    def test_toml_with_defaults_and_jobs(self):
+        """TOML inventar standart qiymatlar, vazifa intervallari va meta bilan o'qilishi kerak"""
+        path = os.path.join(self.directory, 'inventory.toml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(TOML_INVENTORY)
+        devices = load_inventory(path)
+
+        gate = devices['gate1']
+        self.assertEqual(gate.base_url, 'http://10.0.0.5:8000')
+        self.assertEqual((gate.USERNAME, gate.PASSWORD, gate.TIMEOUT), ('admin', 'secret', 10))
+        self.assertEqual(gate.DAEMON_EVENT_SYNC_INTERVAL, 30)
+        self.assertEqual(gate.DAEMON_USER_SYNC_INTERVAL, 0)
+        self.assertEqual(devices['10.0.0.6'].meta, {'model': 'DS-K1T341CM'})
+
+    def test_device_config_overrides_env(self):
+        """DeviceConfig faqat berilgan sozlamalarni yopishi va turga keltirishi kerak"""
+        config = DeviceConfig('cam', host='10.0.0.7', port='8080', debug='true')
+        self.assertEqual(config.PORT, 8080)
+        self.assertIs(config.DEBUG, True)
+        self.assertEqual(config.API_DEVICE_INFO, 'ISAPI/System/deviceInfo')
+
+    def test_watcher_reports_only_differences(self):
+        """Qayta yuklashda faqat qo'shilgan, o'chirilgan va o'zgargan qurilmalar qaytishi kerak"""
+        changes = []
+        watcher = InventoryWatcher(self.path, lambda *diff: changes.append(diff))
+        self.write([{'name': 'a', 'host': '10.0.0.1'}, {'name': 'b', 'host': '10.0.0.2'}])
+        watcher.check()
+        kept = watcher.devices['a']
+
+        self.write([{'name': 'a', 'host': '10.0.0.1'}, {'name': 'b', 'host': '10.0.0.2', 'timeout': 5},
+                    {'name': 'c', 'host': '10.0.0.3'}])
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+
+        added, removed, changed = changes[-1]
+        self.assertEqual((list(added), list(removed), list(changed)), (['c'], [], ['b']))
+        self.assertIs(watcher.devices['a'], kept)
+
+    def test_invalid_file_keeps_previous_state(self):
+        """Xato inventar oldingi holatni buzmasligi kerak"""
+        watcher = InventoryWatcher(self.path, lambda *diff: None)
+        self.write([{'name': 'a', 'host': '10.0.0.1'}])
+        watcher.check()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{broken')
+        self.assertFalse(watcher.check())
+        self.assertEqual(list(watcher.devices), ['a'])
+
+    def test_fleet_reload_keeps_unchanged_devices(self):
+        """Collector o'zgarmagan qurilmalarni saqlab, o'chirilganlarini yopishi kerak"""
+        fleet = FleetCollector(self.path, os.path.join(self.directory, 'output'))
+        self.write([{'name': 'a', 'host': '10.0.1.1'}, {'name': 'b', 'host': '10.0.1.2'}])
+        fleet.watcher.check()
+        daemon_a, key_b = fleet.daemons['a'], fleet.daemons['b'].api.session_key
+
+        self.write([{'name': 'a', 'host': '10.0.1.1'}])
+        fleet.watcher.check()
+
+        self.assertIs(fleet.daemons['a'], daemon_a)
+        self.assertNotIn('b', fleet.daemons)
+        self.assertNotIn(key_b, pool.stats())
+        self.assertIn(daemon_a.api.session_key, pool.stats())
+        fleet.shutdown()
+
+    def test_fleet_reload_applies_queue_and_pool_limits(self):
+        """Sessiya kaliti o'zgarmasa ham yangi concurrency, rate limit va pool hajmi qo'llanishi kerak"""
+        fleet = FleetCollector(self.path, os.path.join(self.directory, 'output'))
+        self.write([{'name': 'a', 'host': '10.0.2.1', 'device_max_concurrency': 2, 'pool_maxsize': 4}])
+        fleet.watcher.check()
+        key = fleet.daemons['a'].api.session_key
+
+        self.write([{'name': 'a', 'host': '10.0.2.1', 'device_max_concurrency': 5,
+                     'device_rate_limit': 3, 'pool_maxsize': 8}])
+        fleet.watcher.check()
+
+        api = fleet.daemons['a'].api
+        self.assertEqual(api.session_key, key)
+        self.assertIs(api.scheduler, scheduler.for_device('10.0.2.1:80', 5, 3.0))
+        self.assertEqual((api.scheduler.max_concurrency, api.scheduler.rate_limit), (5, 3.0))
+        self.assertEqual(api.session.get_adapter('http://10.0.2.1').poolmanager.connection_pool_kw['maxsize'], 8)
+        fleet.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.metrics import MetricsRegistry, endpoint_label, metrics
+
+
+def make_response(content=b"<DeviceInfo><model>DS-K1T341CM</model></DeviceInfo>", status=200,
+                  url="http://172.18.18.60:80/ISAPI/System/deviceInfo"):
+    """Soxta requests.Response yaratish"""
+    response = requests.Response()
+    response.status_code = status
+    response._content = content
+    response.url = url
+    return response
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """MetricsRegistry testlari"""
+
+    def test_disabled_registry_records_nothing(self):
+        """O'chirilgan registry hech narsa yozmasligi kerak"""
+        registry = MetricsRegistry()
+        registry.inc('c')
+        registry.observe('h', 0.1)
+        self.assertEqual(registry.snapshot(), {'counters': {}, 'gauges': {}, 'histograms': {}})
+
+    def test_histogram_snapshot_and_prometheus(self):
+        """Histogram snapshot va Prometheus formatini test qilish"""
+        registry = MetricsRegistry(enabled=True, buckets=(0.1, 1.0))
+        registry.observe('latency', 0.05, device='a')
+        registry.observe('latency', 0.5, device='a')
+        registry.inc('requests_total', device='a', status='200')
+
+        row = registry.snapshot()['histograms']['latency'][0]
+        self.assertEqual(row['count'], 2)
+        self.assertEqual(row['buckets'][0.1], 1)
+        self.assertEqual(row['buckets'][float('inf')], 2)
+
+        text = registry.render_prometheus()
+        self.assertIn('latency_bucket{device="a",le="+Inf"} 2', text)
+        self.assertIn('requests_total{device="a",status="200"} 1', text)
+
+    def test_endpoint_label(self):
+        """ID segmentlari normallashtirilishi kerak"""
+        self.assertEqual(endpoint_label('ISAPI/AccessControl/Door/1/status'),
+                         'ISAPI/AccessControl/Door/{id}/status')
+        self.assertEqual(endpoint_label('ISAPI/System/deviceInfo'), 'ISAPI/System/deviceInfo')
+
+
+class TestRequestInstrumentation(unittest.TestCase):
+    """_make_request metrikalari testlari"""
+
+    def setUp(self):
+        metrics.reset()
+        metrics.enable()
+        self.api = HikVisionAPI(HikVisionConfig())
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_request_and_parse_metrics(self):
+        """So'rov va parsing metrikalari yozilishi kerak"""
+        with mock.patch.object(self.api.session, 'request', return_value=make_response()):
+            self.assertIn('model', self.api.get_device_info())
+
+        snap = metrics.snapshot()
+        total = snap['counters']['hikvision_requests_total'][0]
+        self.assertEqual(total['labels']['status'], '200')
+        self.assertEqual(total['labels']['endpoint'], 'ISAPI/System/deviceInfo')
+        self.assertIn('hikvision_parse_duration_seconds', snap['histograms'])
+        self.assertGreater(snap['counters']['hikvision_response_bytes_received_total'][0]['value'], 0)
+
+    def test_connection_error_is_counted(self):
+        """Ulanish xatosi 'error' statusi bilan hisoblanishi kerak"""
+        with mock.patch.object(self.api.session, 'request',
+                               side_effect=requests.exceptions.ConnectionError('down')):
+            self.assertEqual(self.api.get_device_info(), {})
+
+        total = metrics.snapshot()['counters']['hikvision_requests_total'][0]
+        self.assertEqual(total['labels']['status'], 'error')
+
+    def test_bytes_sent_counts_encoded_body(self):
+        """Yuborilgan baytlar belgilar emas, UTF-8 baytlari bo'yicha sanalishi kerak"""
+        body = "<UserInfo><name>Шерзод Ўлмасов</name></UserInfo>"
+        with mock.patch.object(self.api.session, 'request', return_value=make_response()):
+            self.api._make_request('PUT', 'ISAPI/AccessControl/UserInfo/Modify', data=body)
+
+        sent = metrics.snapshot()['counters']['hikvision_request_bytes_sent_total'][0]
+        self.assertEqual(sent['value'], len(body.encode('utf-8')))
+        self.assertGreater(sent['value'], len(body))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
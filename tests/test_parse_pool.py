@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xml.etree.ElementTree as ET
+
+from src.parse_pool import ParsePool, _records_worker
+from src.xml_utils import iter_records, xml_to_dict
+
+NS = b' xmlns="http://www.hikvision.com/ver20/XMLSchema"'
+
+
+def user_list(count):
+    body = b'<UserInfoSearch' + NS + b'><numOfMatches>%d</numOfMatches>' % count
+    for i in range(count):
+        body += (b'<UserInfo><employeeNo>%d</employeeNo><name>Xodim %d</name>'
+                 b'<Valid><enable>true</enable></Valid>' % (i, i))
+        if i % 3 == 0:
+            body += b'<note>izoh</note>'
+        body += b'</UserInfo>'
+    return body + b'</UserInfoSearch>'
+
+
+def split(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestParsePool(unittest.TestCase):
+    """Katta javoblarni jarayonlar pool ida parse qilish testlari"""
+
+    def setUp(self):
+        self.pool = ParsePool(processes=2, threshold=0, segment_size=2048)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_document_matches_inline(self):
+        body = user_list(50)
+        self.assertEqual(self.pool.parse_document(body), xml_to_dict(ET.fromstring(body)))
+
+    def test_records_match_inline_and_keep_order(self):
+        body = user_list(500)
+        expected = list(iter_records(split(body, 1000), ('UserInfo',)))
+        records = list(self.pool.iter_records(split(body, 777), 'UserInfo'))
+        self.assertEqual(len(records), 500)
+        self.assertEqual(records, expected)
+
+    def test_records_worker_returns_columns(self):
+        names, rows = _records_worker(b'<UserInfo><employeeNo>1</employeeNo></UserInfo>'
+                                      b'<UserInfo><employeeNo>2</employeeNo><note>x</note></UserInfo>', 'UserInfo')
+        self.assertEqual(names, ('employeeNo', 'note'))
+        self.assertEqual(rows, [('1', None), ('2', 'x')])
+
+    def test_similar_tag_names_are_not_records(self):
+        body = b'<UserInfoSearch><UserInfoList><UserInfo><employeeNo>7</employeeNo></UserInfo></UserInfoList></UserInfoSearch>'
+        self.assertEqual(list(self.pool.iter_records([body], 'UserInfo')), [{'employeeNo': '7'}])
+
+    def test_small_payload_parsed_inline(self):
+        pool = ParsePool(processes=2, threshold=1 << 20)
+        with mock.patch.object(pool, '_pool') as executor:
+            self.assertEqual(pool.parse_document(user_list(2))['numOfMatches'], '2')
+        executor.assert_not_called()
+        self.assertFalse(ParsePool(processes=0).should_offload(None))
+        self.assertTrue(pool.should_offload(None))
+
+    def kill_workers(self):
+        """Pool worker jarayonlarini o'ldirish (OOM killer kabi)"""
+        executor = self.pool._pool()
+        executor.submit(len, b'').result()
+        for process in list(executor._processes.values()):
+            process.kill()
+            process.join()
+        return executor
+
+    def test_broken_pool_falls_back_and_rebuilds(self):
+        body = user_list(300)
+        expected = list(iter_records([body], ('UserInfo',)))
+
+        broken = self.kill_workers()
+        self.assertEqual(list(self.pool.iter_records(split(body, 777), 'UserInfo')), expected)
+        self.assertIsNot(self.pool._pool(), broken)
+
+        broken = self.kill_workers()
+        self.assertEqual(self.pool.parse_document(body), xml_to_dict(ET.fromstring(body)))
+        self.assertEqual(list(self.pool.iter_records(split(body, 777), 'UserInfo')), expected)
+        self.assertIsNot(self.pool._pool(), broken)
+
+    def test_worker_dying_mid_stream_keeps_pending_segments(self):
+        body = user_list(300)
+        expected = list(iter_records([body], ('UserInfo',)))
+        chunks = split(body, 777)
+
+        def stream():
+            for i, chunk in enumerate(chunks):
+                if i == len(chunks) // 2:
+                    # Bir nechta bo'lak worker larda kutilayotganda jarayonlar o'ladi
+                    for process in list(self.pool._pool()._processes.values()):
+                        process.kill()
+                yield chunk
+
+        self.assertEqual(list(self.pool.iter_records(stream(), 'UserInfo')), expected)
+
+    def test_invalid_xml_raises_parse_error(self):
+        with self.assertRaises(ET.ParseError):
+            self.pool.parse_document(b'<a><b></a>')
+
+
+if __name__ == '__main__':
+    unittest.main()
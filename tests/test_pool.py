@@ -0,0 +1,139 @@
+import unittest
+import sys
+import os
+import gc
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.parser import HikVisionParser
+from src.pool import PoolManager, PooledSession, device_key
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Keep-alive ulanishlarni sanovchi soxta qurilma"""
+
+    protocol_version = 'HTTP/1.1'
+    clients = set()
+
+    def do_GET(self):
+        self.clients.add(self.client_address)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPooledSession(unittest.TestCase):
+    """Keep-alive sessiya testlari"""
+
+    def setUp(self):
+        KeepAliveHandler.clients = set()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_is_reused(self):
+        """Keep-alive oynasi ichida ulanish qayta ishlatilishi kerak"""
+        session = PooledSession('test', keepalive_timeout=10)
+        for _ in range(3):
+            session.get(self.url, timeout=5)
+        session.close()
+
+        self.assertEqual(len(KeepAliveHandler.clients), 1)
+        self.assertEqual(session.stale_resets, 0)
+
+    def test_idle_connection_is_replaced(self):
+        """Uzoq bo'sh turgan ulanish so'rovdan oldin yangisiga almashtirilishi kerak"""
+        session = PooledSession('test', keepalive_timeout=0.05)
+        session.get(self.url, timeout=5)
+        time.sleep(0.1)
+        session.get(self.url, timeout=5)
+        session.close()
+
+        self.assertEqual(len(KeepAliveHandler.clients), 2)
+        self.assertEqual(session.stale_resets, 1)
+
+
+class TestPoolManager(unittest.TestCase):
+    """Pool menejeri testlari"""
+
+    def test_api_instances_share_device_session(self):
+        """Bir qurilmaga ulangan API va parser bitta sessiyani ishlatishi kerak"""
+        config = HikVisionConfig()
+        api = HikVisionAPI(config)
+        parser = HikVisionParser()
+
+        self.assertIs(api.session, parser.api.session)
+        self.assertIsInstance(api.session, PooledSession)
+
+    def test_idle_sessions_are_evicted(self):
+        """Bo'shatilgan va ishlatilmagan sessiya yopilishi, faol sessiya qolishi kerak"""
+        manager = PoolManager(idle_timeout=60)
+        old = manager.session('a')
+        manager.session('b')
+        manager.release('a', old)
+        with mock.patch.object(old, 'last_used', time.monotonic() - 120):
+            manager.evict_idle()
+
+        self.assertEqual(sorted(manager.stats()), ['b'])
+        self.assertIsNot(manager.session('a'), old)
+
+    def test_held_sessions_are_not_evicted(self):
+        """Tirik API obyekti ushlab turgan sessiya idle bo'lsa ham yopilmasligi kerak"""
+        manager = PoolManager(idle_timeout=60)
+        held = manager.session('a')
+        with mock.patch.object(held, 'last_used', time.monotonic() - 120):
+            manager.evict_idle()
+        self.assertIs(manager.session('a'), held)
+        self.assertEqual(manager.stats()['a']['refs'], 2)
+
+        manager.release('a', held)
+        manager.release('a', held, close=True)
+        self.assertEqual(manager.stats(), {})
+
+    def test_api_releases_session(self):
+        """API obyekti yopilganda yoki yo'q qilinganda sessiya bo'shatilishi kerak"""
+        config = HikVisionConfig()
+        config.HOST = '10.77.0.1'
+        api = HikVisionAPI(config)
+        other = HikVisionAPI(config)
+        session = api.session
+        self.assertEqual(session.refs, 2)
+        api.close()
+        api.close()
+        self.assertEqual(session.refs, 1)
+        del other
+        gc.collect()
+        self.assertEqual(session.refs, 0)
+
+    def test_credentials_are_part_of_key(self):
+        """Boshqa parol bilan ulangan obyekt alohida sessiya va auth ga ega bo'lishi kerak"""
+        first, second = HikVisionConfig(), HikVisionConfig()
+        first.HOST = second.HOST = '10.77.0.2'
+        first.PASSWORD, second.PASSWORD = 'eski', 'yangi'
+        api_a, api_b = HikVisionAPI(first), HikVisionAPI(second)
+
+        self.assertNotEqual(device_key(first), device_key(second))
+        self.assertIsNot(api_a.session, api_b.session)
+        self.assertEqual(api_a.session.auth.password, 'eski')
+        self.assertEqual(api_b.session.auth.password, 'yangi')
+        self.assertNotIn('eski', device_key(first))
+        self.assertEqual(api_a.session.name, f"{first.PROTOCOL}://{first.USERNAME}@10.77.0.2:{first.PORT}")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser import HikVisionParser
+from src.profiling import Profiler, stage_of
+
+
+class FakeAPI:
+    """Faqat kanallarni qaytaruvchi, streaming va PTZ metodlari bo'lmagan soxta API"""
+
+    def get_device_info(self):
+        raise ConnectionError("qurilma javob bermadi")
+
+    def get_channels(self):
+        return [{'id': '1', 'channelName': 'Kirish', 'enabled': 'true'}]
+
+
+class TestProfiler(unittest.TestCase):
+    """Profiler, stage_of va hisobot testlari"""
+
+    def test_nested_stages_and_errors(self):
+        profiler = Profiler()
+        profiler.start()
+        with profiler.stage('collect'):
+            with profiler.stage('device_info', items=3):
+                pass
+        with self.assertRaises(ValueError):
+            with profiler.stage('export'):
+                raise ValueError('disk')
+
+        stages = {entry['stage']: entry for entry in profiler.stages}
+        self.assertEqual(list(stages), ['collect.device_info', 'collect', 'export'])
+        self.assertEqual(stages['collect.device_info']['items'], 3)
+        self.assertEqual(stages['export']['error'], 'ValueError')
+        self.assertGreaterEqual(stages['collect']['seconds'], stages['collect.device_info']['seconds'])
+        self.assertGreaterEqual(stages['collect.device_info']['offset'], 0)
+
+    def test_report_and_write_report(self):
+        profiler = Profiler(cpu=True, memory=True, top=5)
+        profiler.metadata['device'] = 'http://10.0.0.1:80'
+        profiler.start()
+        with profiler.stage('work'):
+            sum(i * i for i in range(10000))
+            data = [bytes(1024) for _ in range(100)]
+        report = profiler.report()
+        self.assertEqual(report['metadata'], {'device': 'http://10.0.0.1:80'})
+        self.assertGreater(report['total_seconds'], 0)
+        self.assertLessEqual(len(report['cpu_top']), 5)
+        self.assertGreater(report['memory']['peak_bytes'], 0)
+        del data
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = profiler.write_report(tmp, '20240101_000000')
+            self.assertEqual(os.path.basename(path), 'hikvision_profile_20240101_000000.json')
+            with open(path, encoding='utf-8') as f:
+                written = json.load(f)
+            self.assertEqual(written['stages'][0]['stage'], 'work')
+            self.assertTrue(os.path.exists(written['cpu_profile_file']))
+
+    def test_stage_of_without_profiler_is_noop(self):
+        stage = stage_of(None)
+        with stage('connect'):
+            pass
+        profiler = Profiler()
+        with stage_of(profiler)('connect'):
+            pass
+        self.assertEqual([entry['stage'] for entry in profiler.stages], ['connect'])
+        self.assertIsNone(profiler.stages[0]['offset'])
+
+    def test_full_system_info_stages_tolerate_missing_sections(self):
+        profiler = Profiler()
+        profiler.start()
+        info = HikVisionParser(FakeAPI()).get_full_system_info(profiler)
+
+        self.assertEqual(info['channels'][0]['channel_name'], 'Kirish')
+        self.assertEqual((info['device_info'], info['streaming_channels'], info['ptz_info']), ({}, [], {}))
+        stages = {entry['stage']: entry for entry in profiler.stages}
+        self.assertEqual(stages['device_info.fetch']['error'], 'ConnectionError')
+        self.assertIn('channels.parse', stages)
+        self.assertNotIn('streaming_channels.fetch', stages)
+        self.assertNotIn('ptz_info.fetch', stages)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
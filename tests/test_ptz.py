@@ -0,0 +1,192 @@
+import unittest
+import sys
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+import requests
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.parser import HikVisionParser
+from src.ptz import PTZController
+
+
+class FakeCamera:
+    """Buyruqlarni yozib boruvchi, kechikish bilan javob beruvchi soxta kamera"""
+
+    def __init__(self, delay=0.0, fail=False, failures=0):
+        self.config = HikVisionConfig()
+        self.delay = delay
+        self.fail = fail
+        self.failures = failures
+        self.commands = []
+        self.times = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def ptz_continuous(self, channel, pan=0, tilt=0, zoom=0):
+        self.gate.wait()
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise requests.exceptions.ReadTimeout('javob yo\'q')
+        if self.fail:
+            raise requests.exceptions.ConnectionError('ulanish yo\'q')
+        self.commands.append((channel, pan, tilt, zoom))
+        self.times.append(time.monotonic())
+
+
+def xml_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    return response
+
+
+class TestPTZ(unittest.TestCase):
+    """PTZ boshqaruvi va buyruqlar navbati testlari"""
+
+    def test_superseded_moves_are_coalesced(self):
+        camera = FakeCamera()
+        camera.gate.clear()
+        controller = PTZController(camera, rate=100)
+        controller.move(1, 10, 0)
+        time.sleep(0.05)
+        self.assertEqual(controller.stats()[1]['coalesced'], 0)
+        # Birinchi buyruq qurilmada "osilib" turibdi, keyingilari birlashadi
+        for speed in range(20, 70, 10):
+            controller.move(1, speed, 5)
+        camera.gate.set()
+        controller.close(stop=False)
+        self.assertEqual(camera.commands, [(1, 10, 0, 0), (1, 60, 5, 0)])
+
+    def test_rate_is_bounded(self):
+        camera = FakeCamera()
+        controller = PTZController(camera, rate=20)
+        start = time.monotonic()
+        while time.monotonic() - start < 0.5:
+            controller.move(1, int((time.monotonic() - start) * 200) + 1, 0)
+            time.sleep(0.002)
+        channel_stats = controller.stats()[1]
+        controller.close(stop=False)
+        self.assertLessEqual(len(camera.commands), 13)
+        self.assertGreater(channel_stats['coalesced'], 100)
+        gaps = [b - a for a, b in zip(camera.times, camera.times[1:])]
+        self.assertGreaterEqual(min(gaps), 0.045)
+
+    def test_first_command_is_immediate_and_duplicates_skipped(self):
+        camera = FakeCamera()
+        controller = PTZController(camera, rate=1)
+        start = time.monotonic()
+        controller.move(2, 30, 0)
+        while not camera.commands and time.monotonic() - start < 1:
+            time.sleep(0.001)
+        self.assertLess(camera.times[0] - start, 0.05)
+        controller.move(2, 30, 0)
+        controller.close()
+        # Takroriy tezlik yuborilmaydi, yopishda kamera to'xtatiladi
+        self.assertEqual(camera.commands, [(2, 30, 0, 0), (2, 0, 0, 0)])
+
+    def test_channels_are_independent_and_values_clamped(self):
+        camera = FakeCamera(delay=0.2)
+        controller = PTZController(camera, rate=100)
+        controller.move(1, 500, -500)
+        time.sleep(0.02)
+        controller.move(2, 1, 1)
+        controller.close(stop=False)
+        self.assertEqual(sorted(camera.commands), [(1, 100, -100, 0), (2, 1, 1, 0)])
+        self.assertLess(abs(camera.times[0] - camera.times[1]), 0.1)
+
+    def test_failed_command_counted(self):
+        controller = PTZController(FakeCamera(fail=True), rate=100)
+        controller.move(1, 10, 10)
+        time.sleep(0.05)
+        self.assertEqual(controller.stats()[1]['failed'], 1)
+        start = time.monotonic()
+        controller.close(stop=False)
+        # Qayta yuborilayotgan harakat yopishni kechiktirmaydi
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_failed_command_is_retried(self):
+        """Yangi buyruq kelmagan bo'lsa xato bergan tezlik muvaffaqiyatgacha qayta yuboriladi"""
+        camera = FakeCamera(failures=2)
+        controller = PTZController(camera, rate=100)
+        controller.move(1, 30, 0)
+        start = time.monotonic()
+        while not camera.commands and time.monotonic() - start < 2:
+            time.sleep(0.01)
+        self.assertEqual(camera.commands, [(1, 30, 0, 0)])
+        self.assertEqual(controller.stats()[1]['failed'], 2)
+
+        # Yopishdagi STOP ham xato bersa close muddati ichida qayta yuboriladi
+        camera.failures = 2
+        controller.close()
+        self.assertEqual(camera.commands, [(1, 30, 0, 0), (1, 0, 0, 0)])
+
+    def test_newer_command_replaces_failed_one(self):
+        """Xato bergan buyruqdan keyin kelgan yangi tezlik eskisini qayta yubormaydi"""
+        camera = FakeCamera(failures=1)
+        camera.gate.clear()
+        controller = PTZController(camera, rate=100)
+        controller.move(1, 30, 0)
+        time.sleep(0.05)
+        controller.move(1, 50, 0)
+        camera.gate.set()
+        controller.close(stop=False)
+        self.assertEqual(camera.commands, [(1, 50, 0, 0)])
+
+    def test_api_continuous_and_info(self):
+        api = HikVisionAPI(HikVisionConfig())
+        with mock.patch.object(api.session, 'request', return_value=xml_response(b'')) as request:
+            api.ptz_continuous(1, 40, -20)
+        method, url = request.call_args.args
+        self.assertEqual(method, 'PUT')
+        self.assertTrue(url.endswith('ISAPI/PTZCtrl/channels/1/continuous'))
+        body = ET.fromstring(request.call_args.kwargs['data'])
+        self.assertEqual([child.text for child in body], ['40', '-20', '0'])
+
+        caps = xml_response(b'<PTZChanelCap xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+                            b'<ContinuousPanTiltSpace><XRange><Min>-100</Min></XRange></ContinuousPanTiltSpace>'
+                            b'<maxPresetNum>300</maxPresetNum></PTZChanelCap>')
+        with mock.patch.object(api.session, 'request', return_value=caps):
+            info = HikVisionParser(api).parse_ptz_info(api.get_ptz_info())
+        self.assertTrue(info['ptz_supported'])
+        self.assertTrue(info['pan_supported'])
+        self.assertFalse(info['zoom_supported'])
+        self.assertTrue(info['preset_supported'])
+
+        with mock.patch.object(api.session, 'request', side_effect=requests.exceptions.HTTPError('404')):
+            self.assertEqual(api.get_ptz_info(), {})
+
+    def test_cli_commands(self):
+        """--ptz: qatorlar harakat/to'xtash buyruqlariga aylanadi"""
+        import main
+        sent = []
+
+        def lines():
+            yield '40 -10\n'
+            # Birinchi harakat yuborilguncha kutiladi, aks holda 's' uni birlashtirib yuboradi
+            start = time.monotonic()
+            while not sent and time.monotonic() - start < 1:
+                time.sleep(0.001)
+            yield from ['chap\n', 's\n', 'q\n', '90 0\n']
+
+        with mock.patch.object(HikVisionAPI, 'ptz_continuous',
+                               side_effect=lambda channel, *velocity: sent.append((channel,) + velocity)), \
+                mock.patch.object(HikVisionConfig, 'METRICS_PORT', 0), \
+                mock.patch('builtins.print'):
+            ok = main.run_ptz(2, lines())
+        self.assertTrue(ok)
+        self.assertEqual(sent[0], (2, 40, -10, 0))
+        self.assertEqual(sent[-1], (2, 0, 0, 0))
+        self.assertNotIn((2, 90, 0, 0), sent)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
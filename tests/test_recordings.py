@@ -0,0 +1,117 @@
+import unittest
+import sys
+import os
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+import requests
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.clock import parse_iso_epoch
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.recordings import RecordingIndex, isapi_utc, parse_segment, track_id
+
+DAY = 1704067200  # 2024-01-01T00:00:00Z
+
+
+def match_item(track, start, end):
+    return {'sourceID': 'x', 'trackID': str(track),
+            'timeSpan': {'startTime': isapi_utc(start), 'endTime': isapi_utc(end)},
+            'mediaSegmentDescriptor': {'contentType': 'video',
+                                       'playbackURI': f"rtsp://nvr/Streaming/tracks/{track}/?starttime={start}"}}
+
+
+class FakeNVR:
+    """Har 10 daqiqada bitta yozuv segmenti bor soxta qurilma"""
+
+    def __init__(self):
+        self.config = HikVisionConfig()
+        self.calls = []
+
+    def search_recordings(self, track, start_time, end_time, page_size=40, priority=None):
+        self.calls.append((track, start_time, end_time))
+        start, end = parse_iso_epoch(start_time), parse_iso_epoch(end_time)
+        for segment_start in range(DAY - 3600, DAY + 86400, 600):
+            if segment_start < end and segment_start + 600 > start:
+                yield match_item(track, segment_start, segment_start + 600)
+
+
+def search_response(items, status):
+    matches = ''.join(
+        f"<searchMatchItem><trackID>101</trackID><timeSpan><startTime>{item[0]}</startTime>"
+        f"<endTime>{item[1]}</endTime></timeSpan></searchMatchItem>" for item in items)
+    response = requests.Response()
+    response.status_code = 200
+    response._content = (f'<CMSearchResult version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+                         f'<responseStatusStrg>{status}</responseStatusStrg>'
+                         f'<numOfMatches>{len(items)}</numOfMatches><matchList>{matches}</matchList>'
+                         f'</CMSearchResult>').encode()
+    return response
+
+
+class TestRecordings(unittest.TestCase):
+    """Yozuvlarni qidirish va hodisalar bilan bog'lash testlari"""
+
+    def test_search_pages_until_done(self):
+        api = HikVisionAPI(HikVisionConfig())
+        pages = [search_response([('2024-01-01T00:00:00Z', '2024-01-01T00:10:00Z')] * 2, 'MORE'),
+                 search_response([('2024-01-01T00:10:00Z', '2024-01-01T00:20:00Z')], 'OK')]
+        with mock.patch.object(api.session, 'request', side_effect=pages) as request:
+            items = list(api.search_recordings(101, '2024-01-01T00:00:00Z', '2024-01-01T01:00:00Z', page_size=2))
+        self.assertEqual(len(items), 3)
+        self.assertEqual(request.call_count, 2)
+        first, second = (ET.fromstring(call.kwargs['data']) for call in request.call_args_list)
+        ns = '{http://www.hikvision.com/ver20/XMLSchema}'
+        self.assertEqual(first.find(f'{ns}searchResultPostion').text, '0')
+        self.assertEqual(second.find(f'{ns}searchResultPostion').text, '2')
+        self.assertEqual(first.find(f'{ns}searchID').text, second.find(f'{ns}searchID').text)
+        self.assertEqual(first.find(f'{ns}trackList/{ns}trackID').text, '101')
+
+    def test_parse_segment(self):
+        segment = parse_segment(match_item(101, DAY, DAY + 600))
+        self.assertEqual((segment['trackID'], segment['start'], segment['end']), ('101', DAY, DAY + 600))
+        self.assertIsNone(parse_segment({'trackID': '101'}))
+        self.assertEqual(track_id(2), 201)
+
+    def test_correlate_uses_few_searches(self):
+        api = FakeNVR()
+        index = RecordingIndex(api)
+        # 3 soat ichida 3000 ta hodisa + boshqa kundagi 1 ta
+        events = [{'timestamp': DAY + i * 3.6} for i in range(3000)] + [{'timestamp': DAY + 86400 - 30}]
+        events.append({'time': 'noma\'lum'})
+        segments = index.correlate(events)
+        self.assertEqual(len(api.calls), 2)
+        self.assertIsNone(segments[-1])
+        for event, segment in zip(events[:-1], segments[:-1]):
+            self.assertLessEqual(segment['start'], event['timestamp'])
+            self.assertLess(event['timestamp'], segment['end'])
+
+        # Keshdagi soatlar qayta so'ralmaydi
+        self.assertEqual(index.find(101, DAY + 100)[0]['start'], DAY)
+        self.assertEqual(len(api.calls), 2)
+        index.find(201, DAY + 100)
+        self.assertEqual(len(api.calls), 3)
+
+    def test_segment_spanning_buckets(self):
+        api = FakeNVR()
+        index = RecordingIndex(api, bucket_seconds=900)
+        loaded = index.load(101, [DAY, DAY + 900])
+        self.assertEqual(len(api.calls), 1)
+        # 00:10-00:20 segmenti ikkala bo'lakda ham bor
+        self.assertIn(DAY + 600, [segment['start'] for segment in loaded[DAY]])
+        self.assertIn(DAY + 600, [segment['start'] for segment in loaded[DAY + 900]])
+
+    def test_current_bucket_not_cached(self):
+        api = FakeNVR()
+        index = RecordingIndex(api)
+        with mock.patch('src.recordings.time.time', return_value=DAY + 1800):
+            index.find(101, DAY + 100)
+            index.find(101, DAY + 100)
+        self.assertEqual(len(api.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.replay import EventReplayer, LatencyProbe, load_events, percentiles, replay
+from src.sinks import EventPipeline
+
+
+def shift_events(count, step=1.0):
+    """08:00 dan boshlab har `step` sekundda bitta hodisa"""
+    return [{'serialNo': i, 'major': 5, 'minor': 75,
+             'time': time.strftime('%Y-%m-%dT%H:%M:%S+05:00', time.gmtime(8 * 3600 + i * step))}
+            for i in range(count)]
+
+
+class TestReplay(unittest.TestCase):
+    """Hodisalarni qayta yuborish testlari"""
+
+    def test_load_jsonl_and_acs_event_json(self):
+        """JSON lines va AcsEvent JSON fayllari o'qilishi kerak"""
+        directory = tempfile.mkdtemp()
+        jsonl = os.path.join(directory, 'events_20240101.jsonl')
+        with open(jsonl, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(json.dumps(event) for event in shift_events(3)) + '\n')
+        acs = os.path.join(directory, 'acs.json')
+        with open(acs, 'w', encoding='utf-8') as f:
+            json.dump({'AcsEvent': {'InfoList': shift_events(2)}}, f)
+
+        self.assertEqual([event['serialNo'] for event in load_events(jsonl)], [0, 1, 2])
+        self.assertEqual(len(load_events(acs)), 2)
+
+    def test_speed_scales_schedule(self):
+        """10x tezlikda 10 s lik oqim ~1 s davom etishi, tick ichidagilar birlashishi kerak"""
+        events = shift_events(11) + [dict(shift_events(1)[0], serialNo=99)]
+        replayer = EventReplayer(events, speed=10)
+        dues = [(due, len(batch)) for due, batch in replayer.batches()]
+        self.assertEqual(dues[0], (0.0, 2))
+        self.assertAlmostEqual(dues[-1][0], 1.0)
+
+        batches = []
+        report = EventReplayer(shift_events(6), speed=20).run(batches.append)
+        self.assertEqual(report['events'], 6)
+        self.assertGreaterEqual(report['duration'], 0.25)
+        self.assertIn('replayEmittedAt', batches[0][0])
+
+    def test_max_speed_through_pipeline_and_push(self):
+        """Maksimal tezlikda barcha hodisalar pipeline ga yetib, latency o'lchanishi kerak"""
+        for via_push in (False, True):
+            probe = LatencyProbe()
+            pipeline = EventPipeline([probe], batch_size=100, batch_interval=0.05)
+            try:
+                report = replay(shift_events(500, step=0.5), pipeline, probe, speed=0, via_push=via_push,
+                                batch_size=100, drain_timeout=10)
+            finally:
+                pipeline.close()
+            self.assertTrue(report['complete'])
+            self.assertEqual(report['delivered'], 500)
+            self.assertEqual(set(report['latency']), {'p50', 'p90', 'p99', 'max'})
+            self.assertGreater(report['events_per_second'], 0)
+
+    def test_percentiles(self):
+        """Persentillar millisekundda"""
+        self.assertAlmostEqual(percentiles([0.001 * i for i in range(1, 101)])['p50'], 51.0)
+        self.assertEqual(percentiles([]), {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
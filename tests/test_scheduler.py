@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.scheduler import (DeviceScheduler, default_priority, PRIORITY_BULK, PRIORITY_CONTROL,
+                           PRIORITY_EVENTS, PRIORITY_NORMAL)
+
+
+class TestDeviceScheduler(unittest.TestCase):
+    """So'rovlar rejalashtiruvchisi testlari"""
+
+    def test_higher_priority_goes_first(self):
+        """Joy bo'shaganda eshik buyrug'i ommaviy o'qishdan oldin o'tishi kerak"""
+        scheduler = DeviceScheduler('test', max_concurrency=1)
+        order = []
+        scheduler.acquire(PRIORITY_NORMAL)
+
+        def worker(priority, name):
+            with scheduler.slot(priority):
+                order.append(name)
+
+        threads = [threading.Thread(target=worker, args=(PRIORITY_BULK, 'bulk')),
+                   threading.Thread(target=worker, args=(PRIORITY_EVENTS, 'events')),
+                   threading.Thread(target=worker, args=(PRIORITY_CONTROL, 'door'))]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        self.assertEqual(scheduler.stats()['queue_depth'], 3)
+
+        scheduler.release()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(order, ['door', 'events', 'bulk'])
+
+    def test_rate_limit(self):
+        """Sekundiga so'rovlar soni cheklanishi kerak"""
+        scheduler = DeviceScheduler('test', max_concurrency=4, rate_limit=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            with scheduler.slot():
+                pass
+        # Birinchi token darhol, qolgan 4 tasi 50 ms dan
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    def test_queue_timeout(self):
+        """Joy bo'shamasa TimeoutError ko'tarilishi va navbat tozalanishi kerak"""
+        scheduler = DeviceScheduler('test', max_concurrency=1)
+        scheduler.acquire()
+        with self.assertRaises(TimeoutError):
+            scheduler.acquire(timeout=0.05)
+        self.assertEqual(scheduler.stats()['queue_depth'], 0)
+
+    def test_default_priority(self):
+        """Endpoint bo'yicha ustuvorlik"""
+        config = HikVisionConfig()
+        self.assertEqual(default_priority('PUT', f"{config.API_DOOR_CONTROL}/1", config), PRIORITY_CONTROL)
+        self.assertEqual(default_priority('GET', config.API_ACCESS_CONTROL, config), PRIORITY_EVENTS)
+        self.assertEqual(default_priority('GET', config.API_USER_INFO, config), PRIORITY_BULK)
+        self.assertEqual(default_priority('GET', config.API_DEVICE_INFO, config), PRIORITY_NORMAL)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser import HikVisionParser
+from src.schema import Field, Schema, now_iso
+
+TS = '2024-01-01T10:00:00'
+
+
+class TestSchema(unittest.TestCase):
+    """Deklarativ sxema testlari"""
+
+    def setUp(self):
+        self.parser = HikVisionParser.__new__(HikVisionParser)
+
+    def test_device_info(self):
+        """Qurilma ma'lumotlari asl parser bilan bir xil bo'lishi kerak"""
+        parsed = self.parser.parse_device_info({'DeviceInfo': {'model': 'DS-K1T341CM', 'deviceName': 'Kirish'}})
+        self.assertEqual(parsed['model'], 'DS-K1T341CM')
+        self.assertEqual(parsed['manufacturer'], 'HikVision')
+        self.assertEqual(parsed['serial_number'], '')
+
+        # get_device_info ildizsiz dict qaytaradi (xml_to_dict)
+        stripped = self.parser.parse_device_info({'model': 'DS-K1T341CM', 'serialNumber': 'S1'})
+        self.assertEqual((stripped['model'], stripped['serial_number']), ('DS-K1T341CM', 'S1'))
+
+        empty = self.parser.parse_device_info({})
+        self.assertEqual(empty['manufacturer'], '')
+        self.assertEqual(list(empty), ['timestamp', 'device_name', 'device_id', 'model', 'serial_number',
+                                       'firmware_version', 'mac_address', 'ip_address', 'manufacturer',
+                                       'device_type'])
+
+    def test_channels(self):
+        """Kanallar: mavjud bo'lmagan kalitlar va dict bo'lmagan qatorlar"""
+        rows = self.parser.parse_channels([
+            {'id': '1', 'enabled': 'True', 'resolutionHeight': '1080', 'videoFormat': 'PAL'},
+            {'id': '2'},
+            'noto\'g\'ri'
+        ])
+        self.assertEqual(rows[0]['enabled'], True)
+        self.assertEqual((rows[0]['resolution_height'], rows[0]['resolution_width']), (1080, 0))
+        self.assertEqual(rows[0]['video_format'], 'PAL')
+        self.assertEqual((rows[1]['enabled'], rows[1]['video_format']), (False, ''))
+        self.assertEqual(rows[2]['channel_id'], '')
+        self.assertEqual(len({row['timestamp'] for row in rows}), 1)
+
+    def test_streaming_channels(self):
+        """Ichki yo'llar, int va format maydonlari"""
+        row = self.parser.parse_streaming_channels([{
+            'id': '101', 'enabled': 'true', 'Transport': {'Protocol': 'RTSP'},
+            'Video': {'videoCodecType': 'H.264', 'maxBitrate': '4096', 'videoResolutionWidth': '1920',
+                      'videoResolutionHeight': '1080'}
+        }])[0]
+        self.assertEqual(row['transport_protocol'], 'RTSP')
+        self.assertEqual((row['video_bitrate'], row['video_frame_rate']), (4096, 0))
+        self.assertEqual(row['video_resolution'], '1920x1080')
+        self.assertEqual((row['audio_codec_type'], row['audio_bitrate']), ('', 0))
+
+    def test_ptz_info(self):
+        """PTZ: ildiz kalit bo'lsa ptz_supported True"""
+        parsed = self.parser.parse_ptz_info({'PTZData': {'pan': 'true', 'zoom': 'FALSE'}})
+        self.assertEqual((parsed['ptz_supported'], parsed['pan_supported'], parsed['zoom_supported']),
+                         (True, True, False))
+        self.assertFalse(self.parser.parse_ptz_info({})['ptz_supported'])
+
+    def test_events(self):
+        """Hodisalar sxemasi"""
+        events = self.parser.parse_events([{'serialNo': 7, 'major': 5, 'minor': 75,
+                                            'employeeNoString': '42', 'time': TS}])
+        self.assertEqual((events[0]['serial_no'], events[0]['employee_no']), (7, '42'))
+        self.assertEqual(events[0]['card_no'], '')
+
+    def test_custom_schema(self):
+        """Qo'shimcha shablon va timestamp siz sxema"""
+        schema = Schema([Field('size', kind='format', template='{0:>4}|{1}', paths=('a', 'b.c')),
+                         Field('count', 'n', 'int', missing='3')], timestamp=None)
+        self.assertEqual(schema.parse({'a': 7, 'b': {'c': 'x'}}), {'size': '   7|x', 'count': 3})
+        self.assertEqual(schema.parse_many([{'n': '12'}, {'n': 12.0}]),
+                         [{'size': '0|0'.rjust(6), 'count': 12}, {'size': '0|0'.rjust(6), 'count': 12}])
+
+    def test_now_iso_matches_datetime(self):
+        """Keshlangan vaqt belgisi datetime.now().isoformat() bilan bir xil bo'lishi kerak"""
+        for now in (1704085200.25, 1704085200.75, 1704085201.0, 1704085201.9999999):
+            with mock.patch('src.schema.time.time', return_value=now):
+                self.assertEqual(now_iso(), datetime.fromtimestamp(now).isoformat())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
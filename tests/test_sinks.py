@@ -0,0 +1,168 @@
+import unittest
+import sys
+import os
+import csv
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sinks import CsvSink, EventPipeline, JsonLinesSink, QueueSink, SQLiteSink, Sink
+
+
+class FlakySink(Sink):
+    """Berilgan marta xato beradigan sink"""
+
+    name = 'flaky'
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    def write(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise IOError('downstream unavailable')
+        self.batches.append(batch)
+
+
+class SlowSink(Sink):
+    """Har bir to'plamni sekin yozuvchi sink"""
+
+    name = 'slow'
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.count = 0
+
+    def write(self, batch):
+        time.sleep(self.delay)
+        self.count += len(batch)
+
+
+def events(count, start=0):
+    return [{'serialNo': str(i), 'ipAddress': '10.0.0.1'} for i in range(start, start + count)]
+
+
+class TestEventPipeline(unittest.TestCase):
+    """Sink pipeline testlari"""
+
+    def test_batches_by_size_and_time(self):
+        """To'plam hajm bo'yicha, qoldiq esa vaqt bo'yicha yozilishi kerak"""
+        sink = QueueSink()
+        pipeline = EventPipeline([sink], batch_size=3, batch_interval=0.05)
+        pipeline.submit(events(7))
+        time.sleep(0.2)
+        pipeline.close()
+
+        sizes = []
+        while not sink.queue.empty():
+            sizes.append(len(sink.queue.get()))
+        self.assertEqual(sizes, [3, 3, 1])
+
+    def test_retry_does_not_drop_events(self):
+        """Sink xato bersa to'plam qayta yuborilishi kerak"""
+        sink = FlakySink(failures=2)
+        pipeline = EventPipeline([sink], batch_size=10, batch_interval=0.01, retry_backoff=0.01)
+        pipeline.submit(events(5))
+        self.assertTrue(pipeline.flush(timeout=5))
+        pipeline.close()
+
+        self.assertEqual(sum(len(batch) for batch in sink.batches), 5)
+        self.assertEqual(pipeline.stats()['sinks']['flaky']['retries'], 2)
+
+    def test_dead_letter_after_max_retries(self):
+        """Urinishlar tugasa hodisalar dead-letter ga yozilishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'dead.jsonl')
+        pipeline = EventPipeline([FlakySink(failures=10)], batch_size=10, batch_interval=0.01,
+                                 max_retries=1, retry_backoff=0.01, dead_letter=JsonLinesSink(path))
+        pipeline.submit(events(2))
+        pipeline.close()
+
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_backpressure_blocks_producer(self):
+        """Navbat to'lganda submit bloklanishi va xotira cheklanishi kerak"""
+        sink = SlowSink(delay=0.1)
+        pipeline = EventPipeline([sink], batch_size=5, batch_interval=0.01, max_queue=10)
+        self.assertTrue(pipeline.submit(events(10)))
+        time.sleep(0.02)
+        self.assertTrue(pipeline.submit(events(5, 10)))
+        # Navbat to'la: qisqa timeout bilan qabul qilinmaydi
+        self.assertFalse(pipeline.submit(events(10, 15), timeout=0.01))
+
+        producer = threading.Thread(target=pipeline.submit, args=(events(10, 25),))
+        producer.start()
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        pipeline.close()
+        self.assertEqual(sink.count, 25)
+
+    def test_close_deadline_dead_letters_down_sink(self):
+        """Ishlamayotgan sink yopilishni muddatdan ortiq ushlamasligi, hodisalar dead-letter ga tushishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'dead.jsonl')
+        healthy = QueueSink()
+        pipeline = EventPipeline([FlakySink(failures=10 ** 6), healthy], batch_size=5, batch_interval=0.01,
+                                 max_retries=None, retry_backoff=0.05, dead_letter=JsonLinesSink(path))
+        pipeline.submit(events(5))
+        time.sleep(0.05)
+        pipeline.submit(events(7, 5))
+        start = time.monotonic()
+        self.assertFalse(pipeline.close(timeout=0.3))
+        self.assertLess(time.monotonic() - start, 1.5)
+
+        with open(path, encoding='utf-8') as f:
+            dead = [json.loads(line) for line in f]
+        self.assertEqual(sorted(int(row['event']['serialNo']) for row in dead), list(range(12)))
+        self.assertEqual({row['sink'] for row in dead}, {'flaky'})
+        self.assertEqual(pipeline.stats()['sinks']['flaky']['failed'], 12)
+        self.assertEqual(sum(len(healthy.queue.get()) for _ in range(healthy.queue.qsize())), 12)
+
+    def test_submit_is_all_or_nothing(self):
+        """Bitta sink navbati to'la bo'lsa to'plam hech bir sink ga qo'yilmasligi kerak"""
+        fast, slow = QueueSink(), SlowSink(delay=0.3)
+        pipeline = EventPipeline([fast, slow], batch_size=10, batch_interval=0.01, max_queue=10)
+        self.assertTrue(pipeline.submit(events(10)))
+        time.sleep(0.05)
+        self.assertTrue(pipeline.submit(events(10, 10)))
+        self.assertFalse(pipeline.submit(events(5, 20), timeout=0.05))
+        pipeline.close()
+
+        received = [event for _ in range(fast.queue.qsize()) for event in fast.queue.get()]
+        self.assertEqual(len(received), 20)
+        self.assertEqual(slow.count, 20)
+        self.assertEqual(pipeline.submitted, 20)
+
+    def test_sqlite_sink(self):
+        """SQLite sink hodisalarni jadvalga yozishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'events.db')
+        pipeline = EventPipeline([SQLiteSink(path)], batch_size=100, batch_interval=0.01)
+        pipeline.submit(events(3))
+        pipeline.close()
+
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM events').fetchone()[0], 3)
+
+    def test_csv_sink_extends_header(self):
+        """Keyinroq paydo bo'lgan maydonlar tashlanmasdan sarlavhaga qo'shilishi kerak"""
+        path = os.path.join(tempfile.mkdtemp(), 'events.csv')
+        sink = CsvSink(path)
+        sink.write([{'serialNo': '1', 'time': 't1'}])
+        sink.write([{'serialNo': '2', 'time': 't2', 'name': 'Ali'}])
+        # Yangi obyekt (qayta ishga tushirish) sarlavhani fayldan o'qiydi
+        CsvSink(path).write([{'serialNo': '3', 'cardNo': '0012345'}])
+
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0]), ['serialNo', 'time', 'name', 'cardNo'])
+        self.assertEqual([row['name'] for row in rows], ['', 'Ali', ''])
+        self.assertEqual(rows[2]['cardNo'], '0012345')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
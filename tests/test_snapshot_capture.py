@@ -0,0 +1,153 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import requests
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.snapshot_capture import FAILED, SAVED, UNCHANGED, SnapshotScheduler
+
+
+class FakeResponse:
+    def __init__(self, body, content_type='image/jpeg'):
+        self.body = body
+        self.headers = {'Content-Type': content_type}
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCamera:
+    """Kadrlarni qaytaruvchi va parallel so'rovlarni sanovchi soxta qurilma"""
+
+    def __init__(self, host='10.0.0.1', frames=None, delay=0.0, channels=None):
+        self.config = HikVisionConfig()
+        self.config.HOST = host
+        self.frames = frames
+        self.delay = delay
+        self.channels = channels or []
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_channels(self):
+        raise AssertionError("kadr kanallari video kirishlaridan emas, oqimlardan olinishi kerak")
+
+    def get_streaming_channels(self):
+        return self.channels
+
+    def open_snapshot(self, channel, stream=1):
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            number = self.requests
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        body = self.frames(channel, number) if self.frames else b'\xff\xd8' + bytes([number % 256]) * 5000
+        return FakeResponse(body)
+
+
+class TestSnapshotCapture(unittest.TestCase):
+    """Kanallardan davriy kadr olish testlari"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_capture_skips_unchanged_frames(self):
+        camera = FakeCamera(frames=lambda channel, number: b'\xff\xd8same' if number < 3 else b'\xff\xd8new')
+        capture = SnapshotScheduler(self.tmp_dir, chunk_size=4)
+        target, = capture.add_device(camera, [1], name='kirish')
+        self.assertEqual([capture.capture(target) for _ in range(4)], [SAVED, UNCHANGED, SAVED, UNCHANGED])
+        files = os.listdir(os.path.join(self.tmp_dir, 'kirish', 'ch1'))
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(name.endswith('.jpg') for name in files))
+
+    def test_non_image_response_fails(self):
+        camera = FakeCamera()
+        camera.open_snapshot = lambda channel, stream=1: FakeResponse(b'<ResponseStatus/>', 'application/xml')
+        capture = SnapshotScheduler(self.tmp_dir)
+        target, = capture.add_device(camera, [1])
+        self.assertEqual(capture.capture(target), FAILED)
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_channels_from_device(self):
+        camera = FakeCamera(channels=[{'id': '101'}, {'id': '102'}, {'id': '201'}, {'name': 'x'},
+                                      {'id': '301', 'enabled': 'false'}, {'id': '401', 'enabled': 'true'}])
+        capture = SnapshotScheduler(self.tmp_dir)
+        self.assertEqual([target.channel for target in capture.add_device(camera)], [1, 2, 4])
+        self.assertEqual([target.channel for target in capture.add_device(FakeCamera('10.0.0.2'))], [1])
+
+    def test_channels_from_streaming_list(self):
+        """Haqiqiy StreamingChannelList javobidan kanal raqamlari"""
+        config = HikVisionConfig()
+        config.HOST = '10.0.0.3'
+        api = HikVisionAPI(config)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = (b'<StreamingChannelList version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+                             b'<StreamingChannel><id>101</id><enabled>true</enabled></StreamingChannel>'
+                             b'<StreamingChannel><id>102</id><enabled>true</enabled></StreamingChannel>'
+                             b'<StreamingChannel><id>201</id><enabled>true</enabled></StreamingChannel>'
+                             b'</StreamingChannelList>')
+        with mock.patch.object(api.session, 'request', return_value=response) as request:
+            targets = SnapshotScheduler(self.tmp_dir).add_device(api)
+        self.assertTrue(request.call_args[0][1].endswith(config.API_STREAMING))
+        self.assertEqual([target.channel for target in targets], [1, 2])
+
+    def test_rate_and_device_concurrency(self):
+        cameras = [FakeCamera(f"10.0.0.{i}", delay=0.02) for i in range(3)]
+        capture = SnapshotScheduler(self.tmp_dir, frames_per_minute=600, device_concurrency=2, workers=16)
+        for camera in cameras:
+            capture.add_device(camera, [1, 2, 3, 4])
+        stats = capture.run(duration=1.0)
+        self.assertLessEqual(max(camera.peak for camera in cameras), 2)
+        # 600 kadr/daqiqa = 10 kadr/s, kanal boshiga
+        self.assertGreater(stats['total']['frames_per_minute'], 450)
+        self.assertLess(stats['total']['frames_per_minute'], 660)
+        self.assertEqual(stats['total']['failed'], 0)
+        self.assertEqual(stats['total']['channels'], 12)
+
+    def test_slow_device_does_not_pile_up(self):
+        camera = FakeCamera(delay=0.25)
+        capture = SnapshotScheduler(self.tmp_dir, frames_per_minute=600)
+        capture.add_device(camera, [1])
+        stats = capture.run(duration=0.8)
+        self.assertLessEqual(camera.requests, 4)
+        self.assertGreater(stats['total']['late'], 0)
+
+    def test_api_snapshot_endpoint(self):
+        api = HikVisionAPI(HikVisionConfig())
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'\xff\xd8'
+        response._content_consumed = True
+        with mock.patch.object(api.session, 'request', return_value=response) as request:
+            api.open_snapshot(3).close()
+        method, url = request.call_args.args
+        self.assertEqual(method, 'GET')
+        self.assertTrue(url.endswith('ISAPI/Streaming/channels/301/picture'))
+        self.assertTrue(request.call_args.kwargs['stream'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,68 @@
+import unittest
+import subprocess
+import sys
+import os
+import json
+
+# Loyiha yo'lini qo'shish
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_DIR)
+
+# `import main` uchun ruxsat etilgan vaqt (interpreter ishga tushishisiz)
+STARTUP_BUDGET_SECONDS = 0.15
+
+# CLI ishga tushganda import qilinmasligi kerak bo'lgan kutubxonalar
+HEAVY_MODULES = ('requests', 'urllib3', 'colorama', 'tqdm', 'dotenv')
+
+MEASURE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def run_python(code):
+    """Yangi interpreter da kod ishga tushirish va stdout ni qaytarish"""
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stdout.strip().splitlines()[-1]
+
+
+class TestStartup(unittest.TestCase):
+    """CLI ishga tushish vaqti testlari"""
+
+    def test_main_import_is_lazy_and_within_budget(self):
+        """main.py import qilinganda og'ir kutubxonalar yuklanmasligi kerak"""
+        # Birinchi ishga tushirish .pyc fayllarni yaratadi, ikkinchisi o'lchanadi
+        run_python(MEASURE_SCRIPT)
+        report = json.loads(run_python(MEASURE_SCRIPT))
+
+        self.assertEqual(report['loaded'], [])
+        self.assertLess(report['elapsed'], STARTUP_BUDGET_SECONDS)
+
+    def test_config_is_resolved_on_first_access(self):
+        """Konfiguratsiya import vaqtida emas, birinchi murojaatda o'qilishi kerak"""
+        code = (
+            "import os, sys\n"
+            "from src.config import HikVisionConfig\n"
+            "loaded_on_import = 'dotenv' in sys.modules\n"
+            "os.environ['HIKVISION_PORT'] = '8080'\n"
+            "print(loaded_on_import, HikVisionConfig.PORT, 'dotenv' in sys.modules)"
+        )
+        self.assertEqual(run_python(code), 'False 8080 True')
+
+    def test_instance_override(self):
+        """Instance darajasidagi qiymat EnvSetting dan ustun bo'lishi kerak"""
+        from src.config import HikVisionConfig
+        config = HikVisionConfig()
+        config.HOST = '10.0.0.5'
+        self.assertEqual(config.base_url, f"http://10.0.0.5:{HikVisionConfig.PORT}")
+        self.assertEqual(HikVisionConfig.HOST, '172.18.18.60')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import json
+import time
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import requests
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.status import StatusRegistry, start_status_server, status
+
+
+def fetch(server, path):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestStatus(unittest.TestCase):
+    """Qurilmalar holati registri va HTTP endpoint testlari"""
+
+    def test_registry_tracks_requests_sync_and_jobs(self):
+        registry = StatusRegistry(stale_after=60)
+        registry.record_request('kirish', 200)
+        registry.record_sync('kirish', time.time() - 30)
+        registry.record_job('kirish', 'card_index')
+        registry.record_request('ombor', None, 'timeout')
+        registry.record_request('ombor', None)
+
+        devices = registry.snapshot()['devices']
+        self.assertTrue(devices['kirish']['healthy'])
+        self.assertTrue(devices['kirish']['reachable'])
+        self.assertAlmostEqual(devices['kirish']['event_lag'], 30, delta=1)
+        self.assertLess(devices['kirish']['cache_age']['card_index'], 1)
+        self.assertFalse(devices['ombor']['healthy'])
+        self.assertFalse(devices['ombor']['reachable'])
+        self.assertEqual(devices['ombor']['consecutive_failures'], 2)
+        self.assertEqual(devices['ombor']['last_error'], 'Ulanish xatosi')
+
+        # HTTP xato: qurilma javob beryapti, lekin so'rov muvaffaqiyatsiz
+        registry.record_request('kirish', 401)
+        device = registry.snapshot()['devices']['kirish']
+        self.assertTrue(device['reachable'])
+        self.assertEqual((device['consecutive_failures'], device['last_error']), (1, 'HTTP 401'))
+        registry.remove('ombor')
+        self.assertEqual(registry.snapshot()['summary'], {'devices': 1, 'healthy': 1})
+
+    def test_health_and_stale_devices(self):
+        registry = StatusRegistry(stale_after=60)
+        self.assertTrue(registry.healthy())
+        registry.record_request('kirish', None, 'timeout')
+        self.assertFalse(registry.healthy())
+        with mock.patch('src.status.time.time', return_value=time.time() - 120):
+            registry.record_request('ombor', 200)
+        self.assertFalse(registry.healthy())
+        registry.record_request('ombor', 200)
+        self.assertTrue(registry.healthy())
+
+    def test_render_is_cached(self):
+        registry = StatusRegistry(cache_ttl=60)
+        first = registry.render()
+        registry.record_request('kirish', 200)
+        self.assertIs(registry.render(), first)
+        registry.cache_ttl = 0
+        self.assertIn(b'kirish', registry.render())
+
+    def test_api_requests_update_status(self):
+        config = HikVisionConfig()
+        config.HOST = '10.9.9.9'
+        api = HikVisionAPI(config)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'<DeviceInfo><model>DS-K1T</model></DeviceInfo>'
+        with mock.patch.object(api.session, 'request', return_value=response):
+            api.get_device_info()
+        self.assertTrue(status.snapshot()['devices']['10.9.9.9']['healthy'])
+        with mock.patch.object(api.session, 'request', side_effect=requests.exceptions.ConnectTimeout('timeout')):
+            api.get_device_info()
+        device = status.snapshot()['devices']['10.9.9.9']
+        self.assertEqual(device['consecutive_failures'], 1)
+        self.assertIn('timeout', device['last_error'])
+        status.remove('10.9.9.9')
+
+    def test_http_endpoints(self):
+        registry = StatusRegistry(stale_after=60, cache_ttl=0)
+        server = start_status_server(0, '127.0.0.1', registry)
+        try:
+            self.assertEqual(fetch(server, '/health'), (200, {'status': 'ok'}))
+            registry.record_request('kirish', None, 'timeout')
+            self.assertEqual(fetch(server, '/health')[0], 503)
+            code, body = fetch(server, '/status')
+            self.assertEqual(code, 200)
+            self.assertEqual(body['devices']['kirish']['consecutive_failures'], 1)
+
+            start = time.perf_counter()
+            for _ in range(50):
+                fetch(server, '/status')
+            self.assertLess((time.perf_counter() - start) / 50, 0.05)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
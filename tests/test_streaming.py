@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import tracemalloc
+from unittest import mock
+
+import requests
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.scheduler import DeviceScheduler
+from src.xml_utils import iter_records
+
+NS = b' xmlns="http://www.hikvision.com/ver20/XMLSchema"'
+
+
+class LazyUserDump:
+    """Foydalanuvchilar ro'yxatini o'qilishiga qarab yaratadigan soxta soket"""
+
+    def __init__(self, count):
+        self.count = count
+        self.reads = 0
+        self.closed = False
+        self._buffer = b'<UserInfoList' + NS + b'><numOfMatches>%d</numOfMatches>' % count
+        self._next = 0
+
+    def read(self, size=-1, **kwargs):
+        while len(self._buffer) < size and self._next <= self.count:
+            if self._next == self.count:
+                self._buffer += b'</UserInfoList>'
+            else:
+                self._buffer += (b'<UserInfo><employeeNo>%d</employeeNo><name>Xodim %d</name>'
+                                 b'<userType>normal</userType><Valid><enable>true</enable>'
+                                 b'<beginTime>2024-01-01T00:00:00</beginTime></Valid>'
+                                 b'<note>%s</note></UserInfo>' % (self._next, self._next, b'x' * 200))
+            self._next += 1
+        self.reads += 1
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+def streamed_response(raw):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = raw
+    return response
+
+
+class TestStreaming(unittest.TestCase):
+    """Katta javoblarni oqim bilan parse qilish testlari"""
+
+    def setUp(self):
+        self.api = HikVisionAPI(HikVisionConfig())
+        self.api.scheduler = DeviceScheduler('test', max_concurrency=1)
+
+    def test_iter_records_across_chunks(self):
+        """Bo'laklar chegarasi va namespace yozuvlarni buzmasligi kerak"""
+        xml = (b'<CardInfoList' + NS + b'><CardInfo><cardNo>1</cardNo></CardInfo>'
+               b'<CardInfo><cardNo>2</cardNo><employeeNo>7</employeeNo></CardInfo></CardInfoList>')
+        chunks = [xml[i:i + 5] for i in range(0, len(xml), 5)]
+        self.assertEqual(list(iter_records(chunks, ('CardInfo',))),
+                         [{'cardNo': '1'}, {'cardNo': '2', 'employeeNo': '7'}])
+
+        events = b'<AcsEvent><searchID>1</searchID><InfoList><major>5</major></InfoList></AcsEvent>'
+        self.assertEqual(list(iter_records([events], ('AcsEvent', 'InfoList'))), [{'major': '5'}])
+        single = b'<UserInfo><employeeNo>3</employeeNo></UserInfo>'
+        self.assertEqual(list(iter_records([single], ('UserInfo',))), [{'employeeNo': '3'}])
+
+    def test_records_yielded_before_body_is_read(self):
+        """Birinchi yozuv butun tana o'qilishidan oldin qaytishi, joy yopilganda bo'shashi kerak"""
+        raw = LazyUserDump(10000)
+        with mock.patch.object(self.api.session, 'request', return_value=streamed_response(raw)) as request:
+            users = self.api.iter_user_info()
+            first = next(users)
+            self.assertEqual(first['employeeNo'], '0')
+            self.assertTrue(request.call_args.kwargs['stream'])
+            self.assertLess(raw._next, raw.count)
+            self.assertEqual(self.api.scheduler.stats()['active'], 1)
+            users.close()
+        self.assertTrue(raw.closed)
+        self.assertEqual(self.api.scheduler.stats()['active'], 0)
+
+    def test_large_dump_memory_is_bounded(self):
+        """~12 MB lik ro'yxat bir necha MB xotirada o'qilishi kerak"""
+        raw = LazyUserDump(40000)
+        with mock.patch.object(self.api.session, 'request', return_value=streamed_response(raw)):
+            tracemalloc.start()
+            try:
+                count = sum(1 for _ in self.api.iter_user_info())
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        self.assertEqual(count, 40000)
+        self.assertLess(peak, 4 * 1024 * 1024)
+        self.assertEqual(self.api.scheduler.stats()['active'], 0)
+
+    def test_get_user_info_unwraps_list(self):
+        """get_user_info ro'yxat ildizi ichidagi foydalanuvchilarni qaytarishi kerak"""
+        with mock.patch.object(self.api.session, 'request', return_value=streamed_response(LazyUserDump(3))):
+            users = self.api.get_user_info()
+        self.assertEqual([user['employeeNo'] for user in users], ['0', '1', '2'])
+        self.assertEqual(self.api.scheduler.stats()['active'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
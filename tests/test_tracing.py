@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# Loyiha yo'lini qo'shish
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from src.config import HikVisionConfig
+from src.hikvision_api import HikVisionAPI
+from src.tracing import MemoryExporter, tracer
+
+
+def make_response(content=b"<DeviceInfo><model>DS-K1T341CM</model></DeviceInfo>"):
+    """Soxta requests.Response yaratish"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.url = "http://172.18.18.60:80/ISAPI/System/deviceInfo"
+    return response
+
+
+class DigestHandler(BaseHTTPRequestHandler):
+    """Digest challenge beradigan, sarlavha va tanani kechiktirib yuboradigan soxta qurilma"""
+
+    protocol_version = 'HTTP/1.1'
+    header_delay = 0.1
+    body_delay = 0.2
+
+    def do_GET(self):
+        if 'Authorization' not in self.headers:
+            body = b'<ResponseStatus/>'
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Digest realm="IP Camera", qop="auth", '
+                                                 'nonce="4e6f6e6365", opaque="", algorithm="MD5"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        body = b"<DeviceInfo><model>DS-K1T341CM</model></DeviceInfo>"
+        time.sleep(self.header_delay)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.flush()
+        time.sleep(self.body_delay)
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTracing(unittest.TestCase):
+    """So'rov trace lari testlari"""
+
+    def setUp(self):
+        self.exporter = MemoryExporter()
+        tracer.configure(True, sample_rate=1.0, exporter=self.exporter)
+        self.api = HikVisionAPI(HikVisionConfig())
+
+    def tearDown(self):
+        tracer.configure(False)
+
+    def test_request_and_parse_spans(self):
+        """request, wait, transfer va parse span lari bitta trace da bo'lishi kerak"""
+        with mock.patch.object(self.api.session, 'request', return_value=make_response()):
+            self.api.get_device_info()
+
+        names = [span.name for span in self.exporter.spans]
+        self.assertEqual(names, ['request', 'wait', 'transfer', 'parse'])
+        self.assertEqual(len({span.trace_id for span in self.exporter.spans}), 1)
+        root = self.exporter.spans[0]
+        self.assertEqual(self.exporter.spans[-1].parent_id, root.span_id)
+        self.assertEqual(root.to_dict()['attrs']['status'], 200)
+
+    def test_zero_sample_rate_records_nothing(self):
+        """sample_rate=0 bo'lsa trace yozilmasligi kerak"""
+        tracer.configure(True, sample_rate=0.0, exporter=self.exporter)
+        with mock.patch.object(self.api.session, 'request', return_value=make_response()):
+            self.api.get_device_info()
+        self.assertEqual(self.exporter.spans, [])
+
+    def start_device(self):
+        """Digest auth li soxta qurilmani ishga tushirib API ni unga ulash"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), DigestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        patches = [mock.patch.object(HikVisionConfig, 'HOST', '127.0.0.1'),
+                   mock.patch.object(HikVisionConfig, 'PORT', server.server_address[1]),
+                   mock.patch.object(HikVisionConfig, 'PASSWORD', 'tracing-test')]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        api = HikVisionAPI(HikVisionConfig())
+        self.addCleanup(api.close)
+        return api
+
+    def durations(self):
+        return {span.name: span.duration for span in self.exporter.spans}
+
+    def test_digest_challenge_phases(self):
+        """Digest takrori bilan ham wait sarlavhalargacha, transfer tana o'qilishini o'lchashi kerak"""
+        api = self.start_device()
+        self.assertEqual(api.get_device_info()['model'], 'DS-K1T341CM')
+
+        names = [span.name for span in self.exporter.spans]
+        self.assertEqual(names, ['request', 'auth', 'wait', 'transfer', 'parse'])
+        durations = self.durations()
+        self.assertGreaterEqual(durations['wait'], 0.09)
+        self.assertGreaterEqual(durations['transfer'], 0.18)
+        self.assertLess(durations['auth'], 0.09)
+
+    def test_stream_transfer_covers_body(self):
+        """stream=True javobda span lar javob yopilganda tana o'qilishi bilan yozilishi kerak"""
+        api = self.start_device()
+        response = api.open_snapshot(1)
+        self.assertEqual(self.exporter.spans, [])
+        time.sleep(0.05)
+        response.content
+        response.close()
+
+        durations = self.durations()
+        self.assertGreaterEqual(durations['wait'], 0.09)
+        self.assertGreaterEqual(durations['transfer'], 0.18)
+        self.assertGreaterEqual(durations['request'], durations['wait'] + durations['transfer'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)